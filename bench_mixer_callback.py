@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Benchmark: output callback mixing cost vs. number of active cues.
+
+Compares the legacy per-cue callback loop (pull -> gain/envelope -> `outdata += chunk`
+-> per-cue RMS/peak + per-channel loop) with engine.processes.mixer.BatchMixer
+(pull into mixer rows -> cached fade-table gains -> one batched multiply + sum
+-> batched levels).
+
+No audio device, PyAV or sounddevice is required; cue PCM is synthetic.
+
+Usage:
+    python bench_mixer_callback.py [--block 512] [--channels 2] [--iters 2000] [--fade-ratio 0.5]
+"""
+from __future__ import annotations
+
+import argparse
+import math
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from engine.processes.fade_curves import get_fade_table
+from engine.processes.mixer import BatchMixer
+
+
+class _Fade:
+    """Legacy output_process._FadeEnv batch gain computation (np.sin every block)."""
+
+    def __init__(self, start: float, target: float, frames: int) -> None:
+        self.start = start
+        self.target = target
+        self.total = max(1, frames)
+        self.frames_left = self.total
+
+    def compute_batch_gains(self, n: int) -> np.ndarray:
+        idx = np.arange(n, dtype=np.float32)
+        t = np.clip(1.0 - ((self.frames_left - idx) / self.total), 0.0, 1.0)
+        s = np.sin(t * np.pi / 2)
+        self.frames_left -= n
+        if self.frames_left <= 0:
+            self.frames_left = self.total  # keep fading for the whole benchmark
+        return (self.start + s * (self.target - self.start)).astype(np.float32)
+
+
+class _TableFade:
+    """Minimal copy of output_process._FadeEnv.fill_gains (cached curve table slice)."""
+
+    def __init__(self, start: float, target: float, frames: int) -> None:
+        self.start = start
+        self.target = target
+        self.total = max(1, frames)
+        self.frames_left = self.total
+        self._table = get_fade_table("equal_power", self.total)
+
+    def fill_gains(self, out: np.ndarray) -> None:
+        n = out.shape[0]
+        pos = self.total - self.frames_left
+        avail = max(0, min(n, self.total + 1 - pos))
+        np.multiply(self._table[pos : pos + avail], self.target - self.start, out=out[:avail])
+        out[:avail] += self.start
+        out[avail:] = self.target
+        self.frames_left -= n
+        if self.frames_left <= 0:
+            self.frames_left = self.total  # keep fading for the whole benchmark
+
+
+def _make_sources(cues: int, frames: int, channels: int) -> list[np.ndarray]:
+    rng = np.random.default_rng(1234)
+    return [(rng.standard_normal((frames * 8, channels)) * 0.1).astype(np.float32) for _ in range(cues)]
+
+
+def _legacy_callback(outdata, frames, channels, sources, positions, scratch, fades, gains):
+    outdata.fill(0.0)
+    levels = {}
+    per_ch = {}
+    for i, src in enumerate(sources):
+        pos = positions[i]
+        chunk = scratch[i]
+        chunk[:] = src[pos : pos + frames]
+        positions[i] = (pos + frames) % (src.shape[0] - frames)
+        env = fades[i]
+        if env is not None:
+            chunk *= env.compute_batch_gains(frames)[:, None]
+        else:
+            chunk *= gains[i]
+        outdata += chunk
+        rms = float(np.sqrt(np.mean(np.square(chunk))))
+        peak = float(np.max(np.abs(chunk)))
+        levels[i] = (rms, peak)
+        rms_ch = []
+        peak_ch = []
+        for ch in range(channels):
+            ch_data = chunk[:, ch]
+            rms_ch.append(float(np.sqrt(np.mean(np.square(ch_data)))))
+            peak_ch.append(float(np.max(np.abs(ch_data))))
+        per_ch[i] = (rms_ch, peak_ch)
+    np.clip(outdata, -1.0, 1.0, out=outdata)
+    return levels, per_ch
+
+
+def _mixer_callback(outdata, frames, channels, sources, positions, mixer, fades, gains):
+    mixer.begin(frames)
+    rows = []
+    for i, src in enumerate(sources):
+        pos = positions[i]
+        row = mixer.add()
+        mixer.block(row)[:] = src[pos : pos + frames]
+        positions[i] = (pos + frames) % (src.shape[0] - frames)
+        env = fades[i]
+        if env is not None:
+            env.fill_gains(mixer.gain_row(row))
+        else:
+            mixer.gain_row(row).fill(gains[i])
+        rows.append((i, row))
+    mixer.mix(outdata)
+    levels = {}
+    per_ch = {}
+    if rows:
+        rms_rows, peak_rows = mixer.levels()
+        for i, row in rows:
+            rms_ch = rms_rows[row].tolist()
+            peak_ch = peak_rows[row].tolist()
+            levels[i] = (math.sqrt(sum(v * v for v in rms_ch) / len(rms_ch)), max(peak_ch))
+            per_ch[i] = (rms_ch, peak_ch)
+    np.clip(outdata, -1.0, 1.0, out=outdata)
+    return levels, per_ch
+
+
+def _time_it(fn, iters: int) -> tuple[float, float]:
+    samples = np.empty(iters, dtype=np.float64)
+    for k in range(iters):
+        t0 = time.perf_counter()
+        fn()
+        samples[k] = (time.perf_counter() - t0) * 1e6
+    return float(np.median(samples)), float(np.percentile(samples, 99))
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--block", type=int, default=512)
+    ap.add_argument("--channels", type=int, default=2)
+    ap.add_argument("--sample-rate", type=int, default=48000)
+    ap.add_argument("--iters", type=int, default=2000)
+    ap.add_argument("--fade-ratio", type=float, default=0.5, help="fraction of cues with an active fade envelope")
+    ap.add_argument("--cues", type=str, default="1,2,4,8,16,24,32,48,64")
+    args = ap.parse_args()
+
+    frames = int(args.block)
+    channels = int(args.channels)
+    budget_us = frames / float(args.sample_rate) * 1e6
+    cue_counts = [int(c) for c in args.cues.split(",") if c.strip()]
+
+    print(f"block={frames} channels={channels} budget={budget_us:.0f}us fade_ratio={args.fade_ratio} iters={args.iters}")
+    print(f"{'cues':>5} | {'legacy p50':>11} {'legacy p99':>11} | {'mixer p50':>10} {'mixer p99':>10} | {'speedup':>7}")
+    print("-" * 70)
+    for cues in cue_counts:
+        sources = _make_sources(cues, frames, channels)
+        n_fades = int(round(cues * args.fade_ratio))
+        gains = [0.8] * cues
+        outdata = np.zeros((frames, channels), dtype=np.float32)
+
+        fades = [_Fade(1.0, 0.0, args.sample_rate) if i < n_fades else None for i in range(cues)]
+        positions = [0] * cues
+        scratch = [np.zeros((frames, channels), dtype=np.float32) for _ in range(cues)]
+        legacy = _time_it(lambda: _legacy_callback(outdata, frames, channels, sources, positions, scratch, fades, gains), args.iters)
+
+        fades = [_TableFade(1.0, 0.0, args.sample_rate) if i < n_fades else None for i in range(cues)]
+        positions = [0] * cues
+        mixer = BatchMixer(channels, max_frames=frames)
+        batched = _time_it(lambda: _mixer_callback(outdata, frames, channels, sources, positions, mixer, fades, gains), args.iters)
+
+        speedup = legacy[0] / batched[0] if batched[0] > 0 else float("inf")
+        print(
+            f"{cues:>5} | {legacy[0]:>9.1f}us {legacy[1]:>9.1f}us | {batched[0]:>8.1f}us {batched[1]:>8.1f}us | {speedup:>6.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
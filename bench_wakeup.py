@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Benchmark: idle CPU and command latency of sleep-polling vs. event-driven loops.
+
+Each loop runs in a spawned process fed by an mp.Queue, like the audio service,
+decode and output loops:
+
+- service: `time.sleep(pump_interval)` then drain (old audio_service_main, 5 ms)
+- decode:  `cmd_q.get(timeout=0.005)` + `time.sleep(0.001)` (old decode main loop)
+- output:  `cmd_q.get(timeout=0.01)` (old output main loop)
+- wakeup:  engine.processes.wakeup.Wakeup.wait(idle timeout) then drain (new)
+
+Idle CPU is the child's process time while no commands arrive. Command latency
+is put() -> the loop seeing the command, for commands sent at random gaps.
+
+No audio device, PyAV or sounddevice is required.
+
+Usage:
+    python bench_wakeup.py [--idle-s 3] [--commands 200] [--gap-ms 7]
+"""
+from __future__ import annotations
+
+import argparse
+import multiprocessing as mp
+import queue
+import random
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from engine.processes.wakeup import Wakeup
+
+LOOPS = ("service", "decode", "output", "wakeup")
+
+
+def _loop(kind: str, cmd_q: mp.Queue, res_q: mp.Queue, idle_s: float) -> None:
+    wakeup = Wakeup([cmd_q]) if kind == "wakeup" else None
+    latencies: list[float] = []
+    idle_cpu: float | None = None
+    cpu0 = time.process_time()
+    idle_end = time.monotonic() + idle_s
+
+    def _handle(msg) -> bool:
+        if msg is None:
+            return False
+        latencies.append(time.monotonic() - float(msg))
+        return True
+
+    running = True
+    while running:
+        if idle_cpu is None and time.monotonic() >= idle_end:
+            idle_cpu = time.process_time() - cpu0
+            res_q.put(("idle", idle_cpu / idle_s))
+        if kind == "service":
+            time.sleep(0.005)
+            msgs = []
+            while True:
+                try:
+                    msgs.append(cmd_q.get_nowait())
+                except queue.Empty:
+                    break
+        elif kind == "decode":
+            msgs = []
+            try:
+                msgs.append(cmd_q.get(timeout=0.005))
+                while True:
+                    msgs.append(cmd_q.get_nowait())
+            except queue.Empty:
+                pass
+            time.sleep(0.001)
+        elif kind == "output":
+            try:
+                msgs = [cmd_q.get(timeout=0.01)]
+            except queue.Empty:
+                msgs = []
+        else:
+            wakeup.wait(0.5 if idle_cpu is not None else max(0.0, idle_end - time.monotonic()))
+            msgs = []
+            while True:
+                try:
+                    msgs.append(cmd_q.get_nowait())
+                except queue.Empty:
+                    break
+        for msg in msgs:
+            if not _handle(msg):
+                running = False
+    res_q.put(("latency", latencies))
+
+
+def _run(kind: str, idle_s: float, commands: int, gap_ms: float) -> dict:
+    ctx = mp.get_context("spawn")
+    cmd_q, res_q = ctx.Queue(), ctx.Queue()
+    proc = ctx.Process(target=_loop, args=(kind, cmd_q, res_q, idle_s), daemon=True)
+    proc.start()
+    tag, idle = res_q.get(timeout=idle_s + 30.0)
+    assert tag == "idle"
+    rng = random.Random(1)
+    for _ in range(commands):
+        time.sleep(rng.uniform(0.0, 2.0 * gap_ms) / 1000.0)
+        cmd_q.put(time.monotonic())
+    cmd_q.put(None)
+    tag, lat = res_q.get(timeout=30.0)
+    proc.join(timeout=5.0)
+    ms = np.asarray(lat, dtype=np.float64) * 1000.0
+    return {
+        "idle_cpu_pct": 100.0 * float(idle),
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "max_ms": float(ms.max()),
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--idle-s", type=float, default=3.0, help="Idle measurement window per loop (s)")
+    ap.add_argument("--commands", type=int, default=200, help="Commands sent per loop")
+    ap.add_argument("--gap-ms", type=float, default=7.0, help="Mean gap between commands (ms)")
+    ap.add_argument("--loops", default=",".join(LOOPS), help="Comma-separated subset of " + ",".join(LOOPS))
+    args = ap.parse_args()
+
+    print(f"{'loop':<8} {'idle cpu %':>10} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for kind in [k.strip() for k in args.loops.split(",") if k.strip()]:
+        if kind not in LOOPS:
+            raise SystemExit(f"unknown loop {kind!r}")
+        r = _run(kind, args.idle_s, args.commands, args.gap_ms)
+        print(f"{kind:<8} {r['idle_cpu_pct']:>10.2f} {r['p50_ms']:>8.3f} {r['p99_ms']:>8.3f} {r['max_ms']:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
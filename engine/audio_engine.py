@@ -5,12 +5,13 @@ import uuid
 import time
 import threading
 import queue
+import itertools
 import json
 import os
 from pathlib import Path
 from dataclasses import replace
 from datetime import datetime
-from typing import Dict, Optional, List
+from typing import Dict, Iterable, Optional, List
 
 from engine import cue
 from engine.cue import Cue, CueInfo
@@ -40,7 +41,9 @@ from engine.commands import (
     OutputSetConfig,
     OutputFadeTo,
     OutputListDevices,
+    OutputRenderUntil,
     SetTransitionFadeDurations,
+    ArmCuesCommand,
 )
 from engine.messages.events import (
     CueStartedEvent,
@@ -51,13 +54,21 @@ from engine.messages.events import (
     MasterLevelsEvent,
     BatchCueLevelsEvent,
     BatchCueTimeEvent,
+    CallbackTimingEvent,
+    OutputClockEvent,
 )
-from engine.processes.decode_process_pooled import decode_process_main, DecodeStart, DecodeStop, DecodedChunk, DecodeError
+from engine.processes.decode_process_pooled import decode_process_main, DecodeArm, DecodeStart, DecodeStop, DecodedChunk, DecodeError
 from engine.processes.output_process import output_process_main, OutputConfig, OutputStartCue, OutputStopCue
+from engine.processes.pcm_shm import PcmSlabPool
+from engine.probe_index import shared_index as shared_probe_index
+from engine.scheduler import Timer, TimerHeap
 import sounddevice as sd
 from log.log_manager import LogManager
 from log.service_log import coerce_log_path
 
+# A cue still active this long after its stop commands were sent is force-removed.
+_STUCK_STOP_TIMEOUT_S = 5.0
+
 class AudioEngine:
     def __init__(self, *, sample_rate: int = 48000, channels: int = 2, block_frames: int = 1024, fade_in_ms: int = 100, fade_out_ms: int = 1000, fade_curve: str = "equal_power", auto_fade_on_new: bool = True) -> None:
         self.sample_rate = int(sample_rate)
@@ -118,6 +129,11 @@ class AudioEngine:
 
         self._decode_proc: Optional[mp.Process] = None
         self._out_proc: Optional[mp.Process] = None
+        # Shared-memory PCM slab pool (decode -> output). Created in start(); the
+        # engine owns the segment and unlinks it in stop().
+        self._pcm_pool: Optional[PcmSlabPool] = None
+        # Direct mode: decoder sends PCM straight to the output process (set in start()).
+        self._decode_direct: bool = False
 
         self.active_cues: Dict[str, Cue] = {}
         # Store immutable CueInfo snapshots for logging/export when cues finish
@@ -138,15 +154,11 @@ class AudioEngine:
         self._global_loop_enabled: bool = False
         # track cues we've requested fades for to avoid duplicate commands
         self._fade_requested: set[str] = set()
-        # track cues pending force-stop: {cue_id: stop_time_unix}
-        self._pending_stops: Dict[str, float] = {}
-        # track cues for which we've already sent the stop commands (after fade elapsed)
-        # so we don't spam DecodeStop/OutputStopCue every pump()
-        self._stop_sent: set[str] = set()
-
-        # rate-limit refade checks to avoid spamming every pump call
-        self._last_refade_check: float = time.time()
-        self._refade_check_interval: float = 0.05  # Check every 50ms max
+        # Time-based work run by pump() when due (engine/scheduler.py), keyed by cue:
+        # ("stop", cue) sends the stop once a fade-out has elapsed, ("force_remove", cue)
+        # drops a cue that never reported finished, ("command", n) runs a scheduled command.
+        self._timers = TimerHeap()
+        self._scheduled_command_ids = itertools.count()
         # track events generated in play_cue() to be returned by pump()
         self._pending_events: List[object] = []
 
@@ -164,6 +176,15 @@ class AudioEngine:
         self._hb_decode_chunks_drained: int = 0
         self._hb_out_events_drained: int = 0
         self._hb_decode_events_drained: int = 0
+        # First-chunk latency: play_cue() -> first decoded PCM for the cue (decoder clock).
+        self._first_chunk_t0: dict[str, float] = {}
+        self._hb_max_first_chunk_ms: float = 0.0
+        self._hb_max_first_chunk_ms_window: float = 0.0
+        self.last_first_chunk_ms: float | None = None
+        # Latest output-stream sample clock (for PlayCueCommand.start_at_sample).
+        self.output_clock: OutputClockEvent | None = None
+        # Latest preroll store stats per decode shard (hits, misses, hit_rate, bytes).
+        self.preroll_stats: dict[int, dict] = {}
 
     def _dbg_print(self, msg: str) -> None:
         if self._debug_prints:
@@ -261,6 +282,18 @@ class AudioEngine:
         except Exception:
             pass
 
+        self._pcm_pool = self._create_pcm_pool()
+        pcm_pool_spec = self._pcm_pool.spec if self._pcm_pool is not None else None
+
+        from engine.tuning import DEFAULT_DECODE_DIRECT
+
+        try:
+            self._decode_direct = bool(
+                int(os.environ.get("STEPD_DECODE_DIRECT", str(DEFAULT_DECODE_DIRECT)).strip() or "0")
+            )
+        except Exception:
+            self._decode_direct = bool(DEFAULT_DECODE_DIRECT)
+
         # Record the active decode transport (queue vs pipe) for run-to-run comparisons.
         self._append_engine_debug(
             level="info",
@@ -268,11 +301,21 @@ class AudioEngine:
             metadata={
                 "decode_transport": self._decode_transport,
                 "max_active_decoders_env": os.environ.get("STEPD_MAX_ACTIVE_DECODERS"),
+                "pcm_shm": pcm_pool_spec is not None,
+                "pcm_shm_slabs": pcm_pool_spec.slab_count if pcm_pool_spec is not None else None,
+                "pcm_shm_slab_frames": pcm_pool_spec.slab_frames if pcm_pool_spec is not None else None,
+                "decode_direct": self._decode_direct,
             },
         )
         self._decode_proc = self._ctx.Process(
             target=decode_process_main,
-            args=(self._decode_cmd_q, self._decode_out_send, self._decode_evt_q),
+            args=(
+                self._decode_cmd_q,
+                self._decode_out_send,
+                self._decode_evt_q,
+                pcm_pool_spec,
+                self._out_pcm_q if self._decode_direct else None,
+            ),
             daemon=False,
         )
         self._decode_proc.start()
@@ -285,9 +328,48 @@ class AudioEngine:
             pass
 
         cfg = OutputConfig(sample_rate=self.sample_rate, channels=self.channels, block_frames=self.block_frames)
-        self._out_proc = self._ctx.Process(target=output_process_main, args=(cfg, self._out_cmd_q, self._out_pcm_q, self._out_evt_q, self._decode_cmd_q), daemon=True)
+        self._out_proc = self._ctx.Process(target=output_process_main, args=(cfg, self._out_cmd_q, self._out_pcm_q, self._out_evt_q, self._decode_cmd_q, pcm_pool_spec), daemon=True)
         self._out_proc.start()
 
+    def _create_pcm_pool(self) -> Optional[PcmSlabPool]:
+        """Create the shared-memory PCM slab pool unless disabled via STEPD_PCM_SHM=0.
+
+        Falls back to pickled PCM over the queues if the segment cannot be created.
+        """
+        from engine.tuning import DEFAULT_PCM_SHM_ENABLED, DEFAULT_PCM_SHM_SLABS, DEFAULT_PCM_SHM_SLAB_FRAMES
+
+        try:
+            enabled = bool(int(os.environ.get("STEPD_PCM_SHM", str(DEFAULT_PCM_SHM_ENABLED)).strip() or "0"))
+        except Exception:
+            enabled = bool(DEFAULT_PCM_SHM_ENABLED)
+        if not enabled:
+            return None
+        try:
+            slabs = int(os.environ.get("STEPD_PCM_SHM_SLABS", str(DEFAULT_PCM_SHM_SLABS)).strip() or str(DEFAULT_PCM_SHM_SLABS))
+        except Exception:
+            slabs = int(DEFAULT_PCM_SHM_SLABS)
+        try:
+            slab_frames = int(
+                os.environ.get("STEPD_PCM_SHM_SLAB_FRAMES", str(DEFAULT_PCM_SHM_SLAB_FRAMES)).strip()
+                or str(DEFAULT_PCM_SHM_SLAB_FRAMES)
+            )
+        except Exception:
+            slab_frames = int(DEFAULT_PCM_SHM_SLAB_FRAMES)
+        try:
+            return PcmSlabPool.create(
+                self._ctx,
+                slab_count=max(8, slabs),
+                slab_frames=max(1024, slab_frames),
+                channels=self.channels,
+            )
+        except Exception as e:
+            self._append_engine_debug(
+                level="warning",
+                message="pcm_shm_create_failed",
+                metadata={"error": f"{type(e).__name__}: {e}"},
+            )
+            return None
+
     def get_output_event_queue(self) -> mp.Queue:
         """Return the output process event queue for direct access."""
         return self._out_evt_q
@@ -333,6 +415,10 @@ class AudioEngine:
 
         self._decode_proc = None
         self._out_proc = None
+        if self._pcm_pool is not None:
+            self._pcm_pool.close()
+            self._pcm_pool.unlink()
+            self._pcm_pool = None
         self.active_cues.clear()
         self.cue_info_map.clear()
         self._removal_reasons.clear()
@@ -415,7 +501,7 @@ class AudioEngine:
                     try:
                         self._removal_reasons[cue_id] = "transport_stop"
                         self._fade_requested.discard(cue_id)
-                        self._pending_stops.pop(cue_id, None)
+                        self._timers.cancel_key(cue_id)
                         self._decode_cmd_q.put(DecodeStop(cue_id=cue_id))
                         self._out_cmd_q.put(OutputStopCue(cue_id=cue_id))
                     except Exception:
@@ -447,9 +533,8 @@ class AudioEngine:
                             self._removal_reasons[cmd.cue_id] = "manual_stop"
                             self._out_cmd_q.put(OutputFadeTo(cue_id=cmd.cue_id, target_db=-120.0, duration_ms=int(cmd.fade_out_ms), curve=getattr(cmd, "fade_curve", "linear")))
                             # schedule pending stop after fade duration
-                            self._pending_stops[cmd.cue_id] = time.time() + (int(cmd.fade_out_ms) / 1000.0)
+                            self._schedule_stop(cmd.cue_id, int(cmd.fade_out_ms) / 1000.0)
                             self._fade_requested.add(cmd.cue_id)
-                            self._stop_sent.discard(cmd.cue_id)
                             self.log.info(cue_id=cmd.cue_id, source="engine", message="stop_with_fade_requested", metadata={"fade_out_ms": cmd.fade_out_ms})
                         except Exception:
                             pass
@@ -535,7 +620,7 @@ class AudioEngine:
                     pass
                 return
 
-            if isinstance(cmd, OutputListDevices):
+            if isinstance(cmd, (OutputListDevices, OutputRenderUntil)):
                 try:
                     # Forward directly to output process; response comes back via output events.
                     self._out_cmd_q.put(cmd)
@@ -543,6 +628,10 @@ class AudioEngine:
                     pass
                 return
 
+            if isinstance(cmd, ArmCuesCommand):
+                self.arm_cues(cmd.cues)
+                return
+
             if isinstance(cmd, SetTransitionFadeDurations):
                 try:
                     self.fade_in_ms = int(cmd.fade_in_ms)
@@ -587,6 +676,29 @@ class AudioEngine:
         except Exception:
             pass
 
+    def _decode_start_block_frames(self) -> int:
+        # Tune decoder-side chunking contract. Historically this was hardcoded to
+        # `self.block_frames * 4`.
+        try:
+            decode_start_block_mult = int(os.environ.get("STEPD_DECODE_START_BLOCK_MULT", "4").strip() or "4")
+        except Exception:
+            decode_start_block_mult = 4
+        decode_start_block_mult = max(1, min(64, int(decode_start_block_mult)))
+        return int(self.block_frames) * int(decode_start_block_mult)
+
+    def arm_cues(self, cues: Iterable[tuple[str, int, Optional[int]]]) -> None:
+        """Replace the armed cue set: the decoder keeps each cue's first STEPD_PREROLL_MS decoded."""
+        heads = tuple(
+            (str(file_path), max(0, int(in_frame or 0)), None if out_frame is None else int(out_frame))
+            for file_path, in_frame, out_frame in cues
+            if file_path
+        )
+        try:
+            self._decode_cmd_q.put(DecodeArm(heads, self.sample_rate, self.channels, self._decode_start_block_frames()))
+            self.log.info(source="engine", message="arm_cues_requested", metadata={"cues": len(heads)})
+        except Exception:
+            pass
+
     def play_cue(
         self,
         cmd: PlayCueCommand,
@@ -626,8 +738,20 @@ class AudioEngine:
         except Exception:
             pass
         
-        # Only probe synchronously if we don't already have cached metadata.
-        if not file_metadata:
+        # Without cached metadata, use the shared probe index; on a miss the file is
+        # probed in the background for the next start instead of blocking this loop.
+        probe_index = shared_probe_index() if not file_metadata else None
+        if probe_index is not None:
+            entry = probe_index.get(cmd.file_path)
+            if entry is None:
+                probe_index.request(cmd.file_path)
+                self.log.info(source="engine", message="probe_index_miss", metadata={"cue_id": cue_id, "file": os.path.basename(cmd.file_path)})
+            else:
+                file_metadata.update(entry.get("metadata") or {})
+                if total_seconds is None and entry.get("duration_seconds") is not None:
+                    total_seconds = float(entry["duration_seconds"])
+        # Index disabled (STEPD_PROBE_INDEX=0): probe synchronously as before.
+        elif not file_metadata:
             # Always try to probe the file for metadata (independent of duration/out_frame)
             # Done synchronously since audio_engine runs in a separate process (won't block GUI)
             try:
@@ -720,7 +844,7 @@ class AudioEngine:
         # Per-call `layered=True` overrides the engine-level `auto_fade_on_new`.
         fade_others = (not layered) and self.auto_fade_on_new
         if fade_others:
-            stop_time = time.time() + (self.fade_out_ms / 1000.0)  # schedule stop after fade duration
+            stop_delay_s = self.fade_out_ms / 1000.0  # schedule stop after fade duration
             # Fade ALL other active cues (don't filter by _fade_requested)
             # The output process will handle duplicate fade commands gracefully
             old_cues = [c for c in list(self.active_cues.keys()) if c != cue_id]
@@ -742,7 +866,7 @@ class AudioEngine:
                         curve=self.fade_curve,
                     ), timeout=0.1)  # 100ms timeout to prevent stalling
                     self._fade_requested.add(old_cid)
-                    self._pending_stops[old_cid] = stop_time
+                    self._schedule_stop(old_cid, stop_delay_s)
                     fade_sent_count += 1
                     self.log.debug(cue_id=old_cid, source="engine", message="fade_requested_on_new_cue", metadata={"new_cue": cue_id, "removal_reason": "auto_fade"})
                     self._dbg_print(f"[FADE-QUEUED] cue={old_cid[:8]} -> output queue (sent={fade_sent_count})")
@@ -750,7 +874,7 @@ class AudioEngine:
                     # Queue full - still mark as pending so refade will retry
                     fade_failed_count += 1
                     self._fade_requested.add(old_cid)
-                    self._pending_stops[old_cid] = stop_time
+                    self._schedule_stop(old_cid, stop_delay_s)
                     self.log.warning(cue_id=old_cid, source="engine", message="fade_queue_timeout_will_retry", metadata={"new_cue": cue_id})
                     self._dbg_print(f"[FADE-QUEUE-TIMEOUT] cue={old_cid[:8]} queue full, will retry (failures={fade_failed_count})")
                 except Exception as e:
@@ -768,15 +892,9 @@ class AudioEngine:
         # CRITICAL: Send DecodeStart FIRST so decoder is ready before output process sends BufferRequest
         self._dbg_print(f"[ENGINE-PLAY-CUE] cue={cue.cue_id[:8]} sending DecodeStart")
 
-        # Tune decoder-side chunking contract. Historically this was hardcoded to
-        # `self.block_frames * 4`.
-        try:
-            decode_start_block_mult = int(os.environ.get("STEPD_DECODE_START_BLOCK_MULT", "4").strip() or "4")
-        except Exception:
-            decode_start_block_mult = 4
-        decode_start_block_mult = max(1, min(64, int(decode_start_block_mult)))
-        decode_start_block_frames = int(self.block_frames) * int(decode_start_block_mult)
+        decode_start_block_frames = self._decode_start_block_frames()
 
+        self._first_chunk_t0[cue.cue_id] = time.monotonic()
         self._decode_cmd_q.put(DecodeStart(
             cue_id=cue.cue_id,
             track_id=cue.track.track_id,
@@ -804,6 +922,8 @@ class AudioEngine:
             fade_in_curve=self.fade_curve,
             target_gain_db=cue.gain_db,
             loop_enabled=self._effective_loop_enabled(bool(getattr(cue, "loop_enabled", False))),
+            start_at_sample=(int(cmd.start_at_sample) if cmd.start_at_sample is not None else None),
+            start_quantum_frames=max(0, int(cmd.start_quantum_frames or 0)),
         ))
         self._output_started.add(cue.cue_id)
 
@@ -834,8 +954,7 @@ class AudioEngine:
         self._removal_reasons[cmd.cue_id] = "manual_stop"
         try:
             self._fade_requested.discard(cmd.cue_id)
-            self._pending_stops.pop(cmd.cue_id, None)
-            self._stop_sent.discard(cmd.cue_id)
+            self._timers.cancel_key(cmd.cue_id)
         except Exception:
             pass
         try:
@@ -900,6 +1019,137 @@ class AudioEngine:
         self._decode_cmd_q.put(cmd)
         self._dbg_print(f"[AudioEngine.update_cue] Commands queued")
 
+    def _note_first_chunk(self, cue_id: str, produced_mono: float | None) -> None:
+        """Record play -> first decoded chunk latency for a cue (once per cue start)."""
+        t0 = self._first_chunk_t0.pop(cue_id, None)
+        if t0 is None:
+            return
+        end = float(produced_mono) if produced_mono is not None else time.monotonic()
+        latency_ms = max(0.0, (end - t0) * 1000.0)
+        self.last_first_chunk_ms = latency_ms
+        if latency_ms > self._hb_max_first_chunk_ms_window:
+            self._hb_max_first_chunk_ms_window = latency_ms
+        if latency_ms > self._hb_max_first_chunk_ms:
+            self._hb_max_first_chunk_ms = latency_ms
+        self.log.info(cue_id=cue_id, source="engine", message="first_chunk_latency", metadata={"latency_ms": round(latency_ms, 2)})
+
+    def _start_output_on_first_chunk(self, cue_id: str, track_id: str | None) -> None:
+        """Send OutputStartCue for a cue whose first PCM is ready, unless already started."""
+        if cue_id not in self.active_cues or cue_id in self._output_started:
+            return
+        cue = self.active_cues.get(cue_id)
+        # If fading in, start silent
+        start_gain_db = cue.gain_db
+        if self.fade_in_ms > 0:
+            start_gain_db = -120.0
+        self._out_cmd_q.put(OutputStartCue(
+            cue_id=cue_id,
+            track_id=track_id,
+            gain_db=start_gain_db,
+            fade_in_duration_ms=self.fade_in_ms,
+            fade_in_curve=self.fade_curve,
+            target_gain_db=cue.gain_db,
+            loop_enabled=self._effective_loop_enabled(bool(getattr(cue, "loop_enabled", False))),
+        ))
+        self._output_started.add(cue_id)
+
+    def schedule_command(self, cmd: object, delay_s: float) -> None:
+        """Run `cmd` through handle_command() from pump() once `delay_s` seconds have passed."""
+        self._timers.schedule_in(delay_s, "command", next(self._scheduled_command_ids), cmd)
+
+    def output_sample_now(self) -> int | None:
+        """Estimated output-stream sample being rendered now, from the latest OutputClockEvent.
+
+        Add a margin (e.g. STEPD_OUTPUT_START_LEAD_MS worth of samples) before using it
+        as a PlayCueCommand.start_at_sample, so the cue's first PCM can arrive in time.
+        """
+        clock = self.output_clock
+        if clock is None:
+            return None
+        elapsed = max(0.0, time.monotonic() - clock.mono_time)
+        return int(clock.sample_pos + elapsed * clock.sample_rate)
+
+    def next_timer_deadline(self) -> float | None:
+        """Monotonic time of the next scheduled engine timer, or None."""
+        return self._timers.next_deadline()
+
+    def _schedule_stop(self, cue_id: str, delay_s: float) -> None:
+        """Send the stop commands for `cue_id` after `delay_s` (its fade-out)."""
+        self._timers.cancel("force_remove", cue_id)
+        self._timers.schedule_in(delay_s, "stop", cue_id)
+
+    def _run_timer(self, timer: Timer, evts: List[object]) -> None:
+        cue_id = timer.key
+        if timer.kind == "command":
+            try:
+                self.handle_command(timer.payload)
+            except Exception:
+                pass
+            return
+        if cue_id not in self.active_cues:
+            return
+
+        if timer.kind == "stop":
+            # The fade-out has elapsed: turn the "fade to silence" into an actual stop.
+            # Output reports "finished"; if it never does, force-remove the cue later.
+            try:
+                # If the caller didn't set an explicit removal reason, treat this as a stop.
+                self._removal_reasons.setdefault(cue_id, "manual_stop")
+            except Exception:
+                pass
+            try:
+                self._decode_cmd_q.put(DecodeStop(cue_id=cue_id))
+            except Exception:
+                pass
+            try:
+                self._out_cmd_q.put(OutputStopCue(cue_id=cue_id))
+            except Exception:
+                pass
+            self._timers.schedule_in(_STUCK_STOP_TIMEOUT_S, "force_remove", cue_id)
+            return
+
+        if timer.kind == "force_remove":
+            # Rare safety valve: fades should complete naturally and emit finished events.
+            cue = self.active_cues.pop(cue_id, None)
+            cue_info = self.cue_info_map.pop(cue_id, None)
+            self._output_started.discard(cue_id)
+            self._first_chunk_t0.pop(cue_id, None)
+            self._fade_requested.discard(cue_id)
+            self._timers.cancel_key(cue_id)
+
+            if self.primary_cue_id == cue_id:
+                self.primary_cue_id = None
+
+            # Send explicit stop commands to clean up
+            try:
+                self._decode_cmd_q.put(DecodeStop(cue_id=cue_id))
+                self._out_cmd_q.put(OutputStopCue(cue_id=cue_id))
+            except Exception:
+                pass
+
+            self.log.warning(cue_id=cue_id, source="engine", message="force_removed_stuck_cue", metadata={"reason": "emergency_timeout_exceeded", "timeout_seconds": _STUCK_STOP_TIMEOUT_S})
+
+            # Generate cue_finished event for GUI
+            if cue and cue_info:
+                stopped_at = datetime.now()
+                final_cue_info = replace(cue_info, stopped_at=stopped_at, removal_reason="emergency_stop")
+                evts.append(CueFinishedEvent(cue_info=final_cue_info, reason="forced"))
+
+    def wakeup_sources(self) -> List[object]:
+        """Channels pump() reads from; a host loop can block on them (engine/processes/wakeup.py)."""
+        return [self._decode_out_q, self._decode_evt_q, self._out_evt_q]
+
+    def needs_pump(self) -> bool:
+        """True while pump() should run every interval (active cues or queued events).
+
+        Otherwise the host may sleep until an input arrives or next_timer_deadline().
+        """
+        return bool(self.active_cues or self._pending_events)
+
+    def mark_idle(self) -> None:
+        """The host is about to block with nothing to do: don't count the wait as a slow pump."""
+        self._hb_last_pump_mono = None
+
     def pump(self) -> List[object]:
         evts: List[object] = []
 
@@ -948,9 +1198,9 @@ class AudioEngine:
             cue_info = self.cue_info_map.pop(cue_id, None)
             try:
                 self._output_started.discard(cue_id)
+                self._first_chunk_t0.pop(cue_id, None)
                 self._fade_requested.discard(cue_id)
-                self._pending_stops.pop(cue_id, None)
-                self._stop_sent.discard(cue_id)
+                self._timers.cancel_key(cue_id)
             except Exception:
                 pass
             if self.primary_cue_id == cue_id:
@@ -1002,76 +1252,11 @@ class AudioEngine:
                 final_cue_info = replace(cue_info, stopped_at=stopped_at, removal_reason=removal_reason)
                 evts.append(CueFinishedEvent(cue_info=final_cue_info, reason=removal_reason))
 
-        # Dispatch any pending fade-outs whose stop time has elapsed.
-        # This is the missing step that turns a "fade to silence" into an actual stop.
-        # We send DecodeStop + OutputStopCue once per cue and then wait for output to emit "finished".
-        current_time = time.time()
-        for cue_id, stop_time in list(self._pending_stops.items()):
-            if cue_id not in self.active_cues:
-                self._pending_stops.pop(cue_id, None)
-                self._stop_sent.discard(cue_id)
-                continue
-            if cue_id in self._stop_sent:
-                continue
-            if current_time < float(stop_time):
-                continue
-            try:
-                # If the caller didn't set an explicit removal reason, treat this as a stop.
-                self._removal_reasons.setdefault(cue_id, "manual_stop")
-            except Exception:
-                pass
-            try:
-                self._decode_cmd_q.put(DecodeStop(cue_id=cue_id))
-            except Exception:
-                pass
-            try:
-                self._out_cmd_q.put(OutputStopCue(cue_id=cue_id))
-            except Exception:
-                pass
-            # Mark stop as sent, and reset the timer base so the stuck-safety window is
-            # measured from *after* we've issued the explicit stop commands.
-            self._stop_sent.add(cue_id)
-            self._pending_stops[cue_id] = current_time
-        
-        # Safety check: if a cue is in pending_stops for too long (>5 seconds), force-remove it
-        # This should be a rare safety valve - fades should complete naturally and emit finished events
-        current_time = time.time()
-        stuck_timeout = 5.0  # 5 second safety timeout for stuck cues
-        pending_to_check = list(self._pending_stops.keys())
-        for cue_id in pending_to_check:
-            stop_time = self._pending_stops[cue_id]
-            
-            # Skip if cue is no longer active
-            if cue_id not in self.active_cues:
-                self._pending_stops.pop(cue_id, None)
-                continue
-            
-            # If we've been waiting way too long, force-remove as emergency measure
-            if current_time - stop_time > stuck_timeout:
-                cue = self.active_cues.pop(cue_id, None)
-                cue_info = self.cue_info_map.pop(cue_id, None)
-                self._output_started.discard(cue_id)
-                self._fade_requested.discard(cue_id)
-                self._pending_stops.pop(cue_id, None)
-                
-                if self.primary_cue_id == cue_id:
-                    self.primary_cue_id = None
-                
-                # Send explicit stop commands to clean up
-                try:
-                    self._decode_cmd_q.put(DecodeStop(cue_id=cue_id))
-                    self._out_cmd_q.put(OutputStopCue(cue_id=cue_id))
-                except Exception:
-                    pass
-                
-                self.log.warning(cue_id=cue_id, source="engine", message="force_removed_stuck_cue", metadata={"reason": "emergency_timeout_exceeded", "timeout_seconds": stuck_timeout})
-                
-                # Generate cue_finished event for GUI
-                if cue and cue_info:
-                    stopped_at = datetime.now()
-                    final_cue_info = replace(cue_info, stopped_at=stopped_at, removal_reason="emergency_stop")
-                    evts.append(CueFinishedEvent(cue_info=final_cue_info, reason="forced"))
-        
+        # Run the time-based work that is due: stops after fade-outs, the stuck-cue
+        # safety valve and scheduled commands. Cost is per due timer, not per cue.
+        for timer in self._timers.pop_due():
+            self._run_timer(timer, evts)
+
         decode_chunks_drained_this_pump = 0
         max_engine_hold_ms_this_pump = 0.0
         max_decoder_age_ms_this_pump = 0.0
@@ -1124,22 +1309,8 @@ class AudioEngine:
                 except Exception:
                     pass
                 # If this is the first decoded chunk for the cue, notify output to start
-                if msg.cue_id in self.active_cues and msg.cue_id not in self._output_started:
-                    cue = self.active_cues.get(msg.cue_id)
-                    # If fading in, start silent
-                    start_gain_db = cue.gain_db
-                    if self.fade_in_ms > 0:
-                        start_gain_db = -120.0
-                    self._out_cmd_q.put(OutputStartCue(
-                        cue_id=msg.cue_id,
-                        track_id=msg.track_id,
-                        gain_db=start_gain_db,
-                        fade_in_duration_ms=self.fade_in_ms,
-                        fade_in_curve=self.fade_curve,
-                        target_gain_db=cue.gain_db,
-                        loop_enabled=self._effective_loop_enabled(bool(getattr(cue, "loop_enabled", False))),
-                    ))
-                    self._output_started.add(msg.cue_id)
+                self._note_first_chunk(msg.cue_id, getattr(msg, "decoder_produced_mono", None))
+                self._start_output_on_first_chunk(msg.cue_id, msg.track_id)
 
                 # Stamp forwarded time as close as possible to the actual enqueue to output.
                 try:
@@ -1149,6 +1320,11 @@ class AudioEngine:
                     pass
                 self._out_pcm_q.put(msg)
             elif isinstance(msg, DecodeError):
+                # The decoder has given up on this cue; release it there too (shard affinity).
+                try:
+                    self._decode_cmd_q.put(DecodeStop(cue_id=msg.cue_id))
+                except Exception:
+                    pass
                 cue = self.active_cues.pop(msg.cue_id, None)
                 if cue:
                     self._dbg_print(f"[ENGINE-DECODE-ERROR] cue={msg.cue_id[:8]} DecodeError: {msg.error}, sending OutputStopCue")
@@ -1156,6 +1332,7 @@ class AudioEngine:
                     self._out_cmd_q.put(OutputStopCue(cue_id=msg.cue_id))
                     try:
                         self._output_started.discard(msg.cue_id)
+                        self._first_chunk_t0.pop(msg.cue_id, None)
                     except Exception:
                         pass
                     evts.append(DecodeErrorEvent(cue_id=msg.cue_id, track_id=msg.track_id, file_path=msg.file_path, error=msg.error))
@@ -1221,11 +1398,39 @@ class AudioEngine:
                     self._output_started.add(cue_id)
                     self.log.info(cue_id=cue_id, track_id=track_id, source="engine", message="sent_start_on_decoder_ready", metadata={"file_path": file_path})
 
+            # Direct mode: PCM went straight to the output process; we only get notices.
+            elif isinstance(m, tuple) and m and m[0] == "first_chunk":
+                cue_id = m[1] if len(m) > 1 else None
+                track_id = m[2] if len(m) > 2 else None
+                if cue_id:
+                    self._note_first_chunk(cue_id, m[4] if len(m) > 4 else None)
+                    self._start_output_on_first_chunk(cue_id, track_id)
+                    self._dbg_print(f"[ENGINE-FIRST-CHUNK] cue={cue_id[:8]} frames={m[3] if len(m) > 3 else None}")
+
+            elif isinstance(m, tuple) and m and m[0] == "eof":
+                cue_id = m[1] if len(m) > 1 else None
+                if cue_id:
+                    self._dbg_print(f"[ENGINE-DECODE-EOF] cue={cue_id[:8]}")
+
             # Decoder diagnostics (best-effort)
             elif isinstance(m, tuple) and m and m[0] == "diag":
                 try:
                     payload = m[1] if len(m) > 1 else None
-                    self.log.warning(source="engine", message="decoder_diag", metadata=payload)
+                    if isinstance(payload, dict) and payload.get("type") == "decode_paths":
+                        # Periodic counts of memmap/cache/direct/resample cue starts; not a problem.
+                        self.log.info(source="engine", message="decoder_paths", metadata=payload)
+                    elif isinstance(payload, dict) and payload.get("type") == "decode_cache":
+                        # RAM decoded-PCM cache size and hit/miss/eviction counts.
+                        self.log.info(source="engine", message="decoder_cache", metadata=payload)
+                    elif isinstance(payload, dict) and payload.get("type") == "decode_shards":
+                        # Shard count once the router has started them.
+                        self.log.info(source="engine", message="decoder_shards", metadata=payload)
+                    elif isinstance(payload, dict) and payload.get("type") == "preroll":
+                        # Armed-head hit/miss counts, memory and heads still to decode per decode shard.
+                        self.preroll_stats[int(payload.get("shard") or 0)] = payload
+                        self.log.info(source="engine", message="decoder_preroll", metadata=payload)
+                    else:
+                        self.log.warning(source="engine", message="decoder_diag", metadata=payload)
                 except Exception:
                     pass
             
@@ -1282,12 +1487,14 @@ class AudioEngine:
                         "max_decoder_age_ms": max_decoder_age_ms_this_pump,
                         "max_decode_to_engine_ms": max_decode_to_engine_ms_this_pump,
                         "max_engine_internal_ms": max_engine_internal_ms_this_pump,
+                        "max_first_chunk_ms": self._hb_max_first_chunk_ms_window,
                         # running maxima since engine start (useful for quick triage)
                         "max_pump_dt_ms_run": self._hb_max_pump_dt_ms,
                         "max_engine_hold_ms_run": self._hb_max_engine_hold_ms,
                         "max_decoder_age_ms_run": self._hb_max_decoder_age_ms,
                         "max_decode_to_engine_ms_run": self._hb_max_decode_to_engine_ms,
                         "max_engine_internal_ms_run": self._hb_max_engine_internal_ms,
+                        "max_first_chunk_ms_run": self._hb_max_first_chunk_ms,
                     }
                     if level == "warning":
                         self.log.warning(source="engine", message="engine_heartbeat", metadata=meta)
@@ -1304,6 +1511,7 @@ class AudioEngine:
                 self._hb_decode_chunks_drained = 0
                 self._hb_out_events_drained = 0
                 self._hb_decode_events_drained = 0
+                self._hb_max_first_chunk_ms_window = 0.0
                 self._hb_last_emit_mono = hb_now
         except Exception:
             pass
@@ -1311,7 +1519,11 @@ class AudioEngine:
         # Now process all other output events (not finished)
         for m in other_events:
             # Pass through non-tuple event objects (telemetry) directly.
-            if isinstance(m, (BatchCueLevelsEvent, BatchCueTimeEvent, MasterLevelsEvent)):
+            if isinstance(m, (BatchCueLevelsEvent, BatchCueTimeEvent, MasterLevelsEvent, CallbackTimingEvent)):
+                evts.append(m)
+                continue
+            if isinstance(m, OutputClockEvent):
+                self.output_clock = m
                 evts.append(m)
                 continue
 
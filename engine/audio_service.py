@@ -18,6 +18,7 @@ from dataclasses import dataclass
 from typing import Optional
 
 from engine.audio_engine import AudioEngine
+from engine.processes.wakeup import Wakeup
 from engine.commands import (
     PlayCueCommand,
     StopCueCommand,
@@ -81,7 +82,8 @@ def audio_service_main(
     2. Routes commands to audio engine
     3. Calls engine.pump() to process events
     4. Forwards engine events to evt_q for GUI consumption
-    5. Sleeps briefly to yield CPU
+    5. Waits for the next command or engine message (at most pump_interval_ms
+       while cues are active, so fades/timeouts keep running)
     
     Stops when cmd_q receives None.
     """
@@ -158,6 +160,7 @@ def audio_service_main(
         running = True
         pump_count = 0
         next_watchdog_check = time.monotonic() + float(getattr(config, "parent_watchdog_poll_s", 0.5) or 0.5)
+        wakeup = Wakeup([cmd_q, *engine.wakeup_sources()])
 
         while running:
             try:
@@ -244,8 +247,21 @@ def audio_service_main(
                     except Exception as e:
                         pass
 
-                # Small sleep to yield CPU and prevent busy-waiting
-                time.sleep(pump_interval)
+                # Block until a command or engine message arrives. With cues active, wake
+                # at least every pump interval; when idle, only for the parent watchdog
+                # or the engine's next scheduled timer.
+                if engine.needs_pump():
+                    wakeup.wait(pump_interval)
+                else:
+                    idle_wait = float(getattr(config, "parent_watchdog_poll_s", 0.5) or 0.5)
+                    if getattr(config, "parent_watchdog_enabled", True):
+                        idle_wait = min(idle_wait, next_watchdog_check - time.monotonic())
+                    timer_deadline = engine.next_timer_deadline()
+                    if timer_deadline is not None:
+                        idle_wait = min(idle_wait, timer_deadline - time.monotonic())
+                    idle_wait = max(0.0, idle_wait)
+                    engine.mark_idle()
+                    wakeup.wait(idle_wait)
 
             except Exception as e:
                 # Catch any unexpected errors in main loop
@@ -254,6 +270,7 @@ def audio_service_main(
 
         # Shutdown: stop the engine
         try:
+            wakeup.close()
             engine.stop()
         except Exception:
             pass
@@ -106,13 +106,18 @@ class PlayCueCommand:
         out_frame (int or None): Stop at this frame (None = end of file).
         fade_in_ms (int): Fade-in duration in ms (default 0 = no fade).
         fade_out_ms (int): Fade-out duration in ms (default 0 = no fade).
-        fade_curve (str): Fade shape: "equal_power" or "linear" (default "equal_power").
+        fade_curve (str): Fade shape: "equal_power", "linear", "log" or "s_curve" (default "equal_power").
         loop_enabled (bool): Loop from out_frame to in_frame if True.
         layered (bool): If True, don't auto-fade existing cues.
         total_seconds (float or None): Pre-computed duration in seconds (optional).
         logging_required (bool): If True, cue will be logged to CSV/Excel on finish.
         file_metadata (dict or None): Pre-probed metadata (e.g. Title/Artist) to avoid probing in engine.
         decoder_probe (dict or None): Pre-probed decoder-relevant info (e.g. audio stream index).
+        start_at_sample (int or None): Start mixing the cue at this absolute output-stream sample
+            (see OutputClockEvent); None = as soon as its first PCM arrives.
+        start_quantum_frames (int): If > 0 and start_at_sample is None, start on the next multiple
+            of this many output samples (at least STEPD_OUTPUT_START_LEAD_MS ahead). Cues fired
+            together with the same quantum start on the same sample.
     """
     cue_id: str
     file_path: str
@@ -129,6 +134,8 @@ class PlayCueCommand:
     logging_required: bool = False
     file_metadata: Optional[dict[str, Any]] = None
     decoder_probe: Optional[dict[str, Any]] = None
+    start_at_sample: Optional[int] = None
+    start_quantum_frames: int = 0
 
 
 @dataclass(frozen=True, slots=True)
@@ -143,7 +150,7 @@ class StopCueCommand:
     Fields:
         cue_id (str): Unique identifier of the cue to stop (required).
         fade_out_ms (int): Fade-out duration in ms (default 0 = immediate stop).
-        fade_curve (str): Fade shape: "linear" or "equal_power" (default "linear").
+        fade_curve (str): Fade shape: "linear", "equal_power", "log" or "s_curve" (default "linear").
     """
     cue_id: str
     fade_out_ms: int = 0
@@ -166,7 +173,7 @@ class FadeCueCommand:
         cue_id (str): Unique identifier of the cue to fade (required).
         target_db (float): Target gain in dB (required). E.g., 0.0 = unity, -6.0 = half.
         duration_ms (int): Fade duration in ms (required). Must be > 0.
-        curve (str): Curve shape: "equal_power" or "linear" (required).
+        curve (str): Curve shape: "equal_power", "linear", "log" or "s_curve" (required).
     """
     cue_id: str
     target_db: float
@@ -266,7 +273,7 @@ class OutputFadeTo:
         cue_id (str): Unique identifier of the cue to fade.
         target_db (float): Target gain in dB.
         duration_ms (int): Fade duration in milliseconds.
-        curve (str): Fade curve shape: "linear" or "equal_power".
+        curve (str): Fade curve shape: "linear", "equal_power", "log" or "s_curve".
     """
     cue_id: str
     target_db: float
@@ -331,6 +338,24 @@ class OutputListDevices:
     pass
 
 
+@dataclass(frozen=True, slots=True)
+class OutputRenderUntil:
+    """Let an offline output sink render up to an output-stream sample, then hold.
+
+    Used by render_scenario.py so scripted steps land on rendered samples, not on
+    wall-clock time. Only offline sinks started with STEPD_OUTPUT_SINK_GATED=1 are
+    gated (they start held at sample 0); a real device ignores it.
+
+    Invariant: The sink holds at the last block boundary at or before `sample` and
+               publishes an OutputClockEvent once it is there.
+    Invariant: Commands queued before this one are applied before rendering resumes.
+
+    Fields:
+        sample (int or None): Output-stream sample to render up to (None = no limit).
+    """
+    sample: int | None
+
+
 @dataclass(frozen=True, slots=True)
 class SetTransitionFadeDurations:
     """Set engine-wide default transition fade durations.
@@ -347,6 +372,24 @@ class SetTransitionFadeDurations:
     fade_out_ms: int
 
 
+@dataclass(frozen=True, slots=True)
+class ArmCuesCommand:
+    """Keep the first STEPD_PREROLL_MS of these cues decoded, ready to start instantly.
+
+    Each command replaces the armed set (an empty one disarms everything). The
+    decode process decodes each cue's head from in_frame in the background; a
+    PlayCueCommand with the same file_path and in_frame then sends its first
+    chunk from memory while the file is opened and seeked behind it.
+
+    Invariant: Purely a latency hint; playback is identical with or without it.
+
+    Fields:
+        cues (tuple): (file_path, in_frame, out_frame or None) per cue, e.g. every
+            loaded button on the visible bank.
+    """
+    cues: tuple[tuple[str, int, Optional[int]], ...]
+
+
 # ==============================================================================
 # BATCH COMMANDS (Performance Optimization)
 # ==============================================================================
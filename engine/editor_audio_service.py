@@ -14,6 +14,7 @@ from pathlib import Path
 from typing import Any, Optional
 
 from log.service_log import coerce_log_path
+from engine.pcm_disk_cache import PcmDiskCache, to_float32
 
 import multiprocessing as mp
 import multiprocessing.connection as mp_connection
@@ -284,6 +285,11 @@ class _PcmCache:
         dst[:] = frames[:n, :].astype(np.float32, copy=False).reshape(-1)
         return n
 
+    def frames_view(self) -> np.ndarray:
+        """(frames_written, channels) float32 view of the decoded PCM (no copy)."""
+        n = int(self.frames_written)
+        return np.frombuffer(self._mv, dtype=np.float32, count=n * self.channels).reshape(n, self.channels)
+
     def read_into(self, outdata: np.ndarray, start_frame: int, n_frames: int) -> int:
         if outdata is None:
             return 0
@@ -459,6 +465,8 @@ def _editor_backend_main(cmd_conn: mp_connection.Connection, evt_conn: mp_connec
 
     pcm_cache: Optional[_PcmCache] = None
     pcm_cache_lock = threading.Lock()
+    # Persistent decoded-PCM cache shared with the engine: a hit skips PyAV entirely.
+    disk_cache = PcmDiskCache.from_env()
     decode_stop_evt = threading.Event()
     decode_thread_obj: Optional[threading.Thread] = None
 
@@ -701,6 +709,10 @@ def _editor_backend_main(cmd_conn: mp_connection.Connection, evt_conn: mp_connec
                 resampler = av.AudioResampler(format="fltp", layout="stereo", rate=cache.sample_rate)
             except Exception:
                 resampler = av.AudioResampler(format="fltp", rate=cache.sample_rate)
+            try:
+                source_channels: Optional[int] = int(stream.codec_context.channels)
+            except Exception:
+                source_channels = None
 
             write_frame = 0
             last_status_t = time.monotonic()
@@ -748,10 +760,32 @@ def _editor_backend_main(cmd_conn: mp_connection.Connection, evt_conn: mp_connec
             except Exception:
                 pass
             _safe_put(evt_q_local, Status("PCM decoded"))
+
+            complete = not (stop_event.is_set() or stop_evt.is_set())
+            if disk_cache is not None and complete and cache.frames_written > 0:
+                disk_cache.store(
+                    path,
+                    cache.sample_rate,
+                    cache.channels,
+                    "stereo",
+                    cache.frames_view(),
+                    source_channels=source_channels,
+                )
         except Exception as e:
             logger.exception("PCM decode failed")
             _safe_put(evt_q_local, Status(f"PCM decode failed: {type(e).__name__}: {e}"))
 
+    def _fill_cache_from_disk(src: np.ndarray, cache: _PcmCache, stop_event: threading.Event) -> None:
+        """Copy an int16 disk-cache entry into the float32 playback cache."""
+        step = int(cache.sample_rate) * 10
+        for start in range(0, int(src.shape[0]), step):
+            if stop_event.is_set() or stop_evt.is_set():
+                return
+            wrote = cache.write_frames(start, to_float32(src[start : start + step]))
+            cache.frames_written = int(start + wrote)
+        cache.frames_total = int(cache.frames_written)
+        _safe_put(evt_q_local, Status("PCM loaded from disk cache"))
+
     def audio_callback(outdata, frames, time_info, status):
         nonlocal last_levels_emit, played_frames_since_last_levels, rms_accum, last_callback_t
 
@@ -977,7 +1011,26 @@ def _editor_backend_main(cmd_conn: mp_connection.Connection, evt_conn: mp_connec
                         headroom = int(state.target_sample_rate * 2)
                         frames_cap = int(max(1, frames_est + headroom))
 
-                        cache = _create_cache(frames_cap)
+                        mapped = None
+                        if disk_cache is not None:
+                            mapped = disk_cache.open(cmd.path, state.target_sample_rate, state.channels, layout="stereo")
+                        if mapped is not None:
+                            frames_est = int(mapped.shape[0])
+                        if mapped is not None and mapped.dtype == np.float32:
+                            # float32 entries are played straight from the memory map.
+                            cache = _PcmCache(
+                                sample_rate=state.target_sample_rate,
+                                channels=state.channels,
+                                frames_capacity=frames_est,
+                                kind="disk",
+                                buffer_obj=mapped,
+                                cleanup=lambda: None,
+                                path=getattr(mapped, "filename", None),
+                            )
+                            cache.frames_written = frames_est
+                            cache.frames_total = frames_est
+                        else:
+                            cache = _create_cache(max(frames_cap, frames_est))
                         with pcm_cache_lock:
                             pcm_cache = cache
 
@@ -998,15 +1051,26 @@ def _editor_backend_main(cmd_conn: mp_connection.Connection, evt_conn: mp_connec
                             ),
                         )
                         _safe_put(evt_q_local, Status("Loaded"))
-                        _safe_put(evt_q_local, Status("Decoding PCM cache"))
-
-                        decode_thread_obj = threading.Thread(
-                            target=_decode_into_cache,
-                            args=(cmd.path, cache, decode_stop_evt),
-                            name="EditorPcmDecode",
-                            daemon=True,
-                        )
-                        decode_thread_obj.start()
+                        if cache.kind == "disk":
+                            _safe_put(evt_q_local, Status("PCM loaded from disk cache"))
+                        elif mapped is not None:
+                            decode_thread_obj = threading.Thread(
+                                target=_fill_cache_from_disk,
+                                args=(mapped, cache, decode_stop_evt),
+                                name="EditorPcmDiskLoad",
+                                daemon=True,
+                            )
+                            decode_thread_obj.start()
+                        else:
+                            _safe_put(evt_q_local, Status("Decoding PCM cache"))
+
+                            decode_thread_obj = threading.Thread(
+                                target=_decode_into_cache,
+                                args=(cmd.path, cache, decode_stop_evt),
+                                name="EditorPcmDecode",
+                                daemon=True,
+                            )
+                            decode_thread_obj.start()
 
                     except Exception as e:
                         logger.exception("Load failed")
@@ -35,6 +35,7 @@ from engine.commands import (
     OutputSetDevice,
     OutputSetConfig,
     OutputListDevices,
+    ArmCuesCommand,
     
     # Output process commands
     OutputFadeTo,
@@ -62,6 +63,7 @@ __all__ = [
     "OutputSetDevice",
     "OutputSetConfig",
     "OutputListDevices",
+    "ArmCuesCommand",
     
     # Output process commands
     "OutputFadeTo",
@@ -28,6 +28,8 @@ Event Categories:
 3. DIAGNOSTIC EVENTS: Status information (best-effort).
    - DecodeErrorEvent: Decode process encountered an error
    - TransportStateEvent: Transport state changed
+   - CallbackTimingEvent: Output callback load histogram (periodic)
+   - OutputClockEvent: Output-stream sample clock for scheduled cue starts (periodic)
 """
 
 from __future__ import annotations
@@ -166,9 +168,13 @@ class MasterLevelsEvent:
     Fields:
         rms: List of per-channel RMS levels in dB (e.g., [-6.5, -7.2] for stereo).
         peak: List of per-channel peak levels in dB (e.g., [-3.0, -4.1] for stereo).
+        true_peak: Optional list of per-channel true-peak levels in dBTP (4x oversampled).
+        lufs_momentary: Optional momentary loudness (400 ms window, BS.1770 K-weighted) in LUFS.
     """
     rms: list
     peak: list
+    true_peak: Optional[list] = None
+    lufs_momentary: Optional[float] = None
 
 
 # ==============================================================================
@@ -181,8 +187,9 @@ class BatchCueLevelsEvent:
     Aggregated audio level updates for multiple cues in a single message.
     
     Replaces individual CueLevelsEvent messages to reduce queue overhead.
-    Invariant: Emitted once per output callback cycle when cues are active.
-    Invariant: Contains all cues with updated levels for this cycle.
+    Invariant: Emitted at telemetry rate (~60Hz) when cues are active.
+    Invariant: Levels are integrated over the interval since the previous event
+               (computed by the output meter worker, not the RT callback).
     
     Fields:
         cue_levels: Dict mapping cue_id -> (rms, peak) tuple for mixed levels.
@@ -190,9 +197,13 @@ class BatchCueLevelsEvent:
         cue_levels_per_channel: Dict mapping cue_id -> (rms_list, peak_list) for per-channel levels.
                                 Example: {"cue1": ([0.5, 0.6], [0.7, 0.8]), ...}
                                 If present, UI should prefer this over cue_levels.
+        cue_true_peak: Optional dict mapping cue_id -> per-channel true-peak list (linear, 4x oversampled).
+        cue_lufs_momentary: Optional dict mapping cue_id -> momentary loudness in LUFS (400 ms window).
     """
     cue_levels: dict  # {cue_id: (rms, peak), ...}
     cue_levels_per_channel: Optional[dict] = None  # {cue_id: (rms_list, peak_list), ...}
+    cue_true_peak: Optional[dict] = None  # {cue_id: [tp_ch...], ...}
+    cue_lufs_momentary: Optional[dict] = None  # {cue_id: lufs, ...}
 
 
 @dataclass(frozen=True, slots=True)
@@ -247,6 +258,74 @@ class TransportStateEvent:
     state: str
 
 
+@dataclass(frozen=True, slots=True)
+class CallbackTimingEvent:
+    """
+    Output callback load histogram for the interval since the previous event.
+
+    Invariant: Emitted every STEPD_CALLBACK_STATS_MS (default 1000 ms) while the stream runs.
+    Invariant: May be dropped if the event queue is full (best-effort).
+    Invariant: Bins are load = callback duration / block budget, in steps of 1/16;
+               the last bin is open-ended (>= 2x budget).
+
+    Fields:
+        callbacks: Callbacks recorded in the interval.
+        budget_ms: Block budget (block_frames / sample_rate) in ms.
+        over_budget: Callbacks that took longer than budget_ms.
+        underflows: PortAudio output_underflow flags seen in the interval.
+        max_ms: Longest callback in the interval, with the cues/fades it was mixing.
+        max_cues: Cues mixed by the longest callback.
+        max_envelopes: Active fade envelopes in the longest callback.
+        p50_ms, p95_ms, p99_ms: Percentiles (upper edge of the containing bin).
+        load_edges: Lower load edge of every bin.
+        counts: Callbacks per bin.
+        underflows_by_bin: Underflow flags per bin, attributed to the previous callback's bin.
+        mean_cues: Mean cues mixed per bin.
+        mean_envelopes: Mean active fade envelopes per bin.
+    """
+    callbacks: int
+    budget_ms: float
+    over_budget: int
+    underflows: int
+    max_ms: float
+    max_cues: int
+    max_envelopes: int
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    load_edges: list
+    counts: list
+    underflows_by_bin: list
+    mean_cues: list
+    mean_envelopes: list
+
+
+@dataclass(frozen=True, slots=True)
+class OutputClockEvent:
+    """
+    Output-stream sample clock, used to pick PlayCueCommand.start_at_sample values.
+
+    Invariant: Emitted about twice per second while the output process runs.
+    Invariant: May be dropped if the event queue is full (best-effort).
+    Invariant: sample_pos only increases; it counts mixed frames (including silence and
+               pause) since the output process started, across stream reopens.
+
+    Fields:
+        sample_pos: Next output-stream sample the mixer will render.
+        sample_rate: Output sample rate (Hz).
+        mono_time: time.monotonic() when sample_pos was read.
+        scheduled: Cues waiting for their start sample.
+        late_starts: Scheduled starts (total) whose PCM was not ready by the start sample.
+        last_late_frames: How many samples late the most recent late start was.
+    """
+    sample_pos: int
+    sample_rate: int
+    mono_time: float
+    scheduled: int = 0
+    late_starts: int = 0
+    last_late_frames: int = 0
+
+
 # ==============================================================================
 # LEGACY / COMPATIBILITY EVENTS
 # ==============================================================================
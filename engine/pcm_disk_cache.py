@@ -0,0 +1,370 @@
+"""
+Persistent on-disk cache of decoded PCM, shared by the engine and the editor.
+
+Each entry is one .npy file holding a whole source file decoded and resampled
+to an output format: (frames, channels) float32, or int16 with
+STEPD_PCM_DISK_CACHE_INT16=1 to halve disk use. Readers open entries with
+np.load(mmap_mode="r"), so a repeat show replaces decoding with page-cache reads
+and hundreds of cues can be ready without holding them in RAM.
+
+Entry names hash the source signature (absolute path, size, mtime_ns; see
+engine.processes.decoded_cache.file_signature), the sample rate, the channel
+count, the sample dtype and a channel layout tag:
+
+- "native": the source already had `channels` channels, so no remapping was
+  needed and any producer's output is interchangeable.
+- otherwise the producer's remap: "pad" (engine: drop/zero-pad channels) or
+  "stereo" (editor: PyAV stereo downmix/upmix).
+
+Writes go to a temp file and are renamed into place, so the engine and the
+editor can share a directory safely. A PcmDiskWriter streams an entry into its
+temp file as it is decoded, so a long file is never held in RAM to be cached. Eviction removes entries older than
+max_age_s, then the least recently used entries (by mtime, touched on open) until the
+directory fits max_bytes. Temp files left by an interrupted write (stores run on
+daemon threads) are removed once they are older than any write could take.
+
+Environment:
+- STEPD_PCM_DISK_CACHE_MB: size budget (0 disables).
+- STEPD_PCM_DISK_CACHE_MAX_ENTRY_MB: largest entry written.
+- STEPD_PCM_DISK_CACHE_MAX_AGE_DAYS: drop entries not used for this long.
+- STEPD_PCM_DISK_CACHE_INT16: store int16 instead of float32.
+- STEPD_PCM_DISK_CACHE_DIR: cache directory (default: <tmp>/stepd_pcm_cache).
+"""
+from __future__ import annotations
+
+import hashlib
+import io
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+from engine.processes.decoded_cache import file_signature
+from engine.tuning import (
+    DEFAULT_PCM_DISK_CACHE_INT16,
+    DEFAULT_PCM_DISK_CACHE_MAX_AGE_DAYS,
+    DEFAULT_PCM_DISK_CACHE_MAX_ENTRY_MB,
+    DEFAULT_PCM_DISK_CACHE_MB,
+)
+
+
+NATIVE_LAYOUT = "native"
+_EVICT_INTERVAL_S = 30.0
+_NPY_HEADER_BYTES = 128  # .npy v1.0 header for any 2-D shape below 10**11 frames
+_STALE_TMP_S = 600.0
+
+
+def default_cache_dir() -> Path:
+    d = os.environ.get("STEPD_PCM_DISK_CACHE_DIR")
+    if d:
+        return Path(d)
+    return Path(tempfile.gettempdir()) / "stepd_pcm_cache"
+
+
+def to_float32(pcm: np.ndarray) -> np.ndarray:
+    """Convert a cached block (float32 or int16) to float32."""
+    if pcm.dtype == np.float32:
+        return np.asarray(pcm)
+    return pcm.astype(np.float32) * np.float32(1.0 / 32768.0)
+
+
+class PcmDiskCache:
+    """Directory of memory-mappable decoded PCM files with size/age eviction."""
+
+    def __init__(
+        self,
+        root: str | os.PathLike,
+        *,
+        max_bytes: int,
+        max_entry_bytes: int | None = None,
+        max_age_s: float | None = None,
+        int16: bool = False,
+    ) -> None:
+        self.root = Path(root)
+        self.max_bytes = max(0, int(max_bytes))
+        if max_entry_bytes is None:
+            max_entry_bytes = self.max_bytes
+        self.max_entry_bytes = min(self.max_bytes, max(0, int(max_entry_bytes)))
+        self.max_age_s = float(max_age_s) if max_age_s else None
+        self.dtype = np.dtype(np.int16 if int16 else np.float32)
+        self._lock = threading.Lock()
+        self._last_evict = 0.0
+
+    @classmethod
+    def from_env(cls) -> "PcmDiskCache | None":
+        """Build the cache from STEPD_PCM_DISK_CACHE_* (None when disabled)."""
+        try:
+            mb = int(os.environ.get("STEPD_PCM_DISK_CACHE_MB", str(DEFAULT_PCM_DISK_CACHE_MB)).strip() or "0")
+        except Exception:
+            mb = DEFAULT_PCM_DISK_CACHE_MB
+        if mb <= 0:
+            return None
+        try:
+            days = float(
+                os.environ.get("STEPD_PCM_DISK_CACHE_MAX_AGE_DAYS", str(DEFAULT_PCM_DISK_CACHE_MAX_AGE_DAYS)).strip() or "0"
+            )
+        except Exception:
+            days = float(DEFAULT_PCM_DISK_CACHE_MAX_AGE_DAYS)
+        try:
+            entry_mb = int(
+                os.environ.get("STEPD_PCM_DISK_CACHE_MAX_ENTRY_MB", str(DEFAULT_PCM_DISK_CACHE_MAX_ENTRY_MB)).strip() or "0"
+            )
+        except Exception:
+            entry_mb = DEFAULT_PCM_DISK_CACHE_MAX_ENTRY_MB
+        try:
+            int16 = bool(int(os.environ.get("STEPD_PCM_DISK_CACHE_INT16", str(DEFAULT_PCM_DISK_CACHE_INT16)).strip() or "0"))
+        except Exception:
+            int16 = bool(DEFAULT_PCM_DISK_CACHE_INT16)
+        cache = cls(
+            default_cache_dir(),
+            max_bytes=mb * 1024 * 1024,
+            max_entry_bytes=entry_mb * 1024 * 1024,
+            max_age_s=days * 86400.0 if days > 0 else None,
+            int16=int16,
+        )
+        cache.remove_stale_temps()
+        return cache
+
+    # -- naming -------------------------------------------------------------------
+
+    def entry_path(self, sig: tuple[str, int, int], sample_rate: int, channels: int, layout: str) -> Path:
+        ident = repr((tuple(sig), int(sample_rate), int(channels), str(layout), self.dtype.str))
+        return self.root / (hashlib.sha1(ident.encode("utf-8")).hexdigest() + ".npy")
+
+    # -- read ---------------------------------------------------------------------
+
+    def open(self, path: str, sample_rate: int, channels: int, layout: str) -> np.ndarray | None:
+        """Memory-map the cached PCM for `path`, or None on a miss.
+
+        Looks for a "native" entry first, then one produced with `layout`.
+        """
+        sig = file_signature(path)
+        if sig is None:
+            return None
+        for tag in (NATIVE_LAYOUT, layout):
+            entry = self.entry_path(sig, sample_rate, channels, tag)
+            try:
+                pcm = np.load(entry, mmap_mode="r", allow_pickle=False)
+            except (OSError, ValueError):
+                continue
+            if pcm.ndim != 2 or pcm.shape[1] != int(channels) or pcm.dtype != self.dtype:
+                continue
+            try:
+                os.utime(entry)  # LRU/age bookkeeping
+            except OSError:
+                pass
+            return pcm
+        return None
+
+    # -- write --------------------------------------------------------------------
+
+    def writer(
+        self,
+        path: str,
+        sample_rate: int,
+        channels: int,
+        layout: str,
+        *,
+        source_channels: int | None = None,
+    ) -> "PcmDiskWriter | None":
+        """Start streaming an entry for `path` (None if it cannot be written)."""
+        sig = file_signature(path)
+        if sig is None:
+            return None
+        tag = NATIVE_LAYOUT if source_channels is not None and int(source_channels) == int(channels) else layout
+        try:
+            return PcmDiskWriter(self, self.entry_path(sig, sample_rate, channels, tag), channels)
+        except OSError:
+            return None
+
+    def store(
+        self,
+        path: str,
+        sample_rate: int,
+        channels: int,
+        layout: str,
+        pcm: np.ndarray,
+        *,
+        source_channels: int | None = None,
+    ) -> Path | None:
+        """Write decoded float32 PCM for `path`. Returns the entry path (None if skipped)."""
+        if pcm.ndim != 2 or pcm.shape[0] == 0 or pcm.shape[1] != int(channels):
+            return None
+        if pcm.shape[0] * int(channels) * self.dtype.itemsize > self.max_entry_bytes:
+            return None
+        writer = self.writer(path, sample_rate, channels, layout, source_channels=source_channels)
+        if writer is None or not writer.append(pcm):
+            return None
+        return writer.commit()
+
+    # -- eviction -----------------------------------------------------------------
+
+    def entries(self) -> list[tuple[Path, int, float]]:
+        """(path, size, mtime) for every entry."""
+        out: list[tuple[Path, int, float]] = []
+        try:
+            it = list(self.root.glob("*.npy"))
+        except OSError:
+            return out
+        for p in it:
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            out.append((p, int(st.st_size), float(st.st_mtime)))
+        return out
+
+    def remove_stale_temps(self, now: float | None = None) -> tuple[int, int]:
+        """Delete *.tmp files from interrupted writes. Returns (removed, freed_bytes)."""
+        now = time.time() if now is None else float(now)
+        removed = 0
+        freed = 0
+        try:
+            temps = list(self.root.glob("*.tmp"))
+        except OSError:
+            return 0, 0
+        for p in temps:
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            if now - float(st.st_mtime) > _STALE_TMP_S and self._unlink(p):
+                removed += 1
+                freed += int(st.st_size)
+        return removed, freed
+
+    def total_bytes(self) -> int:
+        return sum(size for _, size, _ in self.entries())
+
+    def maybe_evict(self) -> None:
+        now = time.monotonic()
+        if now - self._last_evict < _EVICT_INTERVAL_S:
+            return
+        self._last_evict = now
+        self.evict()
+
+    def evict(self, now: float | None = None) -> dict:
+        """Drop expired entries, then least-recently-used ones over the size budget."""
+        with self._lock:
+            now = time.time() if now is None else float(now)
+            removed, freed = self.remove_stale_temps(now)
+            keep: list[tuple[Path, int, float]] = []
+            for p, size, mtime in self.entries():
+                if self.max_age_s is not None and now - mtime > self.max_age_s:
+                    if self._unlink(p):
+                        removed += 1
+                        freed += size
+                    continue
+                keep.append((p, size, mtime))
+            total = sum(size for _, size, _ in keep)
+            keep.sort(key=lambda e: e[2])
+            for p, size, _ in keep:
+                if total <= self.max_bytes:
+                    break
+                if self._unlink(p):
+                    removed += 1
+                    freed += size
+                    total -= size
+            return {"removed": removed, "freed_bytes": freed, "bytes": total}
+
+    @staticmethod
+    def _unlink(p: Path) -> bool:
+        try:
+            p.unlink()
+            return True
+        except OSError:
+            # Still mapped by a reader on Windows; try again on the next pass.
+            return False
+
+
+def _npy_header(dtype: np.dtype, frames: int, channels: int) -> bytes:
+    buf = io.BytesIO()
+    np.lib.format.write_array_header_1_0(
+        buf, {"descr": np.lib.format.dtype_to_descr(dtype), "fortran_order": False, "shape": (int(frames), int(channels))}
+    )
+    return buf.getvalue()
+
+
+class PcmDiskWriter:
+    """One disk-cache entry being written: appended to a temp file, renamed into place on commit().
+
+    The .npy header is rewritten with the final frame count on commit(). An entry
+    that grows past the cache's max_entry_bytes, or hits an I/O error, is dropped.
+    """
+
+    def __init__(self, cache: PcmDiskCache, entry: Path, channels: int) -> None:
+        self.cache = cache
+        self.entry = entry
+        self.channels = int(channels)
+        self.frames = 0
+        cache.root.mkdir(parents=True, exist_ok=True)
+        fd, self._tmp = tempfile.mkstemp(prefix=entry.stem, suffix=".tmp", dir=cache.root)
+        self._fh = os.fdopen(fd, "wb")
+        try:
+            self._fh.write(_npy_header(cache.dtype, 0, self.channels))
+        except BaseException:
+            self.abort()
+            raise
+
+    @property
+    def active(self) -> bool:
+        return self._fh is not None
+
+    def append(self, pcm: np.ndarray) -> bool:
+        """Write float32 (frames, channels) PCM. Returns False once the entry is dropped."""
+        if self._fh is None:
+            return False
+        if pcm.ndim != 2 or pcm.shape[1] != self.channels:
+            self.abort()
+            return False
+        data = np.asarray(pcm, dtype=np.float32)
+        if self.cache.dtype == np.int16:
+            data = np.clip(np.rint(data * 32768.0), -32768, 32767).astype(np.int16)
+        if (self.frames + data.shape[0]) * self.channels * self.cache.dtype.itemsize > self.cache.max_entry_bytes:
+            self.abort()
+            return False
+        try:
+            self._fh.write(np.ascontiguousarray(data, dtype=self.cache.dtype).tobytes())
+        except OSError:
+            self.abort()
+            return False
+        self.frames += int(data.shape[0])
+        return True
+
+    def commit(self) -> Path | None:
+        """Finish the entry and rename it into place. Returns its path (None if dropped)."""
+        fh = self._fh
+        if fh is None:
+            return None
+        if self.frames <= 0:
+            self.abort()
+            return None
+        header = _npy_header(self.cache.dtype, self.frames, self.channels)
+        try:
+            if len(header) != _NPY_HEADER_BYTES:
+                raise OSError("unexpected .npy header size")
+            fh.seek(0)
+            fh.write(header)
+            fh.close()
+            self._fh = None
+            os.replace(self._tmp, self.entry)
+        except OSError:
+            self.abort()
+            return None
+        self.cache.maybe_evict()
+        return self.entry
+
+    def abort(self) -> None:
+        fh, self._fh = self._fh, None
+        if fh is not None:
+            try:
+                fh.close()
+            except OSError:
+                pass
+        try:
+            os.unlink(self._tmp)
+        except OSError:
+            pass
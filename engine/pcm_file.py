@@ -0,0 +1,259 @@
+"""
+PyAV-free reader for uncompressed PCM files (WAV, RF64, AIFF, AIFF-C).
+
+Most of a show library is WAV at the output rate. Sending it through av.open,
+demux, AudioResampler, _normalize_audio and a concatenate per chunk spends
+decode CPU on what is really a copy. This module parses the RIFF/AIFF
+header, memory-maps the sample data and converts slices to float32 (frames,
+channels) with vectorized NumPy, so reading is cheap and seeking is an exact
+O(1) index.
+
+Supported sample formats: 8-bit (unsigned WAV, signed AIFF), 16/24/32-bit
+integer, 32/64-bit float, WAVE_FORMAT_EXTENSIBLE and AIFF-C 'NONE'/'sowt'/'fl32'/'fl64'.
+Everything else (compressed WAV, 12/20-bit, ...) returns None and goes through PyAV.
+
+The decode process uses it automatically when the file's sample rate equals
+the output rate (STEPD_DECODE_PCM_FAST_PATH=0 disables).
+"""
+from __future__ import annotations
+
+import os
+import struct
+
+import numpy as np
+
+from engine.tuning import DEFAULT_DECODE_PCM_FAST_PATH
+
+
+_WAVE_FORMAT_PCM = 0x0001
+_WAVE_FORMAT_IEEE_FLOAT = 0x0003
+_WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+def pcm_fast_path_enabled() -> bool:
+    try:
+        return int(os.environ.get("STEPD_DECODE_PCM_FAST_PATH", str(DEFAULT_DECODE_PCM_FAST_PATH)).strip() or "0") > 0
+    except Exception:
+        return bool(DEFAULT_DECODE_PCM_FAST_PATH)
+
+
+class PcmFile:
+    """Memory-mapped PCM samples, sliced like a (frames, channels) float32 array.
+
+    `pcm[a:b]` returns float32 with `channels` columns: extra source channels are
+    dropped and missing ones zero-filled, the same remap the decode process applies
+    to PyAV output. Only contiguous slices are supported.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        sample_rate: int,
+        source_channels: int,
+        frames: int,
+        data_offset: int,
+        sample_bytes: int,
+        kind: str,
+        big_endian: bool,
+        channels: int | None = None,
+    ) -> None:
+        self.path = path
+        self.sample_rate = int(sample_rate)
+        self.source_channels = int(source_channels)
+        self.frames = int(frames)
+        self.data_offset = int(data_offset)
+        self.sample_bytes = int(sample_bytes)
+        self.kind = kind  # "int", "uint" (8-bit WAV) or "float"
+        self.big_endian = bool(big_endian)
+        self.channels = self.source_channels if channels is None else int(channels)
+        self.dtype = np.float32
+        if self.frames > 0:
+            self._raw = np.memmap(
+                path, dtype=np.uint8, mode="r", offset=self.data_offset, shape=(self.frames * self.frame_bytes,)
+            )
+        else:
+            self._raw = np.zeros(0, dtype=np.uint8)
+
+    @property
+    def frame_bytes(self) -> int:
+        return self.sample_bytes * self.source_channels
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return (self.frames, self.channels)
+
+    def __len__(self) -> int:
+        return self.frames
+
+    def with_channels(self, channels: int) -> "PcmFile":
+        """A view of the same mapping remapped to `channels` output channels."""
+        view = object.__new__(PcmFile)
+        view.__dict__.update(self.__dict__)
+        view.channels = int(channels)
+        return view
+
+    def __getitem__(self, key: slice) -> np.ndarray:
+        if not isinstance(key, slice):
+            raise TypeError("PcmFile supports contiguous frame slices only")
+        start, stop, step = key.indices(self.frames)
+        if step != 1:
+            raise TypeError("PcmFile supports contiguous frame slices only")
+        return self.read(start, max(0, stop - start))
+
+    def read(self, start: int, frames: int) -> np.ndarray:
+        """float32 (frames, channels) for source frames [start, start + frames)."""
+        start = max(0, min(int(start), self.frames))
+        n = max(0, min(int(frames), self.frames - start))
+        fb = self.frame_bytes
+        raw = self._raw[start * fb : (start + n) * fb]
+        pcm = _to_float32(raw, self.sample_bytes, self.kind, self.big_endian).reshape(n, self.source_channels)
+        if self.channels == self.source_channels:
+            return pcm
+        if self.channels < self.source_channels:
+            return np.ascontiguousarray(pcm[:, : self.channels])
+        out = np.zeros((n, self.channels), dtype=np.float32)
+        out[:, : self.source_channels] = pcm
+        return out
+
+
+def _to_float32(raw: np.ndarray, width: int, kind: str, big_endian: bool) -> np.ndarray:
+    """Vectorized conversion of interleaved sample bytes to float32."""
+    order = ">" if big_endian else "<"
+    if kind == "float":
+        return np.frombuffer(raw, dtype=f"{order}f{width}").astype(np.float32)
+    if width == 1:
+        if kind == "uint":
+            return (raw.astype(np.float32) - 128.0) * np.float32(1.0 / 128.0)
+        return raw.view(np.int8).astype(np.float32) * np.float32(1.0 / 128.0)
+    if width == 3:
+        b = raw.reshape(-1, 3).astype(np.int32)
+        if big_endian:
+            v = (b[:, 0] << 24) | (b[:, 1] << 16) | (b[:, 2] << 8)
+        else:
+            v = (b[:, 2] << 24) | (b[:, 1] << 16) | (b[:, 0] << 8)
+        return v.astype(np.float32) * np.float32(1.0 / 2147483648.0)
+    samples = np.frombuffer(raw, dtype=f"{order}i{width}")
+    return samples.astype(np.float32) * np.float32(1.0 / float(1 << (8 * width - 1)))
+
+
+def open_pcm_file(path: str) -> PcmFile | None:
+    """Parse the header of an uncompressed WAV/AIFF file; None if unsupported or unreadable."""
+    try:
+        size = os.path.getsize(path)
+        with open(path, "rb") as fh:
+            head = fh.read(12)
+            if len(head) < 12:
+                return None
+            if head[:4] in (b"RIFF", b"RF64") and head[8:12] == b"WAVE":
+                return _parse_wav(path, fh, size, rf64=head[:4] == b"RF64")
+            if head[:4] == b"FORM" and head[8:12] in (b"AIFF", b"AIFC"):
+                return _parse_aiff(path, fh, size, aifc=head[8:12] == b"AIFC")
+    except (OSError, ValueError, struct.error):
+        return None
+    return None
+
+
+def _parse_wav(path: str, fh, size: int, *, rf64: bool) -> PcmFile | None:
+    fmt = None
+    rf64_data_size = None
+    while True:
+        hdr = fh.read(8)
+        if len(hdr) < 8:
+            return None
+        cid, csize = hdr[:4], struct.unpack("<I", hdr[4:])[0]
+        body_at = fh.tell()
+        if cid == b"ds64":
+            ds = fh.read(min(csize, 28))
+            rf64_data_size = struct.unpack("<Q", ds[8:16])[0]
+        elif cid == b"fmt ":
+            fmt = fh.read(min(csize, 40))
+        elif cid == b"data":
+            if fmt is None or len(fmt) < 16:
+                return None
+            tag, channels, rate, _, _, bits = struct.unpack("<HHIIHH", fmt[:16])
+            if tag == _WAVE_FORMAT_EXTENSIBLE and len(fmt) >= 26:
+                tag = struct.unpack("<H", fmt[24:26])[0]  # first two bytes of the subformat GUID
+            if rf64 and rf64_data_size is not None and csize == 0xFFFFFFFF:
+                csize = rf64_data_size
+            if tag == _WAVE_FORMAT_PCM and bits in (8, 16, 24, 32):
+                kind = "uint" if bits == 8 else "int"
+            elif tag == _WAVE_FORMAT_IEEE_FLOAT and bits in (32, 64):
+                kind = "float"
+            else:
+                return None
+            return _make(path, rate, channels, bits, kind, False, body_at, csize, size)
+        fh.seek(body_at + csize + (csize & 1))
+
+
+def _parse_aiff(path: str, fh, size: int, *, aifc: bool) -> PcmFile | None:
+    comm = None
+    while True:
+        hdr = fh.read(8)
+        if len(hdr) < 8:
+            return None
+        cid, csize = hdr[:4], struct.unpack(">I", hdr[4:])[0]
+        body_at = fh.tell()
+        if cid == b"COMM":
+            comm = fh.read(min(csize, 22))
+        elif cid == b"SSND":
+            if comm is None or len(comm) < 18:
+                return None
+            channels, _, bits = struct.unpack(">hIh", comm[:8])
+            rate = _ieee_extended(comm[8:18])
+            kind, big_endian = "int", True
+            if aifc:
+                comp = comm[18:22]
+                if comp == b"sowt":
+                    big_endian = False
+                elif comp in (b"fl32", b"FL32"):
+                    kind, bits = "float", 32
+                elif comp in (b"fl64", b"FL64"):
+                    kind, bits = "float", 64
+                elif comp != b"NONE":
+                    return None
+            if kind == "int" and bits not in (8, 16, 24, 32):
+                return None
+            offset = struct.unpack(">I", fh.read(4))[0]
+            return _make(path, rate, channels, bits, kind, big_endian, body_at + 8 + offset, csize - 8 - offset, size)
+        fh.seek(body_at + csize + (csize & 1))
+
+
+def _make(
+    path: str,
+    rate: float,
+    channels: int,
+    bits: int,
+    kind: str,
+    big_endian: bool,
+    data_at: int,
+    data_size: int,
+    file_size: int,
+) -> PcmFile | None:
+    rate = int(round(rate))
+    if channels <= 0 or rate <= 0:
+        return None
+    width = bits // 8
+    # Streamed/truncated files: trust the bytes actually on disk.
+    data_size = max(0, min(int(data_size), file_size - data_at))
+    frames = data_size // (width * channels)
+    return PcmFile(
+        path,
+        sample_rate=rate,
+        source_channels=channels,
+        frames=frames,
+        data_offset=data_at,
+        sample_bytes=width,
+        kind=kind,
+        big_endian=big_endian,
+    )
+
+
+def _ieee_extended(b: bytes) -> float:
+    """80-bit IEEE 754 extended float (AIFF sample rate)."""
+    exp, mant = struct.unpack(">HQ", b[:10])
+    sign = -1.0 if exp & 0x8000 else 1.0
+    exp &= 0x7FFF
+    if exp == 0 and mant == 0:
+        return 0.0
+    return sign * mant * 2.0 ** (exp - 16383 - 63)
@@ -0,0 +1,401 @@
+"""
+Persistent probe index shared by the GUI and the AudioService.
+
+Every SoundFileButton used to run its own PyAV probe (duration, rate,
+channels, tags, decoder_probe) and keep the result in its own slot in
+ButtonSettings.json, so two buttons on the same file probed it twice. And
+AudioEngine.play_cue opened the file synchronously with av.open whenever a
+PlayCueCommand came without file_metadata, which blocked the engine loop.
+
+Probes now live in one SQLite database keyed by the file signature
+(path, size, mtime_ns), the same fields the seek index and the decoded PCM
+cache use, so an edited file is never served stale. Each process opens the
+database in WAL mode: readers never wait for the writer, and another process
+writing only holds a reader up for the busy timeout.
+
+- get(): one primary-key lookup, cheap enough for the engine loop.
+- request(): probe (or store a probe the caller already has) on a single
+  background indexer thread per process, unless the file is already indexed.
+
+The buttons look up the index before probing and add what they probe. The
+engine uses the index instead of probing and, on a miss, queues the file so
+the next start finds it.
+
+Environment:
+- STEPD_PROBE_INDEX: 0 disables the index (play_cue probes synchronously again).
+- STEPD_PROBE_INDEX_PATH: database file (default: ./ProbeIndex.sqlite3).
+"""
+from __future__ import annotations
+
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from engine.processes.decoded_cache import file_signature
+from engine.tuning import DEFAULT_PROBE_INDEX
+
+
+_FORMAT_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS probes (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    version INTEGER NOT NULL,
+    duration_seconds REAL,
+    sample_rate INTEGER,
+    channels INTEGER,
+    tags TEXT NOT NULL,
+    decoder_probe TEXT NOT NULL,
+    updated REAL NOT NULL
+)
+"""
+
+
+def probe_index_enabled() -> bool:
+    try:
+        return int(os.environ.get("STEPD_PROBE_INDEX", str(DEFAULT_PROBE_INDEX)).strip() or "0") > 0
+    except Exception:
+        return bool(DEFAULT_PROBE_INDEX)
+
+
+def default_index_path() -> Path:
+    p = os.environ.get("STEPD_PROBE_INDEX_PATH")
+    if p:
+        return Path(p)
+    return Path("ProbeIndex.sqlite3")
+
+
+def _text(v: object) -> str:
+    return v.decode("utf-8", errors="replace") if isinstance(v, bytes) else str(v)
+
+
+def _title_artist(tags: dict) -> tuple[Optional[str], Optional[str]]:
+    title = tags.get("title") or tags.get("TITLE") or tags.get("Title")
+    artist = tags.get("artist") or tags.get("ARTIST") or tags.get("Artist")
+    return title, artist
+
+
+def probe_file(path: str) -> dict[str, Any]:
+    """Best-effort probe: try PyAV, fall back to wave for WAV files.
+
+    Returns {"duration_seconds", "sample_rate", "channels", "title", "artist",
+    "metadata", "decoder_probe"}; unknown fields are None (or empty dicts).
+    """
+    try:
+        import av
+
+        container = av.open(path)
+
+        stream = None
+        audio_stream_index = None
+        try:
+            for i, s in enumerate(list(container.streams)):
+                if getattr(s, "type", None) == "audio":
+                    stream = s
+                    audio_stream_index = int(i)
+                    break
+        except Exception:
+            stream = next((s for s in container.streams if s.type == "audio"), None)
+            audio_stream_index = None
+
+        total_seconds: Optional[float] = None
+        sr: Optional[int] = None
+        ch: Optional[int] = None
+        metadata: dict = {}
+        decoder_probe: dict = {}
+
+        if stream is not None:
+            if getattr(stream, "duration", None) and getattr(stream, "time_base", None):
+                total_seconds = float(stream.duration * stream.time_base)
+            if getattr(stream, "rate", None):
+                sr = int(stream.rate)
+            if getattr(stream, "channels", None):
+                ch = int(stream.channels)
+
+            # Decoder probe fields (serializable)
+            if audio_stream_index is not None:
+                decoder_probe["audio_stream_index"] = int(audio_stream_index)
+            try:
+                tb = getattr(stream, "time_base", None)
+                if tb is not None:
+                    num = getattr(tb, "numerator", None)
+                    den = getattr(tb, "denominator", None)
+                    if num is not None and den is not None:
+                        decoder_probe["time_base_num"] = int(num)
+                        decoder_probe["time_base_den"] = int(den)
+            except Exception:
+                pass
+            try:
+                if getattr(stream, "duration", None) is not None:
+                    decoder_probe["stream_duration"] = int(stream.duration)
+            except Exception:
+                pass
+            if sr is not None:
+                decoder_probe["stream_rate"] = int(sr)
+            if ch is not None:
+                decoder_probe["stream_channels"] = int(ch)
+            # Include duration seconds for downstream consumers.
+            if total_seconds is not None:
+                decoder_probe["duration_seconds"] = float(total_seconds)
+
+        # Container-level tags, then stream-level tags on top.
+        for source in (container, stream):
+            try:
+                if source is not None and getattr(source, "metadata", None):
+                    for k, v in dict(source.metadata).items():
+                        try:
+                            metadata[_text(k)] = _text(v)
+                        except Exception:
+                            pass
+            except Exception:
+                pass
+
+        try:
+            container.close()
+        except Exception:
+            pass
+
+        title, artist = _title_artist(metadata)
+        return {
+            "duration_seconds": total_seconds,
+            "sample_rate": sr,
+            "channels": ch,
+            "title": title,
+            "artist": artist,
+            "metadata": metadata,
+            "decoder_probe": decoder_probe,
+        }
+    except Exception:
+        pass
+
+    # Fallback for WAV via wave module
+    try:
+        import wave
+
+        with wave.open(path, "rb") as w:
+            frames = w.getnframes()
+            rate = w.getframerate()
+            channels = w.getnchannels()
+            total_seconds = frames / float(rate) if rate else None
+            return {
+                "duration_seconds": total_seconds,
+                "sample_rate": int(rate) if rate else None,
+                "channels": int(channels) if channels else None,
+                "title": None,
+                "artist": None,
+                "metadata": {},
+                "decoder_probe": {
+                    "duration_seconds": float(total_seconds) if total_seconds is not None else None,
+                    "stream_rate": int(rate) if rate else None,
+                    "stream_channels": int(channels) if channels else None,
+                },
+            }
+    except Exception:
+        pass
+
+    return {
+        "duration_seconds": None,
+        "sample_rate": None,
+        "channels": None,
+        "title": None,
+        "artist": None,
+        "metadata": {},
+        "decoder_probe": {},
+    }
+
+
+class ProbeIndex:
+    """SQLite probe database with a single background indexer thread.
+
+    Entries are dicts in the shape SoundFileButton caches: {"sig": {"path",
+    "size", "mtime_ns"}, "duration_seconds", "sample_rate", "channels",
+    "title", "artist", "metadata", "decoder_probe"}.
+    """
+
+    def __init__(self, db_path: str | os.PathLike, prober: Callable[[str], dict] = probe_file) -> None:
+        self.db_path = Path(db_path)
+        self.prober = prober
+        self._conn: sqlite3.Connection | None = None
+        self._broken = False
+        self._db_lock = threading.Lock()
+        self._jobs: "queue.Queue[tuple[str, dict | None]]" = queue.Queue()
+        self._pending: set[str] = set()
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self.hits = 0
+        self.misses = 0
+
+    def _connect(self) -> sqlite3.Connection | None:
+        """Open the database on first use (caller holds _db_lock); None if it is unusable."""
+        if self._conn is not None or self._broken:
+            return self._conn
+        try:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), timeout=2.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(_SCHEMA)
+        except (OSError, sqlite3.Error) as e:
+            print(f"[PROBE-INDEX] disabled, cannot open {self.db_path}: {e}")
+            self._broken = True
+            return None
+        self._conn = conn
+        return conn
+
+    def close(self) -> None:
+        with self._db_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _lookup(self, path: str) -> dict | None:
+        sig = file_signature(path)
+        if sig is None:
+            return None
+        with self._db_lock:
+            conn = self._connect()
+            if conn is None:
+                return None
+            try:
+                row = conn.execute(
+                    "SELECT size, mtime_ns, version, duration_seconds, sample_rate, channels, tags, decoder_probe"
+                    " FROM probes WHERE path = ?",
+                    (sig[0],),
+                ).fetchone()
+            except sqlite3.Error:
+                return None
+        if row is None or (int(row[0]), int(row[1])) != (sig[1], sig[2]) or int(row[2]) != _FORMAT_VERSION:
+            return None
+        try:
+            tags = json.loads(row[6])
+            decoder_probe = json.loads(row[7])
+        except ValueError:
+            return None
+        title, artist = _title_artist(tags)
+        return {
+            "sig": {"path": sig[0], "size": sig[1], "mtime_ns": sig[2]},
+            "duration_seconds": row[3],
+            "sample_rate": row[4],
+            "channels": row[5],
+            "title": title,
+            "artist": artist,
+            "metadata": tags,
+            "decoder_probe": decoder_probe,
+        }
+
+    def get(self, path: str) -> dict | None:
+        """Indexed probe for the file as it is now, or None."""
+        entry = self._lookup(path)
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    def put(self, path: str, entry: dict) -> bool:
+        """Store a probe for the file as it is now (replacing any older one for the path)."""
+        sig = file_signature(path)
+        if sig is None:
+            return False
+        tags = entry.get("metadata") if isinstance(entry.get("metadata"), dict) else {}
+        decoder_probe = entry.get("decoder_probe") if isinstance(entry.get("decoder_probe"), dict) else {}
+        try:
+            row = (
+                sig[0],
+                sig[1],
+                sig[2],
+                _FORMAT_VERSION,
+                None if entry.get("duration_seconds") is None else float(entry["duration_seconds"]),
+                None if entry.get("sample_rate") is None else int(entry["sample_rate"]),
+                None if entry.get("channels") is None else int(entry["channels"]),
+                json.dumps(tags),
+                json.dumps(decoder_probe),
+                time.time(),
+            )
+        except (TypeError, ValueError):
+            return False
+        with self._db_lock:
+            conn = self._connect()
+            if conn is None:
+                return False
+            try:
+                conn.execute("INSERT OR REPLACE INTO probes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", row)
+            except sqlite3.Error as e:
+                print(f"[PROBE-INDEX] write failed for {os.path.basename(path)}: {e}")
+                return False
+        return True
+
+    def stats(self) -> dict:
+        with self._db_lock:
+            conn = self._connect()
+            try:
+                entries = int(conn.execute("SELECT COUNT(*) FROM probes").fetchone()[0]) if conn is not None else 0
+            except sqlite3.Error:
+                entries = 0
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "hits": int(self.hits),
+            "misses": int(self.misses),
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+        }
+
+    # -- background indexing ------------------------------------------------------
+
+    def request(self, path: str, entry: dict | None = None) -> None:
+        """Queue `path` for indexing unless it is indexed or queued already.
+
+        With `entry` (a probe the caller already has, e.g. restored from
+        ButtonSettings.json) it is stored as is; otherwise the file is probed.
+        """
+        key = os.path.abspath(path)
+        with self._lock:
+            if key in self._pending:
+                return
+            if self._lookup(path) is not None:
+                return
+            self._pending.add(key)
+            self._jobs.put((path, entry))
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="stepd-probe-index", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            try:
+                path, entry = self._jobs.get(timeout=5.0)
+            except queue.Empty:
+                with self._lock:
+                    if self._jobs.empty():
+                        self._thread = None
+                        return
+                continue
+            try:
+                self.put(path, entry if entry is not None else self.prober(path))
+            except Exception as e:
+                print(f"[PROBE-INDEX] probe failed for {os.path.basename(path)}: {e}")
+            finally:
+                with self._lock:
+                    self._pending.discard(os.path.abspath(path))
+
+
+_shared_index: ProbeIndex | None = None
+_shared_lock = threading.Lock()
+
+
+def shared_index() -> ProbeIndex | None:
+    """Process-wide index from the environment (one indexer thread per process)."""
+    global _shared_index
+    if not probe_index_enabled():
+        return None
+    with _shared_lock:
+        if _shared_index is None:
+            _shared_index = ProbeIndex(default_index_path())
+        return _shared_index
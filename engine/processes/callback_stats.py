@@ -0,0 +1,141 @@
+"""
+Per-callback timing histogram for the output process.
+
+STEPD_RT_TIMING only logs the last/max callback duration once per second, which
+is not enough to size block_frames and cue limits for a given machine. A
+CallbackHistogram records every callback into preallocated counters, binned by
+load (callback duration / block budget):
+
+- counts[bin]: callbacks whose load fell in the bin.
+- cues[bin], envelopes[bin]: summed cues mixed / active fades, so the main loop
+  can report the mean mix size per load bin.
+- underflows[bin]: PortAudio output_underflow flags, attributed to the bin of the
+  *previous* callback. PortAudio raises the flag on the callback after the one
+  that ran late.
+
+record() runs in the RT callback and only does integer stores into
+preallocated arrays. The counters are cumulative. The main loop calls snapshot()
+at its own rate, and snapshot() reports the delta since the previous call, so
+no reset has to race with the callback.
+"""
+from __future__ import annotations
+
+import numpy as np
+
+
+# Load bin edges as a fraction of the block budget: 0..2x in 1/16 steps, then overflow.
+DEFAULT_LOAD_STEP = 1.0 / 16.0
+DEFAULT_LOAD_BINS = 32
+
+
+class CallbackHistogram:
+    """Fixed-size load histogram of output callbacks (RT writer, main-loop reader)."""
+
+    def __init__(self, load_step: float = DEFAULT_LOAD_STEP, load_bins: int = DEFAULT_LOAD_BINS) -> None:
+        self.load_step = float(load_step)
+        self.load_bins = max(1, int(load_bins))
+        n = self.load_bins + 1  # last bin = overflow (>= load_bins * load_step)
+        self.counts = np.zeros(n, dtype=np.int64)
+        self.cues = np.zeros(n, dtype=np.int64)
+        self.envelopes = np.zeros(n, dtype=np.int64)
+        self.underflows = np.zeros(n, dtype=np.int64)
+        self.total = 0
+        self.over_budget = 0
+        self.max_ms = 0.0
+        self.max_cues = 0
+        self.max_envelopes = 0
+        self.budget_ms = 0.0
+        self._prev_bin = 0
+        # Main-loop side: cumulative values at the previous snapshot.
+        self._last = (
+            np.zeros(n, dtype=np.int64),
+            np.zeros(n, dtype=np.int64),
+            np.zeros(n, dtype=np.int64),
+            np.zeros(n, dtype=np.int64),
+        )
+        self._last_total = 0
+        self._last_over = 0
+
+    def record(self, duration_ms: float, budget_ms: float, cues: int, envelopes: int, underflow: bool) -> None:
+        """RT: add one callback. `underflow` is the PortAudio output_underflow flag seen by this callback."""
+        if underflow:
+            self.underflows[self._prev_bin] += 1
+        if budget_ms > 0.0:
+            load = duration_ms / budget_ms
+            self.budget_ms = budget_ms
+            if duration_ms > budget_ms:
+                self.over_budget += 1
+        else:
+            load = 0.0
+        b = int(load / self.load_step)
+        if b > self.load_bins:
+            b = self.load_bins
+        self.counts[b] += 1
+        self.cues[b] += cues
+        self.envelopes[b] += envelopes
+        self.total += 1
+        self._prev_bin = b
+        if duration_ms > self.max_ms:
+            self.max_ms = duration_ms
+            self.max_cues = cues
+            self.max_envelopes = envelopes
+
+    def bin_edges(self) -> list[float]:
+        """Lower load edge of every bin (the last bin is open-ended)."""
+        return [round(i * self.load_step, 6) for i in range(self.load_bins + 1)]
+
+    def snapshot(self) -> dict | None:
+        """Main loop: counters accumulated since the previous snapshot (None if no callbacks)."""
+        counts = self.counts.copy()
+        cues = self.cues.copy()
+        envelopes = self.envelopes.copy()
+        underflows = self.underflows.copy()
+        total = self.total
+        over = self.over_budget
+        last_counts, last_cues, last_env, last_under = self._last
+        d_counts = counts - last_counts
+        d_cues = cues - last_cues
+        d_env = envelopes - last_env
+        d_under = underflows - last_under
+        self._last = (counts, cues, envelopes, underflows)
+        d_total = total - self._last_total
+        d_over = over - self._last_over
+        self._last_total = total
+        self._last_over = over
+
+        max_ms = self.max_ms
+        max_cues = self.max_cues
+        max_env = self.max_envelopes
+        self.max_ms = 0.0  # windowed maximum; a lost race only affects one sample
+
+        n = int(d_counts.sum())
+        if n <= 0:
+            return None
+        budget_ms = self.budget_ms
+        safe = np.maximum(d_counts, 1)
+        return {
+            "callbacks": int(d_total),
+            "budget_ms": float(budget_ms),
+            "over_budget": int(d_over),
+            "underflows": int(d_under.sum()),
+            "max_ms": float(max_ms),
+            "max_cues": int(max_cues),
+            "max_envelopes": int(max_env),
+            "p50_ms": self._percentile_ms(d_counts, 0.50, budget_ms),
+            "p95_ms": self._percentile_ms(d_counts, 0.95, budget_ms),
+            "p99_ms": self._percentile_ms(d_counts, 0.99, budget_ms),
+            "load_edges": self.bin_edges(),
+            "counts": d_counts.tolist(),
+            "underflows_by_bin": d_under.tolist(),
+            "mean_cues": np.round(d_cues / safe, 3).tolist(),
+            "mean_envelopes": np.round(d_env / safe, 3).tolist(),
+        }
+
+    def _percentile_ms(self, counts: np.ndarray, q: float, budget_ms: float) -> float:
+        """Upper edge (ms) of the bin that contains quantile `q`."""
+        total = int(counts.sum())
+        if total <= 0:
+            return 0.0
+        idx = int(np.searchsorted(np.cumsum(counts), q * total, side="left"))
+        idx = min(idx, self.load_bins)
+        return float((idx + 1) * self.load_step * budget_ms)
@@ -0,0 +1,65 @@
+"""
+Reusable per-cue buffer that decoded chunks are assembled in.
+
+The decoder used to collect every decoded frame in a list and then
+`np.concatenate(...).astype(np.float32)` it into the outgoing chunk, on top of
+the per-frame arrays made by _normalize_audio/_ensure_channels. Now each cue
+owns one float32 (frames, channels) buffer: a frame is converted straight into
+the free tail (`reserve`), and `append` only advances the fill mark when the
+kept frames are already in place, copying only if they were trimmed at the
+front (seek discard) or are a leftover from the previous chunk.
+
+The chunk view (`view()`) is only valid until the next `reset()`. The slab
+transport copies it synchronously. Anything that keeps frames longer, such as
+the cache capture, the loop region or an inline message put on an
+mp.Queue (pickled later by a feeder thread), must copy.
+"""
+from __future__ import annotations
+
+import numpy as np
+
+
+class ChunkAssembler:
+    """Preallocated (frames, channels) float32 assembly buffer for one cue."""
+
+    def __init__(self, channels: int, capacity_frames: int) -> None:
+        self.channels = max(1, int(channels))
+        self.buf = np.zeros((max(1, int(capacity_frames)), self.channels), dtype=np.float32)
+        self.filled = 0
+        self.grows = 0
+
+    @property
+    def capacity(self) -> int:
+        return int(self.buf.shape[0])
+
+    def reserve(self, frames: int) -> np.ndarray:
+        """Writable tail view for `frames` new frames (grows the buffer if needed)."""
+        frames = max(0, int(frames))
+        need = self.filled + frames
+        if need > self.capacity:
+            grown = np.zeros((max(need, self.capacity * 2), self.channels), dtype=np.float32)
+            grown[: self.filled] = self.buf[: self.filled]
+            self.buf = grown
+            self.grows += 1
+        return self.buf[self.filled : need]
+
+    def append(self, pcm: np.ndarray) -> np.ndarray:
+        """Add frames to the chunk; free when `pcm` already sits at the fill mark.
+
+        Returns the frames' view in the buffer. Use it instead of `pcm` afterwards:
+        shifting a front-trimmed frame overwrites the tail that `pcm` still points at.
+        """
+        n = int(pcm.shape[0])
+        if n <= 0:
+            return self.buf[self.filled : self.filled]
+        dst = self.reserve(n)
+        if dst.__array_interface__["data"][0] != pcm.__array_interface__["data"][0]:
+            dst[...] = pcm  # numpy handles the overlap when a leftover is shifted to the front
+        self.filled += n
+        return dst
+
+    def view(self) -> np.ndarray:
+        return self.buf[: self.filled]
+
+    def reset(self) -> None:
+        self.filled = 0
@@ -0,0 +1,40 @@
+"""
+Start-up ramp for decoded chunk sizes.
+
+A cue's first chunk used to be the steady-state size (block_frames * chunk_mult,
+16384 frames with the defaults), so a compressed file had to decode ~340 ms of
+audio before the output heard anything. The ramp makes the first chunk just
+cover the cue's start block (DecodeStart.block_frames) and grows each following
+chunk geometrically until it reaches the steady-state size, where it stays.
+"""
+from __future__ import annotations
+
+import os
+
+from engine.tuning import DEFAULT_DECODE_CHUNK_RAMP
+
+
+def chunk_ramp_growth() -> int:
+    """Growth factor per chunk (STEPD_DECODE_CHUNK_RAMP; <= 1 disables the ramp)."""
+    try:
+        growth = int(os.environ.get("STEPD_DECODE_CHUNK_RAMP", str(DEFAULT_DECODE_CHUNK_RAMP)).strip() or "1")
+    except Exception:
+        growth = int(DEFAULT_DECODE_CHUNK_RAMP)
+    return max(1, min(16, growth))
+
+
+class ChunkRamp:
+    """Chunk size for the next decode step of one cue."""
+
+    def __init__(self, first_frames: int, steady_frames: int, growth: int) -> None:
+        self.steady_frames = max(1, int(steady_frames))
+        self.growth = max(1, int(growth))
+        if self.growth <= 1:
+            self.frames = self.steady_frames
+        else:
+            self.frames = max(1, min(self.steady_frames, int(first_frames)))
+
+    def advance(self) -> None:
+        """A chunk was sent; the next one may be larger."""
+        if self.frames < self.steady_frames:
+            self.frames = min(self.steady_frames, self.frames * self.growth)
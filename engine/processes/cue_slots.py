@@ -0,0 +1,177 @@
+"""
+Integer cue slots for the output process (struct-of-arrays cue state).
+
+The callback used to look up rings, envelopes, gains and consumed-sample counts
+in string-keyed dicts (UUID cue ids) for every cue on every block, and built a
+fresh {cue_id: (elapsed, remaining)} dict each time. CueSlotTable gives every
+active cue a small integer slot instead:
+
+- Per-slot numbers live in preallocated NumPy arrays: gain, consumed frames,
+  remaining frames, a "time updated" flag and the scheduled start sample
+  (`start_at`, -1 = start as soon as PCM is buffered).
+- Per-slot objects (the cue's _Ring and active fade envelope) live in plain
+  lists indexed by slot.
+- `active` is an immutable tuple of slots in start order; the callback iterates
+  it without touching cue ids.
+
+Cue ids are mapped to slots only when a cue starts (acquire) and when it
+finishes (release). Everything in between is integer indexing.
+
+Threading: acquire/release and the cue-id helpers run on the output main loop.
+The callback only reads `active` and indexes the arrays/lists. Capacity grows by
+doubling on acquire (rare); the arrays are replaced atomically by attribute
+assignment.
+"""
+from __future__ import annotations
+
+from typing import Any
+
+import numpy as np
+
+
+class CueSlotTable:
+    """Slot allocator plus struct-of-arrays cue state."""
+
+    def __init__(self, capacity: int = 128) -> None:
+        self.capacity = 0
+        self.slot_of: dict[str, int] = {}
+        self.cue_ids: list[str | None] = []
+        self.rings: list[Any] = []
+        self.envelopes: list[Any] = []
+        self.gain = np.ones(0, dtype=np.float32)
+        self.consumed = np.zeros(0, dtype=np.int64)
+        self.remaining = np.zeros(0, dtype=np.int64)
+        self.time_dirty = np.zeros(0, dtype=np.bool_)
+        self.start_at = np.full(0, -1, dtype=np.int64)
+        self._free: list[int] = []
+        self.active: tuple[int, ...] = ()
+        self._grow(max(1, int(capacity)))
+
+    def _grow(self, capacity: int) -> None:
+        old = self.capacity
+        extra = capacity - old
+        gain = np.ones(capacity, dtype=np.float32)
+        consumed = np.zeros(capacity, dtype=np.int64)
+        remaining = np.zeros(capacity, dtype=np.int64)
+        time_dirty = np.zeros(capacity, dtype=np.bool_)
+        start_at = np.full(capacity, -1, dtype=np.int64)
+        if old:
+            gain[:old] = self.gain
+            consumed[:old] = self.consumed
+            remaining[:old] = self.remaining
+            time_dirty[:old] = self.time_dirty
+            start_at[:old] = self.start_at
+        self.cue_ids.extend([None] * extra)
+        self.rings.extend([None] * extra)
+        self.envelopes.extend([None] * extra)
+        self.gain = gain
+        self.consumed = consumed
+        self.remaining = remaining
+        self.time_dirty = time_dirty
+        self.start_at = start_at
+        # Pop from the end -> lowest free slot first.
+        self._free.extend(range(capacity - 1, old - 1, -1))
+        self._free.sort(reverse=True)
+        self.capacity = capacity
+
+    def __len__(self) -> int:
+        return len(self.active)
+
+    def __contains__(self, cue_id: object) -> bool:
+        return cue_id in self.slot_of
+
+    def acquire(self, cue_id: str, ring: Any, start_at: int | None = None) -> int:
+        """Map `cue_id` to a slot (reusing its existing slot) and attach its ring.
+
+        `start_at` (output-stream sample) is stored before the slot becomes active,
+        so the callback never sees the cue without its schedule.
+        """
+        slot = self.slot_of.get(cue_id)
+        if slot is not None:
+            if start_at is not None:
+                self.start_at[slot] = int(start_at)
+            self.rings[slot] = ring
+            return slot
+        if not self._free:
+            self._grow(self.capacity * 2)
+        slot = self._free.pop()
+        self.cue_ids[slot] = cue_id
+        self.rings[slot] = ring
+        self.envelopes[slot] = None
+        self.gain[slot] = 1.0
+        self.consumed[slot] = 0
+        self.remaining[slot] = 0
+        self.time_dirty[slot] = False
+        self.start_at[slot] = -1 if start_at is None else int(start_at)
+        self.slot_of[cue_id] = slot
+        self.active = self.active + (slot,)
+        return slot
+
+    def release(self, cue_id: str) -> int | None:
+        """Free the slot for `cue_id`. Returns the released slot (or None if unknown)."""
+        slot = self.slot_of.pop(cue_id, None)
+        if slot is None:
+            return None
+        self.active = tuple(s for s in self.active if s != slot)
+        self.cue_ids[slot] = None
+        self.rings[slot] = None
+        self.envelopes[slot] = None
+        self.gain[slot] = 1.0
+        self.consumed[slot] = 0
+        self.remaining[slot] = 0
+        self.time_dirty[slot] = False
+        self.start_at[slot] = -1
+        self._free.append(slot)
+        self._free.sort(reverse=True)
+        return slot
+
+    # -- cue-id helpers (main loop) -----------------------------------------------
+
+    def get_gain(self, cue_id: str, default: float = 1.0) -> float:
+        slot = self.slot_of.get(cue_id)
+        return float(self.gain[slot]) if slot is not None else float(default)
+
+    def set_gain(self, cue_id: str, value: float) -> None:
+        slot = self.slot_of.get(cue_id)
+        if slot is not None:
+            self.gain[slot] = float(value)
+
+    def envelope(self, cue_id: str) -> Any:
+        slot = self.slot_of.get(cue_id)
+        return self.envelopes[slot] if slot is not None else None
+
+    def set_envelope(self, cue_id: str, env: Any) -> Any:
+        """Install (or clear, with None) a cue's envelope. Returns the previous one."""
+        slot = self.slot_of.get(cue_id)
+        if slot is None:
+            return None
+        old = self.envelopes[slot]
+        self.envelopes[slot] = env
+        return old
+
+    def scheduled_count(self) -> int:
+        """Active cues still waiting for their start sample."""
+        start_at = self.start_at
+        return sum(1 for slot in self.active if start_at[slot] >= 0)
+
+    def reset_consumed(self, cue_id: str) -> None:
+        slot = self.slot_of.get(cue_id)
+        if slot is not None:
+            self.consumed[slot] = 0
+
+    def collect_times(self, sample_rate: int) -> dict[str, tuple[float, float]] | None:
+        """{cue_id: (elapsed_s, remaining_s)} for slots the callback updated since the last call."""
+        active = self.active
+        if not active or sample_rate <= 0:
+            return None
+        dirty = self.time_dirty
+        times: dict[str, tuple[float, float]] = {}
+        sr = float(sample_rate)
+        for slot in active:
+            if not dirty[slot]:
+                continue
+            dirty[slot] = False
+            cue_id = self.cue_ids[slot]
+            if cue_id is not None:
+                times[cue_id] = (int(self.consumed[slot]) / sr, int(self.remaining[slot]) / sr)
+        return times or None
@@ -8,12 +8,14 @@ from __future__ import annotations
 
 import multiprocessing as mp
 from dataclasses import dataclass
-from typing import Dict, Optional
+from typing import Dict, Generator, NamedTuple, Optional
 import queue as queue_module
 import queue
 import threading
 import time
 import os
+import zlib
+from collections import deque
 
 import numpy as np
 import av
@@ -24,7 +26,24 @@ from engine.tuning import (
     DEFAULT_DECODE_CHUNK_MULT,
     DEFAULT_DECODE_DEFAULT_CHUNK_MIN_FRAMES,
     DEFAULT_DECODE_SLICE_MAX_FRAMES,
+    DEFAULT_DECODE_CACHE_MB,
+    DEFAULT_DECODE_CACHE_MAX_ENTRY_MB,
+    DEFAULT_LOOP_REGION_MAX_MB,
+    DEFAULT_DECODE_SHARDS,
+    DEFAULT_PREROLL_MB,
+    DEFAULT_PREROLL_MS,
 )
+from engine.processes.pcm_shm import PcmSlabPool, PcmSlabPoolSpec, PcmSlabWriter
+from engine.processes.decoded_cache import DecodedPcmCache, PcmCapture, cache_key
+from engine.processes.chunk_buffer import ChunkAssembler
+from engine.processes.chunk_ramp import ChunkRamp, chunk_ramp_growth
+from engine.processes.decode_shards import ShardRouter
+from engine.processes.edf_pool import DecodeJob, EdfDecodePool
+from engine.processes.preroll import PrerollStore, preroll_key
+from engine.processes.wakeup import Wakeup
+from engine.pcm_disk_cache import PcmDiskCache, PcmDiskWriter, to_float32
+from engine.pcm_file import PcmFile, open_pcm_file, pcm_fast_path_enabled
+from engine.seek_index import SeekIndex, shared_store as shared_seek_index_store
 
 
 def _out_send(out_chan: object, msg: object, lock: threading.Lock | None) -> None:
@@ -62,11 +81,21 @@ class DecodeStart:
 class DecodeStop:
     cue_id: str
 
+@dataclass(frozen=True, slots=True)
+class DecodeArm:
+    """Replace the armed cue set: (file_path, in_frame, out_frame) per cue to preroll."""
+    heads: tuple[tuple[str, int, Optional[int]], ...]
+    target_sample_rate: int
+    target_channels: int
+    block_frames: int
+
 @dataclass(frozen=True, slots=True)
 class DecodedChunk:
     cue_id: str
     track_id: str
-    pcm: np.ndarray
+    # Inline PCM (frames, channels). None when the frames live in the shared-memory
+    # slab pool; see shm_slab/shm_offset/shm_frames.
+    pcm: np.ndarray | None
     eof: bool
     is_loop_restart: bool = False
     # --- Decode heartbeat diagnostics (optional) ---
@@ -80,6 +109,67 @@ class DecodedChunk:
     engine_received_mono: float | None = None
     # Monotonic timestamp (seconds) captured in audio_engine right before forwarding to output.
     engine_forwarded_mono: float | None = None
+    # --- Shared-memory transport (engine/processes/pcm_shm.py) ---
+    # Slab index holding this chunk's frames; the consumer must release it exactly once.
+    shm_slab: int | None = None
+    shm_offset: int = 0
+    shm_frames: int = 0
+
+def _send_decoded_pcm(
+    out_q: object,
+    out_lock: threading.Lock | None,
+    writer: PcmSlabWriter | None,
+    *,
+    cue_id: str,
+    track_id: str,
+    pcm: np.ndarray,
+    eof: bool,
+    is_loop_restart: bool,
+    decoder_produced_mono: float | None,
+    decode_work_ms: float | None,
+    worker_id: int | None,
+) -> None:
+    """Send one decoded chunk, through the shared-memory slab pool when available.
+
+    A chunk that spans a slab boundary becomes several descriptors. The loop-restart
+    flag travels on the first message and EOF on the last, so the output ring sees
+    the same sequence as a single inline chunk. Frames that do not fit (pool
+    exhausted) are sent inline as a fallback.
+    """
+    spans: list[tuple[int, int, int]] = []
+    written = 0
+    if writer is not None:
+        try:
+            spans, written = writer.write(pcm)
+        except Exception:
+            spans, written = [], 0
+    # (inline_pcm, slab, offset, frames) per outgoing message, in order.
+    parts: list[tuple[np.ndarray | None, int | None, int, int]] = [
+        (None, slab, offset, frames) for slab, offset, frames in spans
+    ]
+    if written < int(pcm.shape[0]) or not parts:
+        # Copy: `pcm` may be the cue's reused chunk buffer, and mp.Queue pickles later.
+        parts.append((pcm[written:].copy(), None, 0, 0))
+    last = len(parts) - 1
+    for i, (inline, slab, offset, frames) in enumerate(parts):
+        _out_send(
+            out_q,
+            DecodedChunk(
+                cue_id=cue_id,
+                track_id=track_id,
+                pcm=inline,
+                eof=bool(eof) if i == last else False,
+                is_loop_restart=bool(is_loop_restart) if i == 0 else False,
+                decoder_produced_mono=decoder_produced_mono,
+                decode_work_ms=decode_work_ms,
+                worker_id=worker_id,
+                shm_slab=slab,
+                shm_offset=offset,
+                shm_frames=frames,
+            ),
+            out_lock,
+        )
+
 
 @dataclass(frozen=True, slots=True)
 class DecodeError:
@@ -92,6 +182,9 @@ class DecodeError:
 class BufferRequest:
     cue_id: str
     frames_needed: int
+    # Frames buffered in the output ring when the request was sent; the decode pool
+    # schedules the cue whose ring runs dry first (None: as soon as possible).
+    ring_frames: int | None = None
 
 def _normalize_audio(arr: np.ndarray) -> np.ndarray:
     if arr.ndim == 1:
@@ -118,6 +211,88 @@ def _ensure_channels(pcm: np.ndarray, target_channels: int) -> np.ndarray:
     pad = np.zeros((frames, target_channels - ch), dtype=np.float32)
     return np.concatenate([pcm, pad], axis=1)
 
+def _frame_to_pcm(frame: object, channels: int, out: np.ndarray | None = None) -> np.ndarray:
+    """Decoded AVFrame -> interleaved float32 (frames, channels) without intermediates.
+
+    Replaces _normalize_audio + _ensure_channels for both decoded and resampled
+    frames: planes are transposed straight into an array at the output layout,
+    scaled like _normalize_audio and with channels dropped/zero-padded like
+    _ensure_channels. With `out` (e.g. ChunkAssembler.reserve()), the frame is
+    written there instead of into a new array.
+    """
+    arr = frame.to_ndarray()
+    n = int(frame.samples)
+    if frame.format.is_planar:
+        planes = arr
+    else:
+        planes = arr.reshape(n, -1).T
+    k = min(int(planes.shape[0]), int(channels))
+    if out is None:
+        out = np.empty((n, channels), dtype=np.float32)
+    else:
+        out = out[:n]
+    if k < channels:
+        out[:, k:] = 0.0
+    src = planes[:k].T
+    if np.issubdtype(src.dtype, np.floating):
+        out[:, :k] = src
+    elif np.issubdtype(src.dtype, np.unsignedinteger):
+        half = float(np.iinfo(src.dtype).max // 2 + 1)
+        np.subtract(src, np.float32(half), out=out[:, :k], casting="unsafe")
+        out[:, :k] *= np.float32(1.0 / half)
+    else:
+        info = np.iinfo(src.dtype)
+        np.multiply(src, np.float32(1.0 / max(abs(info.min), info.max)), out=out[:, :k], casting="unsafe")
+    return out
+
+
+def _negotiate_direct(start_cmd: DecodeStart, stream: object) -> bool:
+    """True if the source already runs at the output rate, so frames can skip the resampler.
+
+    Prefers the GUI's decoder_probe (stream_rate) and falls back to the opened codec context.
+    """
+    rate = None
+    probe = getattr(start_cmd, "decoder_probe", None)
+    if isinstance(probe, dict) and isinstance(probe.get("stream_rate"), int):
+        rate = int(probe["stream_rate"])
+    if rate is None:
+        try:
+            rate = int(stream.codec_context.sample_rate)
+        except Exception:
+            return False
+    return rate == int(start_cmd.target_sample_rate)
+
+
+_PATH_STATS_INTERVAL_S = 5.0
+
+
+class _DecodePathStats:
+    """How cue starts were served (pcm_file / ram_cache / disk_cache / preroll / direct / resample / indexed_seek).
+
+    loop_region counts loops replayed from memory rather than re-decoded.
+
+    Shared by the decode workers; decode_process_main reports it as a
+    ("diag", {"type": "decode_paths", ...}) event when it changes.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counts: dict[str, int] = {}
+        self._dirty = False
+
+    def note(self, path: str) -> None:
+        with self._lock:
+            self._counts[path] = self._counts.get(path, 0) + 1
+            self._dirty = True
+
+    def take_changed(self) -> dict[str, int] | None:
+        with self._lock:
+            if not self._dirty:
+                return None
+            self._dirty = False
+            return dict(self._counts)
+
+
 @dataclass
 class _JobState:
     """State for a single decode job within a worker"""
@@ -510,24 +685,474 @@ def _decode_worker_pool(worker_id: int, cmd_q: mp.Queue, out_q: mp.Queue) -> Non
         pass
 
 
-def _decode_worker_thread(
+def _resolve_chunk_frames(block_frames: int) -> int:
+    """Frames per decoded chunk for a cue (STEPD_DECODE_CHUNK_* knobs)."""
+    # Larger chunks reduce IPC/message overhead under high concurrency.
+    # Keep configurable so we can tune fairness vs overhead.
+    try:
+        chunk_mult = int(os.environ.get("STEPD_DECODE_CHUNK_MULT", str(DEFAULT_DECODE_CHUNK_MULT)).strip() or str(DEFAULT_DECODE_CHUNK_MULT))
+    except Exception:
+        chunk_mult = int(DEFAULT_DECODE_CHUNK_MULT)
+    chunk_mult = max(1, min(256, int(chunk_mult)))
+    try:
+        default_chunk_min_frames = int(
+            os.environ.get(
+                "STEPD_DECODE_DEFAULT_CHUNK_MIN_FRAMES",
+                str(DEFAULT_DECODE_DEFAULT_CHUNK_MIN_FRAMES),
+            ).strip()
+            or str(DEFAULT_DECODE_DEFAULT_CHUNK_MIN_FRAMES)
+        )
+    except Exception:
+        default_chunk_min_frames = int(DEFAULT_DECODE_DEFAULT_CHUNK_MIN_FRAMES)
+    default_chunk_min_frames = max(256, int(default_chunk_min_frames))
+
+    default_chunk_frames = max(default_chunk_min_frames, int(block_frames) * chunk_mult)  # e.g. 1024*16=16384
+    try:
+        chunk_frames = int(os.environ.get("STEPD_DECODE_CHUNK_FRAMES", str(default_chunk_frames)).strip())
+    except Exception:
+        chunk_frames = default_chunk_frames
+    try:
+        min_chunk_frames = int(
+            os.environ.get(
+                "STEPD_DECODE_CHUNK_MIN_FRAMES",
+                str(DEFAULT_DECODE_CHUNK_MIN_FRAMES),
+            ).strip()
+            or str(DEFAULT_DECODE_CHUNK_MIN_FRAMES)
+        )
+    except Exception:
+        min_chunk_frames = int(DEFAULT_DECODE_CHUNK_MIN_FRAMES)
+    min_chunk_frames = max(256, int(min_chunk_frames))
+
+    chunk_frames = max(min_chunk_frames, int(chunk_frames))
+    return chunk_frames
+
+
+def _loop_region_max_frames(channels: int) -> int:
+    """Largest loop region (frames) kept in memory for replay (STEPD_LOOP_REGION_MAX_MB, 0 disables)."""
+    try:
+        mb = int(os.environ.get("STEPD_LOOP_REGION_MAX_MB", str(DEFAULT_LOOP_REGION_MAX_MB)).strip() or "0")
+    except Exception:
+        mb = DEFAULT_LOOP_REGION_MAX_MB
+    if mb <= 0:
+        return 0
+    return (mb * 1024 * 1024) // (max(1, int(channels)) * 4)
+
+
+def _load_seek_index(path: str, stream: object, *, request_build: bool) -> SeekIndex | None:
+    """Seek index for `stream` of `path`; queues a background build on a miss if asked."""
+    store = shared_seek_index_store()
+    if store is None:
+        return None
+    stream_index = int(getattr(stream, "index", 0) or 0)
+    index = store.load(path, stream_index)
+    if index is None and request_build:
+        store.request(path, stream_index)
+    return index
+
+
+class _SeekAlign(NamedTuple):
+    """The seek target the first frame decoded after a seek is trimmed against."""
+
+    index: SeekIndex | None
+    sample: int  # source sample with an index, else output frame
+    time_base: object = None  # stream time base (unindexed seeks)
+    origin: int = 0  # PTS of output frame 0, the stream's start_time (unindexed seeks)
+
+
+def _seek_container(
+    container: object,
+    stream: object,
+    frame: int,
+    target_sample_rate: int,
+    index: SeekIndex | None,
+) -> tuple[int, _SeekAlign | None]:
+    """Seek so decoding resumes at output `frame`. Returns (discard_frames, align).
+
+    Without an index this is a backward keyframe seek plus a fixed 10 ms discard.
+    With one, the seek lands on the frame holding the target (minus codec pre-roll).
+    Either way `align` is checked against the first decoded frame (see
+    _align_discard), so the trim is exact even if the seek lands early; the fixed
+    discard is only used when that frame has no usable PTS.
+    """
+    frame = max(0, int(frame))
+    if index is not None:
+        sample = int(round(frame * index.sample_rate / target_sample_rate))
+        seek_pts, discard = index.locate(sample)
+        container.seek(seek_pts, stream=stream, any_frame=False, backward=True)
+        return int(round(discard * target_sample_rate / index.sample_rate)), _SeekAlign(index, sample)
+    time_base = getattr(stream, "time_base", None)
+    # Frame 0 is the first decoded sample, which is at start_time (not 0) for e.g.
+    # MP3s with a LAME/gapless header.
+    origin = int(getattr(stream, "start_time", None) or 0)
+    seek_ts = origin + (int((frame / target_sample_rate) / time_base) if frame > 0 else 0)
+    container.seek(seek_ts, stream=stream, any_frame=False, backward=True)
+    return (target_sample_rate // 100 if frame > 0 else 0), _SeekAlign(None, frame, time_base, origin)
+
+
+def _align_discard(align: _SeekAlign, frame_pts: int | None, target_sample_rate: int) -> int | None:
+    """Output frames to drop from the first frame decoded after a seek (None if its PTS is unusable).
+
+    Negative when the seek landed past the target (that many frames are missing).
+    """
+    if frame_pts is None:
+        return None
+    if align.index is not None:
+        offset = align.index.offset_at(frame_pts)
+        if offset is None:
+            return None
+        return max(0, int(round((align.sample - offset) * target_sample_rate / align.index.sample_rate)))
+    if not align.time_base:
+        return None
+    return align.sample - int(round(float((frame_pts - align.origin) * align.time_base) * target_sample_rate))
+
+
+def _serve_cached_pcm(
     worker_id: int,
     start_cmd: DecodeStart,
+    pcm_full: np.ndarray | PcmFile,
     cmd_q: "queue.Queue[object]",
     out_q: mp.Queue,
     event_q: mp.Queue,
-    decode_sema: threading.Semaphore,
     out_lock: threading.Lock | None,
-) -> None:
-    """Decode a single cue on a dedicated thread.
+    slab_writer: PcmSlabWriter | None,
+    pcm_out_q: mp.Queue | None,
+    *,
+    base_frame: int = 0,
+    covers_eof: bool = True,
+    resume: tuple[int, int, bool] | None = None,
+) -> Generator[int | None, None, tuple[int, int, bool] | None]:
+    """Play a cue from decoded PCM in memory without touching the container.
+
+    A decode step generator like _decode_cue_steps (see engine/processes/edf_pool.py):
+    yields the frames sent per chunk, or None while waiting for credit.
+
+    Speaks the same protocol as the PyAV path (BufferRequest credit, UpdateCueCommand,
+    loop restarts, EOF, first_chunk/eof notices), but every chunk is a slice of
+    `pcm_full` (in RAM, a float32/int16 memmap from the disk cache, or a
+    memory-mapped WAV/AIFF PcmFile).
+
+    `pcm_full` holds source frames [base_frame, base_frame + len). A whole cached
+    file has base_frame=0 and covers_eof=True. A decode-once loop region starts at
+    its in_frame and covers EOF only if it was captured up to the end of the file.
+
+    `resume=(pos, credit_frames, is_loop_restart)` continues a cue that was
+    already started by the PyAV path (no "started"/first_chunk notices).
+
+    Returns None when the cue is stopped, or (pos, credit_frames, is_loop_restart)
+    when an in/out update moves the region outside the frames held here; the
+    caller then seeks the container to `pos` and decodes from there.
+    """
+    cue_id = start_cmd.cue_id
+    pcm_chan = pcm_out_q if pcm_out_q is not None else out_q
+    pcm_lock = None if pcm_out_q is not None else out_lock
+    base = int(base_frame)
+    span_end = base + int(pcm_full.shape[0])
+    chunk_frames = _resolve_chunk_frames(start_cmd.block_frames)
+
+    def _region() -> tuple[int, int] | None:
+        start = max(0, int(start_cmd.in_frame))
+        if covers_eof:
+            start = min(start, span_end)
+        if start_cmd.out_frame is None:
+            if not covers_eof:
+                return None
+            end = span_end
+        else:
+            end = max(start, int(start_cmd.out_frame))
+            if covers_eof:
+                end = min(end, span_end)
+        if start < base or end > span_end or start > span_end:
+            return None
+        return start, end
+
+    eof = False
+    if resume is not None:
+        pos, credit_frames, is_loop_restart = resume
+        first_chunk_sent = True
+    else:
+        region = _region()
+        pos = region[0] if region is not None else base
+        credit_frames = 0
+        is_loop_restart = False
+        first_chunk_sent = False
+        try:
+            event_q.put(("started", cue_id, start_cmd.track_id, start_cmd.file_path, None))
+        except Exception:
+            pass
 
-    PyAV is not generally thread-safe across shared objects; this design keeps one
-    container/stream/resampler confined to a single thread.
+    while True:
+        stopping = False
+        while True:
+            try:
+                msg = cmd_q.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(msg, DecodeStop):
+                stopping = True
+                break
+            if isinstance(msg, UpdateCueCommand) and msg.cue_id == cue_id:
+                if msg.loop_enabled is not None:
+                    start_cmd.loop_enabled = bool(msg.loop_enabled)
+                if msg.in_frame is not None:
+                    start_cmd.in_frame = int(msg.in_frame)
+                start_cmd.out_frame = msg.out_frame
+            elif isinstance(msg, BufferRequest) and msg.cue_id == cue_id:
+                credit_frames += int(msg.frames_needed)
+        if stopping:
+            return None
+
+        region = _region()
+        if region is None:
+            return (pos, credit_frames, is_loop_restart)
+        start, end = region
+
+        # Looping turned on after EOF: resume from in_frame (same as the PyAV path).
+        if eof and start_cmd.loop_enabled:
+            pos = start
+            eof = False
+            is_loop_restart = True
+
+        if credit_frames <= 0 or eof:
+            yield None
+            continue
+
+        if pos >= end and start_cmd.loop_enabled and end > start:
+            pos = start
+            is_loop_restart = True
+        if pos < base or pos > span_end:
+            return (pos, credit_frames, is_loop_restart)
+        n = max(0, min(credit_frames, chunk_frames, end - pos))
+        chunk = to_float32(pcm_full[pos - base : pos - base + n])
+        pos += n
+        credit_frames -= n
+        at_end = pos >= end
+        if at_end and (not start_cmd.loop_enabled or end <= start):
+            eof = True
+
+        _send_decoded_pcm(
+            pcm_chan,
+            pcm_lock,
+            slab_writer,
+            cue_id=cue_id,
+            track_id=start_cmd.track_id,
+            pcm=chunk,
+            eof=eof,
+            is_loop_restart=is_loop_restart,
+            decoder_produced_mono=time.monotonic(),
+            decode_work_ms=0.0,
+            worker_id=worker_id,
+        )
+        # The boundary is flagged on the first chunk of the next iteration, so the
+        # output sees the restart at the exact frame.
+        is_loop_restart = bool(at_end and not eof)
+        if is_loop_restart:
+            pos = start
+        if pcm_out_q is not None:
+            try:
+                if not first_chunk_sent and n > 0:
+                    event_q.put(("first_chunk", cue_id, start_cmd.track_id, int(n), time.monotonic(), 0.0))
+                    first_chunk_sent = True
+                if eof:
+                    event_q.put(("eof", cue_id, start_cmd.track_id))
+            except Exception:
+                pass
+        if slab_writer is not None and (credit_frames <= 0 or eof):
+            slab_writer.seal()
+        yield n
+
+
+def _serve_preroll_head(
+    worker_id: int,
+    start_cmd: DecodeStart,
+    head: np.ndarray,
+    cmd_q: "queue.Queue[object]",
+    event_q: mp.Queue,
+    pcm_chan: object,
+    pcm_lock: threading.Lock | None,
+    slab_writer: PcmSlabWriter | None,
+    direct: bool,
+) -> Generator[int | None, None, tuple[int, int] | None]:
+    """Send a cue's first chunk from its armed preroll head, before the container is opened.
+
+    Waits for the first BufferRequest and sends up to its credit from `head`
+    (frames from in_frame), so the first sound does not wait on av.open and
+    the seek. Returns None when the cue is stopped, else (frames sent, credit
+    left); the caller decodes on from there.
     """
     cue_id = start_cmd.cue_id
+    credit_frames = 0
+    try:
+        event_q.put(("started", cue_id, start_cmd.track_id, start_cmd.file_path, None))
+    except Exception:
+        pass
+    while True:
+        while True:
+            try:
+                msg = cmd_q.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(msg, DecodeStop):
+                return None
+            if isinstance(msg, UpdateCueCommand) and msg.cue_id == cue_id:
+                if msg.loop_enabled is not None:
+                    start_cmd.loop_enabled = bool(msg.loop_enabled)
+                if msg.in_frame is not None:
+                    start_cmd.in_frame = int(msg.in_frame)
+                start_cmd.out_frame = msg.out_frame
+            elif isinstance(msg, BufferRequest) and msg.cue_id == cue_id:
+                credit_frames += int(msg.frames_needed)
+        if credit_frames > 0:
+            break
+        yield None
+
+    n = min(credit_frames, int(head.shape[0]))
+    produced_mono = time.monotonic()
+    _send_decoded_pcm(
+        pcm_chan,
+        pcm_lock,
+        slab_writer,
+        cue_id=cue_id,
+        track_id=start_cmd.track_id,
+        pcm=head[:n],
+        eof=False,
+        is_loop_restart=False,
+        decoder_produced_mono=produced_mono,
+        decode_work_ms=0.0,
+        worker_id=worker_id,
+    )
+    if direct:
+        try:
+            event_q.put(("first_chunk", cue_id, start_cmd.track_id, int(n), produced_mono, 0.0))
+        except Exception:
+            pass
+    if slab_writer is not None and credit_frames - n <= 0:
+        slab_writer.seal()
+    yield n
+    return n, credit_frames - n
+
+
+def _decode_cue_steps(
+    worker_id: int,
+    start_cmd: DecodeStart,
+    cmd_q: "queue.Queue[object]",
+    out_q: mp.Queue,
+    event_q: mp.Queue,
+    out_lock: threading.Lock | None,
+    pcm_pool: PcmSlabPool | None = None,
+    pcm_out_q: mp.Queue | None = None,
+    pcm_cache: DecodedPcmCache | None = None,
+    disk_cache: PcmDiskCache | None = None,
+    path_stats: _DecodePathStats | None = None,
+    preroll: PrerollStore | None = None,
+) -> Generator[Optional[int], None, Optional[bool]]:
+    """Decode a single cue as a step generator run by the EDF decode pool.
+
+    Each step decodes and sends about one chunk, then yields the frames sent;
+    it yields None while there is nothing to do until the next message on
+    `cmd_q` (see engine/processes/edf_pool.py). PyAV is not generally
+    thread-safe across shared objects; the pool runs a cue on one worker at a
+    time, so this cue's container/stream/resampler are never used concurrently.
+
+    If `pcm_out_q` is given (direct mode), PCM goes straight to the output process
+    and the engine only receives ("first_chunk", ...) / ("eof", ...) notices on
+    `event_q`. Errors are always reported on `out_q`.
+
+    Uncompressed WAV/AIFF at the output rate is memory-mapped and served without
+    PyAV (engine/pcm_file.py). With `pcm_cache` / `disk_cache`, a cached file is
+    also served without PyAV (RAM first, then a memory-mapped disk entry).
+    Sources already at the output rate skip the resampler (_frame_to_pcm). Otherwise a decode that starts at
+    frame 0 is captured and stored in both when it reaches natural EOF.
+    With `preroll`, an armed cue sends its stored head first and decodes on
+    from the end of the head (engine/processes/preroll.py).
+
+    Returns True if it ended after sending DecodeError; such a cue is not restarted.
+    """
+    cue_id = start_cmd.cue_id
+    slab_writer = PcmSlabWriter(pcm_pool) if pcm_pool is not None else None
+    pcm_chan = pcm_out_q if pcm_out_q is not None else out_q
+    pcm_lock = None if pcm_out_q is not None else out_lock
+    first_chunk_sent = False
 
     container = None
+    capture: PcmCapture | None = None
+    source_channels: int | None = None
+
+    def _note_path(path: str) -> None:
+        if path_stats is not None:
+            path_stats.note(path)
+
     try:
+        if pcm_fast_path_enabled():
+            # Uncompressed WAV/AIFF already at the output rate: memory-map it, no PyAV.
+            pcm_file = open_pcm_file(start_cmd.file_path)
+            if pcm_file is not None and pcm_file.sample_rate == int(start_cmd.target_sample_rate):
+                _note_path("pcm_file")
+                yield from _serve_cached_pcm(
+                    worker_id,
+                    start_cmd,
+                    pcm_file.with_channels(start_cmd.target_channels),
+                    cmd_q,
+                    out_q,
+                    event_q,
+                    out_lock,
+                    slab_writer,
+                    pcm_out_q,
+                )
+                return
+
+        if pcm_cache is not None or disk_cache is not None:
+            fmt = (start_cmd.target_sample_rate, start_cmd.target_channels)
+            key = cache_key(start_cmd.file_path, *fmt)
+            cached = pcm_cache.get(key) if pcm_cache is not None else None
+            served_from = "ram_cache"
+            if cached is None and disk_cache is not None and key is not None:
+                cached = disk_cache.open(start_cmd.file_path, *fmt, layout="pad")
+                served_from = "disk_cache"
+            if cached is not None:
+                _note_path(served_from)
+                yield from _serve_cached_pcm(
+                    worker_id, start_cmd, cached, cmd_q, out_q, event_q, out_lock, slab_writer, pcm_out_q
+                )
+                return
+
+            def _open_disk_entry() -> PcmDiskWriter | None:
+                # Opened on the first chunk, once source_channels is known.
+                return disk_cache.writer(start_cmd.file_path, *fmt, "pad", source_channels=source_channels)
+
+            if key is not None and start_cmd.in_frame <= 0:
+                capture = PcmCapture(
+                    pcm_cache,
+                    key,
+                    start_cmd.target_channels,
+                    open_disk=_open_disk_entry if disk_cache is not None else None,
+                )
+
+        # Armed cue: send the stored head now, then open the container behind it.
+        head: np.ndarray | None = None
+        head_exact = False
+        head_in = int(start_cmd.in_frame)
+        head_sent = 0
+        credit_frames = 0
+        if preroll is not None:
+            armed = preroll.get(
+                preroll_key(start_cmd.file_path, head_in, start_cmd.target_sample_rate, start_cmd.target_channels)
+            )
+            if armed is not None:
+                head, head_exact = armed
+            if head is not None and start_cmd.out_frame is not None and int(start_cmd.out_frame) - head_in <= head.shape[0]:
+                head = None
+        if head is not None:
+            _note_path("preroll")
+            served = yield from _serve_preroll_head(
+                worker_id, start_cmd, head, cmd_q, event_q, pcm_chan, pcm_lock, slab_writer, pcm_out_q is not None
+            )
+            if served is None:
+                return
+            head_sent, credit_frames = served
+            first_chunk_sent = True
+            # The file is not decoded from frame 0, so there is nothing to capture.
+            capture = None
+
         container = av.open(start_cmd.file_path)
         stream = None
         try:
@@ -546,75 +1171,119 @@ def _decode_worker_thread(
             stream = next((s for s in container.streams if s.type == "audio"), None)
         if not stream:
             _out_send(out_q, DecodeError(cue_id, start_cmd.track_id, start_cmd.file_path, "No audio stream"), out_lock)
-            return
+            return True
+        try:
+            source_channels = int(stream.codec_context.channels)
+        except Exception:
+            source_channels = None
+        seek_index = _load_seek_index(
+            start_cmd.file_path,
+            stream,
+            request_build=start_cmd.in_frame > 0 or start_cmd.loop_enabled or head is not None,
+        )
 
         discard_frames = 0
-        if start_cmd.in_frame > 0:
+        align: _SeekAlign | None = None
+        decoded_frames = 0
+        pending_pcm: np.ndarray | None = None
+        keep_head = False
+        if head is not None:
+            # Decode on from the end of the head; the unsent rest of it drains first. If
+            # in/out moved while the head was sent, drop the rest and seek to where it stopped.
+            keep_head = int(start_cmd.in_frame) == head_in and (
+                start_cmd.out_frame is None or int(start_cmd.out_frame) - head_in > head.shape[0]
+            )
+            seek_to = head_in + (head.shape[0] if keep_head else head_sent)
+            if keep_head and head_sent < head.shape[0]:
+                pending_pcm = head[head_sent:]
+            decoded_frames = head_in + head_sent - int(start_cmd.in_frame)
             try:
-                seek_seconds = start_cmd.in_frame / start_cmd.target_sample_rate
-                container.seek(
-                    int(seek_seconds / stream.time_base),
-                    stream=stream,
-                    any_frame=False,
-                    backward=True,
+                if keep_head and not (head_exact and seek_index is not None):
+                    # No exact seek to the end of the head: repeat the seek the head was
+                    # decoded with and decode through it, so the join is sample-exact.
+                    discard_frames, align = _seek_container(
+                        container, stream, head_in, start_cmd.target_sample_rate, None
+                    )
+                    discard_frames += int(head.shape[0])
+                    align = align._replace(sample=align.sample + int(head.shape[0]))
+                else:
+                    discard_frames, align = _seek_container(
+                        container, stream, seek_to, start_cmd.target_sample_rate, seek_index
+                    )
+            except Exception:
+                pass
+        elif start_cmd.in_frame > 0:
+            try:
+                discard_frames, align = _seek_container(
+                    container, stream, start_cmd.in_frame, start_cmd.target_sample_rate, seek_index
                 )
-                discard_frames = start_cmd.target_sample_rate // 100
+                if seek_index is not None:
+                    _note_path("indexed_seek")
             except Exception:
                 pass
 
-        resampler = av.AudioResampler(format="fltp", rate=start_cmd.target_sample_rate)
+        # Format negotiation: a source at the output rate never touches the resampler.
+        direct = _negotiate_direct(start_cmd, stream)
+        resampler = None if direct else av.AudioResampler(format="fltp", rate=start_cmd.target_sample_rate)
+        _note_path("direct" if direct else "resample")
         packet_iter = container.demux(stream)
         frame_iter = None
 
-        decoded_frames = 0
-        credit_frames = 0
         eof = False
         is_loop_restart = False
-        pending_pcm: np.ndarray | None = None
 
-        # Larger chunks reduce IPC/message overhead under high concurrency.
-        # Keep configurable so we can tune fairness vs overhead.
-        try:
-            chunk_mult = int(os.environ.get("STEPD_DECODE_CHUNK_MULT", str(DEFAULT_DECODE_CHUNK_MULT)).strip() or str(DEFAULT_DECODE_CHUNK_MULT))
-        except Exception:
-            chunk_mult = int(DEFAULT_DECODE_CHUNK_MULT)
-        chunk_mult = max(1, min(256, int(chunk_mult)))
-        try:
-            default_chunk_min_frames = int(
-                os.environ.get(
-                    "STEPD_DECODE_DEFAULT_CHUNK_MIN_FRAMES",
-                    str(DEFAULT_DECODE_DEFAULT_CHUNK_MIN_FRAMES),
-                ).strip()
-                or str(DEFAULT_DECODE_DEFAULT_CHUNK_MIN_FRAMES)
-            )
-        except Exception:
-            default_chunk_min_frames = int(DEFAULT_DECODE_DEFAULT_CHUNK_MIN_FRAMES)
-        default_chunk_min_frames = max(256, int(default_chunk_min_frames))
+        # Start small so the first chunk (and the first sound) is ready quickly.
+        chunk_frames = _resolve_chunk_frames(start_cmd.block_frames)
+        ramp = ChunkRamp(max(256, int(start_cmd.block_frames)), chunk_frames, chunk_ramp_growth())
+        # Frames are converted straight into this cue's chunk buffer (room for one
+        # chunk plus the frame that crosses its end; grows for unusually long frames).
+        assembler = ChunkAssembler(start_cmd.target_channels, chunk_frames + 16384)
+        stopping = False
 
-        default_chunk_frames = max(default_chunk_min_frames, int(start_cmd.block_frames) * chunk_mult)  # e.g. 1024*16=16384
-        try:
-            chunk_frames = int(os.environ.get("STEPD_DECODE_CHUNK_FRAMES", str(default_chunk_frames)).strip())
-        except Exception:
-            chunk_frames = default_chunk_frames
-        try:
-            min_chunk_frames = int(
-                os.environ.get(
-                    "STEPD_DECODE_CHUNK_MIN_FRAMES",
-                    str(DEFAULT_DECODE_CHUNK_MIN_FRAMES),
-                ).strip()
-                or str(DEFAULT_DECODE_CHUNK_MIN_FRAMES)
+        # Decode-once loop region: while the cue loops, keep the frames of the current
+        # pass (from in_frame) and replay them from memory at the boundary instead of
+        # seeking and decoding the same span again. None = not capturing.
+        region_max_frames = _loop_region_max_frames(start_cmd.target_channels)
+        region_chunks: list[np.ndarray] | None = None
+        region_frames = 0
+        region_bounds = (start_cmd.in_frame, start_cmd.out_frame)
+        region_handoff: bool | None = None  # set at the boundary: True if the region ends at EOF
+
+        def _begin_region() -> None:
+            nonlocal region_chunks, region_frames, region_bounds
+            capturing = start_cmd.loop_enabled and region_max_frames > 0
+            region_chunks = [] if capturing else None
+            region_frames = 0
+            region_bounds = (start_cmd.in_frame, start_cmd.out_frame)
+
+        def _add_to_region(pcm: np.ndarray) -> None:
+            nonlocal region_chunks, region_frames
+            if region_chunks is None:
+                return
+            region_frames += pcm.shape[0]
+            if region_frames > region_max_frames:
+                region_chunks = None
+                return
+            region_chunks.append(pcm.copy())  # pcm lives in the reused chunk buffer
+
+        def _region_ready() -> bool:
+            return (
+                region_chunks is not None
+                and region_frames > 0
+                and region_bounds == (start_cmd.in_frame, start_cmd.out_frame)
             )
-        except Exception:
-            min_chunk_frames = int(DEFAULT_DECODE_CHUNK_MIN_FRAMES)
-        min_chunk_frames = max(256, int(min_chunk_frames))
-
-        chunk_frames = max(min_chunk_frames, int(chunk_frames))
-        stopping = False
 
-        try:
-            event_q.put(("started", cue_id, start_cmd.track_id, start_cmd.file_path, None))
-        except Exception:
-            pass
+        _begin_region()
+        if head is not None:
+            if keep_head:
+                _add_to_region(head[:head_sent])
+            else:
+                region_chunks = None
+        else:
+            try:
+                event_q.put(("started", cue_id, start_cmd.track_id, start_cmd.file_path, None))
+            except Exception:
+                pass
 
         while not stopping:
             # Drain any pending commands quickly (non-blocking).
@@ -646,21 +1315,18 @@ def _decode_worker_thread(
             # If we previously hit EOF (often due to prebuffering the whole cue while looping was OFF)
             # and looping is turned ON while the cue is still active, resume by seeking and clearing EOF.
             if eof and start_cmd.loop_enabled:
+                if capture is not None:
+                    capture.abandon()
                 try:
-                    seek_ts = 0
-                    if start_cmd.in_frame != 0:
-                        seek_ts = int(
-                            (start_cmd.in_frame / start_cmd.target_sample_rate) / stream.time_base
-                        )
-                    container.seek(seek_ts, stream=stream, any_frame=False, backward=True)
+                    discard_frames, align = _seek_container(
+                        container, stream, start_cmd.in_frame, start_cmd.target_sample_rate, seek_index
+                    )
                     packet_iter = container.demux(stream)
                     frame_iter = None
-                    discard_frames = (
-                        start_cmd.target_sample_rate // 100 if start_cmd.in_frame > 0 else 0
-                    )
                     decoded_frames = 0
                     eof = False
                     is_loop_restart = True
+                    _begin_region()
                 except Exception:
                     # If we can't restart, stay EOF.
                     pass
@@ -668,20 +1334,56 @@ def _decode_worker_thread(
             if stopping:
                 break
 
-            if credit_frames <= 0 or eof:
-                time.sleep(0.001)
+            if region_handoff is not None:
+                # Loop boundary with the whole region in memory: replay it from RAM until
+                # the cue stops or an in/out change leaves the captured frames.
+                covers_eof = region_handoff
+                region_pcm = np.concatenate(region_chunks, axis=0)
+                region_in = region_bounds[0]
+                region_handoff = None
+                region_chunks = None
+                _note_path("loop_region")
+                resumed = yield from _serve_cached_pcm(
+                    worker_id,
+                    start_cmd,
+                    region_pcm,
+                    cmd_q,
+                    out_q,
+                    event_q,
+                    out_lock,
+                    slab_writer,
+                    pcm_out_q,
+                    base_frame=region_in,
+                    covers_eof=covers_eof,
+                    resume=(region_in, credit_frames, True),
+                )
+                if resumed is None:
+                    break
+                pos, credit_frames, is_loop_restart = resumed
+                # DEBUG: Uncomment for region exits: print(f"[DECODER-LOOP] cue={cue_id[:8]} Loop region changed, decoding from frame {pos}")
+                try:
+                    discard_frames, align = _seek_container(
+                        container, stream, pos, start_cmd.target_sample_rate, seek_index
+                    )
+                    packet_iter = container.demux(stream)
+                    frame_iter = None
+                    decoded_frames = pos - int(start_cmd.in_frame)
+                    pending_pcm = None
+                    eof = False
+                except Exception:
+                    # DEBUG: Uncomment for region exit seek failures: print(f"[DECODER-LOOP] cue={cue_id[:8]} Seek after loop region failed")
+                    eof = True
+                if pos == int(start_cmd.in_frame):
+                    _begin_region()
                 continue
 
-            # Avoid having dozens of cue threads decode at once.
-            # This keeps per-cue container/thread isolation, but limits active decode work.
-            acquired = decode_sema.acquire(timeout=0.01)
-            if not acquired:
-                time.sleep(0.0005)
+            if credit_frames <= 0 or eof:
+                yield None
                 continue
 
             frames_out = 0
-            decode_target = min(credit_frames, chunk_frames)
-            pcm_chunks: list[np.ndarray] = []
+            decode_target = min(credit_frames, ramp.frames)
+            assembler.reset()
             work_start = time.monotonic()
 
             try:
@@ -691,6 +1393,15 @@ def _decode_worker_thread(
                         remaining_needed = min(credit_frames, decode_target - frames_out)
                         if remaining_needed <= 0:
                             break
+                        if start_cmd.out_frame is not None:
+                            # The out point may have moved since these frames were decoded.
+                            remaining = int(start_cmd.out_frame) - (int(start_cmd.in_frame) + int(decoded_frames))
+                            if remaining <= 0:
+                                # Drop them; the next decoded frame takes the boundary.
+                                pending_pcm = None
+                                continue
+                            if pending_pcm.shape[0] > remaining:
+                                pending_pcm = pending_pcm[:remaining, :]
 
                         if pending_pcm.shape[0] > remaining_needed:
                             pcm = pending_pcm[:remaining_needed, :]
@@ -702,7 +1413,7 @@ def _decode_worker_thread(
                         decoded_frames += pcm.shape[0]
                         frames_out += pcm.shape[0]
                         credit_frames -= pcm.shape[0]
-                        pcm_chunks.append(pcm)
+                        _add_to_region(assembler.append(pcm))
                         continue
 
                     # Apply pending updates promptly so loop toggles take effect before EOF handling.
@@ -762,33 +1473,27 @@ def _decode_worker_thread(
                             if stopping:
                                 break
 
+                            if capture is not None and capture.active:
+                                capture.finish()
+
+                            if start_cmd.loop_enabled and _region_ready():
+                                # The whole in..EOF pass is in memory: flush, then replay it.
+                                region_handoff = True
+                                break
                             if start_cmd.loop_enabled:
                                 # Natural EOF (end of file) while looping is enabled: seek back and continue
                                 print(f"[DECODER-EOF-LOOP] cue={cue_id[:8]} Hit natural EOF while looping, seeking back")
                                 # Flush any pending frames first
-                                if pcm_chunks or frames_out > 0:
+                                if assembler.filled or frames_out > 0:
                                     break  # Flush and come back
                                 try:
-                                    seek_ts = 0
-                                    if start_cmd.in_frame != 0:
-                                        seek_ts = int(
-                                            (start_cmd.in_frame / start_cmd.target_sample_rate)
-                                            / stream.time_base
-                                        )
-                                    container.seek(
-                                        seek_ts,
-                                        stream=stream,
-                                        any_frame=False,
-                                        backward=True,
+                                    discard_frames, align = _seek_container(
+                                        container, stream, start_cmd.in_frame, start_cmd.target_sample_rate, seek_index
                                     )
                                     packet_iter = container.demux(stream)
                                     is_loop_restart = True
                                     decoded_frames = 0
-                                    discard_frames = (
-                                        start_cmd.target_sample_rate // 100
-                                        if start_cmd.in_frame > 0
-                                        else 0
-                                    )
+                                    _begin_region()
                                     packet = next(packet_iter, None)
                                     if packet is None:
                                         eof = True
@@ -808,15 +1513,41 @@ def _decode_worker_thread(
                         frame_iter = None
                         continue
 
+                    if align is not None:
+                        # First frame after a seek: trim exactly up to the target from its PTS.
+                        exact = _align_discard(align, frame.pts, start_cmd.target_sample_rate)
+                        if exact is not None and exact < 0:
+                            # Landed past the target: count the skipped frames toward the
+                            # pass, and do not keep a region that misses its start.
+                            decoded_frames -= exact
+                            region_chunks = None
+                            exact = 0
+                        if exact is not None:
+                            discard_frames = exact
+                        align = None
+
                     frame.pts = None
-                    resampled = resampler.resample(frame)
-                    if not resampled:
+                    if resampler is None and int(frame.sample_rate) == int(start_cmd.target_sample_rate):
+                        out_frames = [frame]
+                    else:
+                        if resampler is None:
+                            # The probe said the rates match but this frame disagrees.
+                            resampler = av.AudioResampler(format="fltp", rate=start_cmd.target_sample_rate)
+                            _note_path("resample_fallback")
+                        out_frames = resampler.resample(frame)
+                    if not out_frames:
                         continue
 
                     reached_target = False
-                    for out_frame in resampled:
-                        pcm = _normalize_audio(out_frame.to_ndarray())
-                        pcm = _ensure_channels(pcm, start_cmd.target_channels)
+                    for out_frame in out_frames:
+                        # Written at the chunk buffer's fill mark: kept frames need no copy.
+                        pcm = _frame_to_pcm(
+                            out_frame,
+                            start_cmd.target_channels,
+                            assembler.reserve(int(out_frame.samples)),
+                        )
+                        if capture is not None and capture.active:
+                            capture.add(pcm)
 
                         if discard_frames > 0:
                             discard = min(discard_frames, pcm.shape[0])
@@ -831,25 +1562,25 @@ def _decode_worker_thread(
                             # decoded_frames tracks frames produced since in_frame.
                             remaining = int(start_cmd.out_frame) - (int(start_cmd.in_frame) + int(decoded_frames))
                             if remaining <= 0:
+                                if start_cmd.loop_enabled and _region_ready():
+                                    # The whole in..out pass is in memory: flush, then replay it.
+                                    region_handoff = False
+                                    reached_target = True
+                                    break
                                 if start_cmd.loop_enabled:
                                     # Loop boundary reached: seek back immediately (no deferred seek nonsense)
                                     print(f"[DECODER-LOOP] cue={cue_id[:8]} Hit out_frame boundary, looping back to in_frame")
+                                    if capture is not None:
+                                        capture.abandon()
                                     try:
-                                        seek_ts = 0
-                                        if start_cmd.in_frame != 0:
-                                            seek_ts = int(
-                                                (start_cmd.in_frame / start_cmd.target_sample_rate) / stream.time_base
-                                            )
-                                        container.seek(seek_ts, stream=stream, any_frame=False, backward=True)
+                                        discard_frames, align = _seek_container(
+                                            container, stream, start_cmd.in_frame, start_cmd.target_sample_rate, seek_index
+                                        )
                                         packet_iter = container.demux(stream)
                                         frame_iter = None
                                         decoded_frames = 0
-                                        discard_frames = (
-                                            start_cmd.target_sample_rate // 100
-                                            if start_cmd.in_frame > 0
-                                            else 0
-                                        )
                                         is_loop_restart = True
+                                        _begin_region()
                                         # Continue decoding from the loop point instead of breaking
                                         print(f"[DECODER-LOOP] cue={cue_id[:8]} Loop seek successful, continuing decode")
                                         continue
@@ -885,7 +1616,8 @@ def _decode_worker_thread(
                         decoded_frames += pcm.shape[0]
                         frames_out += pcm.shape[0]
                         credit_frames -= pcm.shape[0]
-                        pcm_chunks.append(pcm)
+                        # Region copy from the buffer: a front-trimmed pcm view is stale once shifted.
+                        _add_to_region(assembler.append(pcm))
 
                         # Send one chunk per slice.
                         if frames_out >= decode_target:
@@ -895,44 +1627,68 @@ def _decode_worker_thread(
                     if reached_target:
                         break
 
-                if pcm_chunks:
+                if assembler.filled:
                     work_end = time.monotonic()
                     decode_work_ms = (work_end - work_start) * 1000.0
-                    chunk_data = np.concatenate(pcm_chunks, axis=0).astype(np.float32, copy=False)
+                    chunk_data = assembler.view()
                     produced_mono = time.monotonic()
-                    _out_send(
-                        out_q,
-                        DecodedChunk(
-                            cue_id=cue_id,
-                            track_id=start_cmd.track_id,
-                            pcm=chunk_data,
-                            eof=eof,
-                            is_loop_restart=is_loop_restart,
-                            decoder_produced_mono=produced_mono,
-                            decode_work_ms=decode_work_ms,
-                            worker_id=worker_id,
-                        ),
-                        out_lock,
+                    _send_decoded_pcm(
+                        pcm_chan,
+                        pcm_lock,
+                        slab_writer,
+                        cue_id=cue_id,
+                        track_id=start_cmd.track_id,
+                        pcm=chunk_data,
+                        eof=eof,
+                        is_loop_restart=is_loop_restart,
+                        decoder_produced_mono=produced_mono,
+                        decode_work_ms=decode_work_ms,
+                        worker_id=worker_id,
                     )
                     is_loop_restart = False
+                    ramp.advance()
+                    if pcm_out_q is not None:
+                        try:
+                            if not first_chunk_sent:
+                                event_q.put((
+                                    "first_chunk",
+                                    cue_id,
+                                    start_cmd.track_id,
+                                    int(chunk_data.shape[0]),
+                                    produced_mono,
+                                    decode_work_ms,
+                                ))
+                                first_chunk_sent = True
+                            if eof:
+                                event_q.put(("eof", cue_id, start_cmd.track_id))
+                        except Exception:
+                            pass
+
+                # Out of credit (or done): give the partially filled slab back so idle
+                # cues don't pin shared-memory slabs until their next BufferRequest.
+                if slab_writer is not None and (credit_frames <= 0 or eof):
+                    slab_writer.seal()
 
                 # No more deferred seek logic - we handle loop seeks immediately in the frame loop above
 
             except Exception as e:
                 _out_send(out_q, DecodeError(cue_id, start_cmd.track_id, start_cmd.file_path, f"Decode error: {e}"), out_lock)
-                break
-            finally:
-                try:
-                    decode_sema.release()
-                except Exception:
-                    pass
+                return True
+
+            # One chunk per step: let the pool run the cue whose ring empties first.
+            yield frames_out
 
     except Exception as e:
         try:
             _out_send(out_q, DecodeError(cue_id, start_cmd.track_id, start_cmd.file_path, f"Worker crash: {e}"), out_lock)
         except Exception:
             pass
+        return True
     finally:
+        if capture is not None:
+            capture.abandon()  # stopped before EOF: drop the partial disk entry
+        if slab_writer is not None:
+            slab_writer.seal()
         if container is not None:
             try:
                 container.close()
@@ -941,12 +1697,93 @@ def _decode_worker_thread(
 
 
 
-def decode_process_main(cmd_q: mp.Queue, out_q: mp.Queue, event_q: mp.Queue) -> None:
-    """Decoder coordinator (thread-per-container).
+# Arm jobs run behind live cues: their EDF deadline starts this far out.
+_PREROLL_SLACK_S = 10.0
+
+
+def _preroll_steps(
+    worker_id: int,
+    start_cmd: DecodeStart,
+    store: PrerollStore,
+    pcm_cache: DecodedPcmCache | None = None,
+) -> Generator[int, None, None]:
+    """Decode an armed cue's head into `store`, as a step generator for the decode pool.
+
+    Runs the normal decode path (_decode_cue_steps) into local queues with credit
+    for one frame more than the head, so a stored head is always followed by
+    at least one frame to decode. Files served without PyAV (WAV/AIFF fast path,
+    RAM cache) start instantly already and are skipped.
+    """
+    frames = store.preroll_frames
+    sample_rate = int(start_cmd.target_sample_rate)
+    key = preroll_key(start_cmd.file_path, start_cmd.in_frame, sample_rate, start_cmd.target_channels)
+    if key is None or key in store or not store.is_armed(key):
+        return
+    if pcm_fast_path_enabled():
+        pcm_file = open_pcm_file(start_cmd.file_path)
+        if pcm_file is not None and pcm_file.sample_rate == sample_rate:
+            return
+    if pcm_cache is not None and cache_key(start_cmd.file_path, sample_rate, start_cmd.target_channels) in pcm_cache:
+        return
+
+    cmd_q: "queue.Queue[object]" = queue.Queue()
+    sink: "queue.Queue[object]" = queue.Queue()
+    cmd_q.put(BufferRequest(start_cmd.cue_id, frames + 1))
+    paths = _DecodePathStats()
+    steps = _decode_cue_steps(worker_id, start_cmd, cmd_q, sink, sink, None, path_stats=paths)
+    chunks: list[np.ndarray] = []
+    got = 0
+    failed = False
+    try:
+        for produced in steps:
+            while True:
+                try:
+                    msg = sink.get_nowait()
+                except queue.Empty:
+                    break
+                if isinstance(msg, DecodedChunk) and msg.pcm is not None:
+                    chunks.append(msg.pcm)
+                    got += int(msg.pcm.shape[0])
+                elif isinstance(msg, DecodeError):
+                    failed = True
+            if failed or got > frames or produced is None:
+                break
+            yield int(produced)
+    finally:
+        steps.close()
+    if failed or got <= frames:
+        return
+    # Exact: decoded from frame 0 or after an indexed seek (see _decode_cue_steps for the join).
+    exact = start_cmd.in_frame <= 0 or "indexed_seek" in (paths.take_changed() or {})
+    store.put(key, np.concatenate(chunks, axis=0)[:frames], exact=exact)
+
+
+def _preroll_store_from_env(shard_count: int, sample_rate: int) -> PrerollStore | None:
+    """PrerollStore for one shard (STEPD_PREROLL_MS / STEPD_PREROLL_MB; 0 disables)."""
+    try:
+        ms = int(os.environ.get("STEPD_PREROLL_MS", str(DEFAULT_PREROLL_MS)).strip() or "0")
+        mb = int(os.environ.get("STEPD_PREROLL_MB", str(DEFAULT_PREROLL_MB)).strip() or "0")
+    except Exception:
+        ms, mb = DEFAULT_PREROLL_MS, DEFAULT_PREROLL_MB
+    frames = int(sample_rate) * ms // 1000
+    if frames <= 0 or mb <= 0:
+        return None
+    # Each shard arms its own heads; split the budget so the total stays as configured.
+    return PrerollStore(mb * 1024 * 1024 // max(1, int(shard_count)), frames)
+
+
+def decode_process_main(
+    cmd_q: mp.Queue,
+    out_q: mp.Queue,
+    event_q: mp.Queue,
+    pcm_pool: PcmSlabPoolSpec | None = None,
+    pcm_out_q: mp.Queue | None = None,
+) -> None:
+    """Decode process entry point.
 
-    Spawns one dedicated decode thread per cue; each thread owns its own PyAV
-    container/stream/resampler, which avoids unsafe sharing and eliminates
-    multi-cue interleaving inside a single worker.
+    Runs the decoder in this process, or with STEPD_DECODE_SHARDS > 1 routes cues
+    to that many shard processes (see engine/processes/decode_shards.py) so decoding
+    is not serialized on one GIL. Arguments are as for _decode_shard_main.
     """
     # Ensure tuning defaults are available in this process even when the engine
     # is used outside the GUI (env vars override tuning values).
@@ -957,11 +1794,184 @@ def decode_process_main(cmd_q: mp.Queue, out_q: mp.Queue, event_q: mp.Queue) ->
     except Exception:
         pass
 
-    threads: Dict[str, threading.Thread] = {}
+    shards = _resolve_decode_shards()
+    if shards <= 1:
+        _decode_shard_main(cmd_q, out_q, event_q, pcm_pool, pcm_out_q)
+    else:
+        _decode_router_main(shards, cmd_q, out_q, event_q, pcm_pool, pcm_out_q)
+
+
+def _resolve_decode_shards() -> int:
+    """Decoder process count (STEPD_DECODE_SHARDS; 0 = one per two cores, up to 4)."""
+    try:
+        shards = int(os.environ.get("STEPD_DECODE_SHARDS", str(DEFAULT_DECODE_SHARDS)).strip() or "1")
+    except Exception:
+        shards = int(DEFAULT_DECODE_SHARDS)
+    if shards <= 0:
+        shards = max(1, min(4, (os.cpu_count() or 2) // 2))
+    return max(1, min(16, shards))
+
+
+def _decode_router_main(
+    shard_count: int,
+    cmd_q: mp.Queue,
+    out_q: mp.Queue,
+    event_q: mp.Queue,
+    pcm_pool: PcmSlabPoolSpec | None,
+    pcm_out_q: mp.Queue | None,
+) -> None:
+    """Forward decode commands to shard processes with cue affinity.
+
+    Shards share the engine's output channels and slab pool. A shard that dies is
+    respawned and its cues are restarted there from their last-known DecodeStart.
+    Armed heads (DecodeArm) are split across shards by file path, and a cue whose
+    head is armed starts on the shard that holds it.
+    """
+    ctx = mp.get_context("spawn")
+    # Several processes writing one Pipe Connection must not interleave messages.
+    send_lock = ctx.Lock() if (not hasattr(out_q, "put") and hasattr(out_q, "send")) else None
+    router = ShardRouter(shard_count)
+    starts: Dict[str, DecodeStart] = {}
+    arms: list[DecodeArm | None] = [None] * shard_count
+    armed_on: Dict[tuple[str, int], int] = {}
+    shard_qs: list[mp.Queue] = []
+    procs: list[mp.Process] = []
+
+    def _spawn(i: int) -> mp.Process:
+        proc = ctx.Process(
+            target=_decode_shard_main,
+            args=(shard_qs[i], out_q, event_q, pcm_pool, pcm_out_q),
+            kwargs={"out_lock": send_lock, "shard_index": i, "shard_count": shard_count},
+            name=f"stepd-decode-shard-{i}",
+            daemon=True,
+        )
+        proc.start()
+        return proc
+
+    for i in range(shard_count):
+        shard_qs.append(ctx.Queue())
+        procs.append(_spawn(i))
+    try:
+        event_q.put(("diag", {"type": "decode_shards", "count": shard_count, "ts": time.time()}))
+    except Exception:
+        pass
+
+    while True:
+        try:
+            msg = cmd_q.get(timeout=0.1)
+        except queue_module.Empty:
+            msg = False
+        if msg is None:
+            break
+        if isinstance(msg, DecodeArm):
+            split: list[list[tuple[str, int, Optional[int]]]] = [[] for _ in range(shard_count)]
+            armed_on = {}
+            for head in msg.heads:
+                i = zlib.crc32(str(head[0]).encode("utf-8")) % shard_count
+                split[i].append(head)
+                armed_on[(str(head[0]), int(head[1]))] = i
+            for i in range(shard_count):
+                arms[i] = DecodeArm(tuple(split[i]), msg.target_sample_rate, msg.target_channels, msg.block_frames)
+                try:
+                    shard_qs[i].put(arms[i])
+                except Exception:
+                    pass
+        elif msg is not False:
+            cue_id = getattr(msg, "cue_id", None)
+            if isinstance(msg, DecodeStart):
+                shard = router.assign(cue_id, prefer=armed_on.get((msg.file_path, int(msg.in_frame))))
+                starts[cue_id] = msg
+            else:
+                shard = router.shard_of(cue_id) if cue_id is not None else None
+            if isinstance(msg, UpdateCueCommand) and cue_id in starts:
+                cmd = starts[cue_id]
+                if msg.loop_enabled is not None:
+                    cmd.loop_enabled = bool(msg.loop_enabled)
+                if msg.in_frame is not None:
+                    cmd.in_frame = int(msg.in_frame)
+                cmd.out_frame = msg.out_frame
+            if shard is not None:
+                try:
+                    shard_qs[shard].put(msg)
+                except Exception:
+                    pass
+            if isinstance(msg, DecodeStop):
+                router.release(cue_id)
+                starts.pop(cue_id, None)
+
+        for i, proc in enumerate(procs):
+            if proc.is_alive():
+                continue
+            cues = router.cues_on(i)
+            try:
+                event_q.put((
+                    "diag",
+                    {"type": "decode_shard_restart", "shard": i, "exitcode": proc.exitcode, "cues": len(cues), "ts": time.time()},
+                ))
+            except Exception:
+                pass
+            shard_qs[i] = ctx.Queue()
+            procs[i] = _spawn(i)
+            if arms[i] is not None:
+                shard_qs[i].put(arms[i])
+            for cue_id in cues:
+                cmd = starts.get(cue_id)
+                if cmd is not None:
+                    shard_qs[i].put(cmd)
+
+    for q in shard_qs:
+        try:
+            q.put(None)
+        except Exception:
+            pass
+    for proc in procs:
+        proc.join(timeout=2.0)
+        if proc.is_alive():
+            proc.terminate()
+
+
+def _decode_shard_main(
+    cmd_q: mp.Queue,
+    out_q: mp.Queue,
+    event_q: mp.Queue,
+    pcm_pool: PcmSlabPoolSpec | None = None,
+    pcm_out_q: mp.Queue | None = None,
+    *,
+    out_lock: object | None = None,
+    shard_index: int = 0,
+    shard_count: int = 1,
+) -> None:
+    """Decoder coordinator (EDF worker pool).
+
+    Each cue gets its own PyAV container/stream/resampler inside a step generator
+    (_decode_cue_steps). A fixed pool of STEPD_MAX_ACTIVE_DECODERS workers runs
+    those steps earliest-deadline-first, keyed by how soon each cue's output ring
+    runs dry (BufferRequest.ring_frames), so starving cues are decoded first and
+    thread count does not grow with cue count.
+
+    When `pcm_pool` is given, decoded frames are written into the engine's
+    shared-memory slab pool and only descriptors travel over the PCM channel.
+    When `pcm_out_q` is given (direct mode), the PCM channel is the output
+    process's queue instead of `out_q`; `out_q` then only carries DecodeError.
+
+    As one of several shards, `out_lock` is the router's process-shared lock for a
+    Pipe `out_q`, and worker ids are numbered shard_index, +shard_count, ... so
+    they stay unique across shards.
+    """
+    if shard_count > 1:
+        # Spawned shard: apply tuning in this process too.
+        try:
+            from engine.tuning import apply_engine_tuning_to_env
+
+            apply_engine_tuning_to_env()
+        except Exception:
+            pass
+
+    jobs: Dict[str, DecodeJob] = {}
     thread_queues: Dict[str, "queue.Queue[object]"] = {}
     cue_cmd_map: Dict[str, DecodeStart] = {}
     cue_worker_id: Dict[str, int] = {}
-    next_worker_id = 0
+    next_worker_id = int(shard_index)
 
     cpu_count = os.cpu_count() or 4
     # Conservative cap to avoid Python/GIL thrash while still allowing parallelism.
@@ -973,53 +1983,147 @@ def decode_process_main(cmd_q: mp.Queue, out_q: mp.Queue, event_q: mp.Queue) ->
             max_active_decoders = override
     except Exception:
         pass
-    decode_sema = threading.Semaphore(max_active_decoders)
+
+    def _on_step_error(job: DecodeJob, e: BaseException) -> None:
+        cmd = cue_cmd_map.get(job.cue_id)
+        if cmd is not None:
+            _out_send(out_q, DecodeError(job.cue_id, cmd.track_id, cmd.file_path, f"Worker crash: {e}"), out_lock)
+
+    # The loop sleeps until a command arrives or a job ends (for the health check).
+    wakeup = Wakeup([cmd_q])
+    decode_pool = EdfDecodePool(
+        max_active_decoders, on_error=_on_step_error, on_done=lambda job: wakeup.notify()
+    )
 
     # If out_q is a Pipe Connection shared by multiple threads, protect sends.
-    out_lock: threading.Lock | None = None
-    if not hasattr(out_q, "put") and hasattr(out_q, "send"):
+    if out_lock is None and not hasattr(out_q, "put") and hasattr(out_q, "send"):
         out_lock = threading.Lock()
 
+    pool: PcmSlabPool | None = None
+    if pcm_pool is not None:
+        try:
+            pool = PcmSlabPool.attach(pcm_pool)
+        except Exception as e:
+            pool = None
+            try:
+                event_q.put(("diag", {"type": "pcm_shm_attach_failed", "error": str(e), "ts": time.time()}))
+            except Exception:
+                pass
+
+    # Decoded PCM cache for hot cues (STEPD_DECODE_CACHE_MB, 0 disables).
+    pcm_cache: DecodedPcmCache | None = None
+    try:
+        cache_mb = int(os.environ.get("STEPD_DECODE_CACHE_MB", str(DEFAULT_DECODE_CACHE_MB)).strip() or "0")
+    except Exception:
+        cache_mb = DEFAULT_DECODE_CACHE_MB
+    try:
+        cache_max_entry_mb = int(
+            os.environ.get("STEPD_DECODE_CACHE_MAX_ENTRY_MB", str(DEFAULT_DECODE_CACHE_MAX_ENTRY_MB)).strip() or "0"
+        )
+    except Exception:
+        cache_max_entry_mb = DEFAULT_DECODE_CACHE_MAX_ENTRY_MB
+    if cache_mb > 0 and cache_max_entry_mb > 0:
+        # Each shard has its own cache; split the budget so the total stays as configured.
+        budget = cache_mb * 1024 * 1024 // max(1, int(shard_count))
+        pcm_cache = DecodedPcmCache(budget, cache_max_entry_mb * 1024 * 1024)
+    # Persistent memory-mapped PCM cache shared with the editor (STEPD_PCM_DISK_CACHE_*).
+    disk_cache = PcmDiskCache.from_env()
+    # Which path served each cue (memmap/cache/direct/resample), reported as a diag event.
+    path_stats = _DecodePathStats()
+    path_stats_last = time.monotonic()
+    # Armed cue heads (DecodeArm), decoded one at a time behind the live cues.
+    preroll: PrerollStore | None = None
+    preroll_rate = 0
+    preroll_stats: dict | None = None
+    cache_stats: dict | None = None
+    arm_pending: deque[DecodeStart] = deque()
+    arm_job: DecodeJob | None = None
+
     running = True
 
+    def _post(cue_id: str, msg: object, ring_frames: int | None = None) -> bool:
+        """Queue `msg` for a cue's job and make the job runnable."""
+        q = thread_queues.get(cue_id)
+        job = jobs.get(cue_id)
+        if q is None or job is None:
+            return False
+        q.put_nowait(msg)
+        decode_pool.wake(job, ring_frames)
+        return True
+
     def _start_or_restart_thread(cmd: DecodeStart) -> None:
         nonlocal next_worker_id
         cue_id = cmd.cue_id
 
-        # Stop existing thread if present.
-        prev_q = thread_queues.get(cue_id)
-        prev_t = threads.get(cue_id)
-        if prev_q is not None:
-            try:
-                prev_q.put_nowait(DecodeStop(cue_id=cue_id))
-            except Exception:
-                pass
-        if prev_t is not None and prev_t.is_alive():
-            prev_t.join(timeout=0.25)
+        # Stop the existing job if present; it finishes on its next step.
+        try:
+            _post(cue_id, DecodeStop(cue_id=cue_id))
+        except Exception:
+            pass
 
         q: "queue.Queue[object]" = queue.Queue()
         worker_id = next_worker_id
-        next_worker_id += 1
+        next_worker_id += max(1, int(shard_count))
         cue_worker_id[cue_id] = worker_id
         cue_cmd_map[cue_id] = cmd
 
-        t = threading.Thread(
-            target=_decode_worker_thread,
-            args=(worker_id, cmd, q, out_q, event_q, decode_sema, out_lock),
-            name=f"decode-thread-{cue_id[:8]}",
-            daemon=True,
+        steps = _decode_cue_steps(
+            worker_id, cmd, q, out_q, event_q, out_lock, pool, pcm_out_q, pcm_cache, disk_cache, path_stats, preroll
         )
         thread_queues[cue_id] = q
-        threads[cue_id] = t
-        t.start()
+        jobs[cue_id] = decode_pool.submit(cue_id, steps, cmd.target_sample_rate)
+
+    def _arm(msg: DecodeArm) -> None:
+        nonlocal preroll, preroll_rate, arm_pending
+        sample_rate = int(msg.target_sample_rate)
+        if preroll is None or preroll_rate != sample_rate:
+            preroll = _preroll_store_from_env(shard_count, sample_rate)
+            preroll_rate = sample_rate
+        if preroll is None:
+            return
+        frames = preroll.preroll_frames
+        starts: dict = {}
+        for file_path, in_frame, out_frame in msg.heads:
+            in_frame = max(0, int(in_frame))
+            if out_frame is not None and int(out_frame) - in_frame <= frames:
+                continue  # the whole cue is shorter than its head would be
+            key = preroll_key(file_path, in_frame, sample_rate, msg.target_channels)
+            if key is None or key in starts:
+                continue
+            starts[key] = DecodeStart(
+                cue_id=f"preroll:{len(starts)}",
+                track_id="",
+                file_path=file_path,
+                in_frame=in_frame,
+                out_frame=in_frame + frames + 1,
+                gain_db=0.0,
+                loop_enabled=False,
+                target_sample_rate=sample_rate,
+                target_channels=int(msg.target_channels),
+                block_frames=int(msg.block_frames),
+            )
+        missing = set(preroll.arm(starts))
+        arm_pending = deque(cmd for key, cmd in starts.items() if key in missing)
+
+    def _next_arm_job() -> None:
+        nonlocal arm_job, next_worker_id
+        if arm_job is not None and not arm_job.done:
+            return
+        arm_job = None
+        if preroll is None or not arm_pending:
+            return
+        cmd = arm_pending.popleft()
+        worker_id = next_worker_id
+        next_worker_id += max(1, int(shard_count))
+        steps = _preroll_steps(worker_id, cmd, preroll, pcm_cache)
+        arm_job = decode_pool.submit(cmd.cue_id, steps, cmd.target_sample_rate, slack_s=_PREROLL_SLACK_S)
 
     while running:
-        # Drain commands from cmd_q.
-        first_cmd = True
+        # Block until a command arrives, a job ends, or the path stats are due.
+        wakeup.wait(max(0.0, path_stats_last + _PATH_STATS_INTERVAL_S - time.monotonic()))
         while True:
             try:
-                msg = cmd_q.get(timeout=0.005) if first_cmd else cmd_q.get_nowait()
-                first_cmd = False
+                msg = cmd_q.get_nowait()
             except queue_module.Empty:
                 break
 
@@ -1030,11 +2134,13 @@ def decode_process_main(cmd_q: mp.Queue, out_q: mp.Queue, event_q: mp.Queue) ->
             if isinstance(msg, DecodeStart):
                 _start_or_restart_thread(msg)
 
+            elif isinstance(msg, DecodeArm):
+                _arm(msg)
+
             elif isinstance(msg, BufferRequest):
-                q = thread_queues.get(msg.cue_id)
-                if q is not None:
+                if msg.cue_id in thread_queues:
                     try:
-                        q.put_nowait(msg)
+                        _post(msg.cue_id, msg, msg.ring_frames)
                     except Exception:
                         # If the per-cue queue is wedged, surface as diag.
                         try:
@@ -1051,30 +2157,23 @@ def decode_process_main(cmd_q: mp.Queue, out_q: mp.Queue, event_q: mp.Queue) ->
 
             elif isinstance(msg, DecodeStop):
                 cue_id = msg.cue_id
-                q = thread_queues.get(cue_id)
-                t = threads.get(cue_id)
-                if q is not None:
-                    try:
-                        q.put_nowait(msg)
-                    except Exception:
-                        pass
-                if t is not None and t.is_alive():
-                    t.join(timeout=0.25)
+                try:
+                    _post(cue_id, msg)
+                except Exception:
+                    pass
                 thread_queues.pop(cue_id, None)
-                threads.pop(cue_id, None)
+                jobs.pop(cue_id, None)
                 cue_cmd_map.pop(cue_id, None)
                 cue_worker_id.pop(cue_id, None)
 
             elif isinstance(msg, UpdateCueCommand):
-                # Forward updates to the per-cue decode thread so it can change loop behavior
+                # Forward updates to the per-cue decode job so it can change loop behavior
                 # immediately (critical for disabling looping mid-playback).
                 cue_id = msg.cue_id
-                q = thread_queues.get(cue_id)
-                if q is not None:
-                    try:
-                        q.put_nowait(msg)
-                    except Exception:
-                        pass
+                try:
+                    _post(cue_id, msg)
+                except Exception:
+                    pass
                 # Keep the last-known parameters so if the thread restarts, it restarts with
                 # the updated loop/in/out values.
                 cmd = cue_cmd_map.get(cue_id)
@@ -1089,13 +2188,16 @@ def decode_process_main(cmd_q: mp.Queue, out_q: mp.Queue, event_q: mp.Queue) ->
                     except Exception:
                         pass
 
-        # Health check / restart if a decode thread died unexpectedly.
-        for cue_id, t in list(threads.items()):
-            if t.is_alive():
+        # Health check / restart if a decode job ended unexpectedly. A job that
+        # reported DecodeError is dropped, not restarted: it would only fail again
+        # (in a tight loop) before the engine's DecodeStop for it arrives.
+        for cue_id, job in list(jobs.items()):
+            if not job.done:
                 continue
             cmd = cue_cmd_map.get(cue_id)
-            if cmd is None:
-                threads.pop(cue_id, None)
+            if cmd is None or job.error is not None or job.result is True:
+                cue_cmd_map.pop(cue_id, None)
+                jobs.pop(cue_id, None)
                 thread_queues.pop(cue_id, None)
                 cue_worker_id.pop(cue_id, None)
                 continue
@@ -1113,17 +2215,47 @@ def decode_process_main(cmd_q: mp.Queue, out_q: mp.Queue, event_q: mp.Queue) ->
                 pass
             _start_or_restart_thread(cmd)
 
-        time.sleep(0.001)
+        _next_arm_job()
+
+        now = time.monotonic()
+        if now - path_stats_last >= _PATH_STATS_INTERVAL_S:
+            path_stats_last = now
+            counts = path_stats.take_changed()
+            if counts is not None:
+                try:
+                    event_q.put(("diag", {"type": "decode_paths", "counts": counts, "ts": time.time()}))
+                except Exception:
+                    pass
+            stats = pcm_cache.stats() if pcm_cache is not None else None
+            if stats is not None and stats != cache_stats:
+                cache_stats = stats
+                try:
+                    event_q.put(("diag", {"type": "decode_cache", **stats, "ts": time.time()}))
+                except Exception:
+                    pass
+            stats = {**preroll.stats(), "to_decode": len(arm_pending)} if preroll is not None else None
+            if stats is not None and stats != preroll_stats:
+                preroll_stats = stats
+                try:
+                    event_q.put(("diag", {"type": "preroll", "shard": shard_index, **stats, "ts": time.time()}))
+                except Exception:
+                    pass
 
-    # Shutdown: ask all threads to stop.
-    for cue_id, q in list(thread_queues.items()):
+    # Shutdown: ask all jobs to stop, give them a moment, then close what is left.
+    for cue_id in list(thread_queues.keys()):
         try:
-            q.put_nowait(DecodeStop(cue_id=cue_id))
+            _post(cue_id, DecodeStop(cue_id=cue_id))
         except Exception:
             pass
-    for t in list(threads.values()):
+    deadline = time.monotonic() + 1.0
+    while time.monotonic() < deadline and any(not job.done for job in jobs.values()):
+        time.sleep(0.005)
+    decode_pool.shutdown()
+    wakeup.close()
+    for job in [*jobs.values(), *([arm_job] if arm_job is not None else [])]:
         try:
-            if t.is_alive():
-                t.join(timeout=1.0)
+            job.steps.close()
         except Exception:
             pass
+    if pool is not None:
+        pool.close()
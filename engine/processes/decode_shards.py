@@ -0,0 +1,61 @@
+"""
+Cue -> decoder shard assignment for multi-process decoding.
+
+All decode threads used to live in one process, so PyAV's Python-side work
+(frame iteration, to_ndarray, chunk assembly) shared one GIL however many cores
+the machine had. With STEPD_DECODE_SHARDS > 1, decode_process_main becomes a
+router in front of N shard processes, each running the usual EDF decode pool.
+
+Rules:
+- Affinity: once a cue is on a shard, every message for it (credit, updates,
+  stop, a restart DecodeStart) goes to that shard, so its container never moves.
+- New cues go to the least-loaded shard (fewest active cues); ties prefer the
+  cue's hash slot so assignment is stable and spreads evenly.
+- A cue whose preroll head is armed on a shard starts there regardless of load:
+  heads are spread by file path, and only that shard can serve the head.
+"""
+from __future__ import annotations
+
+import zlib
+
+
+class ShardRouter:
+    """Tracks which shard owns each active cue."""
+
+    def __init__(self, shard_count: int) -> None:
+        self.shard_count = max(1, int(shard_count))
+        self._owner: dict[str, int] = {}
+        self._load = [0] * self.shard_count
+
+    def assign(self, cue_id: str, prefer: int | None = None) -> int:
+        """Shard for a DecodeStart: the current owner, else `prefer`, else the least-loaded shard."""
+        shard = self._owner.get(cue_id)
+        if shard is not None:
+            return shard
+        if prefer is not None and 0 <= prefer < self.shard_count:
+            shard = int(prefer)
+        else:
+            preferred = zlib.crc32(cue_id.encode("utf-8")) % self.shard_count
+            shard = min(
+                range(self.shard_count),
+                key=lambda i: (self._load[i], (i - preferred) % self.shard_count),
+            )
+        self._owner[cue_id] = shard
+        self._load[shard] += 1
+        return shard
+
+    def shard_of(self, cue_id: str) -> int | None:
+        return self._owner.get(cue_id)
+
+    def release(self, cue_id: str) -> int | None:
+        """Forget a stopped cue. Returns the shard it was on."""
+        shard = self._owner.pop(cue_id, None)
+        if shard is not None:
+            self._load[shard] -= 1
+        return shard
+
+    def cues_on(self, shard: int) -> list[str]:
+        return [cue for cue, s in self._owner.items() if s == shard]
+
+    def loads(self) -> list[int]:
+        return list(self._load)
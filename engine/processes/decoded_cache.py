@@ -0,0 +1,200 @@
+"""
+In-process LRU cache of fully decoded PCM for hot cues.
+
+Shows fire the same stingers and beds many times. Without a cache, every
+DecodeStart re-opens the container, re-demuxes and re-resamples the whole file.
+The decode process keeps one DecodedPcmCache shared by all decode threads:
+
+- Key: (file signature, target sample rate, target channels). The signature is
+  (absolute path, size, mtime_ns), the same fields SoundFileButton uses to
+  validate cached probes, so an edited file is never served stale.
+- Value: the whole file as one read-only float32 (frames, channels) array at
+  the target rate, captured on the first decode that ran from frame 0 to natural EOF.
+- Memory: bounded by a byte budget with LRU eviction. Files larger than the
+  per-entry limit are never captured.
+
+A PcmCapture collects chunks during that first decode and gives up as soon as it
+stops being a clean front-to-back pass (a seek, or the entry limit exceeded).
+Evicted files can still be served from the persistent disk cache
+(engine/pcm_disk_cache.py), which the capture also feeds: chunks are streamed to
+the disk entry as they arrive, so only files within the RAM entry limit are held
+in memory.
+"""
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Callable
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from engine.pcm_disk_cache import PcmDiskWriter
+
+
+CacheKey = tuple[tuple[str, int, int], int, int]
+
+
+def file_signature(path: str) -> tuple[str, int, int] | None:
+    """(absolute path, size, mtime_ns) for `path`, or None if it cannot be stat'ed."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (os.path.abspath(path), int(st.st_size), int(st.st_mtime_ns))
+
+
+def cache_key(path: str, sample_rate: int, channels: int) -> CacheKey | None:
+    sig = file_signature(path)
+    if sig is None:
+        return None
+    return (sig, int(sample_rate), int(channels))
+
+
+class DecodedPcmCache:
+    """Thread-safe, byte-budgeted LRU of decoded PCM arrays."""
+
+    def __init__(self, budget_bytes: int, max_entry_bytes: int | None = None) -> None:
+        self.budget_bytes = max(0, int(budget_bytes))
+        self.max_entry_bytes = self.budget_bytes if max_entry_bytes is None else max(0, int(max_entry_bytes))
+        self._entries: OrderedDict[CacheKey, np.ndarray] = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: object) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def get(self, key: CacheKey | None) -> np.ndarray | None:
+        if key is None:
+            return None
+        with self._lock:
+            pcm = self._entries.get(key)
+            if pcm is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return pcm
+
+    def accepts(self, nbytes: int) -> bool:
+        return 0 < int(nbytes) <= min(self.max_entry_bytes, self.budget_bytes)
+
+    def put(self, key: CacheKey | None, pcm: np.ndarray) -> bool:
+        """Insert (or replace) an entry, evicting least-recently-used ones. Returns False if it does not fit."""
+        if key is None:
+            return False
+        nbytes = int(pcm.nbytes)
+        if not self.accepts(nbytes):
+            return False
+        pcm = np.ascontiguousarray(pcm, dtype=np.float32)
+        pcm.flags.writeable = False
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.bytes -= int(old.nbytes)
+            while self._entries and self.bytes + nbytes > self.budget_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.bytes -= int(evicted.nbytes)
+                self.evictions += 1
+            self._entries[key] = pcm
+            self.bytes += nbytes
+        return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": int(self.bytes),
+                "budget_bytes": int(self.budget_bytes),
+                "hits": int(self.hits),
+                "misses": int(self.misses),
+                "evictions": int(self.evictions),
+            }
+
+
+class PcmCapture:
+    """Collects one front-to-back decode of a file for DecodedPcmCache.
+
+    Chunks are kept in RAM up to `max_bytes` (default: the cache's entry limit).
+    `open_disk()` (optional) is called on the first add() for a disk-cache writer
+    that every chunk is streamed to; it is committed on finish(). The capture stays
+    active while either is still collecting.
+    """
+
+    def __init__(
+        self,
+        cache: DecodedPcmCache | None,
+        key: CacheKey,
+        channels: int,
+        *,
+        max_bytes: int | None = None,
+        open_disk: Callable[[], "PcmDiskWriter | None"] | None = None,
+    ) -> None:
+        self.cache = cache
+        self.key = key
+        self.channels = int(channels)
+        if max_bytes is None:
+            max_bytes = cache.max_entry_bytes if cache is not None else 0
+        self.max_bytes = int(max_bytes)
+        self._open_disk = open_disk
+        self.disk: PcmDiskWriter | None = None
+        self._chunks: list[np.ndarray] = []
+        self._bytes = 0
+        self._in_ram = cache is not None
+        self.active = self._in_ram or open_disk is not None
+
+    def add(self, pcm: np.ndarray) -> None:
+        """Capture the next chunk (copied if kept, so `pcm` may be a reused buffer)."""
+        if not self.active:
+            return
+        if self._open_disk is not None:
+            open_disk, self._open_disk = self._open_disk, None
+            self.disk = open_disk()
+        if self._in_ram:
+            self._bytes += int(pcm.shape[0]) * self.channels * 4
+            if self._bytes > self.max_bytes:
+                self._in_ram = False
+                self._chunks = []
+            else:
+                self._chunks.append(pcm.copy())
+        if self.disk is not None and not self.disk.append(pcm):
+            self.disk = None
+        self.active = self._in_ram or self.disk is not None
+
+    def abandon(self) -> None:
+        self.active = False
+        self._in_ram = False
+        self._open_disk = None
+        self._chunks = []
+        disk, self.disk = self.disk, None
+        if disk is not None:
+            disk.abort()
+
+    def finish(self) -> np.ndarray | None:
+        """Natural EOF: store the captured file. Returns the array kept in RAM (or None)."""
+        if not self.active:
+            return None
+        self.active = False
+        chunks, self._chunks = self._chunks, []
+        disk, self.disk = self.disk, None
+        if disk is not None:
+            disk.commit()
+        if not self._in_ram or not chunks:
+            return None
+        pcm = np.concatenate(chunks, axis=0).astype(np.float32, copy=False)
+        if self.cache is not None:
+            self.cache.put(self.key, pcm)
+        return pcm
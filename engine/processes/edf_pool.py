@@ -0,0 +1,182 @@
+"""
+Deadline-driven (EDF) worker pool for the decode process.
+
+The decode process used to start one thread per cue and cap concurrent work
+with a semaphore polled every 10 ms. Which thread won the semaphore was
+effectively random, so a cue whose output ring was nearly empty could wait
+behind one that was already full, and thread count grew with cue count.
+
+Here each cue is a generator that owns its container/resampler state and
+yields after roughly one decoded chunk:
+
+- `yield n` (int): produced n frames and may have more work;
+- `yield None`: nothing to do until a new message arrives (no credit, or EOF).
+
+Whatever the generator returns is kept as `DecodeJob.result`.
+
+A fixed set of workers repeatedly runs one step of the runnable job with the
+earliest deadline. The deadline is the monotonic time at which the cue's
+output ring runs dry: receipt time + ring_frames / sample_rate from the last
+BufferRequest, pushed later by every frame the job produces. A job is
+only ever on one worker at a time, so per-cue PyAV objects are never touched
+concurrently.
+"""
+from __future__ import annotations
+
+import heapq
+import itertools
+import threading
+import time
+from typing import Callable, Generator, Optional
+
+CueSteps = Generator[Optional[int], None, object]
+
+_IDLE = "idle"
+_QUEUED = "queued"
+_RUNNING = "running"
+_DONE = "done"
+
+
+class DecodeJob:
+    """One cue's step generator plus its scheduling state."""
+
+    def __init__(self, cue_id: str, steps: CueSteps, sample_rate: int, deadline: float) -> None:
+        self.cue_id = cue_id
+        self.steps = steps
+        self.sample_rate = max(1, int(sample_rate))
+        self.deadline = float(deadline)
+        self.state = _IDLE
+        self.error: BaseException | None = None
+        self.result: object = None
+        self._wake_pending = False
+        self._heap_seq = -1
+
+    @property
+    def done(self) -> bool:
+        return self.state == _DONE
+
+
+class EdfDecodePool:
+    """Fixed worker threads running DecodeJob steps in earliest-deadline-first order."""
+
+    def __init__(
+        self,
+        workers: int,
+        *,
+        on_error: Callable[[DecodeJob, BaseException], None] | None = None,
+        on_done: Callable[[DecodeJob], None] | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.clock = clock
+        self.on_error = on_error
+        self.on_done = on_done
+        self._cond = threading.Condition()
+        self._heap: list[tuple[float, int, DecodeJob]] = []
+        self._seq = itertools.count()
+        self._running = True
+        self.steps_run = 0
+        self._threads = [
+            threading.Thread(target=self._worker, name=f"decode-worker-{i}", daemon=True)
+            for i in range(max(1, int(workers)))
+        ]
+        for t in self._threads:
+            t.start()
+
+    @property
+    def workers(self) -> int:
+        return len(self._threads)
+
+    def submit(self, cue_id: str, steps: CueSteps, sample_rate: int, slack_s: float = 0.0) -> DecodeJob:
+        """Add a cue; it runs as soon as a worker is free (deadline = now + slack_s).
+
+        Background work (preroll arming) passes a slack so it only runs while no
+        live cue's ring is due sooner.
+        """
+        job = DecodeJob(cue_id, steps, sample_rate, self.clock() + max(0.0, float(slack_s)))
+        with self._cond:
+            self._push(job)
+        return job
+
+    def wake(self, job: DecodeJob, ring_frames: int | None = None) -> None:
+        """A message was queued for `job`: make it runnable.
+
+        `ring_frames` (frames buffered in the output ring when the request was sent)
+        resets the deadline; None keeps the current one.
+        """
+        with self._cond:
+            if ring_frames is not None:
+                job.deadline = self.clock() + max(0, int(ring_frames)) / job.sample_rate
+            if job.state == _RUNNING:
+                job._wake_pending = True
+            elif job.state in (_IDLE, _QUEUED):
+                # Re-pushing a queued job re-keys it; the stale heap entry is skipped.
+                self._push(job)
+
+    def shutdown(self, timeout: float = 1.0) -> None:
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        for t in self._threads:
+            t.join(timeout=timeout)
+
+    def queued(self) -> int:
+        with self._cond:
+            return sum(1 for _, seq, job in self._heap if job.state == _QUEUED and job._heap_seq == seq)
+
+    # -- internals ------------------------------------------------------------------
+
+    def _push(self, job: DecodeJob) -> None:
+        seq = next(self._seq)
+        job._heap_seq = seq
+        job.state = _QUEUED
+        heapq.heappush(self._heap, (job.deadline, seq, job))
+        self._cond.notify()
+
+    def _pop(self) -> DecodeJob | None:
+        with self._cond:
+            while self._running:
+                while self._heap:
+                    _, seq, job = heapq.heappop(self._heap)
+                    if job.state == _QUEUED and job._heap_seq == seq:
+                        job.state = _RUNNING
+                        job._wake_pending = False
+                        return job
+                self._cond.wait(timeout=0.1)
+            return None
+
+    def _worker(self) -> None:
+        while True:
+            job = self._pop()
+            if job is None:
+                return
+            produced: int | None = None
+            finished = False
+            try:
+                produced = next(job.steps)
+            except StopIteration as stop:
+                finished = True
+                job.result = stop.value
+            except BaseException as e:  # a crashed step must not take the worker down
+                finished = True
+                job.error = e
+                if self.on_error is not None:
+                    try:
+                        self.on_error(job, e)
+                    except Exception:
+                        pass
+            with self._cond:
+                self.steps_run += 1
+                if finished:
+                    job.state = _DONE
+                    if self.on_done is not None:
+                        try:
+                            self.on_done(job)
+                        except Exception:
+                            pass
+                elif produced is not None:
+                    job.deadline += max(0, int(produced)) / job.sample_rate
+                    self._push(job)
+                elif job._wake_pending:
+                    self._push(job)
+                else:
+                    job.state = _IDLE
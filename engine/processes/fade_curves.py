@@ -0,0 +1,142 @@
+"""
+Fade-curve lookup tables for the output process.
+
+A fade of `length` frames follows a normalized shape s(t) for t = k / length,
+k = 0..length, with s(0) = 0 and s(1) = 1. The callback only needs
+gain = start + s * (target - start), so each (curve, length) shape is built
+once into a float32 table and reused by every envelope with that length. The
+per-block cost is then one slice plus a multiply-add.
+
+Tables are held in a bounded LRU cache (by total bytes). They are built when
+an envelope is created (main loop), never inside the RT callback.
+
+Supported curves (unknown names fall back to "linear"):
+- "equal_power": sin(t * pi/2). Constant-power crossfades (default).
+- "linear": t.
+- "log": log10(1 + 9t). Fast start, slow finish; sounds even for fade-outs.
+- "s_curve": 0.5 - 0.5 * cos(pi * t). Slow start and finish.
+"""
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+FADE_CURVES = ("equal_power", "linear", "log", "s_curve")
+
+_CURVE_ALIASES = {
+    "equal_power": "equal_power",
+    "equal-power": "equal_power",
+    "constant_power": "equal_power",
+    "sine": "equal_power",
+    "linear": "linear",
+    "lin": "linear",
+    "log": "log",
+    "logarithmic": "log",
+    "s_curve": "s_curve",
+    "s-curve": "s_curve",
+    "scurve": "s_curve",
+    "cosine": "s_curve",
+}
+
+DEFAULT_FADE_TABLE_CACHE_MB = 32
+
+
+def normalize_fade_curve(curve: object) -> str:
+    """Map a user/command curve name to one of FADE_CURVES ("linear" if unknown)."""
+    try:
+        key = str(curve).strip().lower()
+    except Exception:
+        return "linear"
+    return _CURVE_ALIASES.get(key, "linear")
+
+
+def _build_table(curve: str, length: int) -> np.ndarray:
+    t = np.linspace(0.0, 1.0, length + 1, dtype=np.float64)
+    if curve == "equal_power":
+        s = np.sin(t * (np.pi / 2.0))
+    elif curve == "log":
+        s = np.log10(1.0 + 9.0 * t)
+    elif curve == "s_curve":
+        s = 0.5 - 0.5 * np.cos(np.pi * t)
+    else:
+        s = t
+    table = s.astype(np.float32)
+    # Exact endpoints so a finished fade lands precisely on its target gain.
+    table[0] = 0.0
+    table[-1] = 1.0
+    table.setflags(write=False)
+    return table
+
+
+class FadeTableCache:
+    """Bounded LRU cache of normalized fade tables keyed by (curve, length)."""
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max(0, int(max_bytes))
+        self._tables: "OrderedDict[tuple[str, int], np.ndarray]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, curve: object, length: int) -> np.ndarray:
+        """Return the read-only (length + 1,) table s(k / length) for a curve."""
+        key = (normalize_fade_curve(curve), max(1, int(length)))
+        with self._lock:
+            table = self._tables.get(key)
+            if table is not None:
+                self._tables.move_to_end(key)
+                self.hits += 1
+                return table
+        table = _build_table(*key)
+        with self._lock:
+            self.misses += 1
+            if key not in self._tables:
+                self._tables[key] = table
+                self._bytes += table.nbytes
+            # Evict least-recently-used tables, but always keep the newest one:
+            # envelopes hold their own reference, so eviction never breaks a running fade.
+            while self._bytes > self.max_bytes and len(self._tables) > 1:
+                _, old = self._tables.popitem(last=False)
+                self._bytes -= old.nbytes
+        return table
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "tables": len(self._tables),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+def _default_cache_bytes() -> int:
+    try:
+        mb = float(os.environ.get("STEPD_FADE_TABLE_CACHE_MB", str(DEFAULT_FADE_TABLE_CACHE_MB)).strip() or "0")
+    except Exception:
+        mb = float(DEFAULT_FADE_TABLE_CACHE_MB)
+    return int(max(0.0, mb) * 1024 * 1024)
+
+
+_cache: FadeTableCache | None = None
+_cache_lock = threading.Lock()
+
+
+def fade_table_cache() -> FadeTableCache:
+    """Process-wide table cache (sized by STEPD_FADE_TABLE_CACHE_MB)."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = FadeTableCache(_default_cache_bytes())
+    return _cache
+
+
+def get_fade_table(curve: object, length: int) -> np.ndarray:
+    return fade_table_cache().get(curve, length)
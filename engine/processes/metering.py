@@ -0,0 +1,413 @@
+"""
+Metering off the realtime path: post-fader tap ring + meter worker thread.
+
+The output callback used to compute RMS/peak per cue and per channel on every
+block, and switched meters off entirely during bulk fades. Now the callback
+only publishes a snapshot of the post-fader mixer rows (one per cue) and the
+master block into a MeterTap. A MeterWorker thread drains the tap and computes
+the following, vectorized across all cues:
+
+- RMS and sample peak per channel, integrated over each publish period.
+- True-peak per channel: 4x FFT oversampling of each block (ITU-R BS.1770
+  style; blocks are treated as periodic, which is fine for metering).
+- Momentary loudness (LUFS): K-weighted mean square over the last 400 ms. The
+  K-weighting filter response is applied in the frequency domain, so all cue
+  windows go through one batched rFFT.
+
+MeterTap is a single-producer / single-consumer ring of preallocated slots.
+The producer (RT callback) only copies into a free slot and advances its write
+counter; the consumer only advances its read counter. Rows are tagged with the
+output's integer cue slots and resolved to cue ids on the consumer side. When the worker falls
+behind, blocks are dropped and counted rather than blocking the callback.
+"""
+from __future__ import annotations
+
+import math
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+
+# Floor used for dB/LUFS values of silence (matches the -120 dB floor used elsewhere).
+SILENCE_DB = -120.0
+
+
+class MeterTap:
+    """SPSC ring of post-fader block snapshots (producer: RT callback, consumer: MeterWorker)."""
+
+    def __init__(
+        self,
+        channels: int,
+        max_frames: int = 2048,
+        max_cues: int = 32,
+        slots: int = 16,
+        names: list | None = None,
+    ) -> None:
+        self.channels = max(1, int(channels))
+        self.slots = max(2, int(slots))
+        # Cue slot -> cue id (the output's CueSlotTable.cue_ids); read by the consumer only.
+        self.names: list = names if names is not None else []
+        self._cue_blocks = [np.zeros((max(1, int(max_cues)), max(1, int(max_frames)), self.channels), dtype=np.float32) for _ in range(self.slots)]
+        self._master_blocks = [np.zeros((max(1, int(max_frames)), self.channels), dtype=np.float32) for _ in range(self.slots)]
+        self._cue_slots = [np.zeros(max(1, int(max_cues)), dtype=np.int64) for _ in range(self.slots)]
+        self._counts = [0] * self.slots
+        self._frames = [0] * self.slots
+        self._retired: dict[int, int] = {}  # cue slot -> _write when it was released
+        self._write = 0  # written by producer only
+        self._read = 0   # written by consumer only
+        self.dropped = 0
+
+    def publish(self, cue_slots: np.ndarray, rows: np.ndarray, master: np.ndarray) -> bool:
+        """Copy one block into the next free slot. Returns False (and counts a drop) if full.
+
+        cue_slots: (n,) cue slot index of each row; resolved to cue ids by the consumer
+        rows: (n, frames, channels) post-fader cue audio
+        master: (frames, channels) master mix
+        """
+        if self._write - self._read >= self.slots:
+            self.dropped += 1
+            return False
+        slot = self._write % self.slots
+        n = int(cue_slots.shape[0])
+        frames = int(master.shape[0])
+        cue_block = self._cue_blocks[slot]
+        if n > cue_block.shape[0] or frames > cue_block.shape[1]:
+            # Slot is not visible to the consumer until _write advances, so it is safe
+            # to replace here. Only happens when the cue count/block size hits a new high.
+            cue_block = np.zeros((max(n, cue_block.shape[0] * 2), max(frames, cue_block.shape[1]), self.channels), dtype=np.float32)
+            self._cue_blocks[slot] = cue_block
+            self._cue_slots[slot] = np.zeros(cue_block.shape[0], dtype=np.int64)
+        if frames > self._master_blocks[slot].shape[0]:
+            self._master_blocks[slot] = np.zeros((frames, self.channels), dtype=np.float32)
+        if n:
+            cue_block[:n, :frames] = rows
+            self._cue_slots[slot][:n] = cue_slots
+        self._master_blocks[slot][:frames] = master
+        self._counts[slot] = n
+        self._frames[slot] = frames
+        self._write += 1
+        return True
+
+    def retire(self, cue_slot: int) -> None:
+        """Main loop: `cue_slot` was released. Blocks published before now are not
+        credited to whichever cue takes the slot next."""
+        self._retired[int(cue_slot)] = self._write
+
+    def pending(self) -> int:
+        return self._write - self._read
+
+    def peek(self) -> tuple[tuple, np.ndarray, np.ndarray] | None:
+        """Consumer: cue ids and views of the oldest unread block, or None. Call advance() when done.
+
+        Rows whose cue slot was released since the block was published have cue id None.
+        """
+        if self._read >= self._write:
+            return None
+        slot = self._read % self.slots
+        n = self._counts[slot]
+        frames = self._frames[slot]
+        names = self.names
+        retired = self._retired
+        seq = self._read
+        cue_ids = tuple(
+            None if retired.get(s, -1) > seq or s >= len(names) else names[s]
+            for s in self._cue_slots[slot][:n].tolist()
+        )
+        return cue_ids, self._cue_blocks[slot][:n, :frames], self._master_blocks[slot][:frames]
+
+    def advance(self) -> None:
+        self._read += 1
+
+
+def _biquad_power_response(b: tuple[float, float, float], a: tuple[float, float, float], w: np.ndarray) -> np.ndarray:
+    z1 = np.exp(-1j * w)
+    z2 = z1 * z1
+    h = (b[0] + b[1] * z1 + b[2] * z2) / (a[0] + a[1] * z1 + a[2] * z2)
+    return np.abs(h) ** 2
+
+
+def k_weighting_power_response(sample_rate: int, n_fft: int) -> np.ndarray:
+    """|H(f)|^2 of the BS.1770 K-weighting filter (shelf + RLB high-pass) at rFFT bins."""
+    fs = float(sample_rate)
+    w = 2.0 * np.pi * np.fft.rfftfreq(int(n_fft), d=1.0 / fs) / fs
+
+    # Stage 1: high shelf (+4 dB above ~1.7 kHz).
+    gain_db, q, fc = 3.999843853973347, 0.7071752369554196, 1681.974450955533
+    k = math.tan(math.pi * fc / fs)
+    vh = 10.0 ** (gain_db / 20.0)
+    vb = vh ** 0.4996667741545416
+    a0 = 1.0 + k / q + k * k
+    shelf_b = ((vh + vb * k / q + k * k) / a0, 2.0 * (k * k - vh) / a0, (vh - vb * k / q + k * k) / a0)
+    shelf_a = (1.0, 2.0 * (k * k - 1.0) / a0, (1.0 - k / q + k * k) / a0)
+
+    # Stage 2: RLB high-pass (~38 Hz).
+    q, fc = 0.5003270373238773, 38.13547087602444
+    k = math.tan(math.pi * fc / fs)
+    a0 = 1.0 + k / q + k * k
+    hp_b = (1.0, -2.0, 1.0)
+    hp_a = (1.0, 2.0 * (k * k - 1.0) / a0, (1.0 - k / q + k * k) / a0)
+
+    return _biquad_power_response(shelf_b, shelf_a, w) * _biquad_power_response(hp_b, hp_a, w)
+
+
+def _parseval_weights(n: int) -> np.ndarray:
+    """Per-bin weights so that sum(weights * |rfft(x)|^2) == mean(x^2)."""
+    bins = n // 2 + 1
+    wts = np.full(bins, 2.0, dtype=np.float64)
+    wts[0] = 1.0
+    if n % 2 == 0:
+        wts[-1] = 1.0
+    return wts / float(n * n)
+
+
+def true_peak(blocks: np.ndarray, oversample: int = 4) -> np.ndarray:
+    """Per-row, per-channel true-peak (linear) of (rows, frames, channels) via FFT oversampling."""
+    rows, frames, channels = blocks.shape
+    if rows == 0 or frames == 0:
+        return np.zeros((rows, channels), dtype=np.float32)
+    spec = np.fft.rfft(blocks, axis=1)
+    up = np.fft.irfft(spec, n=frames * oversample, axis=1) * float(oversample)
+    tp = np.max(np.abs(up), axis=1)
+    # Never report less than the sample peak (band-limited reconstruction can undershoot).
+    return np.maximum(tp, np.max(np.abs(blocks), axis=1)).astype(np.float32)
+
+
+def lin_to_db(value: float) -> float:
+    return float(20.0 * math.log10(value)) if value > 0.0 else SILENCE_DB
+
+
+class _SourceMeter:
+    """Per-source accumulators owned by the worker thread."""
+
+    __slots__ = ("sumsq", "frames", "peak", "tp", "hist", "hist_pos", "hist_filled", "last_seen")
+
+    def __init__(self, channels: int, window: int) -> None:
+        self.sumsq = np.zeros(channels, dtype=np.float64)
+        self.frames = 0
+        self.peak = np.zeros(channels, dtype=np.float32)
+        self.tp = np.zeros(channels, dtype=np.float32)
+        self.hist = np.zeros((window, channels), dtype=np.float32)
+        self.hist_pos = 0
+        self.hist_filled = 0
+        self.last_seen = 0.0
+
+    def push_history(self, block: np.ndarray) -> None:
+        window = self.hist.shape[0]
+        n = block.shape[0]
+        if n >= window:
+            self.hist[:] = block[n - window :]
+            self.hist_pos = 0
+            self.hist_filled = window
+            return
+        end = self.hist_pos + n
+        if end <= window:
+            self.hist[self.hist_pos : end] = block
+        else:
+            split = window - self.hist_pos
+            self.hist[self.hist_pos :] = block[:split]
+            self.hist[: n - split] = block[split:]
+        self.hist_pos = end % window
+        self.hist_filled = min(window, self.hist_filled + n)
+
+    def reset_period(self) -> None:
+        self.sumsq.fill(0.0)
+        self.frames = 0
+        self.peak.fill(0.0)
+        self.tp.fill(0.0)
+
+
+class MeterWorker:
+    """Background meter thread draining a MeterTap.
+
+    latest() returns the most recent published snapshot dict (or None):
+    - "cue_levels": {cue_id: (rms, peak)} linear, for BatchCueLevelsEvent.cue_levels
+    - "cue_levels_per_channel": {cue_id: ([rms...], [peak...])} linear
+    - "cue_true_peak": {cue_id: [tp...]} linear
+    - "cue_lufs_momentary": {cue_id: lufs}
+    - "master_rms_db" / "master_peak_db" / "master_true_peak_db": per-channel dB lists
+    - "master_lufs_momentary": float
+    """
+
+    def __init__(
+        self,
+        tap: MeterTap,
+        sample_rate: int,
+        *,
+        publish_hz: float = 60.0,
+        lufs_window_ms: float = 400.0,
+        true_peak_oversample: int = 4,
+        enable_true_peak: bool = True,
+        stale_after_s: float = 2.0,
+    ) -> None:
+        self.tap = tap
+        self.sample_rate = max(1, int(sample_rate))
+        self.channels = tap.channels
+        self.publish_interval = 1.0 / max(1.0, float(publish_hz))
+        self.window = max(1, int(self.sample_rate * float(lufs_window_ms) / 1000.0))
+        self.true_peak_oversample = max(1, int(true_peak_oversample))
+        self.enable_true_peak = bool(enable_true_peak)
+        self.stale_after_s = float(stale_after_s)
+        # Frequency-domain K-weighting with Parseval normalization folded in.
+        self._lufs_weights = k_weighting_power_response(self.sample_rate, self.window) * _parseval_weights(self.window)
+        self._sources: dict[str, _SourceMeter] = {}
+        self._master = _SourceMeter(self.channels, self.window)
+        self._forget: deque[str] = deque()
+        self._latest: dict | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.blocks_processed = 0
+
+    # -- control (any thread) -------------------------------------------------
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="meter-worker", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 1.0) -> None:
+        self._stop.set()
+        t = self._thread
+        if t is not None:
+            t.join(timeout=timeout)
+        self._thread = None
+
+    def forget(self, cue_id: str) -> None:
+        """Drop meter state for a finished cue (processed by the worker thread)."""
+        self._forget.append(cue_id)
+
+    def latest(self) -> dict | None:
+        return self._latest
+
+    # -- worker ---------------------------------------------------------------
+
+    def _run(self) -> None:
+        next_publish = time.monotonic() + self.publish_interval
+        poll = min(0.005, self.publish_interval / 2.0)
+        while not self._stop.is_set():
+            self.drain()
+            now = time.monotonic()
+            if now >= next_publish:
+                self.publish(now)
+                next_publish = now + self.publish_interval
+            self._stop.wait(poll)
+
+    def drain(self) -> int:
+        """Process every pending tap block. Returns the number of blocks processed."""
+        tap = self.tap
+        count = 0
+        now = time.monotonic()
+        while True:
+            item = tap.peek()
+            if item is None:
+                break
+            cue_ids, rows, master = item
+            try:
+                self._accumulate(cue_ids, rows, master, now)
+            finally:
+                tap.advance()
+            count += 1
+        self.blocks_processed += count
+        return count
+
+    def _accumulate(self, cue_ids: tuple, rows: np.ndarray, master: np.ndarray, now: float) -> None:
+        frames = int(master.shape[0])
+        if frames == 0:
+            return
+        n = len(cue_ids)
+        if n:
+            sumsq = np.einsum("nfc,nfc->nc", rows, rows, dtype=np.float64)
+            peak = np.max(np.abs(rows), axis=1)
+            tp = true_peak(rows, self.true_peak_oversample) if self.enable_true_peak else peak
+            for i, cue_id in enumerate(cue_ids):
+                if cue_id is None:
+                    continue
+                src = self._sources.get(cue_id)
+                if src is None:
+                    src = _SourceMeter(self.channels, self.window)
+                    self._sources[cue_id] = src
+                src.sumsq += sumsq[i]
+                src.frames += frames
+                np.maximum(src.peak, peak[i], out=src.peak)
+                np.maximum(src.tp, tp[i], out=src.tp)
+                src.push_history(rows[i])
+                src.last_seen = now
+
+        m = self._master
+        m.sumsq += np.einsum("fc,fc->c", master, master, dtype=np.float64)
+        m.frames += frames
+        np.maximum(m.peak, np.max(np.abs(master), axis=0), out=m.peak)
+        if self.enable_true_peak:
+            np.maximum(m.tp, true_peak(master[None, :, :], self.true_peak_oversample)[0], out=m.tp)
+        else:
+            np.maximum(m.tp, m.peak, out=m.tp)
+        m.push_history(master)
+        m.last_seen = now
+
+    def _momentary_lufs(self, sources: list[_SourceMeter]) -> np.ndarray:
+        """Momentary loudness for each source from its 400 ms history (one batched rFFT).
+
+        The history is circular, but |FFT| is invariant to circular shifts, so it
+        does not need to be unrolled.
+        """
+        if not sources:
+            return np.zeros(0, dtype=np.float64)
+        hist = np.stack([s.hist for s in sources])
+        power = np.abs(np.fft.rfft(hist, axis=1)) ** 2
+        ms = np.einsum("nkc,k->n", power, self._lufs_weights)
+        with np.errstate(divide="ignore"):
+            lufs = -0.691 + 10.0 * np.log10(ms)
+        return np.where(ms > 0.0, lufs, SILENCE_DB)
+
+    def publish(self, now: float | None = None) -> dict:
+        """Turn the accumulators into a snapshot, reset the period, and expose it via latest()."""
+        if now is None:
+            now = time.monotonic()
+        while self._forget:
+            try:
+                self._sources.pop(self._forget.popleft(), None)
+            except IndexError:
+                break
+        for cue_id, src in list(self._sources.items()):
+            if now - src.last_seen > self.stale_after_s:
+                self._sources.pop(cue_id, None)
+
+        active = [(cue_id, src) for cue_id, src in self._sources.items() if src.frames > 0]
+        cue_levels: dict = {}
+        cue_levels_per_channel: dict = {}
+        cue_true_peak: dict = {}
+        cue_lufs: dict = {}
+        if active:
+            lufs = self._momentary_lufs([src for _, src in active])
+            for (cue_id, src), loud in zip(active, lufs.tolist()):
+                rms_ch = np.sqrt(src.sumsq / src.frames)
+                rms_list = rms_ch.tolist()
+                peak_list = src.peak.tolist()
+                cue_levels[cue_id] = (float(math.sqrt(float(np.mean(src.sumsq)) / src.frames)), max(peak_list))
+                cue_levels_per_channel[cue_id] = (rms_list, peak_list)
+                cue_true_peak[cue_id] = src.tp.tolist()
+                cue_lufs[cue_id] = float(loud)
+                src.reset_period()
+
+        snapshot: dict = {
+            "cue_levels": cue_levels,
+            "cue_levels_per_channel": cue_levels_per_channel,
+            "cue_true_peak": cue_true_peak,
+            "cue_lufs_momentary": cue_lufs,
+            "master_rms_db": None,
+            "master_peak_db": None,
+            "master_true_peak_db": None,
+            "master_lufs_momentary": None,
+            "dropped_blocks": self.tap.dropped,
+        }
+        m = self._master
+        if m.frames > 0:
+            snapshot["master_rms_db"] = [lin_to_db(v) for v in np.sqrt(m.sumsq / m.frames).tolist()]
+            snapshot["master_peak_db"] = [lin_to_db(v) for v in m.peak.tolist()]
+            snapshot["master_true_peak_db"] = [lin_to_db(v) for v in m.tp.tolist()]
+            snapshot["master_lufs_momentary"] = float(self._momentary_lufs([m])[0])
+            m.reset_period()
+        self._latest = snapshot
+        return snapshot
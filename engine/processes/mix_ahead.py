@@ -0,0 +1,137 @@
+"""
+Ahead-of-time master mixing for the output process.
+
+By default the whole mix (ring pulls, fades, glitch diagnostics, meter tap) runs
+inside the sounddevice callback, so it competes for the GIL with the PCM drain,
+logging and telemetry code in the same process. With STEPD_OUTPUT_AHEAD_BLOCKS
+> 0, a MixAheadThread renders the master mix up to that many blocks ahead into
+a preallocated MasterRing, and the PortAudio callback only copies `frames`
+samples out of it.
+
+Trade-off: commands (stop, fade, transport) become audible up to
+ahead_blocks * block_frames frames later.
+
+MasterRing is single-producer (mix thread) / single-consumer (RT callback): the
+producer only advances `_write`, the consumer only advances `_read`, both as
+monotonically increasing frame counters.
+"""
+from __future__ import annotations
+
+import threading
+from typing import Callable
+
+import numpy as np
+
+
+class MasterRing:
+    """Fixed-capacity float32 circular buffer of master output frames (SPSC)."""
+
+    def __init__(self, capacity_frames: int, channels: int) -> None:
+        self.capacity = max(1, int(capacity_frames))
+        self.channels = max(1, int(channels))
+        self._buf = np.zeros((self.capacity, self.channels), dtype=np.float32)
+        self._write = 0  # producer only
+        self._read = 0   # consumer only
+        self.underruns = 0
+        self.underrun_frames = 0
+
+    def available(self) -> int:
+        return self._write - self._read
+
+    def space(self) -> int:
+        return self.capacity - (self._write - self._read)
+
+    def write(self, block: np.ndarray) -> int:
+        """Producer: append up to space() frames of `block`. Returns frames written."""
+        n = min(int(block.shape[0]), self.space())
+        if n <= 0:
+            return 0
+        pos = self._write % self.capacity
+        first = min(n, self.capacity - pos)
+        self._buf[pos : pos + first] = block[:first]
+        if n > first:
+            self._buf[: n - first] = block[first:n]
+        self._write += n
+        return n
+
+    def read_into(self, out: np.ndarray) -> int:
+        """Consumer (RT): copy len(out) frames into `out`, zero-filling on underrun."""
+        frames = int(out.shape[0])
+        n = min(frames, self.available())
+        if n > 0:
+            pos = self._read % self.capacity
+            first = min(n, self.capacity - pos)
+            out[:first] = self._buf[pos : pos + first]
+            if n > first:
+                out[first:n] = self._buf[: n - first]
+            self._read += n
+        if n < frames:
+            out[n:] = 0.0
+            self.underruns += 1
+            self.underrun_frames += frames - n
+        return n
+
+
+class MixAheadThread:
+    """Keeps a MasterRing filled `ahead_blocks` blocks ahead by calling `render(block)`.
+
+    `render(block)` must fill the (block_frames, channels) array with the next block
+    of master output. The RT callback calls wake() after consuming audio.
+    """
+
+    def __init__(
+        self,
+        ring: MasterRing,
+        render: Callable[[np.ndarray], None],
+        block_frames: int,
+        ahead_blocks: int,
+        sample_rate: int,
+    ) -> None:
+        self.ring = ring
+        self.render = render
+        self.block_frames = max(1, int(block_frames))
+        self.target_frames = min(ring.capacity, self.block_frames * max(1, int(ahead_blocks)))
+        self._block = np.zeros((self.block_frames, ring.channels), dtype=np.float32)
+        # Fallback poll in case a wake-up is missed: half a block period.
+        self._poll_s = max(0.0005, 0.5 * self.block_frames / float(max(1, int(sample_rate))))
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.render_errors = 0
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="mix-ahead", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 1.0) -> None:
+        self._stop.set()
+        self._wake.set()
+        t = self._thread
+        if t is not None:
+            t.join(timeout=timeout)
+        self._thread = None
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    def fill(self) -> int:
+        """Render blocks until the ring holds target_frames (or is full). Returns blocks rendered."""
+        ring = self.ring
+        rendered = 0
+        while ring.available() + self.block_frames <= self.target_frames and ring.space() >= self.block_frames:
+            try:
+                self.render(self._block)
+            except Exception:
+                self.render_errors += 1
+                self._block.fill(0.0)
+            ring.write(self._block)
+            rendered += 1
+        return rendered
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.fill()
+            self._wake.wait(self._poll_s)
+            self._wake.clear()
@@ -0,0 +1,109 @@
+"""
+Batched multi-cue mixer for the output callback.
+
+The per-cue loop in the sounddevice callback used to pull, scale, and add each
+cue into `outdata` separately, plus separate RMS/peak reductions per cue and
+per channel. BatchMixer keeps one preallocated (cues, frames, channels) block
+array and a matching (cues, frames) gain array:
+
+- The callback pulls each cue's ring straight into its block row and writes the
+  cue's gain (constant or fade envelope) into its gain row.
+- mix() applies every gain row in one broadcast multiply and sums all rows into
+  `outdata` in one reduction.
+- levels() computes per-cue, per-channel RMS and peak for all rows at once.
+
+Nothing here allocates in steady state. Capacity grows by doubling only when
+more cues are mixed than ever before (or the block size grows).
+"""
+from __future__ import annotations
+
+import numpy as np
+
+
+class BatchMixer:
+    """Preallocated struct-of-arrays mixing stage (RT callback use only)."""
+
+    def __init__(self, channels: int, max_frames: int = 2048, max_cues: int = 32) -> None:
+        self.channels = max(1, int(channels))
+        self.count = 0
+        self.frames = 0
+        self._alloc(max(1, int(max_cues)), max(1, int(max_frames)))
+
+    def _alloc(self, cues: int, frames: int) -> None:
+        self.capacity_cues = int(cues)
+        self.capacity_frames = int(frames)
+        self._blocks = np.zeros((cues, frames, self.channels), dtype=np.float32)
+        self._gains = np.ones((cues, frames), dtype=np.float32)
+        # Scratch for level reductions so levels() does not allocate.
+        self._scratch = np.zeros((cues, frames, self.channels), dtype=np.float32)
+        self._rms = np.zeros((cues, self.channels), dtype=np.float32)
+        self._peak = np.zeros((cues, self.channels), dtype=np.float32)
+
+    def _grow(self, cues: int, frames: int) -> None:
+        old_blocks = self._blocks
+        old_gains = self._gains
+        n = self.count
+        f = min(self.frames, frames)
+        self._alloc(max(cues, self.capacity_cues), max(frames, self.capacity_frames))
+        if n and f:
+            self._blocks[:n, :f] = old_blocks[:n, :f]
+            self._gains[:n, :f] = old_gains[:n, :f]
+
+    def begin(self, frames: int) -> None:
+        """Start a new block of `frames` frames with no cues."""
+        frames = int(frames)
+        self.count = 0
+        if frames > self.capacity_frames:
+            self._grow(self.capacity_cues, frames)
+        self.frames = frames
+
+    def add(self) -> int:
+        """Reserve the next cue row for this block and return its index."""
+        if self.count >= self.capacity_cues:
+            self._grow(self.capacity_cues * 2, self.capacity_frames)
+        row = self.count
+        self.count += 1
+        return row
+
+    def block(self, row: int) -> np.ndarray:
+        """(frames, channels) view of a cue row: pre-gain PCM before mix(), post-gain after."""
+        return self._blocks[row, : self.frames]
+
+    def gain_row(self, row: int) -> np.ndarray:
+        """(frames,) per-sample gain view of a cue row."""
+        return self._gains[row, : self.frames]
+
+    def rows(self) -> np.ndarray:
+        """(count, frames, channels) view of every row added this block."""
+        return self._blocks[: self.count, : self.frames]
+
+    def mix(self, outdata: np.ndarray) -> None:
+        """Apply all gain rows in place and write the sum of all rows into `outdata`."""
+        n = self.count
+        f = self.frames
+        if n == 0:
+            outdata.fill(0.0)
+            return
+        blocks = self._blocks[:n, :f]
+        np.multiply(blocks, self._gains[:n, :f, None], out=blocks)
+        np.sum(blocks, axis=0, out=outdata)
+
+    def levels(self) -> tuple[np.ndarray, np.ndarray]:
+        """Per-cue, per-channel (rms, peak) arrays of shape (count, channels) for the mixed rows.
+
+        Must be called after mix(); returned arrays are views reused on the next block.
+        """
+        n = self.count
+        f = self.frames
+        rms = self._rms[:n]
+        peak = self._peak[:n]
+        if n == 0 or f == 0:
+            return rms, peak
+        blocks = self._blocks[:n, :f]
+        scratch = self._scratch[:n, :f]
+        np.square(blocks, out=scratch)
+        np.mean(scratch, axis=1, out=rms)
+        np.sqrt(rms, out=rms)
+        np.abs(blocks, out=scratch)
+        np.max(scratch, axis=1, out=peak)
+        return rms, peak
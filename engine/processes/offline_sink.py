@@ -0,0 +1,277 @@
+"""
+Headless output sink: drive the output callback without an audio device.
+
+output_process_main normally hands its callback to a sounddevice OutputStream,
+so reproducing a fade storm or loop-boundary glitch means playing it in real time
+on real hardware. With STEPD_OUTPUT_SINK set, the output process opens an
+OfflineOutputStream instead. It calls the same callback from a thread, writes the
+master mix to a file, and records per-callback timing.
+
+STEPD_OUTPUT_SINK:
+- "" / "device": normal sounddevice output (default).
+- "null": discard the mix (timing only).
+- "wav:<path>": 32-bit float WAV of the master mix.
+- "npy:<path>": NumPy .npy array (frames, channels) of the master mix.
+
+STEPD_OUTPUT_SINK_SPEED: render speed as a multiple of real time while cues are
+active (default 0 = as fast as the CPU and decoder allow). While no cue is
+active the sink always runs at real time, so idle periods do not turn into huge
+silent files. Before each block the sink asks the output process whether every
+playing cue has a block of PCM buffered. If not, it waits (counted as a stall)
+instead of rendering an underflow that would never happen on a real device.
+
+STEPD_OUTPUT_SINK_GATED=1 (set by render_scenario.py): the sink starts held at
+sample 0 and renders only up to the sample of the last OutputRenderUntil
+command, so scripted steps are applied at exact rendered positions.
+
+Timing stats (callback duration percentiles, over-budget count, stalls) are
+written to "<path>.timing.json" for file sinks and logged by the output process.
+"""
+from __future__ import annotations
+
+import json
+import struct
+import threading
+import time
+from typing import Callable
+
+import numpy as np
+
+
+SINK_KINDS = ("null", "wav", "npy")
+
+
+def parse_sink_spec(spec: str | None) -> tuple[str, str | None] | None:
+    """Parse STEPD_OUTPUT_SINK. Returns None for the real device, else (kind, path)."""
+    raw = (spec or "").strip()
+    if not raw or raw.lower() == "device":
+        return None
+    kind, _, path = raw.partition(":")
+    kind = kind.strip().lower()
+    if kind not in SINK_KINDS:
+        raise ValueError(f"unknown output sink {raw!r} (expected device, null, wav:<path> or npy:<path>)")
+    if kind == "null":
+        return ("null", None)
+    if not path.strip():
+        raise ValueError(f"output sink {kind!r} needs a path ({kind}:<path>)")
+    return (kind, path.strip())
+
+
+class MasterWriter:
+    """Writes rendered master blocks to a float32 WAV / .npy file (or nowhere)."""
+
+    def __init__(self, kind: str, path: str | None, sample_rate: int, channels: int) -> None:
+        self.kind = kind
+        self.path = path
+        self.sample_rate = int(sample_rate)
+        self.channels = int(channels)
+        self.frames = 0
+        self._fh = None
+        self._blocks: list[np.ndarray] = []
+        if kind == "wav" and path:
+            self._fh = open(path, "wb")
+            self._write_wav_header(0)
+
+    def _write_wav_header(self, data_frames: int) -> None:
+        block_align = self.channels * 4
+        data_bytes = data_frames * block_align
+        header = b"RIFF" + struct.pack("<I", 36 + data_bytes) + b"WAVE"
+        # fmt chunk: WAVE_FORMAT_IEEE_FLOAT (3)
+        header += b"fmt " + struct.pack(
+            "<IHHIIHH", 16, 3, self.channels, self.sample_rate, self.sample_rate * block_align, block_align, 32
+        )
+        header += b"data" + struct.pack("<I", data_bytes)
+        self._fh.seek(0)
+        self._fh.write(header)
+
+    def write(self, block: np.ndarray) -> None:
+        if block.shape[1] != self.channels:
+            return
+        self.frames += int(block.shape[0])
+        if self.kind == "wav" and self._fh is not None:
+            self._fh.write(np.ascontiguousarray(block, dtype="<f4").tobytes())
+        elif self.kind == "npy":
+            self._blocks.append(np.array(block, dtype=np.float32, copy=True))
+
+    def close(self) -> None:
+        if self.kind == "wav" and self._fh is not None:
+            self._write_wav_header(self.frames)
+            self._fh.close()
+            self._fh = None
+        elif self.kind == "npy" and self.path:
+            data = np.concatenate(self._blocks) if self._blocks else np.zeros((0, self.channels), dtype=np.float32)
+            self._blocks = []
+            with open(self.path, "wb") as fh:
+                np.save(fh, data)
+
+
+class CallbackTimingStats:
+    """Per-callback durations (ms) for one offline render."""
+
+    def __init__(self, budget_ms: float) -> None:
+        self.budget_ms = float(budget_ms)
+        self._ms = np.zeros(4096, dtype=np.float64)
+        self.count = 0
+        self.over_budget = 0
+        self.stalls = 0
+        self.stall_ms = 0.0
+
+    def add(self, ms: float) -> None:
+        if self.count >= self._ms.shape[0]:
+            self._ms = np.concatenate([self._ms, np.zeros_like(self._ms)])
+        self._ms[self.count] = ms
+        self.count += 1
+        if ms > self.budget_ms:
+            self.over_budget += 1
+
+    def summary(self) -> dict:
+        out = {
+            "callbacks": self.count,
+            "budget_ms": self.budget_ms,
+            "over_budget": self.over_budget,
+            "stalls": self.stalls,
+            "stall_ms": round(self.stall_ms, 3),
+        }
+        if self.count:
+            ms = self._ms[: self.count]
+            p50, p95, p99 = np.percentile(ms, [50, 95, 99]).tolist()
+            out.update(
+                mean_ms=float(ms.mean()),
+                p50_ms=float(p50),
+                p95_ms=float(p95),
+                p99_ms=float(p99),
+                max_ms=float(ms.max()),
+            )
+        return out
+
+
+class OfflineOutputStream:
+    """Stand-in for sounddevice.OutputStream that renders from a thread.
+
+    callback(outdata, frames, time_info, status) is the output process callback.
+    ready(frames) -> bool says whether every active cue can fill the next block,
+    and active() -> bool whether any cue is playing (idle periods run at real time).
+    gate(frames) -> bool (optional) says whether the next block may be rendered at
+    all; while it is False the sink holds without counting a stall.
+    """
+
+    def __init__(
+        self,
+        *,
+        samplerate: int,
+        channels: int,
+        blocksize: int,
+        callback: Callable,
+        writer: MasterWriter,
+        speed: float = 0.0,
+        ready: Callable[[int], bool] | None = None,
+        active: Callable[[], bool] | None = None,
+        max_stall_s: float = 2.0,
+        gate: Callable[[int], bool] | None = None,
+    ) -> None:
+        self.samplerate = int(samplerate)
+        self.channels = int(channels)
+        self.blocksize = int(blocksize) if int(blocksize) > 0 else 512
+        self.callback = callback
+        self.writer = writer
+        self.speed = max(0.0, float(speed))
+        self.ready = ready
+        self.active_fn = active
+        self.gate = gate
+        self.max_stall_s = float(max_stall_s)
+        self.block_s = self.blocksize / float(max(1, self.samplerate))
+        self.stats = CallbackTimingStats(self.block_s * 1000.0)
+        self._out = np.zeros((self.blocksize, self.channels), dtype=np.float32)
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.frames_rendered = 0
+
+    @property
+    def active(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="offline-output", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        t = self._thread
+        if t is not None:
+            t.join(timeout=5.0)
+        self._thread = None
+
+    def close(self) -> None:
+        self.stop()
+
+    def _gate_open(self) -> bool:
+        try:
+            return bool(self.gate(self.blocksize))
+        except Exception:
+            return True
+
+    def _wait_ready(self) -> None:
+        if self.ready is None:
+            return
+        t0 = time.perf_counter()
+        stalled = False
+        while not self._stop.is_set():
+            try:
+                if self.ready(self.blocksize):
+                    break
+            except Exception:
+                break
+            stalled = True
+            if time.perf_counter() - t0 > self.max_stall_s:
+                break  # render the underflow rather than hang forever
+            time.sleep(0.001)
+        if stalled:
+            self.stats.stalls += 1
+            self.stats.stall_ms += (time.perf_counter() - t0) * 1000.0
+
+    def _run(self) -> None:
+        next_due = time.perf_counter()
+        out = self._out
+        while not self._stop.is_set():
+            if self.gate is not None and not self._gate_open():
+                time.sleep(0.001)
+                next_due = time.perf_counter()
+                continue
+            try:
+                busy = bool(self.active_fn()) if self.active_fn is not None else True
+            except Exception:
+                busy = True
+            if busy:
+                self._wait_ready()
+            # Pace: real time when idle, `speed` x real time when busy (0 = unpaced).
+            pace = 1.0 if not busy else self.speed
+            if pace > 0.0:
+                now = time.perf_counter()
+                if next_due > now:
+                    time.sleep(next_due - now)
+                next_due = max(next_due, time.perf_counter() - self.block_s) + self.block_s / pace
+            else:
+                next_due = time.perf_counter()
+
+            t0 = time.perf_counter()
+            try:
+                self.callback(out, self.blocksize, None, None)
+            except Exception:
+                out.fill(0.0)
+            self.stats.add((time.perf_counter() - t0) * 1000.0)
+            self.writer.write(out)
+            self.frames_rendered += self.blocksize
+
+
+def write_timing_summary(path: str | None, summary: dict) -> None:
+    """Write timing stats next to a file sink ("<path>.timing.json")."""
+    if not path:
+        return
+    try:
+        with open(f"{path}.timing.json", "w", encoding="utf-8") as fh:
+            json.dump(summary, fh, indent=2)
+    except OSError:
+        pass
@@ -3,19 +3,28 @@ from __future__ import annotations
 import multiprocessing as mp
 from dataclasses import dataclass, replace
 from typing import Dict
-from collections import deque
 import time
 import os
 
 import numpy as np
-import math
 from engine.processes.decode_process_pooled import DecodedChunk
 from engine.processes.decode_process_pooled import BufferRequest, DecodeError, DecodeStop
+from engine.processes.pcm_shm import PcmSlabPool, PcmSlabPoolSpec
+from engine.processes.mixer import BatchMixer
+from engine.processes.pcm_ring import PcmRing
+from engine.processes.cue_slots import CueSlotTable
+from engine.processes.offline_sink import MasterWriter, OfflineOutputStream, parse_sink_spec, write_timing_summary
+from engine.processes.fade_curves import get_fade_table, normalize_fade_curve
+from engine.processes.metering import MeterTap, MeterWorker
+from engine.processes.mix_ahead import MasterRing, MixAheadThread
+from engine.processes.callback_stats import CallbackHistogram
+from engine.processes.wakeup import Wakeup
 from engine.commands import (
     OutputFadeTo,
     OutputSetDevice,
     OutputSetConfig,
     OutputListDevices,
+    OutputRenderUntil,
     UpdateCueCommand,
     TransportPause,
     TransportPlay,
@@ -33,11 +42,18 @@ from engine.messages.events import (
     BatchCueTimeEvent,
     DecodeErrorEvent,
     TransportStateEvent,
+    CallbackTimingEvent,
+    OutputClockEvent,
 )
 
 LOW_WATER_MULT = 4
 BLOCK_MULT = 8
 
+# Main-loop wait with cues playing (ring refill checks) and with nothing playing
+# (telemetry/status only). Commands and PCM wake the loop immediately either way.
+_ACTIVE_WAIT_S = 0.01
+_IDLE_WAIT_S = 0.1
+
 @dataclass(frozen=True, slots=True)
 class OutputStartCue:
     cue_id: str
@@ -48,52 +64,43 @@ class OutputStartCue:
     target_gain_db: float = 0.0
     loop_enabled: bool = False
     is_loop_restart: bool = False  # True if this is a loop restart (skip fade-in, don't emit finish event)
+    start_at_sample: int | None = None  # absolute output-stream sample to start on (see OutputClockEvent)
+    start_quantum_frames: int = 0  # start on the next multiple of this many samples (0 = off)
     
 class _FadeEnv:
+    """Gain ramp from `start` to `target` over `frames` frames.
+
+    The curve shape is a shared precomputed table (see fade_curves); it is fetched
+    here, in the main loop, so the RT callback only slices it.
+    """
+
     def __init__(self, start, target, frames, curve):
         self.start = start
         self.target = target
         self.frames_left = max(1, frames)
         self.total = self.frames_left
-        self.curve = curve
+        self.curve = normalize_fade_curve(curve)
+        self._table = get_fade_table(self.curve, self.total)
+
+    def fill_gains(self, out: np.ndarray) -> None:
+        """Write the next len(out) gains into `out` and advance the envelope (no allocation)."""
+        n = out.shape[0]
+        pos = self.total - self.frames_left
+        # Table holds total+1 points; past the end the envelope sits at its target.
+        avail = max(0, min(n, self.total + 1 - pos))
+        if avail > 0:
+            np.multiply(self._table[pos : pos + avail], self.target - self.start, out=out[:avail])
+            out[:avail] += self.start
+        if avail < n:
+            out[avail:] = self.target
+        self.frames_left -= n
 
-    def next_gain(self):
-        t = 1.0 - (self.frames_left / self.total)
-        # interpolation factor in [0,1]
-        if self.curve == "equal_power":
-            s = math.sin(t * math.pi / 2)
-        else:
-            s = t
-
-        # map from start..target using factor s
-        g = self.start + s * (self.target - self.start)
-
-        self.frames_left -= 1
-        return g
-    
     def compute_batch_gains(self, num_frames):
-        """Pre-compute all gains for a chunk at once (vectorized with NumPy)"""
-        if num_frames == 0:
-            return np.array([], dtype=np.float32)
-        
-        # Compute all frame indices efficiently
-        frame_indices = np.arange(num_frames, dtype=np.float32)
-        t = 1.0 - ((self.frames_left - frame_indices) / self.total)
-        t = np.clip(t, 0.0, 1.0)
-        
-        # Apply curve
-        if self.curve == "equal_power":
-            s = np.sin(t * np.pi / 2)
-        else:
-            s = t
-        
-        # Linear interpolation: start + s * (target - start)
-        gains = self.start + s * (self.target - self.start)
-        
-        # Update frames_left
-        self.frames_left -= num_frames
-        
-        return gains.astype(np.float32)
+        """Return the next `num_frames` gains as a new array (see fill_gains)."""
+        gains = np.empty(int(num_frames), dtype=np.float32)
+        if num_frames > 0:
+            self.fill_gains(gains)
+        return gains
 
 
 @dataclass(frozen=True, slots=True)
@@ -106,15 +113,20 @@ class OutputConfig:
     channels: int
     block_frames: int
 
+# Default per-cue PCM ring capacity (frames); output_process_main sizes rings from
+# the buffering target unless STEPD_OUTPUT_RING_FRAMES is set.
+DEFAULT_RING_CAPACITY_FRAMES = 65536
+
 def _db_to_lin(db: float) -> float:
     return float(10.0 ** (db / 20.0))
 
 class _Ring:
-    def __init__(self):
-        # Store (pcm, is_loop_restart) so we can trim already-buffered loop iterations
-        # at the exact loop boundary when looping is disabled.
-        self.q: deque[tuple[np.ndarray, bool]] = deque()
-        self.frames = 0
+    def __init__(self, capacity_frames: int = DEFAULT_RING_CAPACITY_FRAMES):
+        # Decoded PCM lives in a fixed-capacity circular buffer (created on first push,
+        # once the channel count is known). Loop-restart boundaries are tracked as markers
+        # so we can stop at the exact loop boundary when looping is disabled.
+        self.capacity_frames = max(1, int(capacity_frames))
+        self.pcm: PcmRing | None = None
         self.eof = False
         self.request_pending = False
         self.request_started_at = None  # timestamp when current buffer request was made
@@ -147,88 +159,77 @@ class _Ring:
         # Scratch buffer reused by pull() to avoid per-callback allocations.
         self._scratch: np.ndarray | None = None
 
+    @property
+    def frames(self) -> int:
+        """Frames buffered for playback (including any spill waiting for ring space)."""
+        pcm = self.pcm
+        return pcm.frames if pcm is not None else 0
+
     def push(self, a: np.ndarray, eof: bool, *, is_loop_restart: bool = False):
         if a.size:
-            self.q.append((a, bool(is_loop_restart)))
-            self.frames += a.shape[0]
+            if self.pcm is None:
+                self.pcm = PcmRing(self.capacity_frames, a.shape[1] if a.ndim == 2 else 1)
+            self.pcm.push(a if a.ndim == 2 else a.reshape(-1, 1), is_loop_restart=bool(is_loop_restart))
             self.started = True
         if eof:
             self.eof = True
 
+    def flush(self) -> None:
+        """Main loop: move spilled PCM into the ring as the callback frees space."""
+        if self.pcm is not None:
+            self.pcm.flush()
+
+    def clear(self) -> None:
+        """Drop all buffered audio (main loop)."""
+        if self.pcm is not None:
+            self.pcm.clear()
+
+    def truncate(self, keep_frames: int) -> int:
+        """Keep only the next `keep_frames` buffered frames (main loop). Returns frames kept."""
+        if self.pcm is None:
+            return 0
+        self.pcm.flush()
+        return self.pcm.truncate(keep_frames)
+
     def drop_buffered_loop_restart_audio(self) -> bool:
         """Drop any already-buffered audio that belongs to a future loop iteration.
 
         Returns True if any audio was dropped.
         """
-        if not self.q:
+        if self.pcm is None:
             return False
+        return self.pcm.truncate_at_next_restart()
 
-        dropped = False
-        new_q: deque[tuple[np.ndarray, bool]] = deque()
-        new_frames = 0
-        saw_restart = False
-
-        for pcm, is_restart in self.q:
-            if saw_restart:
-                dropped = True
-                continue
-            if is_restart:
-                saw_restart = True
-                dropped = True
-                continue
-            new_q.append((pcm, False))
-            new_frames += int(pcm.shape[0])
-
-        if dropped:
-            self.q = new_q
-            self.frames = new_frames
-        return dropped
-
-    def pull(self, n: int, channels: int):
+    def pull(self, n: int, channels: int, out: np.ndarray | None = None):
         # Reuse a scratch buffer to avoid per-callback allocations (helps prevent
-        # periodic clicks from GC/allocator jitter).
-        out = self._scratch
-        if out is None or out.shape != (n, channels):
-            out = np.zeros((n, channels), dtype=np.float32)
-            self._scratch = out
-        else:
-            out.fill(0.0)
-        filled = 0
-        restart_index: int | None = None
-        while filled < n and self.q:
-            # If loop disable was requested, stop cleanly at the loop boundary.
-            # The first chunk of the next loop iteration is tagged is_restart=True.
-            if self.stop_on_restart_boundary:
-                try:
-                    _, is_restart = self.q[0]
-                    if is_restart:
-                        # Do not play any samples from the next loop iteration.
-                        self.q.clear()
-                        self.frames = 0
-                        self.eof = True
-                        break
-                except Exception:
-                    pass
-            a, is_restart = self.q[0]
-            take = min(n - filled, a.shape[0])
-            if is_restart and take > 0 and restart_index is None:
-                restart_index = filled
-            out[filled:filled+take] = a[:take]
-            if take == a.shape[0]:
-                self.q.popleft()
-            else:
-                # If this chunk marks a loop restart boundary, consuming any samples from it
-                # means we've crossed the boundary. Clear the marker on the remainder so
-                # stop_on_restart_boundary won't incorrectly stop mid-chunk.
-                self.q[0] = (a[take:], False)
-            self.frames -= take
-            filled += take
-        done = (filled == 0 and self.eof and self.frames == 0 and not self.q)
+        # periodic clicks from GC/allocator jitter). Callers that mix in place
+        # (BatchMixer) pass their own (n, channels) destination instead.
+        if out is None:
+            out = self._scratch
+            if out is None or out.shape != (n, channels):
+                out = np.zeros((n, channels), dtype=np.float32)
+                self._scratch = out
+        pcm = self.pcm
+        if pcm is None:
+            out[:] = 0.0
+            return out, bool(self.eof), 0, None
+        # If loop disable was requested, stop cleanly at the loop boundary:
+        # no samples from the next loop iteration are played.
+        filled, restart_index, stopped = pcm.pull_into(out, stop_at_restart=self.stop_on_restart_boundary)
+        if stopped:
+            self.eof = True
+        done = (filled == 0 and self.eof and pcm.frames == 0)
 
         return out, done, filled, restart_index
 
-def output_process_main(cfg: OutputConfig, cmd_q: mp.Queue, pcm_q: mp.Queue, event_q: mp.Queue, decode_cmd_q:mp.Queue) -> None:
-    import sounddevice as sd
+def output_process_main(cfg: OutputConfig, cmd_q: mp.Queue, pcm_q: mp.Queue, event_q: mp.Queue, decode_cmd_q:mp.Queue, pcm_pool: PcmSlabPoolSpec | None = None) -> None:
+    # Headless sink (STEPD_OUTPUT_SINK=null|wav:<path>|npy:<path>) drives the same
+    # callback without PortAudio; sounddevice is only imported for the real device.
+    offline_sink = parse_sink_spec(os.environ.get("STEPD_OUTPUT_SINK"))
+    if offline_sink is None:
+        import sounddevice as sd
+    else:
+        sd = None
     from log.service_log import coerce_log_path
     from engine.tuning import (
         DEFAULT_OUTPUT_LOW_WATER_BLOCKS,
@@ -236,14 +237,18 @@ def output_process_main(cfg: OutputConfig, cmd_q: mp.Queue, pcm_q: mp.Queue, eve
         DEFAULT_OUTPUT_MIN_TARGET_BLOCKS,
         DEFAULT_OUTPUT_STARVE_WARN_FRAMES,
         DEFAULT_OUTPUT_TARGET_BLOCKS,
+        DEFAULT_METER_TAP_SLOTS,
+        DEFAULT_METER_TRUE_PEAK,
+        DEFAULT_OUTPUT_AHEAD_BLOCKS,
+        DEFAULT_CALLBACK_STATS_MS,
+        DEFAULT_OUTPUT_START_LEAD_MS,
     )
 
     rings: Dict[str, _Ring] = {}
-    gains: Dict[str, float] = {}
-    envelopes: Dict[str, _FadeEnv] = {}
+    # Integer slot per active cue: gain, fade envelope and consumed-sample counts
+    # (for elapsed time reporting) live here; the callback only indexes slots.
+    slots = CueSlotTable()
     pending_starts: Dict[str, OutputStartCue] = {}
-    # tracking per-cue consumed sample counts for elapsed time reporting
-    cue_samples_consumed: Dict[str, int] = {}
     # Track which cues are looping to suppress finish event on loop restart
     looping_cues: set[str] = set()
     # Cues that have had looping disabled mid-playback.
@@ -679,20 +684,30 @@ def output_process_main(cfg: OutputConfig, cmd_q: mp.Queue, pcm_q: mp.Queue, eve
                 if ring:
                     try:
                         ring.eof = True
-                        ring.q.clear()
-                        ring.frames = 0
+                        ring.clear()
                         ring.request_pending = False
                         ring.request_started_at = None
                     except Exception as ex:
                         _log(f"EXCEPTION clearing ring for error cue={pcm.cue_id}: {type(ex).__name__}: {ex}")
                 continue
+            if isinstance(pcm, DecodedChunk):
+                try:
+                    resolved = _resolve_pcm(pcm)
+                except Exception as ex:
+                    resolved = None
+                    _log(f"[PCM-SHM] take failed cue={pcm.cue_id[:8]}: {type(ex).__name__}: {ex}")
+                if resolved is None:
+                    _log(f"[PCM-SHM] dropped unresolvable chunk cue={pcm.cue_id[:8]} slab={pcm.shm_slab}")
+                    continue
+                pcm = resolved
             try:
                 # If there's a pending OutputStartCue for this cue, activate it now
                 pending = pending_starts.pop(pcm.cue_id, None)
                 if pending:
                     _log(f"[DRAIN-ACTIVATE] cue={pcm.cue_id[:8]} first PCM, gain={pending.gain_db}")
-                    ring = rings.setdefault(pcm.cue_id, _Ring())
-                    gains[pcm.cue_id] = _db_to_lin(pending.gain_db)
+                    ring = rings.setdefault(pcm.cue_id, _Ring(ring_capacity_frames))
+                    slots.acquire(pcm.cue_id, ring)
+                    slots.set_gain(pcm.cue_id, _db_to_lin(pending.gain_db))
                     
                     # Track looping cues
                     if pending.loop_enabled and pcm.cue_id not in loop_stop_requested:
@@ -704,14 +719,15 @@ def output_process_main(cfg: OutputConfig, cmd_q: mp.Queue, pcm_q: mp.Queue, eve
                             cur = _db_to_lin(pending.gain_db)
                             target = _db_to_lin(pending.target_gain_db)
                             fade_frames = int(cfg.sample_rate * pending.fade_in_duration_ms / 1000)
-                            envelopes[pcm.cue_id] = _FadeEnv(cur, target, fade_frames, pending.fade_in_curve)
+                            slots.set_envelope(pcm.cue_id, _FadeEnv(cur, target, fade_frames, pending.fade_in_curve))
                             _log(f"[DRAIN-FADE-IN] cue={pcm.cue_id[:8]} fade_in={fade_frames}fr")
                         except Exception as ex:
                             _log(f"[DRAIN-ACTIVATE-ERROR] cue={pcm.cue_id[:8]}: {type(ex).__name__}")
                 ring = rings.get(pcm.cue_id)
                 if ring is None:
-                    ring = _Ring()
+                    ring = _Ring(ring_capacity_frames)
                     rings[pcm.cue_id] = ring
+                    slots.acquire(pcm.cue_id, ring)
                     _log(f"[DRAIN-CREATE-RING] cue={pcm.cue_id[:8]} created new ring")
 
                 # When looping is disabled mid-playback, we rely on the ring's
@@ -721,7 +737,7 @@ def output_process_main(cfg: OutputConfig, cmd_q: mp.Queue, pcm_q: mp.Queue, eve
 
                 # Reset elapsed time on loop restart (only if we will actually play it).
                 if pcm.is_loop_restart:
-                    cue_samples_consumed[pcm.cue_id] = 0
+                    slots.reset_consumed(pcm.cue_id)
                 frames_in_chunk = pcm.pcm.shape[0]
                 _log(f"[DECODE-CHUNK] cue={pcm.cue_id[:8]} received {frames_in_chunk} frames, eof={pcm.eof}")
                 was_started = bool(getattr(ring, "started", False))
@@ -807,21 +823,22 @@ def output_process_main(cfg: OutputConfig, cmd_q: mp.Queue, pcm_q: mp.Queue, eve
             except Exception as ex:
                 _log(f"[DRAIN-EXCEPTION] cue={pcm.cue_id[:8]}: {type(ex).__name__}")
 
-    def callback(outdata, frames, t, status):
+    def render_block(outdata, frames, status):
         # STRICTLY REAL-TIME SAFE:
         # - No blocking IPC (only put_nowait for telemetry, silently drop on full)
         # - No logging or prints
         # - No exception handling with side effects
         # - Only audio mixing and state updates
         # - Set finished_pending flag; main loop handles event emission
-
-        cb_start_perf = None
-        if enable_rt_timing:
-            try:
-                cb_start_perf = time.perf_counter()
-            except Exception:
-                cb_start_perf = None
-        
+        #
+        # Runs inside the PortAudio callback, or on the mix-ahead thread when
+        # STEPD_OUTPUT_AHEAD_BLOCKS > 0. State lives on `callback` attributes either way.
+        #
+        # `pos` is the output-stream sample clock: the first sample of this block. It
+        # advances by every rendered block (silence and pause included) and is what
+        # scheduled cue starts (slots.start_at) are measured against.
+        pos = callback._render_pos
+        callback._render_pos = pos + frames
         try:
             # Telemetry/status: cache in-process; main loop emits at a steady rate.
             if status:
@@ -834,9 +851,9 @@ def output_process_main(cfg: OutputConfig, cmd_q: mp.Queue, pcm_q: mp.Queue, eve
             # This keeps cue position stable so TransportPlay resumes instantly.
             if transport_paused:
                 # Still mark EOF rings as finished_pending so Stop works while paused.
-                cue_ids = getattr(callback, "_cue_ids_snapshot", ())
-                for cue_id in cue_ids:
-                    ring = rings.get(cue_id)
+                slot_rings = slots.rings
+                for slot in slots.active:
+                    ring = slot_rings[slot]
                     if ring is None:
                         continue
                     try:
@@ -845,41 +862,54 @@ def output_process_main(cfg: OutputConfig, cmd_q: mp.Queue, pcm_q: mp.Queue, eve
                     except Exception:
                         pass
                 outdata[:] = 0
-                try:
-                    callback._latest_batch_levels = None
-                    callback._latest_batch_levels_per_ch = None
-                    callback._latest_batch_times = None
-                    callback._latest_master_event = None
-                except Exception:
-                    pass
                 return
 
-            # Mix directly into outdata to avoid per-callback allocations.
-            outdata.fill(0.0)
-            active_envelopes = len(envelopes)  # Check concurrency level
-            skip_telemetry = active_envelopes > 6  # Skip telemetry during bulk fades to reduce CPU load
+            # Mix through the preallocated BatchMixer: each cue is pulled straight into its
+            # mixer row, gains/envelopes are written as per-sample gain rows, and a single
+            # batched multiply + sum produces outdata (no per-cue `outdata += chunk`).
+            mixer = callback._mixer
+            if mixer.channels != cfg.channels:
+                mixer = BatchMixer(cfg.channels, max_frames=max(frames, cfg.block_frames))
+                callback._mixer = mixer
+            mixer.begin(frames)
+
+            # Per-cue state is indexed by integer slot (struct-of-arrays); no cue-id lookups here.
+            # Read `active` before the arrays: the table only ever grows, so every slot fits.
+            active_slots = slots.active
+            slot_rings = slots.rings
+            slot_envelopes = slots.envelopes
+            slot_gain = slots.gain
+            slot_consumed = slots.consumed
+            slot_remaining = slots.remaining
+            slot_time_dirty = slots.time_dirty
+            slot_start_at = slots.start_at
+            block_end = pos + frames
+
+            # (slot, ring, row, end, restart_index) for every cue mixed this block.
+            # `end` is the row offset just past the cue's audio (start offset + frames pulled).
+            mixed = []
+            mixed_slots = callback._mixed_slots
+            if mixed_slots.shape[0] < slots.capacity:
+                mixed_slots = np.zeros(slots.capacity, dtype=np.int64)
+                callback._mixed_slots = mixed_slots
 
-            # Optional glitch diagnostics (RT-safe: compute + cache only; no I/O).
-            
-            # Accumulate telemetry for batching - send once per callback instead of per-cue
-            batch_levels = {}  # {cue_id: (rms, peak), ...}
-            batch_times = {}   # {cue_id: (elapsed, remaining), ...}
-            
-            # Initialize per-channel cache if not present
-            if not hasattr(callback, '_batch_levels_per_channel'):
-                callback._batch_levels_per_channel = {}
-            
-            cue_ids = getattr(callback, "_cue_ids_snapshot", ())
             cues_total = 0
             cues_with_pcm = 0
             cues_starved = 0
             cues_partial = 0
-            for cue_id in cue_ids:
-                ring = rings.get(cue_id)
+            envelopes_active = 0
+            for slot in active_slots:
+                ring = slot_rings[slot]
                 if ring is None:
                     continue
                 cues_total += 1
                 try:
+                    # Scheduled start (PlayCueCommand.start_at_sample / start_quantum_frames):
+                    # leave the cue untouched until the block that contains its start sample.
+                    start_at = slot_start_at[slot]
+                    if start_at >= block_end:
+                        continue
+
                     # If we have never received PCM for this cue yet, don't pull/mix at all.
                     # This avoids injecting silence mid-buffer and reduces chance of a start click.
                     if ring.frames <= 0:
@@ -896,82 +926,106 @@ def output_process_main(cfg: OutputConfig, cmd_q: mp.Queue, pcm_q: mp.Queue, eve
 
                     cues_with_pcm += 1
 
-                    chunk, done, filled, restart_index = ring.pull(frames, cfg.channels)
+                    # Sample-accurate start: the cue begins `offset` samples into this block.
+                    # If its PCM arrived after the start sample, it starts now (late).
+                    offset = 0
+                    if start_at >= 0:
+                        slot_start_at[slot] = -1
+                        if start_at >= pos:
+                            offset = int(start_at - pos)
+                        else:
+                            callback._late_starts += 1
+                            callback._last_late_frames = int(pos - start_at)
+
+                    row = mixer.add()
+                    block = mixer.block(row)
+                    if offset:
+                        block[:offset] = 0.0
+                    _, done, filled, restart_index = ring.pull(frames - offset, cfg.channels, out=block[offset:])
+                    end = offset + filled
+                    if restart_index is not None:
+                        restart_index += offset
 
                     # Track partial fills (padding happens inside ring.pull via zero-filled remainder)
-                    if filled < frames and not done:
-                        padded = int(frames - filled)
+                    if end < frames and not done:
+                        padded = int(frames - end)
                         ring.partial_fill_count += 1
                         ring.partial_padded_frames_total += padded
                         ring.last_partial_padded_frames = padded
                         cues_partial += 1
-                    
-                    env = envelopes.get(cue_id)
+
+                    gain_row = mixer.gain_row(row)
+                    env = slot_envelopes[slot]
                     if env:
-                        # Use batch gain computation when multiple envelopes are active (>=3)
-                        # Batch mode is much faster for multiple concurrent fades
-                        if active_envelopes >= 3:
-                            # Batch mode: compute all gains at once (vectorized)
-                            batch_gains = env.compute_batch_gains(chunk.shape[0])
-                            # Vectorized gain application: chunk *= gains (per-channel broadcast)
-                            chunk *= batch_gains[:, None]
-                            gains[cue_id] = batch_gains[-1] if len(batch_gains) > 0 else env.target
-                            if env.frames_left <= 0:
-                                gains[cue_id] = env.target
-                                envelopes.pop(cue_id, None)
-                                if env.target == 0.0:
-                                    ring.finished_pending = True
-                                    ring.request_pending = False
-                                    # Request decoder stop; let EOF naturally propagate when all buffered frames consumed
-                                    try:
-                                        decode_cmd_q.put_nowait(DecodeStop(cue_id=cue_id))
-                                    except Exception:
-                                        pass
-                        else:
-                            # Per-sample mode: original behavior for low concurrency
-                            for i in range(chunk.shape[0]):
-                                g = env.next_gain()
-                                chunk[i] *= g
-                                gains[cue_id] = g
-                                if env.frames_left <= 0:
-                                    gains[cue_id] = env.target
-                                    envelopes.pop(cue_id, None)
-                                    if env.target == 0.0:
-                                        ring.finished_pending = True
-                                        ring.request_pending = False
-                                        # Request decoder stop; let EOF naturally propagate when all buffered frames consumed
-                                        try:
-                                            decode_cmd_q.put_nowait(DecodeStop(cue_id=cue_id))
-                                        except Exception:
-                                            pass
-                                    for j in range(i+1, chunk.shape[0]):
-                                        chunk[j] *= env.target
-                                    break
+                        # Vectorized envelope for every active fade (applied in the batched mix).
+                        # A cue starting mid-block starts its envelope at its first sample.
+                        envelopes_active += 1
+                        if offset:
+                            gain_row[:offset] = 0.0
+                        env.fill_gains(gain_row[offset:])
+                        slot_gain[slot] = gain_row[-1] if frames > 0 else env.target
+                        if env.frames_left <= 0:
+                            slot_gain[slot] = env.target
+                            slot_envelopes[slot] = None
+                            if env.target == 0.0:
+                                ring.finished_pending = True
+                                ring.request_pending = False
+                                # Request decoder stop; let EOF naturally propagate when all buffered frames consumed
+                                try:
+                                    decode_cmd_q.put_nowait(DecodeStop(cue_id=slots.cue_ids[slot]))
+                                except Exception:
+                                    pass
                     else:
-                        gain_val = gains.get(cue_id, 1.0)
-                        chunk *= gain_val
+                        gain_row.fill(slot_gain[slot])
 
                     # If this is the final audio block for this cue (EOF reached and no buffered
                     # frames remain after this pull), apply a short fade-to-zero at the end of the
                     # block. This avoids a hard step to silence on the next callback.
                     if eof_fade_frames > 0 and filled > 0:
                         try:
-                            is_final_block = bool(ring.eof and ring.frames == 0 and (not ring.q))
+                            is_final_block = bool(ring.eof and ring.frames == 0)
                         except Exception:
                             is_final_block = False
                         if is_final_block:
                             fade_n = int(min(filled, eof_fade_frames))
                             if fade_n > 1:
-                                start = int(filled - fade_n)
-                                inv = 1.0 / float(fade_n - 1)
-                                for i in range(fade_n):
-                                    g = 1.0 - (float(i) * inv)
-                                    chunk[start + i] *= g
+                                ramp = eof_fade_ramp if fade_n == eof_fade_frames else np.linspace(1.0, 0.0, fade_n, dtype=np.float32)
+                                gain_row[end - fade_n : end] *= ramp
                             else:
-                                chunk[filled - 1] *= 0.0
+                                gain_row[end - 1] = 0.0
+
+                    if filled > 0:
+                        # Elapsed/remaining time: main loop converts these at telemetry rate.
+                        slot_consumed[slot] += filled
+                        slot_remaining[slot] = ring.frames
+                        slot_time_dirty[slot] = True
+
+                    mixed_slots[len(mixed)] = slot
+                    mixed.append((slot, ring, row, end, restart_index))
+
+                    # Mark cue finished pending; main loop will emit event reliably
+                    if done:
+                        ring.finished_pending = True
+                        # Clean up envelope and gain when cue finishes
+                        slot_envelopes[slot] = None
+                        slot_gain[slot] = 1.0
+                except Exception:
+                    pass
+
+            mixer.mix(outdata)
+            # Mix size for the callback load histogram.
+            callback._cb_cues = len(mixed)
+            callback._cb_envelopes = envelopes_active
+
+            # Post-mix pass: per-cue glitch diagnostics read the post-gain mixer rows.
+            for slot, ring, row, end, restart_index in mixed:
+                if end <= 0 or not enable_glitch_diag:
+                    continue
+                try:
+                    chunk = mixer.block(row)
 
                     # Glitch diagnostics (per-cue): loop restart discontinuity.
-                    if enable_glitch_diag and restart_index is not None and filled > 0:
+                    if enable_glitch_diag and restart_index is not None:
                         try:
                             if restart_index == 0:
                                 prev = ring.last_out_sample
@@ -991,89 +1045,35 @@ def output_process_main(cfg: OutputConfig, cmd_q: mp.Queue, pcm_q: mp.Queue, eve
                             pass
 
                     # Glitch diagnostics (per-cue): partial-fill step to zero padding.
-                    if enable_glitch_diag and filled > 0 and filled < frames:
+                    if enable_glitch_diag and end < frames:
                         try:
-                            ring.last_partial_step_to_zero = float(np.max(np.abs(chunk[filled - 1])))
+                            ring.last_partial_step_to_zero = float(np.max(np.abs(chunk[end - 1])))
                         except Exception:
                             pass
 
                     # Track last output sample for this cue (post-gain) for boundary comparisons.
-                    if filled > 0:
+                    if enable_glitch_diag:
                         try:
                             if ring.last_out_sample is None:
-                                ring.last_out_sample = np.array(chunk[filled - 1], dtype=np.float32)
+                                ring.last_out_sample = np.array(chunk[end - 1], dtype=np.float32)
                             else:
-                                ring.last_out_sample[:] = chunk[filled - 1]
+                                ring.last_out_sample[:] = chunk[end - 1]
                         except Exception:
                             pass
-                    
-                    outdata += chunk
-
-                    # Telemetry: accumulate for batching - send one batch message per callback
-                    # Skip entirely during bulk fades (>6 concurrent envelopes) to prevent event queue congestion
-                    if filled > 0:
-                        cue_samples_consumed[cue_id] = cue_samples_consumed.get(cue_id, 0) + filled
-                        elapsed_seconds = cue_samples_consumed[cue_id] / float(cfg.sample_rate)
-                        remaining_seconds = ring.frames / float(cfg.sample_rate) if cfg.sample_rate > 0 else 0.0
-                        
-                        # Accumulate time for this cue
-                        batch_times[cue_id] = (elapsed_seconds, remaining_seconds)
-                        
-                        if (not skip_telemetry) and (not disable_rt_meters):
-                            # Normal case: accumulate level data for this cue (both overall and per-channel)
-                            segment = chunk[:filled]
-                            try:
-                                rms = float(np.sqrt(np.mean(np.square(segment))))
-                            except Exception:
-                                rms = 0.0
-                            try:
-                                peak = float(np.max(np.abs(segment)))
-                            except Exception:
-                                peak = 0.0
-                            batch_levels[cue_id] = (rms, peak)
-                            
-                            # Calculate per-channel levels for each audio channel
-                            rms_per_channel = []
-                            peak_per_channel = []
-                            for ch in range(cfg.channels):
-                                try:
-                                    ch_data = segment[:, ch]
-                                    ch_rms = float(np.sqrt(np.mean(np.square(ch_data))))
-                                    ch_peak = float(np.max(np.abs(ch_data)))
-                                    rms_per_channel.append(ch_rms)
-                                    peak_per_channel.append(ch_peak)
-                                except Exception:
-                                    rms_per_channel.append(0.0)
-                                    peak_per_channel.append(0.0)
-                            
-                            # Store per-channel levels for batching
-                            callback._batch_levels_per_channel[cue_id] = (rms_per_channel, peak_per_channel)
-                        else:
-                            # During bulk fade: send zero levels to indicate we're not computing meters
-                            batch_levels[cue_id] = (-64.0, -64.0)
-                    
-                    # Mark cue finished pending; main loop will emit event reliably
-                    if done:
-                        ring.finished_pending = True
-                        # Clean up envelope and gains when cue finishes
-                        envelopes.pop(cue_id, None)
-                        gains.pop(cue_id, None)
                 except Exception:
                     pass
-            
-            # Cache batched telemetry (main loop emits at ~60Hz).
-            try:
-                callback._latest_batch_levels = batch_levels if batch_levels else None
-                batch_levels_per_ch = getattr(callback, '_batch_levels_per_channel', {})
-                callback._latest_batch_levels_per_ch = batch_levels_per_ch if batch_levels_per_ch else None
-                callback._latest_batch_times = batch_times if batch_times else None
-            except Exception:
-                pass
-            # Clear per-channel cache for next cycle.
-            callback._batch_levels_per_channel = {}
-            
+
             np.clip(outdata, -1.0, 1.0, out=outdata)
 
+            # Meters: hand the post-fader cue rows and the master block to the meter
+            # worker thread (copy into a preallocated tap slot; dropped if it falls behind).
+            meter_tap = callback._meter_tap
+            if meter_tap is not None and meter_tap.channels == cfg.channels:
+                try:
+                    meter_tap.publish(mixed_slots[: len(mixed)], mixer.rows(), outdata)
+                except Exception:
+                    pass
+
             # Glitch diagnostics (master): detect large block-boundary jumps.
             # NOTE: A simple absolute threshold can false-positive on normal high-frequency content.
             # We therefore gate logging to either:
@@ -1146,42 +1146,6 @@ def output_process_main(cfg: OutputConfig, cmd_q: mp.Queue, pcm_q: mp.Queue, eve
                     callback._prev_end_max_delta = float(cur_end_max_delta)
                 except Exception:
                     pass
-            
-            # Calculate and emit master output levels (per-channel RMS and peak)
-            if not disable_rt_meters:
-                master_event = None
-                try:
-                    master_rms_per_channel = []
-                    master_peak_per_channel = []
-                    for ch in range(cfg.channels):
-                        channel_data = outdata[:, ch]
-                        rms = float(np.sqrt(np.mean(np.square(channel_data))))
-                        peak = float(np.max(np.abs(channel_data)))
-                        master_rms_per_channel.append(rms)
-                        master_peak_per_channel.append(peak)
-
-                    # Convert linear RMS/peak to dB (avoid log(0))
-                    master_rms_db = []
-                    master_peak_db = []
-                    for rms, peak in zip(master_rms_per_channel, master_peak_per_channel):
-                        rms_db = 20 * np.log10(rms) if rms > 0 else -120.0
-                        peak_db = 20 * np.log10(peak) if peak > 0 else -120.0
-                        master_rms_db.append(float(rms_db))
-                        master_peak_db.append(float(peak_db))
-
-                    master_event = MasterLevelsEvent(rms=master_rms_db, peak=master_peak_db)
-                except Exception:
-                    master_event = None
-                if master_event is not None:
-                    try:
-                        callback._latest_master_event = master_event
-                    except Exception:
-                        pass
-            else:
-                try:
-                    callback._latest_master_event = None
-                except Exception:
-                    pass
         except Exception as ex:
             # RT-safe observability: record that something went wrong in the callback.
             # The main loop can log this at telemetry rate.
@@ -1195,6 +1159,29 @@ def output_process_main(cfg: OutputConfig, cmd_q: mp.Queue, pcm_q: mp.Queue, eve
             except Exception:
                 pass
 
+    def callback(outdata, frames, t, status):
+        cb_start_perf = None
+        if enable_rt_timing or cb_hist is not None:
+            try:
+                cb_start_perf = time.perf_counter()
+            except Exception:
+                cb_start_perf = None
+
+        ring = master_ring
+        if ring is None:
+            render_block(outdata, frames, status)
+        else:
+            # Mix-ahead mode: the master mix is already rendered; only copy it out.
+            if status:
+                try:
+                    callback._latest_status = str(status)
+                except Exception:
+                    pass
+            ring.read_into(outdata)
+            thread = mix_thread
+            if thread is not None:
+                thread.wake()
+
         if cb_start_perf is not None:
             try:
                 cb_ms = (time.perf_counter() - cb_start_perf) * 1000.0
@@ -1207,6 +1194,17 @@ def output_process_main(cfg: OutputConfig, cmd_q: mp.Queue, pcm_q: mp.Queue, eve
                     callback._rt_budget_ms = float(budget_ms)
                     if cb_ms > budget_ms:
                         callback._rt_over_budget = int(getattr(callback, "_rt_over_budget", 0)) + 1
+                else:
+                    budget_ms = 0.0
+                hist = cb_hist
+                if hist is not None:
+                    hist.record(
+                        cb_ms,
+                        budget_ms,
+                        callback._cb_cues,
+                        callback._cb_envelopes,
+                        bool(status) and bool(getattr(status, "output_underflow", False)),
+                    )
             except Exception:
                 pass
 
@@ -1238,7 +1236,7 @@ def output_process_main(cfg: OutputConfig, cmd_q: mp.Queue, pcm_q: mp.Queue, eve
 
     # Optional RT callback timing instrumentation and A/B load shedding.
     # - Enable timing with STEPD_RT_TIMING=1 (reports outside the callback)
-    # - Disable meters with STEPD_RT_DISABLE_METERS=1 (skips RMS/peak work in callback)
+    # - Disable meters with STEPD_RT_DISABLE_METERS=1 (no tap copy in callback, no meter thread)
     try:
         enable_rt_timing = bool(int(os.environ.get("STEPD_RT_TIMING", "0")))
     except Exception:
@@ -1249,6 +1247,174 @@ def output_process_main(cfg: OutputConfig, cmd_q: mp.Queue, pcm_q: mp.Queue, eve
         disable_rt_meters = False
     last_rt_timing_report_mono = 0.0
 
+    # Callback load histogram: every callback is binned by duration/budget (with cues
+    # mixed, fades active and PortAudio underflow flags); the main loop emits a
+    # CallbackTimingEvent every STEPD_CALLBACK_STATS_MS (0 disables).
+    try:
+        callback_stats_ms = int(os.environ.get("STEPD_CALLBACK_STATS_MS", str(DEFAULT_CALLBACK_STATS_MS)).strip() or "0")
+    except Exception:
+        callback_stats_ms = DEFAULT_CALLBACK_STATS_MS
+    cb_hist: CallbackHistogram | None = CallbackHistogram() if callback_stats_ms > 0 else None
+    callback._cb_cues = 0
+    callback._cb_envelopes = 0
+    last_callback_stats_mono = time.monotonic()
+
+    # Output-stream sample clock (advanced by render_block) and scheduled-start counters.
+    # OutputClockEvent publishes the clock so the engine/GUI can pick start samples;
+    # quantized starts land at least STEPD_OUTPUT_START_LEAD_MS after the command arrives.
+    callback._render_pos = 0
+    callback._late_starts = 0
+    callback._last_late_frames = 0
+    last_late_starts = 0
+    _clock_event_interval = 0.5
+    last_clock_event_mono = 0.0
+    try:
+        start_lead_ms = int(os.environ.get("STEPD_OUTPUT_START_LEAD_MS", str(DEFAULT_OUTPUT_START_LEAD_MS)).strip() or "0")
+    except Exception:
+        start_lead_ms = DEFAULT_OUTPUT_START_LEAD_MS
+    start_lead_ms = max(0, min(2000, start_lead_ms))
+
+    def _resolve_start_sample(msg: OutputStartCue) -> int | None:
+        """Output-stream sample a new cue starts on, or None to start once PCM is buffered."""
+        if msg.is_loop_restart:
+            return None
+        # The block being rendered right now can no longer change; start after it.
+        earliest = int(callback._render_pos) + (cfg.block_frames if cfg.block_frames > 0 else 512)
+        if msg.start_at_sample is not None:
+            start = int(msg.start_at_sample)
+        elif msg.start_quantum_frames > 0:
+            quantum = int(msg.start_quantum_frames)
+            lead = earliest + int(cfg.sample_rate * start_lead_ms / 1000)
+            start = -(-lead // quantum) * quantum
+        else:
+            return None
+        if start < earliest:
+            _log(f"[START-CUE-SCHEDULE] cue={msg.cue_id[:8]} start={start} already passed (clock={earliest}); starting late")
+        else:
+            _log(f"[START-CUE-SCHEDULE] cue={msg.cue_id[:8]} start={start} in {start - earliest}fr")
+        return max(0, start)
+
+    # Meter worker: RMS/peak/true-peak/LUFS are computed off the RT thread from a
+    # post-fader tap ring the callback fills. Rebuilt when channels/sample rate change.
+    try:
+        meter_tap_slots = int(os.environ.get("STEPD_METER_TAP_SLOTS", str(DEFAULT_METER_TAP_SLOTS)).strip() or "0")
+    except Exception:
+        meter_tap_slots = DEFAULT_METER_TAP_SLOTS
+    try:
+        meter_true_peak = bool(int(os.environ.get("STEPD_METER_TRUE_PEAK", str(DEFAULT_METER_TRUE_PEAK)).strip() or "0"))
+    except Exception:
+        meter_true_peak = bool(DEFAULT_METER_TRUE_PEAK)
+    meter_worker: MeterWorker | None = None
+    last_meter_snapshot: dict | None = None
+
+    # Optional mix-ahead mode: a thread renders the master mix STEPD_OUTPUT_AHEAD_BLOCKS
+    # blocks ahead into a MasterRing and the PortAudio callback only copies from it.
+    # Adds ahead_blocks * block_frames of latency; 0 (default) mixes inside the callback.
+    try:
+        output_ahead_blocks = int(
+            os.environ.get("STEPD_OUTPUT_AHEAD_BLOCKS", str(DEFAULT_OUTPUT_AHEAD_BLOCKS)).strip() or "0"
+        )
+    except Exception:
+        output_ahead_blocks = DEFAULT_OUTPUT_AHEAD_BLOCKS
+    output_ahead_blocks = max(0, min(64, output_ahead_blocks))
+    master_ring: MasterRing | None = None
+    mix_thread: MixAheadThread | None = None
+    last_ahead_underruns = 0
+
+    # Offline sink state (see engine/processes/offline_sink.py).
+    try:
+        offline_speed = float(os.environ.get("STEPD_OUTPUT_SINK_SPEED", "0").strip() or "0")
+    except Exception:
+        offline_speed = 0.0
+    offline_writer: MasterWriter | None = None
+    # STEPD_OUTPUT_SINK_GATED=1: the sink starts held at sample 0 and renders only up
+    # to the last OutputRenderUntil sample (render_scenario.py steps by rendered samples).
+    offline_gated = offline_sink is not None and os.environ.get("STEPD_OUTPUT_SINK_GATED", "").strip() == "1"
+    offline_render_limit: int | None = 0 if offline_gated else None
+    if offline_gated:
+        output_ahead_blocks = 0  # a mix-ahead thread would render past the hold
+    last_clock_event_pos = -1
+
+    def _offline_gate(frames: int) -> bool:
+        limit = offline_render_limit
+        return limit is None or int(callback._render_pos) + int(frames) <= limit
+
+    def _offline_held() -> bool:
+        limit = offline_render_limit
+        block = cfg.block_frames if cfg.block_frames > 0 else 512
+        return limit is not None and int(callback._render_pos) + block > limit
+
+    def _offline_active() -> bool:
+        return bool(slots.active) or bool(pending_starts)
+
+    def _offline_ready(frames: int) -> bool:
+        # A real device would not wait for the decoder; offline rendering does, so that
+        # faster-than-realtime runs do not invent underflows.
+        if pending_starts:
+            return False
+        slot_rings = slots.rings
+        for slot in slots.active:
+            ring = slot_rings[slot]
+            if ring is None or ring.eof or ring.finished_pending or not ring.started:
+                continue
+            if ring.frames < frames:
+                return False
+        return True
+
+    def _render_ahead(block: np.ndarray) -> None:
+        render_block(block, block.shape[0], None)
+
+    def _restart_mix_ahead() -> None:
+        nonlocal master_ring, mix_thread
+        old = mix_thread
+        master_ring = None
+        mix_thread = None
+        if old is not None:
+            old.stop()
+        if output_ahead_blocks <= 0:
+            return
+        block_frames = cfg.block_frames if cfg.block_frames > 0 else 512
+        try:
+            ring = MasterRing(block_frames * (output_ahead_blocks + 1), cfg.channels)
+            thread = MixAheadThread(ring, _render_ahead, block_frames, output_ahead_blocks, cfg.sample_rate)
+            thread.fill()  # prime with silence so the first callback never underruns
+            mix_thread = thread
+            master_ring = ring
+            thread.start()
+        except Exception as ex:
+            _log(f"EXCEPTION starting mix-ahead thread: {type(ex).__name__}: {ex}")
+
+    def _ensure_meter_worker() -> None:
+        nonlocal meter_worker
+        if disable_rt_meters:
+            return
+        if (
+            meter_worker is not None
+            and meter_worker.channels == cfg.channels
+            and meter_worker.sample_rate == cfg.sample_rate
+        ):
+            return
+        old = meter_worker
+        try:
+            callback._meter_tap = None
+        except Exception:
+            pass
+        if old is not None:
+            old.stop()
+        try:
+            tap = MeterTap(cfg.channels, max_frames=cfg.block_frames, slots=max(2, meter_tap_slots), names=slots.cue_ids)
+            meter_worker = MeterWorker(
+                tap,
+                cfg.sample_rate,
+                publish_hz=telemetry_hz,
+                enable_true_peak=meter_true_peak,
+            )
+            meter_worker.start()
+            callback._meter_tap = tap
+        except Exception as ex:
+            meter_worker = None
+            _log(f"EXCEPTION starting meter worker: {type(ex).__name__}: {ex}")
+
     # Optional decoded-PCM boundary diagnostics (outside RT callback).
     # Detect discontinuities between consecutive decoded chunks for a cue.
     try:
@@ -1262,6 +1428,24 @@ def output_process_main(cfg: OutputConfig, cmd_q: mp.Queue, pcm_q: mp.Queue, eve
     _pcm_prev_tail: dict[str, np.ndarray] = {}
     _pcm_prev_end_max_delta: dict[str, float] = {}
 
+    # Shared-memory PCM transport: chunks may arrive as slab descriptors (pcm=None).
+    shm_pool: PcmSlabPool | None = None
+    if pcm_pool is not None:
+        try:
+            shm_pool = PcmSlabPool.attach(pcm_pool)
+            _log(f"[PCM-SHM] attached slabs={pcm_pool.slab_count} slab_frames={pcm_pool.slab_frames} ch={pcm_pool.channels}")
+        except Exception as ex:
+            _log(f"[PCM-SHM] attach failed: {type(ex).__name__}: {ex}")
+
+    def _resolve_pcm(chunk: DecodedChunk) -> DecodedChunk | None:
+        """Return `chunk` with inline PCM, copying (and releasing) a shared-memory slab span."""
+        if chunk.pcm is not None:
+            return chunk
+        if chunk.shm_slab is None or shm_pool is None:
+            return None
+        pcm = shm_pool.take(chunk.shm_slab, chunk.shm_offset, chunk.shm_frames)
+        return replace(chunk, pcm=pcm, shm_slab=None)
+
     # Click-free natural EOF handling.
     # When a cue ends exactly on a block boundary, the following callback outputs silence.
     # If the last sample of the previous block was non-zero, that hard step can sound like a click.
@@ -1272,6 +1456,8 @@ def output_process_main(cfg: OutputConfig, cmd_q: mp.Queue, pcm_q: mp.Queue, eve
         eof_fade_ms = 5.0
     eof_fade_ms = max(0.0, min(50.0, eof_fade_ms))
     eof_fade_frames = int(cfg.sample_rate * eof_fade_ms / 1000.0) if (eof_fade_ms > 0 and cfg.sample_rate > 0) else 0
+    # Precomputed 1 -> 0 ramp applied to the final block's gain row (see callback).
+    eof_fade_ramp = np.linspace(1.0, 0.0, eof_fade_frames, dtype=np.float32) if eof_fade_frames > 1 else None
 
     # Buffer sizing (in units of output blocks). Defaults are conservative to hide
     # occasional multi-second decoder gaps without adding excessive memory use.
@@ -1328,6 +1514,15 @@ def output_process_main(cfg: OutputConfig, cmd_q: mp.Queue, pcm_q: mp.Queue, eve
     except Exception:
         starve_warn_frames = max(int(cfg.block_frames), int(DEFAULT_OUTPUT_STARVE_WARN_FRAMES))
 
+    # Per-cue PCM ring capacity (frames). The decoder fills up to target_blocks and may
+    # overshoot by one chunk; anything that does not fit waits in the ring's spill queue.
+    try:
+        ring_capacity_frames = int(os.environ.get("STEPD_OUTPUT_RING_FRAMES", "0").strip() or "0")
+    except Exception:
+        ring_capacity_frames = 0
+    if ring_capacity_frames <= 0:
+        ring_capacity_frames = max(DEFAULT_RING_CAPACITY_FRAMES, 2 * int(cfg.block_frames) * int(target_blocks))
+
     if _pre_clamp_target_blocks != target_blocks or _pre_clamp_low_water_blocks != low_water_blocks:
         try:
             _log(
@@ -1369,7 +1564,7 @@ def output_process_main(cfg: OutputConfig, cmd_q: mp.Queue, pcm_q: mp.Queue, eve
     stream_needs_open = True
 
     def open_stream(device=None):
-        nonlocal stream, cfg, current_device
+        nonlocal stream, cfg, current_device, offline_writer
         if device is None:
             device = current_device
         try:
@@ -1381,17 +1576,40 @@ def output_process_main(cfg: OutputConfig, cmd_q: mp.Queue, pcm_q: mp.Queue, eve
                     pass
         except NameError:
             pass
+        _restart_mix_ahead()
         try:
-            stream = sd.OutputStream(
-                samplerate=cfg.sample_rate,
-                channels=cfg.channels,
-                dtype="float32",
-                blocksize=cfg.block_frames,
-                callback=callback,
-                device=device,
-            )
+            if offline_sink is not None:
+                if offline_writer is None:
+                    offline_writer = MasterWriter(offline_sink[0], offline_sink[1], cfg.sample_rate, cfg.channels)
+                stream = OfflineOutputStream(
+                    samplerate=cfg.sample_rate,
+                    channels=cfg.channels,
+                    blocksize=cfg.block_frames,
+                    callback=callback,
+                    writer=offline_writer,
+                    speed=offline_speed,
+                    ready=_offline_ready,
+                    active=_offline_active,
+                    gate=_offline_gate if offline_gated else None,
+                    # Gated renders are reproducible: wait for the decoder instead of
+                    # rendering an underflow.
+                    max_stall_s=30.0 if offline_gated else 2.0,
+                )
+                device = f"offline:{offline_sink[0]}"
+            else:
+                stream = sd.OutputStream(
+                    samplerate=cfg.sample_rate,
+                    channels=cfg.channels,
+                    dtype="float32",
+                    blocksize=cfg.block_frames,
+                    callback=callback,
+                    device=device,
+                )
             stream.start()
-            _log(f"Opened output stream device={device} sr={cfg.sample_rate} ch={cfg.channels} block={cfg.block_frames}")
+            _log(
+                f"Opened output stream device={device} sr={cfg.sample_rate} ch={cfg.channels} block={cfg.block_frames}"
+                f" ahead_blocks={output_ahead_blocks if master_ring is not None else 0}"
+            )
             return True
         except Exception as ex:
             _log(f"EXCEPTION opening output stream device={device}: {type(ex).__name__}: {ex}")
@@ -1400,20 +1618,26 @@ def output_process_main(cfg: OutputConfig, cmd_q: mp.Queue, pcm_q: mp.Queue, eve
     # Initialize transport state before starting the stream; the RT callback reads it.
     transport_paused = False
     try:
-        callback._cue_ids_snapshot = ()
+        callback._mixer = BatchMixer(cfg.channels, max_frames=cfg.block_frames)
+        callback._mixed_slots = np.zeros(slots.capacity, dtype=np.int64)
+        callback._meter_tap = None
     except Exception:
         pass
+    _ensure_meter_worker()
 
     # Start the output stream immediately so first cue playback is instant.
     # If initial open fails, we will retry on the next cue/device/config message.
     stream_needs_open = not open_stream(device=current_device)
 
+    wakeup = Wakeup([cmd_q, pcm_q])
     try:
         while True:
-            try:
-                msg = cmd_q.get(timeout=0.01)
-            except Exception:
-                msg = None
+            msg = None
+            if wakeup.wait(_ACTIVE_WAIT_S if (rings or pending_starts) else _IDLE_WAIT_S):
+                try:
+                    msg = cmd_q.get_nowait()
+                except Exception:
+                    msg = None
 
             # IMPORTANT: Apply loop enable/disable immediately (before draining PCM).
             # Otherwise, a loop-restart PCM chunk can be drained and played before we
@@ -1450,14 +1674,15 @@ def output_process_main(cfg: OutputConfig, cmd_q: mp.Queue, pcm_q: mp.Queue, eve
                 except Exception:
                     pass
             _drain_pcm()
+            # Move PCM that did not fit into its ring once the callback has freed space.
+            for ring in rings.values():
+                try:
+                    ring.flush()
+                except Exception:
+                    pass
             _report_starvation()
-
-            # Provide the RT callback a stable, non-iterating view of active cue ids.
-            # (Avoids dict-iteration races between main thread and PortAudio callback thread.)
-            try:
-                callback._cue_ids_snapshot = tuple(rings.keys())
-            except Exception:
-                pass
+            # The RT callback iterates `slots.active` (an immutable tuple replaced on
+            # acquire/release), so it never iterates a dict the main loop is mutating.
 
             # -------------------------------------------------
             # Emit cached telemetry at ~60Hz (outside RT callback)
@@ -1589,12 +1814,64 @@ def output_process_main(cfg: OutputConfig, cmd_q: mp.Queue, pcm_q: mp.Queue, eve
                         except Exception:
                             pass
 
-                    latest_levels = getattr(callback, "_latest_batch_levels", None)
-                    latest_levels_per_ch = getattr(callback, "_latest_batch_levels_per_ch", None)
+                    # Callback load histogram (best-effort diagnostics event).
+                    if cb_hist is not None and (now_mono - last_callback_stats_mono) * 1000.0 >= callback_stats_ms:
+                        last_callback_stats_mono = now_mono
+                        try:
+                            hist_snapshot = cb_hist.snapshot()
+                            if hist_snapshot is not None:
+                                if hist_snapshot["underflows"] and enable_rt_timing:
+                                    _log(
+                                        f"[RT-HIST] underflows={hist_snapshot['underflows']} "
+                                        f"over_budget={hist_snapshot['over_budget']} p99_ms={hist_snapshot['p99_ms']:.3f} "
+                                        f"max_ms={hist_snapshot['max_ms']:.3f} max_cues={hist_snapshot['max_cues']} "
+                                        f"budget_ms={hist_snapshot['budget_ms']:.3f}"
+                                    )
+                                event_q.put_nowait(CallbackTimingEvent(**hist_snapshot))
+                        except Exception:
+                            pass
+
+                    # Output sample clock for scheduled starts (best-effort diagnostics event).
+                    if callback._late_starts != last_late_starts:
+                        last_late_starts = callback._late_starts
+                        _log(f"[START-LATE] count={last_late_starts} last_late_frames={callback._last_late_frames}")
+                    # A gated offline sink publishes its clock as soon as it is held.
+                    held = offline_gated and _offline_held() and int(callback._render_pos) != last_clock_event_pos
+                    if held or (now_mono - last_clock_event_mono) >= _clock_event_interval:
+                        last_clock_event_mono = now_mono
+                        last_clock_event_pos = int(callback._render_pos)
+                        try:
+                            event_q.put_nowait(OutputClockEvent(
+                                sample_pos=int(callback._render_pos),
+                                sample_rate=int(cfg.sample_rate),
+                                mono_time=time.monotonic(),
+                                scheduled=slots.scheduled_count(),
+                                late_starts=int(callback._late_starts),
+                                last_late_frames=int(callback._last_late_frames),
+                            ))
+                        except Exception:
+                            pass
+
+                    if master_ring is not None and master_ring.underruns != last_ahead_underruns:
+                        _log(
+                            f"[MIX-AHEAD-UNDERRUN] count={master_ring.underruns} "
+                            f"missing_frames_total={master_ring.underrun_frames} ahead_blocks={output_ahead_blocks}"
+                        )
+                        last_ahead_underruns = master_ring.underruns
+
+                    _ensure_meter_worker()
+                    meters = meter_worker.latest() if meter_worker is not None else None
+                    if meters is last_meter_snapshot:
+                        meters = None  # nothing new since the last telemetry tick
+                    else:
+                        last_meter_snapshot = meters
+                    latest_levels = meters["cue_levels"] if meters is not None else None
                     if latest_levels:
                         event = BatchCueLevelsEvent(
                             cue_levels=latest_levels,
-                            cue_levels_per_channel=latest_levels_per_ch,
+                            cue_levels_per_channel=meters["cue_levels_per_channel"] or None,
+                            cue_true_peak=meters["cue_true_peak"] or None,
+                            cue_lufs_momentary=meters["cue_lufs_momentary"] or None,
                         )
                         try:
                             event_q.put_nowait(event)
@@ -1602,7 +1879,7 @@ def output_process_main(cfg: OutputConfig, cmd_q: mp.Queue, pcm_q: mp.Queue, eve
                         except Exception:
                             telemetry_probe["levels_dropped"] += 1
 
-                    latest_times = getattr(callback, "_latest_batch_times", None)
+                    latest_times = slots.collect_times(cfg.sample_rate)
                     if latest_times:
                         event = BatchCueTimeEvent(cue_times=latest_times)
                         try:
@@ -1611,7 +1888,14 @@ def output_process_main(cfg: OutputConfig, cmd_q: mp.Queue, pcm_q: mp.Queue, eve
                         except Exception:
                             telemetry_probe["times_dropped"] += 1
 
-                    latest_master = getattr(callback, "_latest_master_event", None)
+                    latest_master = None
+                    if meters is not None and meters["master_rms_db"] is not None:
+                        latest_master = MasterLevelsEvent(
+                            rms=meters["master_rms_db"],
+                            peak=meters["master_peak_db"],
+                            true_peak=meters["master_true_peak_db"],
+                            lufs_momentary=meters["master_lufs_momentary"],
+                        )
                     if latest_master is not None:
                         try:
                             event_q.put_nowait(latest_master)
@@ -1634,8 +1918,11 @@ def output_process_main(cfg: OutputConfig, cmd_q: mp.Queue, pcm_q: mp.Queue, eve
                         event_q.put(("finished", cue_id, removal_reason))
                         lifecycle_probe["finished_sent"] += 1
                         rings.pop(cue_id, None)
-                        gains.pop(cue_id, None)
-                        cue_samples_consumed.pop(cue_id, None)
+                        released = slots.release(cue_id)
+                        if meter_worker is not None:
+                            if released is not None:
+                                meter_worker.tap.retire(released)
+                            meter_worker.forget(cue_id)
                         looping_cues.discard(cue_id)
                     except Exception:
                         lifecycle_probe["finished_failed"] += 1
@@ -1668,14 +1955,14 @@ def output_process_main(cfg: OutputConfig, cmd_q: mp.Queue, pcm_q: mp.Queue, eve
                     
                     # Check if any fade envelopes have completed to silence
                     # (this must happen even if the cue has 0 frames and isn't being processed by callback)
-                    env = envelopes.get(cue_id)
+                    env = slots.envelope(cue_id)
                     if env and env.frames_left <= 0 and env.target == 0.0:
                         # Envelope completed to silence - mark finished immediately
                         _log(f"[MAIN-LOOP-ENVELOPE-COMPLETE] cue={cue_id} fade complete, marking finished_pending")
                         removal_reasons[cue_id] = "fade_complete"  # Track fade completion as removal reason
                         ring.finished_pending = True
                         ring.request_pending = False
-                        envelopes.pop(cue_id, None)
+                        slots.set_envelope(cue_id, None)
                         # Tell decoder to stop processing this cue (non-blocking, may fail silently)
                         try:
                             decode_cmd_q.put_nowait(DecodeStop(cue_id=cue_id))
@@ -1697,7 +1984,7 @@ def output_process_main(cfg: OutputConfig, cmd_q: mp.Queue, pcm_q: mp.Queue, eve
                                 ring.eof = True
                                 ring.request_pending = False
                                 ring.request_started_at = None
-                                envelopes.pop(cue_id, None)
+                                slots.set_envelope(cue_id, None)
                                 continue
                     
                     if ring.eof:
@@ -1725,7 +2012,7 @@ def output_process_main(cfg: OutputConfig, cmd_q: mp.Queue, pcm_q: mp.Queue, eve
                                 # Keep it bounded to avoid runaway credit during slow decodes.
                                 retry_cap = cfg.block_frames * (max(target_blocks, 192) if active_rings > 8 else target_blocks)
                                 credit = needed if not should_retry else min(needed, retry_cap)
-                                decode_cmd_q.put_nowait(BufferRequest(cue_id, int(credit)))
+                                decode_cmd_q.put_nowait(BufferRequest(cue_id, int(credit), int(ring.frames)))
                                 ring.request_pending = True
                                 ring.request_started_at = current_time
                                 ring.request_started_mono = current_mono
@@ -1758,11 +2045,17 @@ def output_process_main(cfg: OutputConfig, cmd_q: mp.Queue, pcm_q: mp.Queue, eve
                     pcm = pcm_q.get_nowait()
                 except Exception:
                     pcm = None
+                if isinstance(pcm, DecodedChunk):
+                    try:
+                        pcm = _resolve_pcm(pcm)
+                    except Exception:
+                        pcm = None
                 if isinstance(pcm, DecodedChunk):
                     ring = rings.get(pcm.cue_id)
                     if ring is None:
-                        ring = _Ring()
+                        ring = _Ring(ring_capacity_frames)
                         rings[pcm.cue_id] = ring
+                        slots.acquire(pcm.cue_id, ring)
                     ring.push(pcm.pcm, pcm.eof, is_loop_restart=bool(getattr(pcm, "is_loop_restart", False)))
                 _flush_probe_logs()
                 continue
@@ -1781,16 +2074,16 @@ def output_process_main(cfg: OutputConfig, cmd_q: mp.Queue, pcm_q: mp.Queue, eve
                     if existing_ring:
                         _log(f"[START-CUE-REUSE] Ring exists for cue={msg.cue_id[:8]} eof={existing_ring.eof} frames={existing_ring.frames} finished={existing_ring.finished_pending}")
                     
-                    ring = rings.setdefault(msg.cue_id, _Ring())
+                    ring = rings.setdefault(msg.cue_id, _Ring(ring_capacity_frames))
+                    slots.acquire(msg.cue_id, ring, start_at=_resolve_start_sample(msg))
                     _log(f"[START-CUE] cue={msg.cue_id[:8]} is_new={not existing_ring} fade_in={msg.fade_in_duration_ms}")
                     
                     # If this is a loop restart, clear the old envelope and ring EOF flag
                     if msg.is_loop_restart:
                         _log(f"[START-CUE-LOOP-RESTART] cue={msg.cue_id[:8]}")
-                        envelopes.pop(msg.cue_id, None)
+                        slots.set_envelope(msg.cue_id, None)
                         ring.eof = False
-                        ring.frames = 0
-                        ring.q.clear()
+                        ring.clear()
                         ring.last_pcm_time = None
                         ring.request_pending = False
                         ring.request_started_at = None
@@ -1800,8 +2093,7 @@ def output_process_main(cfg: OutputConfig, cmd_q: mp.Queue, pcm_q: mp.Queue, eve
                         if ring.eof or ring.frames > 0 or ring.finished_pending:
                             _log(f"[START-CUE-STALE] cue={msg.cue_id[:8]} WARNING: eof={ring.eof} frames={ring.frames} finished={ring.finished_pending}")
                             ring.eof = False
-                            ring.frames = 0
-                            ring.q.clear()
+                            ring.clear()
                             ring.finished_pending = False
                             ring.last_pcm_time = None
                             ring.request_pending = False
@@ -1811,7 +2103,7 @@ def output_process_main(cfg: OutputConfig, cmd_q: mp.Queue, pcm_q: mp.Queue, eve
                         # Initial request: fill to the target buffer immediately so the
                         # output callback has headroom before any subsequent decode stalls.
                         initial_needed = cfg.block_frames * target_blocks
-                        decode_cmd_q.put_nowait(BufferRequest(msg.cue_id, initial_needed))
+                        decode_cmd_q.put_nowait(BufferRequest(msg.cue_id, initial_needed, int(ring.frames)))
                         ring.request_pending = True
                         ring.request_started_at = current_time
                         ring.request_started_mono = current_mono
@@ -1858,25 +2150,11 @@ def output_process_main(cfg: OutputConfig, cmd_q: mp.Queue, pcm_q: mp.Queue, eve
                             fade_frames = max(1, min(int(ring.frames), fade_frames))
 
                             # Truncate ring to the first `fade_frames` frames.
-                            kept_q: deque[tuple[np.ndarray, bool]] = deque()
-                            kept = 0
-                            while ring.q and kept < fade_frames:
-                                pcm, is_restart = ring.q.popleft()
-                                take = min(int(pcm.shape[0]), fade_frames - kept)
-                                if take <= 0:
-                                    break
-                                if take == int(pcm.shape[0]):
-                                    kept_q.append((pcm, bool(is_restart)))
-                                else:
-                                    kept_q.append((pcm[:take].copy(), bool(is_restart)))
-                                kept += take
-                            ring.q = kept_q
-                            ring.frames = kept
+                            ring.truncate(fade_frames)
 
                             # Fade current gain to zero over the remaining frames.
-                            cur = float(gains.get(msg.cue_id, 1.0))
-                            envelopes[msg.cue_id] = _FadeEnv(cur, 0.0, fade_frames, "equal_power")
-                            gains[msg.cue_id] = cur
+                            cur = slots.get_gain(msg.cue_id)
+                            slots.set_envelope(msg.cue_id, _FadeEnv(cur, 0.0, fade_frames, "equal_power"))
                             ring.eof = True
                             ring.request_pending = False
                             ring.request_started_at = None
@@ -1884,8 +2162,7 @@ def output_process_main(cfg: OutputConfig, cmd_q: mp.Queue, pcm_q: mp.Queue, eve
                         else:
                             # No audio buffered (or fade disabled): stop immediately.
                             ring.eof = True
-                            ring.q.clear()
-                            ring.frames = 0
+                            ring.clear()
                             ring.request_pending = False
                             ring.request_started_at = None
                             ring.finished_pending = True
@@ -1929,9 +2206,9 @@ def output_process_main(cfg: OutputConfig, cmd_q: mp.Queue, pcm_q: mp.Queue, eve
                             # EOF and nothing buffered: fade can't do anything meaningful.
                             _log(f"[OUTPUT-FADE-EOF-EMPTY] cue={msg.cue_id[:8]} eof=1 ring_frames=0 -> finished_pending")
                             ring.finished_pending = True
-                            envelopes.pop(msg.cue_id, None)
+                            slots.set_envelope(msg.cue_id, None)
                         else:
-                            cur = gains.get(msg.cue_id, 1.0)
+                            cur = slots.get_gain(msg.cue_id)
                             _log(
                                 f"[OUTPUT-FADE-START] cue={msg.cue_id[:8]} target_db={msg.target_db} duration_ms={msg.duration_ms} "
                                 f"current_gain={cur} eof={int(bool(ring.eof))} ring_frames={ring_frames}"
@@ -1948,7 +2225,7 @@ def output_process_main(cfg: OutputConfig, cmd_q: mp.Queue, pcm_q: mp.Queue, eve
                             # This prevents envelopes that outlive the ring while still providing a fade.
                             if ring.eof and ring_frames > 0:
                                 fade_frames = min(int(fade_frames), int(ring_frames))
-                            envelopes[msg.cue_id] = _FadeEnv(cur, target, fade_frames, msg.curve)
+                            slots.set_envelope(msg.cue_id, _FadeEnv(cur, target, fade_frames, msg.curve))
                             _log(
                                 f"[OUTPUT-FADE-CREATED] cue={msg.cue_id[:8]} cur={cur} target={target} "
                                 f"frames={fade_frames} curve={msg.curve}"
@@ -1962,10 +2239,10 @@ def output_process_main(cfg: OutputConfig, cmd_q: mp.Queue, pcm_q: mp.Queue, eve
                     if msg.gain_db is not None:
                         # Update gain immediately
                         target = _db_to_lin(msg.gain_db)
-                        old_gain = gains.get(msg.cue_id, 1.0)
-                        gains[msg.cue_id] = target
+                        old_gain = slots.get_gain(msg.cue_id)
                         # Remove any active envelope so static gain takes effect
-                        removed_env = envelopes.pop(msg.cue_id, None)
+                        removed_env = slots.set_envelope(msg.cue_id, None)
+                        slots.set_gain(msg.cue_id, target)
                         _log(f"[OUTPUT-UPDATE-CUE] cue={msg.cue_id} NEW_gain_db={msg.gain_db} linear={target:.6f} (from {old_gain:.6f}), removed_envelope={removed_env is not None}")
                     # Keep output-side loop tracking in sync so it can't get stale when
                     # global loop / override toggles issue UpdateCueCommand(loop_enabled=...).
@@ -2037,7 +2314,7 @@ def output_process_main(cfg: OutputConfig, cmd_q: mp.Queue, pcm_q: mp.Queue, eve
                 try:
                     _log("OutputListDevices received")
                     try:
-                        devs = sd.query_devices()
+                        devs = sd.query_devices() if sd is not None else []
                     except Exception:
                         devs = []
                     try:
@@ -2046,12 +2323,31 @@ def output_process_main(cfg: OutputConfig, cmd_q: mp.Queue, pcm_q: mp.Queue, eve
                         pass
                 except Exception as ex:
                     _log(f"EXCEPTION in OutputListDevices handler: {type(ex).__name__}: {ex}")
+            elif isinstance(msg, OutputRenderUntil):
+                if offline_gated:
+                    offline_render_limit = None if msg.sample is None else max(0, int(msg.sample))
 
             _flush_probe_logs()
     finally:
+        wakeup.close()
         _flush_probe_logs(force=True)
         try:
             stream.stop()
             stream.close()
         except Exception:
             pass
+        if mix_thread is not None:
+            mix_thread.stop()
+        if meter_worker is not None:
+            meter_worker.stop()
+        if offline_writer is not None:
+            try:
+                offline_writer.close()
+                summary = stream.stats.summary() if isinstance(stream, OfflineOutputStream) else {}
+                summary["frames_written"] = int(offline_writer.frames)
+                write_timing_summary(offline_writer.path, summary)
+                _log(f"[OFFLINE-SINK] kind={offline_writer.kind} path={offline_writer.path} stats={summary}")
+            except Exception as ex:
+                _log(f"EXCEPTION closing offline sink: {type(ex).__name__}: {ex}")
+        if shm_pool is not None:
+            shm_pool.close()
@@ -0,0 +1,244 @@
+"""
+Fixed-capacity circular PCM buffer for one output cue.
+
+Replaces the deque of (array, is_loop_restart) chunks the output ring used to
+keep. Decoded chunks are copied into a preallocated float32 (capacity, channels)
+buffer, and loop-restart boundaries are kept as absolute frame positions in a
+small side array. pull_into() is then one or two contiguous copies per segment,
+with no slicing, tuple rebuilding or deque churn on the RT path.
+
+Threading model (single producer / single consumer):
+- Producer (output main loop): push(), flush(), clear(), truncate(),
+  truncate_at_next_restart(). Owns `_write`, `_discard_upto`, `_end_at`, the
+  marker head and the spill queue.
+- Consumer (RT callback or mix-ahead thread): pull_into(). Owns `_read` and the
+  marker tail.
+
+All positions are monotonically increasing frame counters; the buffer index is
+position % capacity. The producer never moves `_read`. Dropping audio is
+expressed as a lower bound (`_discard_upto`) or upper bound (`_end_at`) that
+the consumer applies on its next pull. That keeps clear/truncate race-free
+against a pull already in progress.
+
+If a chunk does not fit, the remainder waits in a producer-side spill queue and
+is written by flush()/push() once the consumer frees space. Memory per cue is
+therefore the fixed buffer plus at most the decoder's over-delivery.
+"""
+from __future__ import annotations
+
+from collections import deque
+
+import numpy as np
+
+
+DEFAULT_MAX_MARKERS = 64
+
+
+class PcmRing:
+    """SPSC float32 circular buffer with loop-restart markers."""
+
+    def __init__(self, capacity_frames: int, channels: int, max_markers: int = DEFAULT_MAX_MARKERS) -> None:
+        self.capacity = max(1, int(capacity_frames))
+        self.channels = max(1, int(channels))
+        self._buf = np.zeros((self.capacity, self.channels), dtype=np.float32)
+        self._markers = np.zeros(max(1, int(max_markers)), dtype=np.int64)
+
+        # Producer-owned
+        self._write = 0
+        self._discard_upto = 0
+        self._end_at: int | None = None
+        self._sealed = False
+        self._marker_head = 0
+        self._spill: deque[tuple[np.ndarray, bool]] = deque()
+        self._spill_frames = 0
+
+        # Consumer-owned
+        self._read = 0
+        self._marker_tail = 0
+        self._spill_discard_requested = False
+
+    # -- accounting (any thread) ------------------------------------------------
+
+    def _readable_bounds(self) -> tuple[int, int]:
+        start = self._read
+        if self._discard_upto > start:
+            start = self._discard_upto
+        end = self._write
+        limit = self._end_at
+        if limit is not None and limit < end:
+            end = limit
+        return start, end
+
+    @property
+    def buffered(self) -> int:
+        """Frames readable from the buffer right now (excludes spill)."""
+        start, end = self._readable_bounds()
+        return end - start if end > start else 0
+
+    @property
+    def frames(self) -> int:
+        """Total frames still to be played: buffered plus spilled."""
+        return self.buffered + self._spill_frames
+
+    @property
+    def spilled(self) -> int:
+        return self._spill_frames
+
+    # -- producer ---------------------------------------------------------------
+
+    def _space(self) -> int:
+        return self.capacity - (self._write - self._read)
+
+    def _write_now(self, pcm: np.ndarray, is_loop_restart: bool) -> int:
+        """Copy as much of `pcm` as fits. Returns frames written."""
+        n = min(int(pcm.shape[0]), self._space())
+        if n <= 0:
+            return 0
+        if is_loop_restart:
+            if self._marker_head - self._marker_tail >= self._markers.shape[0]:
+                return 0  # marker FIFO full: wait in spill until the consumer passes a boundary
+            self._markers[self._marker_head % self._markers.shape[0]] = self._write
+            self._marker_head += 1
+        pos = self._write % self.capacity
+        first = min(n, self.capacity - pos)
+        self._buf[pos : pos + first] = pcm[:first]
+        if n > first:
+            self._buf[: n - first] = pcm[first:n]
+        self._write += n
+        return n
+
+    def push(self, pcm: np.ndarray, *, is_loop_restart: bool = False) -> None:
+        """Append decoded PCM (frames, channels). Ignored after truncate() until clear()."""
+        if self._sealed or pcm.shape[0] == 0:
+            return
+        self.flush()
+        if self._spill:
+            self._spill.append((pcm, bool(is_loop_restart)))
+            self._spill_frames += int(pcm.shape[0])
+            return
+        written = self._write_now(pcm, bool(is_loop_restart))
+        if written < pcm.shape[0]:
+            # A partially written restart chunk already has its marker; the rest is plain audio.
+            rest_is_restart = bool(is_loop_restart) and written == 0
+            self._spill.append((pcm[written:], rest_is_restart))
+            self._spill_frames += int(pcm.shape[0]) - written
+
+    def flush(self) -> int:
+        """Move spilled chunks into the buffer as space allows. Returns frames moved."""
+        if self._spill_discard_requested:
+            self._spill_discard_requested = False
+            self._spill.clear()
+            self._spill_frames = 0
+            return 0
+        moved = 0
+        while self._spill:
+            pcm, is_restart = self._spill[0]
+            written = self._write_now(pcm, is_restart)
+            if written <= 0:
+                break
+            moved += written
+            self._spill_frames -= written
+            if written == pcm.shape[0]:
+                self._spill.popleft()
+            else:
+                self._spill[0] = (pcm[written:], False)
+                break
+        return moved
+
+    def clear(self) -> None:
+        """Drop all buffered and spilled audio and accept new pushes."""
+        self._spill.clear()
+        self._spill_frames = 0
+        self._end_at = None
+        self._sealed = False
+        self._discard_upto = self._write
+
+    def truncate(self, keep_frames: int) -> int:
+        """Keep only the next `keep_frames` readable frames; ignore pushes until clear().
+
+        Returns the number of frames kept.
+        """
+        start, end = self._readable_bounds()
+        keep = max(0, min(int(keep_frames), end - start))
+        self._spill.clear()
+        self._spill_frames = 0
+        self._sealed = True
+        self._end_at = start + keep
+        return keep
+
+    def truncate_at_next_restart(self) -> bool:
+        """Drop audio from the next loop-restart boundary on. Returns True if anything was dropped."""
+        start, end = self._readable_bounds()
+        m = self._markers.shape[0]
+        for i in range(self._marker_tail, self._marker_head):
+            pos = int(self._markers[i % m])
+            if start <= pos < end:
+                self._end_at = pos
+                self._sealed = True
+                self._spill.clear()
+                self._spill_frames = 0
+                return True
+        # Boundary may still be waiting in the spill queue.
+        for idx, (_, is_restart) in enumerate(self._spill):
+            if is_restart:
+                while len(self._spill) > idx:
+                    pcm, _ = self._spill.pop()
+                    self._spill_frames -= int(pcm.shape[0])
+                self._sealed = True
+                return True
+        return False
+
+    # -- consumer ---------------------------------------------------------------
+
+    def pull_into(self, out: np.ndarray, *, stop_at_restart: bool = False) -> tuple[int, int | None, bool]:
+        """Copy up to len(out) frames into `out` and zero-fill the rest.
+
+        Returns (filled, restart_index, stopped):
+        - restart_index: offset in `out` where a loop restart boundary was crossed, or None.
+        - stopped: True if stop_at_restart hit a boundary; everything buffered was dropped.
+        """
+        n = int(out.shape[0])
+        start, end = self._readable_bounds()
+        r = start
+        m = self._markers.shape[0]
+        tail = self._marker_tail
+        head = self._marker_head
+        # Markers left behind by clear()/truncate() are no longer reachable.
+        while tail < head and self._markers[tail % m] < r:
+            tail += 1
+
+        filled = 0
+        restart_index: int | None = None
+        stopped = False
+        while filled < n and r < end:
+            seg_end = end
+            if tail < head:
+                marker = int(self._markers[tail % m])
+                if marker == r:
+                    if stop_at_restart:
+                        # Do not play any samples from the next loop iteration.
+                        r = end
+                        tail = head
+                        stopped = True
+                        self._spill_discard_requested = True
+                        break
+                    if restart_index is None:
+                        restart_index = filled
+                    tail += 1
+                    continue
+                if marker < seg_end:
+                    seg_end = marker
+            take = min(n - filled, seg_end - r)
+            pos = r % self.capacity
+            first = min(take, self.capacity - pos)
+            out[filled : filled + first] = self._buf[pos : pos + first]
+            if take > first:
+                out[filled + first : filled + take] = self._buf[: take - first]
+            r += take
+            filled += take
+
+        if filled < n:
+            out[filled:] = 0.0
+        self._marker_tail = tail
+        self._read = r
+        return filled, restart_index, stopped
@@ -0,0 +1,218 @@
+"""
+Shared-memory PCM slab pool for the decode -> output transport.
+
+Without this, every decoded chunk is pickled onto decode_out_q, unpickled in
+AudioEngine.pump(), and pickled again onto the output PCM queue. With the pool
+enabled, decode threads write float32 frames straight into a slab of one
+SharedMemory segment (owned by the engine) and only send a small DecodedChunk
+descriptor (slab, offset, frames) with pcm=None. The output process copies the
+frames into its ring and releases the slab.
+
+Slab lifecycle (reference counts live in the segment header and are guarded
+by a multiprocessing Lock shared by every attached process):
+- A writer acquires a free slab: refcount 0 -> 1 (the writer's hold).
+- Every span written into the slab adds one reference.
+- The writer drops its hold when the slab is full, the cue goes idle, or the
+  decode job ends.
+- The consumer drops one reference per descriptor; at 0 the slab is free.
+
+Only numpy and the standard library are imported here so the module can be
+used (and tested) without PyAV or sounddevice.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+# Header is one int32 refcount per slab, padded so sample data is cache-line aligned.
+_HEADER_ALIGN = 64
+
+
+def _header_bytes(slab_count: int) -> int:
+    raw = 4 * int(slab_count)
+    return ((raw + _HEADER_ALIGN - 1) // _HEADER_ALIGN) * _HEADER_ALIGN
+
+
+@dataclass(frozen=True, slots=True)
+class PcmSlabPoolSpec:
+    """Picklable handle used to attach a child process to the engine's slab pool.
+
+    Fields:
+    - name: SharedMemory segment name
+    - slab_count / slab_frames / channels: pool geometry (float32 frames)
+    - lock: multiprocessing Lock guarding the slab refcounts
+
+    Invariants:
+    - Must be passed as a Process argument (the lock is only picklable at spawn time).
+    """
+
+    name: str
+    slab_count: int
+    slab_frames: int
+    channels: int
+    lock: object
+
+
+class PcmSlabPool:
+    """Fixed set of float32 PCM slabs in one SharedMemory segment."""
+
+    def __init__(self, spec: PcmSlabPoolSpec, shm: shared_memory.SharedMemory, *, owner: bool) -> None:
+        self._spec = spec
+        self._shm = shm
+        self._owner = bool(owner)
+        self._lock = spec.lock
+        hdr = _header_bytes(spec.slab_count)
+        self._refs = np.ndarray((spec.slab_count,), dtype=np.int32, buffer=shm.buf, offset=0)
+        self._data = np.ndarray(
+            (spec.slab_count, spec.slab_frames, spec.channels),
+            dtype=np.float32,
+            buffer=shm.buf,
+            offset=hdr,
+        )
+        # Rotating scan start so slabs are reused round-robin (keeps recently
+        # released slabs cold while the consumer may still be copying neighbours).
+        self._next_hint = 0
+
+    @classmethod
+    def create(cls, ctx: object, *, slab_count: int, slab_frames: int, channels: int) -> "PcmSlabPool":
+        """Create (and own) a new pool. `ctx` is the multiprocessing context used for the lock."""
+        slab_count = max(1, int(slab_count))
+        slab_frames = max(1, int(slab_frames))
+        channels = max(1, int(channels))
+        size = _header_bytes(slab_count) + slab_count * slab_frames * channels * 4
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        spec = PcmSlabPoolSpec(
+            name=shm.name,
+            slab_count=slab_count,
+            slab_frames=slab_frames,
+            channels=channels,
+            lock=ctx.Lock(),  # type: ignore[attr-defined]
+        )
+        pool = cls(spec, shm, owner=True)
+        pool._refs[:] = 0
+        return pool
+
+    @classmethod
+    def attach(cls, spec: PcmSlabPoolSpec) -> "PcmSlabPool":
+        # Spawned children share the engine's resource tracker, so the (idempotent)
+        # registration made by attaching is undone by the owner's unlink().
+        return cls(spec, shared_memory.SharedMemory(name=spec.name), owner=False)
+
+    @property
+    def spec(self) -> PcmSlabPoolSpec:
+        return self._spec
+
+    @property
+    def slab_frames(self) -> int:
+        return self._spec.slab_frames
+
+    @property
+    def channels(self) -> int:
+        return self._spec.channels
+
+    def acquire_slab(self) -> int | None:
+        """Claim a free slab for writing (refcount 0 -> 1). Returns None when exhausted."""
+        n = self._spec.slab_count
+        with self._lock:  # type: ignore[union-attr]
+            start = self._next_hint
+            for i in range(n):
+                slab = (start + i) % n
+                if self._refs[slab] == 0:
+                    self._refs[slab] = 1
+                    self._next_hint = (slab + 1) % n
+                    return slab
+        return None
+
+    def add_ref(self, slab: int) -> None:
+        with self._lock:  # type: ignore[union-attr]
+            self._refs[slab] += 1
+
+    def release(self, slab: int) -> None:
+        with self._lock:  # type: ignore[union-attr]
+            if self._refs[slab] > 0:
+                self._refs[slab] -= 1
+
+    def frames_view(self, slab: int) -> np.ndarray:
+        """Writable (slab_frames, channels) view of one slab."""
+        return self._data[slab]
+
+    def take(self, slab: int, offset: int, frames: int) -> np.ndarray:
+        """Copy a span out of the pool and release its reference."""
+        try:
+            return np.array(self._data[slab, offset : offset + frames], dtype=np.float32, copy=True)
+        finally:
+            self.release(slab)
+
+    def free_slabs(self) -> int:
+        with self._lock:  # type: ignore[union-attr]
+            return int(np.count_nonzero(self._refs == 0))
+
+    def close(self) -> None:
+        # Drop numpy views before closing the mmap, otherwise close() raises BufferError.
+        self._refs = None  # type: ignore[assignment]
+        self._data = None  # type: ignore[assignment]
+        try:
+            self._shm.close()
+        except Exception:
+            pass
+
+    def unlink(self) -> None:
+        if not self._owner:
+            return
+        try:
+            self._shm.unlink()
+        except Exception:
+            pass
+
+
+class PcmSlabWriter:
+    """Per-cue slab writer.
+
+    Not thread-safe: each decode thread owns one writer. Consecutive chunks of a
+    cue are packed into the same slab until it fills up or the writer is sealed.
+    """
+
+    def __init__(self, pool: PcmSlabPool) -> None:
+        self._pool = pool
+        self._slab: int | None = None
+        self._offset = 0
+
+    def write(self, pcm: np.ndarray) -> tuple[list[tuple[int, int, int]], int]:
+        """Copy `pcm` into slabs.
+
+        Returns (spans, frames_written) where spans is a list of (slab, offset, frames).
+        Each span holds one reference that the consumer must release via
+        PcmSlabPool.take(). If the pool runs out of slabs, frames_written is less than
+        the input length and the caller sends the remainder inline.
+        """
+        pool = self._pool
+        if pcm.ndim != 2 or pcm.shape[1] != pool.channels:
+            return [], 0
+        total = int(pcm.shape[0])
+        spans: list[tuple[int, int, int]] = []
+        written = 0
+        while written < total:
+            if self._slab is None or self._offset >= pool.slab_frames:
+                self.seal()
+                slab = pool.acquire_slab()
+                if slab is None:
+                    break
+                self._slab = slab
+                self._offset = 0
+            n = min(total - written, pool.slab_frames - self._offset)
+            pool.frames_view(self._slab)[self._offset : self._offset + n] = pcm[written : written + n]
+            pool.add_ref(self._slab)
+            spans.append((self._slab, self._offset, n))
+            self._offset += n
+            written += n
+        return spans, written
+
+    def seal(self) -> None:
+        """Drop the writer's hold on the current slab (if any)."""
+        if self._slab is not None:
+            self._pool.release(self._slab)
+        self._slab = None
+        self._offset = 0
@@ -0,0 +1,130 @@
+"""
+Preroll store: the decoded first frames of armed cues.
+
+Pressing a button whose file is not in the decoded PCM cache has to open the
+container, seek to in_frame and decode before the first chunk can leave the
+decode process. Arming a set of cues (the visible bank, see ArmCuesCommand)
+decodes the first STEPD_PREROLL_MS of each, starting at its in_frame, into this
+store ahead of time. A DecodeStart whose head is armed sends the stored frames
+at once and opens the container behind them (see _decode_cue_steps).
+
+- Key: (file signature, in_frame, target sample rate, target channels). The
+  signature is the one DecodedPcmCache uses, so an edited file is never served.
+- Value: a PrerollHead, a read-only float32 (preroll_frames, channels) array
+  plus whether it was decoded with an exact seek (seek index, or in_frame 0).
+  The decoder resumes behind an exact head with an indexed seek, and behind an
+  approximate one by repeating its seek and decoding through it, so the join
+  is seamless either way.
+- Memory: bounded by a byte budget with LRU eviction. Each arm call replaces the
+  armed set, and heads that are no longer armed are dropped right away.
+
+Hits and misses count the cue starts that would otherwise have opened a
+container, so the hit rate says how many of those the arming covered.
+"""
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Iterable, NamedTuple
+
+import numpy as np
+
+from engine.processes.decoded_cache import file_signature
+
+
+PrerollKey = tuple[tuple[str, int, int], int, int, int]
+
+
+class PrerollHead(NamedTuple):
+    pcm: np.ndarray
+    exact: bool
+
+
+def preroll_key(path: str, in_frame: int, sample_rate: int, channels: int) -> PrerollKey | None:
+    sig = file_signature(path)
+    if sig is None:
+        return None
+    return (sig, max(0, int(in_frame)), int(sample_rate), int(channels))
+
+
+class PrerollStore:
+    """Thread-safe, byte-budgeted LRU of cue heads, limited to the armed set."""
+
+    def __init__(self, budget_bytes: int, preroll_frames: int) -> None:
+        self.budget_bytes = max(0, int(budget_bytes))
+        self.preroll_frames = max(0, int(preroll_frames))
+        self._entries: OrderedDict[PrerollKey, PrerollHead] = OrderedDict()
+        self._armed: set[PrerollKey] = set()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: object) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def arm(self, keys: Iterable[PrerollKey]) -> list[PrerollKey]:
+        """Replace the armed set. Drops heads no longer armed; returns the armed keys still missing."""
+        with self._lock:
+            self._armed = set(keys)
+            for key in [k for k in self._entries if k not in self._armed]:
+                self.bytes -= int(self._entries.pop(key).pcm.nbytes)
+            return [k for k in self._armed if k not in self._entries]
+
+    def is_armed(self, key: PrerollKey | None) -> bool:
+        with self._lock:
+            return key in self._armed
+
+    def get(self, key: PrerollKey | None) -> PrerollHead | None:
+        if key is None:
+            return None
+        with self._lock:
+            head = self._entries.get(key)
+            if head is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return head
+
+    def put(self, key: PrerollKey | None, pcm: np.ndarray, *, exact: bool = False) -> bool:
+        """Store an armed cue's head, evicting least-recently-used ones. Returns False if not armed or too big."""
+        if key is None:
+            return False
+        nbytes = int(pcm.nbytes)
+        if not 0 < nbytes <= self.budget_bytes:
+            return False
+        pcm = np.ascontiguousarray(pcm, dtype=np.float32)
+        pcm.flags.writeable = False
+        with self._lock:
+            if key not in self._armed:
+                return False
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.bytes -= int(old.pcm.nbytes)
+            while self._entries and self.bytes + nbytes > self.budget_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.bytes -= int(evicted.pcm.nbytes)
+                self.evictions += 1
+            self._entries[key] = PrerollHead(pcm, bool(exact))
+            self.bytes += nbytes
+        return True
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "armed": len(self._armed),
+                "entries": len(self._entries),
+                "bytes": int(self.bytes),
+                "budget_bytes": int(self.budget_bytes),
+                "hits": int(self.hits),
+                "misses": int(self.misses),
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+                "evictions": int(self.evictions),
+            }
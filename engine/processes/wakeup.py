@@ -0,0 +1,123 @@
+"""
+Event-driven wakeups for the audio process loops.
+
+The service, decode and output loops used to sleep-poll: a fixed
+`time.sleep(pump_interval)` or `cmd_q.get(timeout=...)` per iteration, so an
+idle engine woke up hundreds of times per second and every command waited up to
+one poll interval before it was seen.
+
+`Wakeup` blocks in `multiprocessing.connection.wait` on the read ends of the
+loop's inputs (mp.Queue readers and Pipe connections) plus a private pipe that
+other threads poke with `notify()`. The loop wakes when it has work to do, or
+when its timeout ends, for periodic work such as telemetry or watchdogs.
+
+In-process `queue.Queue` inputs (threaded tests, offline tools) cannot be waited
+on. Then `wait()` falls back to polling them every `poll_s`, which is how these
+loops behaved before.
+"""
+from __future__ import annotations
+
+import multiprocessing as mp
+import queue
+import threading
+import time
+from multiprocessing import connection
+from typing import Iterable
+
+
+def waitable(source: object) -> object | None:
+    """The object multiprocessing.connection.wait can block on for `source`, if any."""
+    reader = getattr(source, "_reader", None)  # mp.Queue / SimpleQueue read end
+    if reader is not None and hasattr(reader, "fileno"):
+        return reader
+    if hasattr(source, "recv_bytes") and hasattr(source, "fileno"):
+        return source  # Pipe connection
+    return None
+
+
+def _has_data(source: object) -> bool:
+    try:
+        if isinstance(source, queue.Queue):
+            return not source.empty()
+        poll = getattr(source, "poll", None)
+        if poll is not None:
+            return bool(poll())
+        empty = getattr(source, "empty", None)
+        if empty is not None:
+            return not empty()
+    except Exception:
+        return True  # let the loop find out
+    return False
+
+
+class Wakeup:
+    """Blocks a loop until an input is readable, notify() is called, or a timeout."""
+
+    def __init__(self, sources: Iterable[object] = (), *, poll_s: float = 0.001) -> None:
+        self._sources = [s for s in sources if s is not None]
+        self._poll_s = float(poll_s)
+        self._notify_r, self._notify_w = mp.Pipe(duplex=False)
+        self._notify_lock = threading.Lock()
+        self._notified = False
+        handles = [waitable(s) for s in self._sources]
+        self._pollable = [s for s, h in zip(self._sources, handles) if h is None]
+        self._handles = [h for h in handles if h is not None] + [self._notify_r]
+        self.wakeups = 0
+        self.timeouts = 0
+
+    def notify(self) -> None:
+        """Wake the waiting loop (safe from any thread; repeated calls coalesce)."""
+        with self._notify_lock:
+            if self._notified:
+                return
+            self._notified = True
+            try:
+                self._notify_w.send_bytes(b"\0")
+            except Exception:
+                pass
+
+    def wait(self, timeout: float | None) -> bool:
+        """Block until there is work; False if `timeout` (seconds) passed without any."""
+        if self._pollable:
+            ready = self._wait_polling(timeout)
+        else:
+            ready = bool(connection.wait(self._handles, timeout))
+        self._clear_notify()
+        if ready:
+            self.wakeups += 1
+        else:
+            self.timeouts += 1
+        return ready
+
+    def close(self) -> None:
+        for conn in (self._notify_r, self._notify_w):
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    # -- internals ------------------------------------------------------------------
+
+    def _wait_polling(self, timeout: float | None) -> bool:
+        deadline = None if timeout is None else time.monotonic() + max(0.0, float(timeout))
+        while True:
+            if any(_has_data(s) for s in self._pollable):
+                return True
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return False
+            step = self._poll_s if remaining is None else min(self._poll_s, remaining)
+            # Sleeps for one poll step, but still wakes at once for waitable inputs.
+            if connection.wait(self._handles, step):
+                return True
+
+    def _clear_notify(self) -> None:
+        with self._notify_lock:
+            if not self._notified:
+                return
+            self._notified = False
+            try:
+                while self._notify_r.poll():
+                    self._notify_r.recv_bytes()
+            except Exception:
+                pass
@@ -0,0 +1,101 @@
+"""
+Timer heap for AudioEngine's time-based work.
+
+pump() used to find due work by scanning: every cue in `_pending_stops` was
+compared against time.time() twice per pump (send the stop once the fade has
+elapsed, then force-remove a cue still stuck 5 s later). Work is now
+scheduled as timers keyed by (kind, key), for example ("stop", cue_id) or
+("force_remove", cue_id). pump() pops only the timers that are due, so its cost
+follows the number of due events rather than the number of active cues.
+
+Rescheduling a (kind, key) replaces its timer. Cancelled and replaced entries
+stay in the heap and are skipped when they surface (lazy deletion), so schedule
+and cancel are O(log n) and O(1) and never search the heap.
+"""
+from __future__ import annotations
+
+import heapq
+import itertools
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Hashable
+
+
+@dataclass(slots=True)
+class Timer:
+    at: float
+    kind: str
+    key: Hashable
+    payload: Any = None
+    seq: int = 0
+
+
+class TimerHeap:
+    """Timers ordered by due time; one live timer per (kind, key)."""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        self.clock = clock
+        self._heap: list[tuple[float, int, Timer]] = []
+        self._live: dict[tuple[str, Hashable], Timer] = {}
+        self._by_key: dict[Hashable, set[str]] = {}
+        self._seq = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    def schedule(self, at: float, kind: str, key: Hashable, payload: Any = None) -> Timer:
+        """Run (kind, key) at monotonic time `at`, replacing any pending timer for it."""
+        timer = Timer(float(at), kind, key, payload, next(self._seq))
+        self._live[(kind, key)] = timer
+        self._by_key.setdefault(key, set()).add(kind)
+        heapq.heappush(self._heap, (timer.at, timer.seq, timer))
+        if len(self._heap) > 2 * len(self._live) + 64:
+            # Mostly stale entries (frequent reschedules): rebuild from the live timers.
+            self._heap = [(t.at, t.seq, t) for t in self._live.values()]
+            heapq.heapify(self._heap)
+        return timer
+
+    def schedule_in(self, delay_s: float, kind: str, key: Hashable, payload: Any = None) -> Timer:
+        return self.schedule(self.clock() + max(0.0, float(delay_s)), kind, key, payload)
+
+    def get(self, kind: str, key: Hashable) -> Timer | None:
+        return self._live.get((kind, key))
+
+    def cancel(self, kind: str, key: Hashable) -> bool:
+        if self._live.pop((kind, key), None) is None:
+            return False
+        kinds = self._by_key.get(key)
+        if kinds is not None:
+            kinds.discard(kind)
+            if not kinds:
+                del self._by_key[key]
+        return True
+
+    def cancel_key(self, key: Hashable) -> None:
+        """Drop every pending timer for `key` (e.g. a cue that finished)."""
+        for kind in self._by_key.pop(key, ()):
+            self._live.pop((kind, key), None)
+
+    def next_deadline(self) -> float | None:
+        """Due time of the earliest live timer, or None."""
+        self._drop_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: float | None = None) -> list[Timer]:
+        """Remove and return the timers due at `now`, earliest first."""
+        if now is None:
+            now = self.clock()
+        due: list[Timer] = []
+        while self._heap and self._heap[0][0] <= now:
+            _, _, timer = heapq.heappop(self._heap)
+            if self._live.get((timer.kind, timer.key)) is timer:
+                self.cancel(timer.kind, timer.key)
+                due.append(timer)
+        return due
+
+    def _drop_stale(self) -> None:
+        while self._heap:
+            timer = self._heap[0][2]
+            if self._live.get((timer.kind, timer.key)) is timer:
+                return
+            heapq.heappop(self._heap)
@@ -0,0 +1,304 @@
+"""
+Sample-accurate seek index per media file.
+
+Seeking to an in/loop point used to be a backward keyframe seek followed by
+discarding a fixed 10 ms, which trims at the wrong sample whenever the seek lands
+more (or less) than 10 ms early. The index maps every decoded frame's PTS to its
+offset in decoded samples, so the decoder can seek to the exact frame that holds
+the target sample and discard exactly the samples before it.
+
+Offsets count the samples the decoder actually outputs from the start of the
+stream. FFmpeg already trims encoder delay and padding (LAME/iTunes gapless
+info, MP4 edit lists) when it decodes, so the offsets line up with what the
+engine plays from frame 0. The delay (priming samples before PTS 0) and
+padding (decoded samples past the container duration) are recorded for diagnostics.
+
+Codecs whose frames depend on earlier packets (MP3 bit reservoir, AAC/Vorbis
+overlap, Opus pre-roll) seek a few frames early and discard the extra.
+
+Indexes are built once per file on a background thread (SoundFileButton requests
+one after probing) and stored as .npz files in a directory next to the probe
+cache in ButtonSettings.json, keyed by the same (path, size, mtime_ns) signature.
+
+Environment:
+- STEPD_SEEK_INDEX: 0 disables building and using indexes.
+- STEPD_SEEK_INDEX_DIR: index directory (default: ./SeekIndex).
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import queue
+import tempfile
+import threading
+from dataclasses import dataclass
+from fractions import Fraction
+from pathlib import Path
+
+import numpy as np
+
+from engine.processes.decoded_cache import file_signature
+from engine.tuning import DEFAULT_SEEK_INDEX
+
+
+# Frames decoded before the target frame so the decoder state is primed.
+_PREROLL_FRAMES = {
+    "mp3": 2,
+    "mp3float": 2,
+    "mp2": 1,
+    "aac": 1,
+    "vorbis": 1,
+    "opus": 4,
+}
+
+_FORMAT_VERSION = 1
+
+
+@dataclass(frozen=True)
+class SeekIndex:
+    """PTS -> decoded sample offset for one audio stream (source sample rate)."""
+
+    sig: tuple[str, int, int]
+    stream_index: int
+    sample_rate: int
+    time_base: Fraction
+    pts: np.ndarray  # int64, one per decoded frame, ascending
+    offsets: np.ndarray  # int64, decoded samples before each frame
+    total_samples: int
+    delay_samples: int = 0
+    padding_samples: int = 0
+    preroll: int = 0
+
+    def __len__(self) -> int:
+        return int(self.pts.shape[0])
+
+    def locate(self, sample: int) -> tuple[int, int]:
+        """(seek_pts, discard) to start decoding at source `sample`.
+
+        Seek to `seek_pts`, then drop `discard` decoded samples.
+        """
+        sample = max(0, min(int(sample), int(self.total_samples)))
+        i = int(np.searchsorted(self.offsets, sample, side="right")) - 1
+        i = max(0, i - int(self.preroll))
+        return int(self.pts[i]), sample - int(self.offsets[i])
+
+    def offset_at(self, pts: int | None) -> int | None:
+        """Decoded sample offset of the frame with this PTS, if it is indexed."""
+        if pts is None:
+            return None
+        i = int(np.searchsorted(self.pts, int(pts), side="left"))
+        if i >= len(self) or int(self.pts[i]) != int(pts):
+            return None
+        return int(self.offsets[i])
+
+
+def seek_index_enabled() -> bool:
+    try:
+        return int(os.environ.get("STEPD_SEEK_INDEX", str(DEFAULT_SEEK_INDEX)).strip() or "0") > 0
+    except Exception:
+        return bool(DEFAULT_SEEK_INDEX)
+
+
+def default_index_dir() -> Path:
+    d = os.environ.get("STEPD_SEEK_INDEX_DIR")
+    if d:
+        return Path(d)
+    return Path("SeekIndex")
+
+
+def build_seek_index(path: str, stream_index: int | None = None) -> SeekIndex | None:
+    """Decode `path` once and index every frame. Returns None if it has no usable timestamps."""
+    import av
+
+    sig = file_signature(path)
+    if sig is None:
+        return None
+    container = av.open(path)
+    try:
+        streams = list(container.streams)
+        stream = None
+        if stream_index is not None and 0 <= int(stream_index) < len(streams):
+            cand = streams[int(stream_index)]
+            if getattr(cand, "type", None) == "audio":
+                stream = cand
+        if stream is None:
+            stream = next((s for s in streams if s.type == "audio"), None)
+        if stream is None or stream.time_base is None:
+            return None
+        sr = int(stream.codec_context.sample_rate or stream.rate or 0)
+        if sr <= 0:
+            return None
+        tb = Fraction(stream.time_base)
+
+        pts: list[int] = []
+        offsets: list[int] = []
+        total = 0
+        for packet in container.demux(stream):
+            for frame in packet.decode():
+                p = frame.pts if frame.pts is not None else packet.pts
+                if p is None:
+                    return None
+                if pts and int(p) <= pts[-1]:
+                    # Non-monotonic timestamps: a seek could not be resolved reliably.
+                    return None
+                pts.append(int(p))
+                offsets.append(total)
+                total += int(frame.samples)
+        if not pts:
+            return None
+
+        first = float(pts[0] * tb) * sr
+        delay = max(0, int(round(-first)))
+        padding = 0
+        if stream.duration is not None:
+            padding = max(0, total - int(round(float(stream.duration * tb) * sr)))
+        codec = str(getattr(stream.codec_context, "name", "") or "")
+        return SeekIndex(
+            sig=sig,
+            stream_index=int(stream.index),
+            sample_rate=sr,
+            time_base=tb,
+            pts=np.asarray(pts, dtype=np.int64),
+            offsets=np.asarray(offsets, dtype=np.int64),
+            total_samples=int(total),
+            delay_samples=delay,
+            padding_samples=padding,
+            preroll=_PREROLL_FRAMES.get(codec, 0),
+        )
+    finally:
+        try:
+            container.close()
+        except Exception:
+            pass
+
+
+class SeekIndexStore:
+    """Directory of seek indexes with a single background builder thread."""
+
+    def __init__(self, root: str | os.PathLike) -> None:
+        self.root = Path(root)
+        self._jobs: "queue.Queue[tuple[str, int | None]]" = queue.Queue()
+        self._pending: set[str] = set()
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    def entry_path(self, sig: tuple[str, int, int]) -> Path:
+        ident = repr((tuple(sig), _FORMAT_VERSION))
+        return self.root / (hashlib.sha1(ident.encode("utf-8")).hexdigest() + ".npz")
+
+    def load(self, path: str, stream_index: int | None = None) -> SeekIndex | None:
+        sig = file_signature(path)
+        if sig is None:
+            return None
+        try:
+            with np.load(self.entry_path(sig), allow_pickle=False) as z:
+                meta = [int(v) for v in z["meta"]]
+                index = SeekIndex(
+                    sig=sig,
+                    stream_index=meta[0],
+                    sample_rate=meta[1],
+                    time_base=Fraction(meta[2], meta[3]),
+                    pts=np.asarray(z["pts"], dtype=np.int64),
+                    offsets=np.asarray(z["offsets"], dtype=np.int64),
+                    total_samples=meta[4],
+                    delay_samples=meta[5],
+                    padding_samples=meta[6],
+                    preroll=meta[7],
+                )
+                stored_sig = (str(z["path"]), meta[8], meta[9])
+        except (OSError, KeyError, ValueError, IndexError, ZeroDivisionError):
+            return None
+        if stored_sig != sig:
+            return None
+        if stream_index is not None and int(stream_index) != index.stream_index:
+            return None
+        return index
+
+    def save(self, index: SeekIndex) -> Path | None:
+        entry = self.entry_path(index.sig)
+        meta = np.asarray(
+            [
+                index.stream_index,
+                index.sample_rate,
+                index.time_base.numerator,
+                index.time_base.denominator,
+                index.total_samples,
+                index.delay_samples,
+                index.padding_samples,
+                index.preroll,
+                index.sig[1],
+                index.sig[2],
+            ],
+            dtype=np.int64,
+        )
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(prefix=entry.stem, suffix=".tmp", dir=self.root)
+            try:
+                with os.fdopen(fd, "wb") as fh:
+                    np.savez(fh, meta=meta, pts=index.pts, offsets=index.offsets, path=np.asarray(index.sig[0]))
+                os.replace(tmp, entry)
+            except BaseException:
+                try:
+                    os.unlink(tmp)
+                except OSError:
+                    pass
+                raise
+        except OSError:
+            return None
+        return entry
+
+    def exists(self, path: str) -> bool:
+        sig = file_signature(path)
+        return sig is not None and self.entry_path(sig).exists()
+
+    # -- background building ------------------------------------------------------
+
+    def request(self, path: str, stream_index: int | None = None) -> None:
+        """Queue `path` for indexing unless an up-to-date index exists or is being built."""
+        key = os.path.abspath(path)
+        with self._lock:
+            if key in self._pending:
+                return
+            if self.exists(path):
+                return
+            self._pending.add(key)
+            self._jobs.put((path, stream_index))
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="stepd-seek-index", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            try:
+                path, stream_index = self._jobs.get(timeout=5.0)
+            except queue.Empty:
+                with self._lock:
+                    if self._jobs.empty():
+                        self._thread = None
+                        return
+                continue
+            try:
+                index = build_seek_index(path, stream_index)
+                if index is not None:
+                    self.save(index)
+            except Exception as e:
+                print(f"[SEEK-INDEX] build failed for {os.path.basename(path)}: {e}")
+            finally:
+                with self._lock:
+                    self._pending.discard(os.path.abspath(path))
+
+
+_shared_store: SeekIndexStore | None = None
+_shared_lock = threading.Lock()
+
+
+def shared_store() -> SeekIndexStore | None:
+    """Process-wide store from the environment (one builder thread per process)."""
+    global _shared_store
+    if not seek_index_enabled():
+        return None
+    with _shared_lock:
+        if _shared_store is None:
+            _shared_store = SeekIndexStore(default_index_dir())
+        return _shared_store
@@ -12,6 +12,10 @@ from typing import Any
 DEFAULT_AUDIO_SERVICE_BLOCK_FRAMES = 2048
 DEFAULT_DECODE_START_BLOCK_MULT = 4
 
+# Shared SQLite probe index (engine/probe_index.py) used by the GUI and AudioService;
+# 0 makes play_cue probe files synchronously again.
+DEFAULT_PROBE_INDEX = 1
+
 DEFAULT_OUTPUT_TARGET_BLOCKS = 192
 DEFAULT_OUTPUT_LOW_WATER_BLOCKS = 96
 DEFAULT_OUTPUT_STARVE_WARN_FRAMES = 2048
@@ -21,11 +25,66 @@ DEFAULT_OUTPUT_STARVE_WARN_FRAMES = 2048
 DEFAULT_OUTPUT_MIN_TARGET_BLOCKS = 24
 DEFAULT_OUTPUT_MIN_LOW_WATER_BLOCKS = 12
 
+# Blocks the output mix thread renders ahead of the device callback (0 = mix in the callback).
+DEFAULT_OUTPUT_AHEAD_BLOCKS = 0
+
+# Minimum lead (ms) between a quantized cue start and the output clock when the start
+# command arrives, so the first decoded chunk can land before the boundary.
+DEFAULT_OUTPUT_START_LEAD_MS = 50
+
+# Output meters run on a worker thread fed by a post-fader tap ring.
+DEFAULT_METER_TAP_SLOTS = 16
+DEFAULT_METER_TRUE_PEAK = 1
+
+# Callback load histogram (CallbackTimingEvent) emit interval in ms (0 = disabled).
+DEFAULT_CALLBACK_STATS_MS = 1000
+
 DEFAULT_DECODE_CHUNK_MULT = 16
 DEFAULT_DECODE_DEFAULT_CHUNK_MIN_FRAMES = 4096
 DEFAULT_DECODE_CHUNK_MIN_FRAMES = 1024
 DEFAULT_DECODE_SLICE_MAX_FRAMES = 4096
 
+# First chunk of a cue covers only its start block; later chunks grow by this factor
+# up to the steady-state chunk size (1 disables the ramp).
+DEFAULT_DECODE_CHUNK_RAMP = 2
+
+# Decoded PCM cache in the decode process (whole files at the output rate, LRU).
+DEFAULT_DECODE_CACHE_MB = 256
+DEFAULT_DECODE_CACHE_MAX_ENTRY_MB = 64
+
+# Looped cues keep the decoded in..out region in memory and replay it instead of seeking (0 disables).
+DEFAULT_LOOP_REGION_MAX_MB = 32
+
+# Per-file seek index (engine/seek_index.py) for sample-accurate in/loop points (0 disables).
+DEFAULT_SEEK_INDEX = 1
+
+# Read uncompressed WAV/AIFF at the output rate via numpy.memmap instead of PyAV (0 disables).
+DEFAULT_DECODE_PCM_FAST_PATH = 1
+
+# Decoder processes (cue-affine shards, each with its own GIL); 0 = one per two cores, up to 4.
+DEFAULT_DECODE_SHARDS = 1
+
+# Armed cues (the visible bank) keep their first N ms, from in_frame, decoded in the
+# decode process (engine/processes/preroll.py); the budget is split across shards. 0 disables.
+DEFAULT_PREROLL_MS = 500
+DEFAULT_PREROLL_MB = 32
+
+# Persistent decoded-PCM cache (engine/pcm_disk_cache.py), shared with the editor.
+DEFAULT_PCM_DISK_CACHE_MB = 2048
+# Largest entry written to it (decodes are streamed to disk, not held in RAM).
+DEFAULT_PCM_DISK_CACHE_MAX_ENTRY_MB = 256
+DEFAULT_PCM_DISK_CACHE_MAX_AGE_DAYS = 30
+DEFAULT_PCM_DISK_CACHE_INT16 = 0
+
+# Shared-memory PCM transport (decode -> output). Slabs are reused round-robin;
+# each actively decoding cue holds at most one partially filled slab.
+DEFAULT_PCM_SHM_ENABLED = 1
+DEFAULT_PCM_SHM_SLABS = 128
+DEFAULT_PCM_SHM_SLAB_FRAMES = 32768
+
+# Direct decode -> output PCM path. The engine only sees first-chunk/EOF notices.
+DEFAULT_DECODE_DIRECT = 1
+
 
 @dataclass(frozen=True, slots=True)
 class EngineTuning:
@@ -35,6 +94,7 @@ class EngineTuning:
 
     # Engine -> decoder contract
     decode_start_block_frames_multiplier: int | None = None
+    probe_index: int | None = None
 
     # Output buffering (interpreted by output_process)
     output_target_blocks: int | None = None
@@ -42,13 +102,37 @@ class EngineTuning:
     output_starve_warn_frames: int | None = None
     output_min_target_blocks: int | None = None
     output_min_low_water_blocks: int | None = None
+    output_ahead_blocks: int | None = None
+    output_start_lead_ms: int | None = None
+    meter_tap_slots: int | None = None
+    meter_true_peak: int | None = None
+    callback_stats_ms: int | None = None
 
     # Decoder chunking/slicing (interpreted by decode_process_pooled)
     decode_chunk_frames: int | None = None
     decode_chunk_min_frames: int | None = None
     decode_default_chunk_min_frames: int | None = None
     decode_chunk_multiplier: int | None = None
+    decode_chunk_ramp: int | None = None
     decode_slice_max_frames: int | None = None
+    decode_cache_mb: int | None = None
+    decode_cache_max_entry_mb: int | None = None
+    decode_loop_region_max_mb: int | None = None
+    decode_seek_index: int | None = None
+    decode_pcm_fast_path: int | None = None
+    decode_shards: int | None = None
+    preroll_ms: int | None = None
+    preroll_mb: int | None = None
+    pcm_disk_cache_mb: int | None = None
+    pcm_disk_cache_max_entry_mb: int | None = None
+    pcm_disk_cache_max_age_days: int | None = None
+    pcm_disk_cache_int16: int | None = None
+
+    # Decode -> output PCM transport (interpreted by audio_engine)
+    pcm_shm_enabled: int | None = None
+    pcm_shm_slabs: int | None = None
+    pcm_shm_slab_frames: int | None = None
+    decode_direct: int | None = None
 
 
 def _repo_root() -> Path:
@@ -211,16 +295,39 @@ def load_engine_tuning() -> EngineTuning:
     return EngineTuning(
         audio_service_block_frames=_get_int(data, "audio_service", "block_frames"),
         decode_start_block_frames_multiplier=_get_int(data, "engine", "decode_start_block_frames_multiplier"),
+        probe_index=_get_int(data, "engine", "probe_index"),
         output_target_blocks=_get_int(data, "output", "target_blocks"),
         output_low_water_blocks=_get_int(data, "output", "low_water_blocks"),
         output_starve_warn_frames=_get_int(data, "output", "starve_warn_frames"),
         output_min_target_blocks=_get_int(data, "output", "min_target_blocks"),
         output_min_low_water_blocks=_get_int(data, "output", "min_low_water_blocks"),
+        output_ahead_blocks=_get_int(data, "output", "ahead_blocks"),
+        output_start_lead_ms=_get_int(data, "output", "start_lead_ms"),
+        meter_tap_slots=_get_int(data, "output", "meter_tap_slots"),
+        meter_true_peak=_get_int(data, "output", "meter_true_peak"),
+        callback_stats_ms=_get_int(data, "output", "callback_stats_ms"),
         decode_chunk_frames=_get_int(data, "decode", "chunk_frames"),
         decode_chunk_min_frames=_get_int(data, "decode", "min_chunk_frames"),
         decode_default_chunk_min_frames=_get_int(data, "decode", "default_chunk_min_frames"),
         decode_chunk_multiplier=_get_int(data, "decode", "chunk_multiplier"),
+        decode_chunk_ramp=_get_int(data, "decode", "chunk_ramp"),
         decode_slice_max_frames=_get_int(data, "decode", "slice_max_frames"),
+        decode_cache_mb=_get_int(data, "decode", "cache_mb"),
+        decode_cache_max_entry_mb=_get_int(data, "decode", "cache_max_entry_mb"),
+        decode_loop_region_max_mb=_get_int(data, "decode", "loop_region_max_mb"),
+        decode_seek_index=_get_int(data, "decode", "seek_index"),
+        decode_pcm_fast_path=_get_int(data, "decode", "pcm_fast_path"),
+        decode_shards=_get_int(data, "decode", "shards"),
+        preroll_ms=_get_int(data, "decode", "preroll_ms"),
+        preroll_mb=_get_int(data, "decode", "preroll_mb"),
+        pcm_disk_cache_mb=_get_int(data, "pcm_disk_cache", "max_mb"),
+        pcm_disk_cache_max_entry_mb=_get_int(data, "pcm_disk_cache", "max_entry_mb"),
+        pcm_disk_cache_max_age_days=_get_int(data, "pcm_disk_cache", "max_age_days"),
+        pcm_disk_cache_int16=_get_int(data, "pcm_disk_cache", "int16"),
+        pcm_shm_enabled=_get_int(data, "transport", "pcm_shm"),
+        pcm_shm_slabs=_get_int(data, "transport", "pcm_shm_slabs"),
+        pcm_shm_slab_frames=_get_int(data, "transport", "pcm_shm_slab_frames"),
+        decode_direct=_get_int(data, "transport", "decode_direct"),
     )
 
 
@@ -257,12 +364,36 @@ def apply_engine_tuning_to_env(*, overwrite: bool = False) -> EngineTuning:
     _set_env_default("STEPD_OUTPUT_STARVE_WARN_FRAMES", tuning.output_starve_warn_frames, overwrite=overwrite)
     _set_env_default("STEPD_OUTPUT_MIN_TARGET_BLOCKS", tuning.output_min_target_blocks, overwrite=overwrite)
     _set_env_default("STEPD_OUTPUT_MIN_LOW_WATER_BLOCKS", tuning.output_min_low_water_blocks, overwrite=overwrite)
+    _set_env_default("STEPD_OUTPUT_AHEAD_BLOCKS", tuning.output_ahead_blocks, overwrite=overwrite)
+    _set_env_default("STEPD_OUTPUT_START_LEAD_MS", tuning.output_start_lead_ms, overwrite=overwrite)
+    _set_env_default("STEPD_METER_TAP_SLOTS", tuning.meter_tap_slots, overwrite=overwrite)
+    _set_env_default("STEPD_METER_TRUE_PEAK", tuning.meter_true_peak, overwrite=overwrite)
+    _set_env_default("STEPD_CALLBACK_STATS_MS", tuning.callback_stats_ms, overwrite=overwrite)
 
     _set_env_default("STEPD_DECODE_CHUNK_FRAMES", tuning.decode_chunk_frames, overwrite=overwrite)
     _set_env_default("STEPD_DECODE_CHUNK_MIN_FRAMES", tuning.decode_chunk_min_frames, overwrite=overwrite)
     _set_env_default("STEPD_DECODE_DEFAULT_CHUNK_MIN_FRAMES", tuning.decode_default_chunk_min_frames, overwrite=overwrite)
     _set_env_default("STEPD_DECODE_CHUNK_MULT", tuning.decode_chunk_multiplier, overwrite=overwrite)
+    _set_env_default("STEPD_DECODE_CHUNK_RAMP", tuning.decode_chunk_ramp, overwrite=overwrite)
     _set_env_default("STEPD_DECODE_SLICE_MAX_FRAMES", tuning.decode_slice_max_frames, overwrite=overwrite)
+    _set_env_default("STEPD_DECODE_CACHE_MB", tuning.decode_cache_mb, overwrite=overwrite)
+    _set_env_default("STEPD_DECODE_CACHE_MAX_ENTRY_MB", tuning.decode_cache_max_entry_mb, overwrite=overwrite)
+    _set_env_default("STEPD_LOOP_REGION_MAX_MB", tuning.decode_loop_region_max_mb, overwrite=overwrite)
+    _set_env_default("STEPD_SEEK_INDEX", tuning.decode_seek_index, overwrite=overwrite)
+    _set_env_default("STEPD_PROBE_INDEX", tuning.probe_index, overwrite=overwrite)
+    _set_env_default("STEPD_DECODE_PCM_FAST_PATH", tuning.decode_pcm_fast_path, overwrite=overwrite)
+    _set_env_default("STEPD_DECODE_SHARDS", tuning.decode_shards, overwrite=overwrite)
+    _set_env_default("STEPD_PREROLL_MS", tuning.preroll_ms, overwrite=overwrite)
+    _set_env_default("STEPD_PREROLL_MB", tuning.preroll_mb, overwrite=overwrite)
+    _set_env_default("STEPD_PCM_DISK_CACHE_MB", tuning.pcm_disk_cache_mb, overwrite=overwrite)
+    _set_env_default("STEPD_PCM_DISK_CACHE_MAX_ENTRY_MB", tuning.pcm_disk_cache_max_entry_mb, overwrite=overwrite)
+    _set_env_default("STEPD_PCM_DISK_CACHE_MAX_AGE_DAYS", tuning.pcm_disk_cache_max_age_days, overwrite=overwrite)
+    _set_env_default("STEPD_PCM_DISK_CACHE_INT16", tuning.pcm_disk_cache_int16, overwrite=overwrite)
+
+    _set_env_default("STEPD_PCM_SHM", tuning.pcm_shm_enabled, overwrite=overwrite)
+    _set_env_default("STEPD_PCM_SHM_SLABS", tuning.pcm_shm_slabs, overwrite=overwrite)
+    _set_env_default("STEPD_PCM_SHM_SLAB_FRAMES", tuning.pcm_shm_slab_frames, overwrite=overwrite)
+    _set_env_default("STEPD_DECODE_DIRECT", tuning.decode_direct, overwrite=overwrite)
 
     _set_env_default(
         "STEPD_DECODE_START_BLOCK_MULT",
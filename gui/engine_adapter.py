@@ -81,6 +81,7 @@ from engine.commands import (
     OutputListDevices,
     SetTransitionFadeDurations,
     BatchCommandsCommand,
+    ArmCuesCommand,
 )
 from engine.cue import Cue
 from engine.messages.events import (
@@ -485,7 +486,7 @@ class EngineAdapter(QObject):
             cue_id (str): Unique identifier of the cue to fade.
             target_db (float): Target gain in dB (e.g., 0.0 = unity, -6.0 = half).
             duration_ms (int): Fade duration in milliseconds (must be > 0).
-            curve (str): Curve shape ("equal_power" or "linear", default "equal_power").
+            curve (str): Curve shape ("equal_power", "linear", "log" or "s_curve", default "equal_power").
         """
         start = time.perf_counter()
         try:
@@ -616,6 +617,20 @@ class EngineAdapter(QObject):
         except Exception:
             return bool(self._cue_loop_enabled.get(cue_id, False))
 
+    def arm_cues(self, cues: list[tuple[str, int, Optional[int]]]) -> None:
+        """
+        Keep the first moments of these cues decoded so they start instantly.
+
+        Replaces the previously armed set (an empty list disarms everything).
+
+        Args:
+            cues (list): (file_path, in_frame, out_frame or None) per cue.
+        """
+        try:
+            self._cmd_q.put(ArmCuesCommand(cues=tuple(cues)))
+        except Exception as e:
+            print(f"[EngineAdapter.arm_cues] Error: {e}")
+
     def set_master_gain(self, gain_db: float) -> None:
         """
         Request change to master output gain (future use).
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Headless scenario runner: render scripted cue scenarios through the real engine
+into WAV files, faster than real time, with per-callback timing stats.
+
+Each scenario is a JSON file:
+
+    {
+      "name": "fade_storm",                      # optional, defaults to file stem
+      "sample_rate": 48000, "channels": 2, "block_frames": 512,
+      "sources": {"tone": {"tone_hz": 440, "seconds": 3.0, "amp": 0.2}},
+      "steps": [
+        {"at": 0.0, "cmd": "play", "cue": "a", "source": "tone", "loop": true, "layered": true},
+        {"at": 0.0, "cmd": "play", "cue": "b", "file": "music/intro.mp3", "gain_db": -6},
+        {"at": 0.5, "cmd": "play", "cue": "c", "source": "tone", "quantum": 4800},
+        {"at": 1.5, "cmd": "fade", "cue": "a", "target_db": -120, "duration_ms": 500},
+        {"at": 2.0, "cmd": "update", "cue": "b", "loop_enabled": false},
+        {"at": 2.5, "cmd": "stop", "cue": "b", "fade_out_ms": 200}
+      ],
+      "timeout_s": 30
+    }
+
+- "sources" are synthetic WAVs generated next to the output (no fixture files needed);
+  "file" paths are resolved relative to the scenario file.
+- "quantum" / "start_at_sample" on a play step schedule a sample-accurate start
+  (PlayCueCommand.start_quantum_frames / start_at_sample).
+- Step times are in render seconds: output samples from the start of the render,
+  rounded down to a block boundary. The sink is gated (STEPD_OUTPUT_SINK_GATED):
+  it renders up to the next step's sample and holds there until the step has been
+  issued, so a step lands on the same rendered sample on every run. A cue started
+  by a play step begins on that step's sample once its first PCM is decoded (the
+  render waits for it). --speed S (default 4) paces rendering at S x real time
+  between steps; --speed 0 renders as fast as the CPU and decoder allow.
+- "stop" with fade_out_ms is rendered as a fade to -120 dB, which ends the cue when
+  the fade completes in the output.
+- A step fails the scenario if it has no effect: a fade/stop/update whose cue is
+  not playing when the step is reached, or a stop (or fade to -120 dB) whose cue
+  never finishes.
+- A scenario ends when every played cue has finished (or timeout_s elapses).
+
+Outputs per scenario in --out-dir: <name>.wav (master mix, float32) and
+<name>.wav.timing.json (callback p50/p95/p99/max, over-budget count, decoder stalls).
+The run exits non-zero if any scenario left a cue unfinished or had a failed step.
+
+Usage:
+    python render_scenario.py scenarios/*.json --out-dir renders [--speed 4] [--sink wav|npy|null]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+import uuid
+import wave
+from pathlib import Path
+
+import numpy as np
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+
+def _write_tone_wav(path: Path, *, tone_hz: float, seconds: float, amp: float, sample_rate: int, channels: int) -> None:
+    t = np.arange(int(seconds * sample_rate)) / float(sample_rate)
+    x = (amp * np.sin(2.0 * np.pi * tone_hz * t)).astype(np.float32)
+    pcm = (np.repeat(x[:, None], channels, axis=1) * 32767.0).astype("<i2")
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(channels)
+        w.setsampwidth(2)
+        w.setframerate(sample_rate)
+        w.writeframes(pcm.tobytes())
+
+
+def _build_command(step: dict, cue_ids: dict[str, str], files: dict[str, str], base_dir: Path):
+    from engine.commands import (
+        FadeCueCommand,
+        PlayCueCommand,
+        StopCueCommand,
+        TransportPause,
+        TransportPlay,
+        UpdateCueCommand,
+    )
+
+    cmd = step.get("cmd")
+    if cmd == "pause":
+        return TransportPause()
+    if cmd == "resume":
+        return TransportPlay()
+
+    name = str(step["cue"])
+    if cmd == "play":
+        cue_id = cue_ids.setdefault(name, str(uuid.uuid4()))
+        if "source" in step:
+            file_path = files[str(step["source"])]
+        else:
+            file_path = str((base_dir / step["file"]).resolve())
+        return PlayCueCommand(
+            cue_id=cue_id,
+            file_path=file_path,
+            track_id=f"scenario:{name}",
+            gain_db=float(step.get("gain_db", 0.0)),
+            in_frame=int(step.get("in_frame", 0)),
+            out_frame=step.get("out_frame"),
+            fade_in_ms=int(step.get("fade_in_ms", 0)),
+            fade_curve=str(step.get("curve", "equal_power")),
+            loop_enabled=bool(step.get("loop", False)),
+            layered=bool(step.get("layered", True)),
+            start_at_sample=step.get("start_at_sample"),
+            start_quantum_frames=int(step.get("quantum", 0)),
+        )
+
+    cue_id = cue_ids[name]
+    if cmd == "stop":
+        fade_out_ms = int(step.get("fade_out_ms", 0))
+        if fade_out_ms > 0:
+            # The output process ends a cue faded to silence on the rendered sample the
+            # fade completes; StopCueCommand's fade-out is timed by the engine's wall clock.
+            return FadeCueCommand(cue_id=cue_id, target_db=-120.0, duration_ms=fade_out_ms, curve=str(step.get("curve", "linear")))
+        return StopCueCommand(cue_id=cue_id)
+    if cmd == "fade":
+        return FadeCueCommand(
+            cue_id=cue_id,
+            target_db=float(step["target_db"]),
+            duration_ms=int(step["duration_ms"]),
+            curve=str(step.get("curve", "equal_power")),
+        )
+    if cmd == "update":
+        return UpdateCueCommand(
+            cue_id=cue_id,
+            in_frame=step.get("in_frame"),
+            out_frame=step.get("out_frame"),
+            gain_db=step.get("gain_db"),
+            loop_enabled=step.get("loop_enabled"),
+        )
+    raise ValueError(f"unknown scenario step cmd={cmd!r}")
+
+
+def run_scenario(path: Path, out_dir: Path, *, speed: float, sink_kind: str) -> dict:
+    spec = json.loads(path.read_text(encoding="utf-8"))
+    name = str(spec.get("name") or path.stem)
+    sample_rate = int(spec.get("sample_rate", 48000))
+    channels = int(spec.get("channels", 2))
+    block_frames = int(spec.get("block_frames", 512))
+    timeout_s = float(spec.get("timeout_s", 60.0))
+
+    files: dict[str, str] = {}
+    for src_name, src in (spec.get("sources") or {}).items():
+        src_path = out_dir / f"{name}.{src_name}.src.wav"
+        _write_tone_wav(
+            src_path,
+            tone_hz=float(src.get("tone_hz", 440.0)),
+            seconds=float(src.get("seconds", 2.0)),
+            amp=float(src.get("amp", 0.2)),
+            sample_rate=int(src.get("sample_rate", sample_rate)),
+            channels=int(src.get("channels", channels)),
+        )
+        files[str(src_name)] = str(src_path.resolve())
+
+    out_path = out_dir / f"{name}.{sink_kind}" if sink_kind != "null" else None
+    os.environ["STEPD_OUTPUT_SINK"] = f"{sink_kind}:{out_path.resolve()}" if out_path else "null"
+    os.environ["STEPD_OUTPUT_SINK_SPEED"] = str(float(speed))
+    os.environ["STEPD_OUTPUT_SINK_GATED"] = "1"
+
+    from engine.audio_engine import AudioEngine
+    from engine.commands import FadeCueCommand, OutputRenderUntil, PlayCueCommand, StopCueCommand
+    from engine.messages.events import CueFinishedEvent, DecodeErrorEvent, OutputClockEvent
+
+    # Steps grouped by the block-aligned output sample they are issued at.
+    groups: dict[int, list[dict]] = {}
+    for step in sorted(spec.get("steps") or [], key=lambda s: float(s.get("at", 0.0))):
+        sample = int(round(float(step.get("at", 0.0)) * sample_rate)) // block_frames * block_frames
+        groups.setdefault(sample, []).append(step)
+    wall_scale = (1.0 / speed) if speed > 0 else 1.0
+    cue_ids: dict[str, str] = {}
+    played: set[str] = set()
+    finished: set[str] = set()
+    must_finish: dict[str, str] = {}  # cue_id -> step that should have ended it
+    step_errors: list[str] = []
+    clock = {"sample_pos": -1}
+
+    def _pump() -> None:
+        for evt in engine.pump():
+            if isinstance(evt, CueFinishedEvent):
+                finished.add(evt.cue_info.cue_id)
+            elif isinstance(evt, DecodeErrorEvent):
+                step_errors.append(f"decode error for {evt.file_path}: {evt.error}")
+            elif isinstance(evt, OutputClockEvent):
+                clock["sample_pos"] = max(clock["sample_pos"], int(evt.sample_pos))
+
+    def _issue(sample: int, step: dict) -> None:
+        label = f"{step.get('cmd')} {step.get('cue', '')} at {sample / sample_rate:.3f}s".rstrip()
+        try:
+            cmd = _build_command(step, cue_ids, files, path.parent)
+        except KeyError:
+            step_errors.append(f"{label}: cue was never played")
+            return
+        if isinstance(cmd, PlayCueCommand):
+            played.add(cmd.cue_id)
+        elif getattr(cmd, "cue_id", None) is not None:
+            if cmd.cue_id in finished:
+                step_errors.append(f"{label}: cue had already finished")
+                return
+            if isinstance(cmd, StopCueCommand) or (isinstance(cmd, FadeCueCommand) and cmd.target_db <= -120.0):
+                must_finish[cmd.cue_id] = label
+        engine.handle_command(cmd)
+
+    engine = AudioEngine(sample_rate=sample_rate, channels=channels, block_frames=block_frames)
+    engine.start()
+    t0 = time.perf_counter()
+    deadline = t0 + timeout_s * wall_scale + 10.0
+    try:
+        for sample in sorted(groups):
+            # Render up to the step, then wait for the sink to hold there.
+            engine.handle_command(OutputRenderUntil(sample))
+            while clock["sample_pos"] < sample and time.perf_counter() < deadline:
+                _pump()
+                time.sleep(0.002)
+            if clock["sample_pos"] < sample:
+                step_errors.append(f"render never reached {sample / sample_rate:.3f}s")
+                break
+            # Collect finish events for cues that ended before the hold.
+            settle = time.perf_counter() + 0.05
+            while time.perf_counter() < settle:
+                _pump()
+                time.sleep(0.002)
+            for step in groups[sample]:
+                _issue(sample, step)
+        engine.handle_command(OutputRenderUntil(None))
+        while time.perf_counter() < deadline:
+            _pump()
+            if played <= finished:
+                break
+            time.sleep(0.002)
+    finally:
+        engine.stop()
+    wall_s = time.perf_counter() - t0
+    for cue_id, label in must_finish.items():
+        if cue_id not in finished:
+            step_errors.append(f"{label}: cue never finished")
+
+    result = {
+        "name": name,
+        "wall_s": round(wall_s, 3),
+        "cues": len(played),
+        "finished": len(played & finished),
+        "step_errors": step_errors,
+    }
+    if out_path is not None:
+        timing_path = Path(f"{out_path}.timing.json")
+        for _ in range(50):  # output process writes the summary on shutdown
+            if timing_path.exists():
+                break
+            time.sleep(0.1)
+        try:
+            result.update(json.loads(timing_path.read_text(encoding="utf-8")))
+        except Exception:
+            pass
+        if result.get("frames_written"):
+            result["render_s"] = round(result["frames_written"] / float(sample_rate), 3)
+            result["x_realtime"] = round(result["render_s"] / wall_s, 2) if wall_s > 0 else None
+        result["output"] = str(out_path)
+    return result
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("scenarios", nargs="+", help="scenario JSON files or directories")
+    ap.add_argument("--out-dir", default="renders")
+    ap.add_argument("--speed", type=float, default=4.0, help="render speed vs real time (0 = unpaced)")
+    ap.add_argument("--sink", choices=("wav", "npy", "null"), default="wav")
+    args = ap.parse_args()
+
+    paths: list[Path] = []
+    for item in args.scenarios:
+        p = Path(item)
+        paths.extend(sorted(p.glob("*.json")) if p.is_dir() else [p])
+    out_dir = Path(args.out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    failures = 0
+    for path in paths:
+        result = run_scenario(path, out_dir, speed=args.speed, sink_kind=args.sink)
+        ok = result["finished"] == result["cues"] and not result["step_errors"]
+        failures += 0 if ok else 1
+        print(json.dumps(result))
+    print(f"{len(paths) - failures}/{len(paths)} scenarios finished all cues with every step applied")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from engine.processes.callback_stats import CallbackHistogram
+
+
+def test_binning_and_overflow():
+    h = CallbackHistogram()
+    h.record(1.0, 10.0, 2, 0, False)   # load 0.1 -> bin 1
+    h.record(5.0, 10.0, 4, 1, False)   # load 0.5 -> bin 8
+    h.record(50.0, 10.0, 9, 3, False)  # load 5.0 -> overflow
+    snap = h.snapshot()
+    assert snap["callbacks"] == 3
+    assert snap["counts"][1] == 1 and snap["counts"][8] == 1 and snap["counts"][-1] == 1
+    assert snap["over_budget"] == 1
+    assert snap["max_ms"] == 50.0 and snap["max_cues"] == 9 and snap["max_envelopes"] == 3
+    assert snap["mean_cues"][8] == 4.0
+    assert len(snap["load_edges"]) == len(snap["counts"])
+
+
+def test_underflow_attributed_to_previous_callback():
+    """PortAudio flags an underflow on the callback after the one that ran late."""
+    h = CallbackHistogram()
+    h.record(12.0, 10.0, 6, 2, False)  # late callback: load 1.2 -> bin 19
+    h.record(1.0, 10.0, 6, 2, True)    # PortAudio reports the underflow here
+    snap = h.snapshot()
+    assert snap["underflows"] == 1
+    assert snap["underflows_by_bin"][19] == 1
+    assert snap["underflows_by_bin"][1] == 0
+
+
+def test_snapshot_is_delta():
+    h = CallbackHistogram()
+    for _ in range(10):
+        h.record(2.0, 10.0, 1, 0, False)
+    assert h.snapshot()["callbacks"] == 10
+    assert h.snapshot() is None
+    h.record(2.0, 10.0, 1, 0, False)
+    snap = h.snapshot()
+    assert snap["callbacks"] == 1 and sum(snap["counts"]) == 1
+    assert 0.0 < snap["p50_ms"] <= 10.0
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import numpy as np
+
+from engine.processes.chunk_buffer import ChunkAssembler
+
+
+def _fill(view: np.ndarray, start: int) -> np.ndarray:
+    view[:, 0] = np.arange(start, start + view.shape[0], dtype=np.float32)
+    view[:, 1] = -view[:, 0]
+    return view
+
+
+def test_in_place_frames_are_not_copied():
+    asm = ChunkAssembler(2, 4096)
+    buf = asm.buf
+    for i in range(4):
+        asm.append(_fill(asm.reserve(1024), i * 1024))
+    assert asm.buf is buf and asm.filled == 4096
+    assert np.array_equal(asm.view()[:, 0], np.arange(4096, dtype=np.float32))
+    assert np.shares_memory(asm.view(), buf)
+
+
+def test_trimmed_frame_and_leftover_shift_into_place():
+    """append() returns the frames as they sit in the buffer (what the loop region copies).
+
+    That holds even when a short discard makes the shift overlap the trimmed view.
+    """
+    asm = ChunkAssembler(2, 4096)
+    asm.append(_fill(asm.reserve(1000), 0))
+    frame = _fill(asm.reserve(1000), 5000)
+    kept = asm.append(frame[300:])  # discard the first 300 frames after a seek
+    assert np.array_equal(asm.view()[1000:, 0], np.arange(5300, 6000, dtype=np.float32))
+    assert np.array_equal(kept[:, 0], np.arange(5300, 6000, dtype=np.float32))
+    assert not np.array_equal(frame[300:, 0], kept[:, 0])  # the trimmed view was overwritten by the shift
+
+    # Next frame crosses the chunk target: keep 200, leave 800 for the next chunk.
+    frame = _fill(asm.reserve(1000), 9000)
+    asm.append(frame[:200])
+    leftover = frame[200:]
+    assert asm.filled == 1900
+
+    asm.reset()
+    asm.append(leftover)
+    assert asm.filled == 800
+    assert np.array_equal(asm.view()[:, 0], np.arange(9200, 10000, dtype=np.float32))
+    assert np.array_equal(asm.view()[:, 1], -np.arange(9200, 10000, dtype=np.float32))
+
+
+def test_grows_for_oversized_frame():
+    asm = ChunkAssembler(2, 1024)
+    asm.append(_fill(asm.reserve(1000), 0))
+    asm.append(_fill(asm.reserve(5000), 1000))
+    assert asm.grows == 1 and asm.capacity >= 6000
+    assert np.array_equal(asm.view()[:, 0], np.arange(6000, dtype=np.float32))
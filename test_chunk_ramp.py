@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import os
+
+from engine.processes.chunk_ramp import ChunkRamp, chunk_ramp_growth
+
+
+def _sizes(ramp: ChunkRamp, n: int) -> list[int]:
+    out = []
+    for _ in range(n):
+        out.append(ramp.frames)
+        ramp.advance()
+    return out
+
+
+def test_first_chunk_is_start_block():
+    ramp = ChunkRamp(1536, 16384, 2)
+    assert ramp.frames == 1536
+
+
+def test_geometric_growth_caps_at_steady_state():
+    assert _sizes(ChunkRamp(1536, 16384, 2), 7) == [1536, 3072, 6144, 12288, 16384, 16384, 16384]
+    assert _sizes(ChunkRamp(4096, 16384, 4), 3) == [4096, 16384, 16384]
+    # A start block larger than the steady-state chunk never exceeds it.
+    assert ChunkRamp(65536, 16384, 2).frames == 16384
+
+
+def test_growth_one_disables_ramp():
+    assert _sizes(ChunkRamp(1536, 16384, 1), 2) == [16384, 16384]
+    old = os.environ.get("STEPD_DECODE_CHUNK_RAMP")
+    try:
+        os.environ["STEPD_DECODE_CHUNK_RAMP"] = "1"
+        assert chunk_ramp_growth() == 1
+        os.environ["STEPD_DECODE_CHUNK_RAMP"] = "bogus"
+        assert chunk_ramp_growth() == 2
+    finally:
+        if old is None:
+            os.environ.pop("STEPD_DECODE_CHUNK_RAMP", None)
+        else:
+            os.environ["STEPD_DECODE_CHUNK_RAMP"] = old
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from engine.processes.cue_slots import CueSlotTable
+
+
+def test_acquire_release_reuse():
+    """`active` must stay an immutable tuple in start order: the callback iterates it unlocked."""
+    slots = CueSlotTable(capacity=4)
+    a = slots.acquire("a", "ring-a")
+    b = slots.acquire("b", "ring-b")
+    assert (a, b) == (0, 1) and slots.active == (0, 1)
+    assert slots.acquire("a", "ring-a2") == a and slots.rings[a] == "ring-a2"
+
+    slots.set_gain("a", 0.5)
+    slots.set_envelope("a", "env")
+    slots.release("a")
+    assert slots.active == (1,) and "a" not in slots
+    assert slots.get_gain("a") == 1.0 and slots.envelope("a") is None
+
+    c = slots.acquire("c", "ring-c")
+    assert c == 0 and slots.gain[c] == 1.0 and slots.envelopes[c] is None
+    assert slots.active == (1, 0)
+    assert slots.release("missing") is None
+
+
+def test_growth_keeps_state():
+    slots = CueSlotTable(capacity=2)
+    for i in range(5):
+        slot = slots.acquire(f"cue{i}", i)
+        slots.gain[slot] = float(i)
+    assert slots.capacity >= 5
+    assert [slots.get_gain(f"cue{i}") for i in range(5)] == [0.0, 1.0, 2.0, 3.0, 4.0]
+    assert len(slots) == 5
+
+
+def test_collect_times_only_dirty_slots():
+    slots = CueSlotTable()
+    a = slots.acquire("a", None)
+    slots.acquire("b", None)
+    assert slots.collect_times(48000) is None
+
+    slots.consumed[a] += 48000
+    slots.remaining[a] = 24000
+    slots.time_dirty[a] = True
+    assert slots.collect_times(48000) == {"a": (1.0, 0.5)}
+    assert slots.collect_times(48000) is None
+
+
+def test_start_schedule_lifecycle():
+    slots = CueSlotTable(capacity=1)
+    a = slots.acquire("a", None, start_at=4800)
+    slots.acquire("b", None)  # grows the table
+    assert slots.start_at[a] == 4800 and slots.start_at[slots.slot_of["b"]] == -1
+    assert slots.scheduled_count() == 1
+    slots.acquire("a", None)  # re-acquire keeps the schedule
+    assert slots.start_at[a] == 4800
+    slots.release("a")
+    assert slots.start_at[a] == -1 and slots.scheduled_count() == 0
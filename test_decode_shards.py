@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from engine.processes.decode_shards import ShardRouter
+
+
+def test_new_cues_balance_across_shards():
+    r = ShardRouter(3)
+    for i in range(30):
+        r.assign(f"cue-{i}")
+    assert r.loads() == [10, 10, 10]
+
+
+def test_affinity_until_stop():
+    """A restarted cue must reach the shard still holding its decoder state."""
+    r = ShardRouter(4)
+    shard = r.assign("bed")
+    for i in range(7):
+        r.assign(f"other-{i}")
+    assert r.assign("bed") == shard  # restart keeps the container's shard
+    assert r.shard_of("bed") == shard
+    assert sum(r.loads()) == 8
+    assert r.release("bed") == shard
+    assert r.shard_of("bed") is None and r.release("bed") is None
+    assert sum(r.loads()) == 7
+
+
+def test_refill_emptiest_shard():
+    r = ShardRouter(2)
+    a = [r.assign(f"a{i}") for i in range(4)]
+    for cue, shard in zip([f"a{i}" for i in range(4)], a):
+        if shard == 0:
+            r.release(cue)
+    assert r.loads()[0] == 0
+    assert r.assign("new") == 0
+    assert r.cues_on(0) == ["new"]
+
+
+def test_prefer_armed_shard():
+    r = ShardRouter(2)
+    for i in range(3):
+        r.assign(f"a{i}", prefer=1)
+    assert r.loads() == [0, 3]
+    assert r.assign("a0", prefer=0) == 1  # affinity still wins for a running cue
+    assert r.assign("b", prefer=5) == 0  # out of range: least loaded
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import os
+
+import numpy as np
+
+from engine.processes.decoded_cache import DecodedPcmCache, PcmCapture, cache_key
+
+
+def _pcm(frames: int, value: float = 0.5) -> np.ndarray:
+    return np.full((frames, 2), value, dtype=np.float32)
+
+
+def test_key_tracks_file_changes(tmp_path):
+    path = tmp_path / "sting.wav"
+    path.write_bytes(b"x" * 100)
+    k1 = cache_key(str(path), 48000, 2)
+    assert k1 == cache_key(str(path), 48000, 2)
+    assert k1 != cache_key(str(path), 44100, 2)
+    path.write_bytes(b"x" * 101)
+    os.utime(path, ns=(1, 1))
+    assert cache_key(str(path), 48000, 2) != k1
+    assert cache_key(str(tmp_path / "missing.wav"), 48000, 2) is None
+
+
+def test_lru_eviction_within_budget():
+    entry = _pcm(1000).nbytes
+    cache = DecodedPcmCache(budget_bytes=entry * 2)
+    cache.put("a", _pcm(1000))
+    cache.put("b", _pcm(1000))
+    assert cache.get("a") is not None  # a is now most recent
+    cache.put("c", _pcm(1000))
+    assert "b" not in cache and "a" in cache and "c" in cache
+    assert cache.bytes <= cache.budget_bytes
+    assert cache.stats()["evictions"] == 1
+    assert cache.get("b") is None and cache.stats()["misses"] == 1
+
+
+def test_cached_arrays_are_read_only():
+    cache = DecodedPcmCache(budget_bytes=1 << 20)
+    cache.put("a", _pcm(10))
+    assert not cache.get("a").flags.writeable
+
+
+def test_capture_store_and_abandon():
+    """Only a clean pass under the entry limit is stored; anything else would serve a partial file."""
+    cache = DecodedPcmCache(budget_bytes=1 << 20, max_entry_bytes=_pcm(100).nbytes)
+    cap = PcmCapture(cache, "a", 2)
+    cap.add(_pcm(60, 0.1))
+    cap.add(_pcm(40, 0.2))
+    stored = cap.finish()
+    assert stored is not None and stored.shape == (100, 2)
+    assert np.array_equal(cache.get("a")[60:], _pcm(40, 0.2))
+
+    too_big = PcmCapture(cache, "b", 2)
+    too_big.add(_pcm(80))
+    too_big.add(_pcm(80))
+    assert not too_big.active and too_big.finish() is None and "b" not in cache
+
+    seeked = PcmCapture(cache, "c", 2)
+    seeked.add(_pcm(10))
+    seeked.abandon()
+    assert seeked.finish() is None and "c" not in cache
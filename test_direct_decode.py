@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import queue
+import time
+
+from engine.audio_engine import AudioEngine
+from engine.commands import PlayCueCommand
+from engine.messages.events import CueFinishedEvent, DecodeErrorEvent
+from engine.processes.decode_process_pooled import DecodeError, DecodeStart
+from engine.processes.output_process import OutputStartCue, OutputStopCue
+
+
+def _take(q, kind: type, timeout: float = 2.0):
+    """Next message of `kind` from an engine queue (others are skipped)."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            msg = q.get(timeout=0.05)
+        except queue.Empty:
+            continue
+        if isinstance(msg, kind):
+            return msg
+    raise AssertionError(f"no {kind.__name__} within {timeout}s")
+
+
+def _pump_until(engine: AudioEngine, done, timeout: float = 2.0) -> list:
+    events: list = []
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        events.extend(engine.pump())
+        if done(events):
+            return events
+        time.sleep(0.01)
+    raise AssertionError(f"condition not reached; events={events}")
+
+
+def _play(engine: AudioEngine, cue_id: str) -> DecodeStart:
+    engine._decode_direct = True
+    engine.play_cue(
+        PlayCueCommand(cue_id=cue_id, file_path="/nonexistent/bed.wav", total_seconds=1.0, file_metadata={"title": "Bed"}),
+        layered=True,
+    )
+    return _take(engine._decode_cmd_q, DecodeStart)
+
+
+def _no_more(q, kind: type, wait: float = 0.2) -> bool:
+    deadline = time.monotonic() + wait
+    while time.monotonic() < deadline:
+        try:
+            if isinstance(q.get(timeout=0.05), kind):
+                return False
+        except queue.Empty:
+            pass
+    return True
+
+
+def test_direct_cue_runs_on_notices():
+    """Regression: in direct mode the engine only sees notices, never PCM.
+
+    No processes are started: the test plays the decoder and output processes
+    through the engine's queues.
+    """
+    engine = AudioEngine(auto_fade_on_new=False, fade_in_ms=0)
+    start = _play(engine, "cue-1")
+    assert _take(engine._out_cmd_q, OutputStartCue).cue_id == "cue-1"  # play_cue starts the output at once
+
+    engine._decode_evt_q.put(("first_chunk", "cue-1", start.track_id, 512, time.monotonic(), 0.0))
+    _pump_until(engine, lambda _: engine.last_first_chunk_ms is not None)
+    assert _no_more(engine._out_cmd_q, OutputStartCue)  # the notice does not start it twice
+
+    engine._decode_evt_q.put(("eof", "cue-1", start.track_id))
+    _pump_until(engine, lambda _: engine._decode_evt_q.empty())
+    assert "cue-1" in engine.active_cues  # decoding is done; the output still plays it out
+
+    engine._out_evt_q.put(("finished", "cue-1", "eof_natural"))
+    events = _pump_until(engine, lambda evts: any(isinstance(e, CueFinishedEvent) for e in evts))
+    finished = [e for e in events if isinstance(e, CueFinishedEvent)]
+    assert finished[0].cue_info.cue_id == "cue-1" and finished[0].reason == "eof_natural"
+    assert "cue-1" not in engine.active_cues
+    assert engine._out_pcm_q.empty()  # no PCM went through the engine
+
+
+def test_first_chunk_notice_starts_output():
+    engine = AudioEngine(auto_fade_on_new=False, fade_in_ms=0)
+    start = _play(engine, "cue-3")
+    _take(engine._out_cmd_q, OutputStartCue)
+    engine._output_started.discard("cue-3")  # as if the eager start had not been sent
+
+    engine._decode_evt_q.put(("first_chunk", "cue-3", start.track_id, 512, time.monotonic(), 0.0))
+    _pump_until(engine, lambda _: "cue-3" in engine._output_started)
+    started = _take(engine._out_cmd_q, OutputStartCue)
+    assert started.cue_id == "cue-3" and started.track_id == start.track_id
+    assert engine._out_pcm_q.empty()
+
+
+def test_decode_error_stops_cue_in_direct_mode():
+    """DecodeError is always sent on the decode output queue, direct mode or not."""
+    engine = AudioEngine(auto_fade_on_new=False, fade_in_ms=0)
+    start = _play(engine, "cue-2")
+
+    engine._decode_out_q.put(DecodeError("cue-2", start.track_id, start.file_path, "No audio stream"))
+    events = _pump_until(engine, lambda evts: any(isinstance(e, DecodeErrorEvent) for e in evts))
+    assert [e.cue_id for e in events if isinstance(e, DecodeErrorEvent)] == ["cue-2"]
+    assert _take(engine._out_cmd_q, OutputStopCue).cue_id == "cue-2"
+    assert "cue-2" not in engine.active_cues
+
+    engine._out_evt_q.put(("finished", "cue-2", "stopped"))
+    events = _pump_until(engine, lambda evts: any(isinstance(e, CueFinishedEvent) for e in evts))
+    finished = [e for e in events if isinstance(e, CueFinishedEvent)]
+    assert finished[0].reason == "decode_error: No audio stream"
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import threading
+import time
+
+from engine.processes.edf_pool import EdfDecodePool
+
+
+def _clock() -> float:
+    return 100.0
+
+
+def _wait(pred, timeout=2.0) -> None:
+    end = time.monotonic() + timeout
+    while not pred():
+        assert time.monotonic() < end, "timed out"
+        time.sleep(0.001)
+
+
+def _blocker(started: threading.Event, release: threading.Event):
+    started.set()
+    release.wait(2.0)
+    yield None
+
+
+def _recorder(name: str, order: list[str], produce: list[int | None]):
+    for frames in produce:
+        order.append(name)
+        yield frames
+
+
+def test_earliest_deadline_first():
+    """A cue's deadline is when its output ring runs dry (ring_frames / rate)."""
+    pool = EdfDecodePool(1, clock=_clock)
+    started, release = threading.Event(), threading.Event()
+    pool.submit("busy", _blocker(started, release), 48000)
+    assert started.wait(2.0)
+
+    order: list[str] = []
+    jobs = {name: pool.submit(name, _recorder(name, order, [None]), 48000) for name in ("full", "empty", "half")}
+    pool.wake(jobs["full"], ring_frames=48000)
+    pool.wake(jobs["empty"], ring_frames=0)
+    pool.wake(jobs["half"], ring_frames=4800)
+    assert pool.queued() == 3
+    release.set()
+    _wait(lambda: len(order) == 3)
+    assert order == ["empty", "half", "full"]
+    pool.shutdown()
+
+
+def test_production_pushes_deadline_back():
+    pool = EdfDecodePool(1, clock=_clock)
+    started, release = threading.Event(), threading.Event()
+    pool.submit("busy", _blocker(started, release), 48000)
+    assert started.wait(2.0)
+
+    order: list[str] = []
+    fast = pool.submit("fast", _recorder("fast", order, [24000, 24000, 24000, None]), 48000)
+    slow = pool.submit("slow", _recorder("slow", order, [None]), 48000)
+    pool.wake(fast, ring_frames=0)        # due now, +0.5 s per step
+    pool.wake(slow, ring_frames=36000)    # due in 0.75 s
+    release.set()
+    _wait(lambda: fast.done or len(order) == 5)
+    assert order == ["fast", "fast", "slow", "fast", "fast"]
+    pool.shutdown()
+
+
+def test_wake_while_running_reruns_and_idle_parks():
+    pool = EdfDecodePool(1, clock=_clock)
+    in_step, release = threading.Event(), threading.Event()
+    steps: list[int] = []
+
+    def cue():
+        while True:
+            steps.append(len(steps))
+            if len(steps) == 1:
+                in_step.set()
+                release.wait(2.0)
+            yield None
+
+    job = pool.submit("c", cue(), 48000)
+    assert in_step.wait(2.0)
+    pool.wake(job)  # message arrives mid-step
+    release.set()
+    _wait(lambda: len(steps) == 2)
+    time.sleep(0.05)
+    assert len(steps) == 2  # parked until the next wake
+    pool.wake(job)
+    _wait(lambda: len(steps) == 3)
+    pool.shutdown()
+
+
+def test_crash_is_isolated():
+    errors = []
+    pool = EdfDecodePool(1, on_error=lambda job, e: errors.append((job.cue_id, str(e))))
+
+    def bad():
+        raise RuntimeError("boom")
+        yield None
+
+    order: list[str] = []
+    crashed = pool.submit("bad", bad(), 48000)
+    ok = pool.submit("ok", _recorder("ok", order, [None]), 48000)
+    _wait(lambda: crashed.done and order == ["ok"])
+    assert errors == [("bad", "boom")] and not ok.done
+    pool.shutdown()
+
+
+def test_return_value_is_kept():
+    pool = EdfDecodePool(1)
+
+    def failing():
+        yield 0
+        return True
+
+    job = pool.submit("c", failing(), 48000)
+    _wait(lambda: job.done)
+    assert job.result is True and job.error is None
+    pool.shutdown()
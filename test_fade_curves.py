@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import numpy as np
+
+from engine.processes.fade_curves import FADE_CURVES, FadeTableCache, normalize_fade_curve
+
+
+def test_curves_are_monotonic_with_exact_endpoints():
+    cache = FadeTableCache(max_bytes=1 << 20)
+    for curve in FADE_CURVES:
+        table = cache.get(curve, 480)
+        assert table.shape == (481,)
+        assert table.dtype == np.float32
+        assert table[0] == 0.0 and table[-1] == 1.0
+        assert np.all(np.diff(table) >= 0.0), curve
+
+
+def test_equal_power_matches_sine_shape():
+    """The table must match the sin(t * pi/2) the callback used to compute per block."""
+    table = FadeTableCache(max_bytes=1 << 20).get("equal_power", 1000)
+    t = np.arange(1001) / 1000.0
+    assert np.allclose(table, np.sin(t * np.pi / 2), atol=1e-6)
+
+
+def test_curve_aliases():
+    assert normalize_fade_curve("Equal-Power") == "equal_power"
+    assert normalize_fade_curve("logarithmic") == "log"
+    assert normalize_fade_curve("s-curve") == "s_curve"
+    assert normalize_fade_curve("bogus") == "linear"
+
+
+def test_lru_reuse_and_eviction():
+    # Room for two 1001-point float32 tables (4004 bytes each), not three.
+    cache = FadeTableCache(max_bytes=9000)
+    a = cache.get("linear", 1000)
+    assert cache.get("lin", 1000) is a
+    cache.get("log", 1000)
+    cache.get("linear", 1000)  # touch -> "log" becomes least recently used
+    cache.get("s_curve", 1000)
+    stats = cache.stats()
+    assert stats["tables"] == 2 and stats["bytes"] <= 9000
+    assert cache.get("linear", 1000) is a
+    assert stats["hits"] == 2
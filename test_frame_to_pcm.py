@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import queue
+import types
+import wave
+
+import av
+import numpy as np
+import pytest
+
+from engine.processes import decode_process_pooled as dpp
+from engine.processes.decode_process_pooled import (
+    BufferRequest,
+    DecodeStart,
+    DecodedChunk,
+    _DecodePathStats,
+    _ensure_channels,
+    _frame_to_pcm,
+    _negotiate_direct,
+    _normalize_audio,
+)
+
+
+RATE = 48000
+FRAMES = 1024
+LAYOUTS = {"mono": 1, "stereo": 2, "5.1": 6}
+
+
+def _samples(channels: int) -> np.ndarray:
+    rng = np.random.default_rng(channels)
+    return rng.uniform(-0.9, 0.9, (channels, FRAMES))
+
+
+def _frame(fmt: str, layout: str) -> av.AudioFrame:
+    ch = LAYOUTS[layout]
+    planes = _samples(ch)
+    base = fmt.rstrip("p")
+    if base == "s16":
+        planes = np.round(planes * 32767).astype(np.int16)
+    elif base == "s32":
+        planes = np.round(planes * 2147483647).astype(np.int32)
+    else:
+        planes = planes.astype(np.float32)
+    if fmt.endswith("p"):
+        arr = planes
+    else:
+        arr = planes.T.reshape(1, -1)  # packed: interleaved in one plane
+    frame = av.AudioFrame.from_ndarray(np.ascontiguousarray(arr), format=fmt, layout=layout)
+    frame.sample_rate = RATE
+    return frame
+
+
+def _old_path(frame: av.AudioFrame, channels: int) -> np.ndarray:
+    resampler = av.AudioResampler(format="fltp", rate=RATE)
+    out = list(resampler.resample(frame)) + list(resampler.resample(None))
+    pcm = [_ensure_channels(_normalize_audio(f.to_ndarray()), channels) for f in out]
+    return np.concatenate(pcm, axis=0)
+
+
+@pytest.mark.parametrize("fmt", ["s16", "s16p", "s32", "s32p", "flt", "fltp"])
+@pytest.mark.parametrize("layout", ["mono", "stereo", "5.1"])
+def test_frame_to_pcm_matches_resampler_path(fmt, layout):
+    """Regression: must match AudioResampler(fltp) + _normalize_audio + _ensure_channels."""
+    frame = _frame(fmt, layout)
+    expected = _old_path(frame, 2)
+    pcm = _frame_to_pcm(frame, 2)
+    assert pcm.dtype == np.float32 and pcm.shape == (FRAMES, 2)
+    assert np.allclose(pcm, expected, rtol=0.0, atol=1e-6)
+    if layout == "mono":
+        assert np.all(pcm[:, 1] == 0.0)
+
+    buf = np.full((FRAMES + 10, 2), 7.0, dtype=np.float32)
+    into = _frame_to_pcm(frame, 2, buf)
+    assert np.shares_memory(into, buf) and np.array_equal(into, pcm)
+    assert np.all(buf[FRAMES:] == 7.0)
+
+
+def _start(probe: dict | None, path: str = "x") -> DecodeStart:
+    return DecodeStart("c1", "t1", path, 0, None, 0.0, False, RATE, 2, 512, decoder_probe=probe)
+
+
+def test_negotiate_direct():
+    stream = types.SimpleNamespace(codec_context=types.SimpleNamespace(sample_rate=44100))
+    assert _negotiate_direct(_start({"stream_rate": RATE}), stream)
+    assert not _negotiate_direct(_start({"stream_rate": 44100}), stream)
+    assert not _negotiate_direct(_start(None), stream)
+    assert _negotiate_direct(_start({}), types.SimpleNamespace(codec_context=types.SimpleNamespace(sample_rate=RATE)))
+    assert not _negotiate_direct(_start(None), object())
+
+
+def test_rate_mismatch_falls_back_to_resampling(tmp_path, monkeypatch):
+    """Frames that disagree with the probed rate must be resampled, not played at the wrong speed."""
+    monkeypatch.setenv("STEPD_DECODE_PCM_FAST_PATH", "0")
+    monkeypatch.setattr(dpp, "shared_seek_index_store", lambda: None)
+    path = str(tmp_path / "tone.wav")
+    tone = np.round(np.sin(np.arange(44100) * 0.05) * 20000).astype(np.int16)
+    with wave.open(path, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(44100)
+        w.writeframes(tone.tobytes())
+
+    # The probe claims the output rate, so the cue starts on the direct path.
+    cmd_q: "queue.Queue[object]" = queue.Queue()
+    sink: "queue.Queue[object]" = queue.Queue()
+    cmd_q.put(BufferRequest("c1", 10**6))
+    stats = _DecodePathStats()
+    got = []
+    eof = False
+    steps = dpp._decode_cue_steps(0, _start({"stream_rate": RATE}, path), cmd_q, sink, sink, None, path_stats=stats)
+    for produced in steps:
+        while not sink.empty():
+            msg = sink.get_nowait()
+            if isinstance(msg, DecodedChunk):
+                got.append(np.array(msg.pcm))
+                eof = eof or msg.eof
+        if eof or produced is None:
+            break
+    steps.close()
+    assert eof
+    pcm = np.concatenate(got, axis=0)
+    assert stats.take_changed() == {"direct": 1, "resample_fallback": 1}
+
+    container = av.open(path)
+    resampler = av.AudioResampler(format="fltp", rate=RATE)
+    expected = []
+    for frame in container.decode(audio=0):
+        frame.pts = None
+        for out in resampler.resample(frame):
+            expected.append(_ensure_channels(_normalize_audio(out.to_ndarray()), 2))
+    container.close()
+    expected = np.concatenate(expected, axis=0)
+    assert pcm.shape[0] >= expected.shape[0] > 44100
+    assert np.allclose(pcm[: expected.shape[0]], expected, rtol=0.0, atol=1e-6)
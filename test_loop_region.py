@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import queue
+import wave
+from fractions import Fraction
+
+import numpy as np
+import pytest
+
+from engine.commands import UpdateCueCommand
+from engine.processes import decode_process_pooled as dpp
+from engine.processes.decode_process_pooled import BufferRequest, DecodeStart, DecodedChunk, DecodeError
+
+
+RATE = 48000
+FILE_FRAMES = 20000
+SOURCE = (np.arange(FILE_FRAMES) % 30000).astype(np.int16)
+EXPECTED = SOURCE.astype(np.float32) / 32768.0  # what the decoder makes of SOURCE
+
+
+class _Cue:
+    """Drives _decode_cue_steps in-thread: grant credit, step until it waits for more."""
+
+    def __init__(self, path: str, in_frame: int, out_frame: int | None) -> None:
+        self.cmd_q: "queue.Queue[object]" = queue.Queue()
+        self.sink: "queue.Queue[object]" = queue.Queue()
+        start = DecodeStart("c1", "t1", path, in_frame, out_frame, 0.0, True, RATE, 1, 512)
+        self.steps = dpp._decode_cue_steps(0, start, self.cmd_q, self.sink, self.sink, None)
+        self.chunks: list[tuple[np.ndarray, bool]] = []
+
+    def pump(self, frames: int) -> None:
+        self.cmd_q.put(BufferRequest("c1", frames))
+        for produced in self.steps:
+            while not self.sink.empty():
+                msg = self.sink.get_nowait()
+                assert not isinstance(msg, DecodeError), msg
+                if isinstance(msg, DecodedChunk):
+                    self.chunks.append((np.array(msg.pcm[:, 0]), bool(msg.is_loop_restart)))
+            if produced is None:
+                return
+
+    def play(self, frames: int, step: int) -> None:
+        """Grant `frames` of credit `step` frames at a time (no chunk spans two loop boundaries)."""
+        for pos in range(0, frames, step):
+            self.pump(min(step, frames - pos))
+
+    def update(self, in_frame: int, out_frame: int | None) -> None:
+        self.cmd_q.put(UpdateCueCommand("c1", in_frame=in_frame, out_frame=out_frame))
+
+    def output(self) -> np.ndarray:
+        return np.concatenate([pcm for pcm, _ in self.chunks])
+
+    def restarts(self) -> int:
+        return sum(1 for _, restart in self.chunks if restart)
+
+    def close(self) -> None:
+        self.steps.close()
+
+
+def _make_source(tmp_path, monkeypatch) -> tuple[str, list[int]]:
+    # Force the PyAV path (no WAV memory-map, no seek index) and count seeks.
+    monkeypatch.setenv("STEPD_DECODE_PCM_FAST_PATH", "0")
+    monkeypatch.setattr(dpp, "shared_seek_index_store", lambda: None)
+    seeks = []
+    real_seek = dpp._seek_container
+
+    def _counting_seek(*args, **kwargs):
+        seeks.append(args[2])
+        return real_seek(*args, **kwargs)
+
+    monkeypatch.setattr(dpp, "_seek_container", _counting_seek)
+    path = str(tmp_path / "ramp.wav")
+    with wave.open(path, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(RATE)
+        w.writeframes(SOURCE.tobytes())
+    return path, seeks
+
+
+@pytest.fixture
+def source(tmp_path, monkeypatch):
+    return _make_source(tmp_path, monkeypatch)
+
+
+def _expect(out: np.ndarray, *spans: tuple[int, int], repeat: tuple[int, int]) -> None:
+    """`out` is the file spans in order, then `repeat` over and over up to its end."""
+    head = [EXPECTED[a:b] for a, b in spans]
+    period = EXPECTED[repeat[0] : repeat[1]]
+    tail = out.shape[0] - sum(x.shape[0] for x in head)
+    assert tail > 2 * period.shape[0]
+    expected = np.concatenate(head + [np.resize(period, tail)])
+    assert out.shape == expected.shape
+    mismatch = np.flatnonzero(out != expected)
+    assert mismatch.size == 0, f"first mismatch at output frame {mismatch[:1]}"
+
+
+@pytest.mark.parametrize("in_frame,out_frame", [(3000, 7000), (3000, None)])
+def test_region_replays_first_pass(source, in_frame, out_frame):
+    """Later passes replay the first decoded pass sample for sample.
+
+    Each pass starts with exactly one is_loop_restart chunk.
+    """
+    path, seeks = source
+    cue = _Cue(path, in_frame, out_frame)
+    length = (out_frame or FILE_FRAMES) - in_frame
+    cue.play(length * 5 + 100, length)
+    cue.close()
+    _expect(cue.output(), repeat=(in_frame, out_frame or FILE_FRAMES))
+    assert cue.restarts() == 5  # one is_loop_restart per pass after the first
+    assert seeks == [in_frame]  # decoded once, never seeked back
+
+
+def test_loop_change_while_capturing_rejects_stale_region(source):
+    """A region captured for the old loop points must not be replayed."""
+    path, seeks = source
+    cue = _Cue(path, 3000, 7000)
+    cue.pump(1000)
+    cue.update(5000, 7000)  # the first pass is being captured for 3000..7000
+    cue.play(2000 * 5, 2000)
+    cue.close()
+    # Pass positions count from in_frame, so the first pass ends 2000 frames early, at
+    # the new out point less 1000; then 5000..7000 repeats (not the stale 3000.. capture).
+    _expect(cue.output(), (3000, 5000), repeat=(5000, 7000))
+    assert cue.restarts() == 5
+    assert seeks == [3000, 5000]
+
+
+def test_loop_change_during_replay(source):
+    path, seeks = source
+    cue = _Cue(path, 3000, 7000)
+    cue.play(4000 * 2 + 1000, 4000)  # 1000 frames into the first replayed pass
+    cue.update(10000, 12000)
+    cue.play(8000 + 2000 * 6, 2000)
+    cue.close()
+    # The current pass leaves memory at 4000 and runs on to the new out point 12000;
+    # then 10000..12000 is decoded once and replayed.
+    _expect(cue.output(), (3000, 7000), (3000, 7000), (3000, 12000), repeat=(10000, 12000))
+    assert cue.restarts() == 2 + 6
+    assert seeks == [3000, 4000, 10000]
+
+
+class _Stream:
+    time_base = Fraction(1, RATE)
+    start_time = 1105  # LAME/gapless MP3: the first decoded frame is at ~23 ms
+
+
+class _Container:
+    def __init__(self) -> None:
+        self.seeks: list[int] = []
+
+    def seek(self, ts, **_kwargs) -> None:
+        self.seeks.append(ts)
+
+
+def test_unindexed_seek_uses_stream_start():
+    """Regression: gapless MP3s start at a nonzero PTS.
+
+    Trimming against 0 took a loop back to frame 0 for a seek past the target.
+    """
+    container = _Container()
+    _, align = dpp._seek_container(container, _Stream(), 0, RATE, None)
+    assert container.seeks == [1105]
+    assert dpp._align_discard(align, 1105, RATE) == 0  # not "landed past the target"
+
+    _, align = dpp._seek_container(container, _Stream(), 3000, RATE, None)
+    assert container.seeks[-1] == 1105 + 3000
+    assert dpp._align_discard(align, 1105 + 1000, RATE) == 2000
+    assert dpp._align_discard(align, 1105 + 3500, RATE) == -500
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import numpy as np
+
+from engine.processes.metering import MeterTap, MeterWorker, true_peak
+
+
+SR = 48000
+BLOCK = 512
+
+
+def _sine(freq: float, amp: float, frames: int, channels: int, phase: float = 0.0) -> np.ndarray:
+    t = np.arange(frames) / SR
+    x = (amp * np.sin(2 * np.pi * freq * t + phase)).astype(np.float32)
+    return np.repeat(x[:, None], channels, axis=1)
+
+
+def _slots(*slots: int) -> np.ndarray:
+    return np.array(slots, dtype=np.int64)
+
+
+def test_tap_ring_order_and_drops():
+    tap = MeterTap(2, max_frames=BLOCK, max_cues=1, slots=2, names=["a", "b", "c"])
+    for k in range(3):
+        rows = np.full((1, BLOCK, 2), float(k), dtype=np.float32)
+        tap.publish(_slots(0), rows, rows[0])
+    assert tap.dropped == 1 and tap.pending() == 2
+    ids, rows, master = tap.peek()
+    assert ids == ("a",) and rows.shape == (1, BLOCK, 2) and master[0, 0] == 0.0
+    tap.advance()
+    assert tap.peek()[2][0, 0] == 1.0
+    tap.advance()
+    assert tap.peek() is None
+
+    # More cues than preallocated: the slot grows instead of truncating.
+    rows = np.ones((3, BLOCK, 2), dtype=np.float32)
+    assert tap.publish(_slots(2, 0, 1), rows, rows[0])
+    ids, rows, _ = tap.peek()
+    assert ids == ("c", "a", "b") and rows.shape == (3, BLOCK, 2)
+
+
+def test_released_slot_is_not_credited_to_its_next_cue():
+    """Blocks tapped before a slot was released belong to the cue that held it then."""
+    names = ["a", None]
+    tap = MeterTap(1, max_frames=BLOCK, slots=8, names=names)
+    worker = MeterWorker(tap, SR)
+    loud = np.full((BLOCK, 1), 0.5, dtype=np.float32)
+    tap.publish(_slots(0), loud[None, :, :], loud)
+    names[0] = None  # the main loop releases "a"...
+    tap.retire(0)
+    names[0] = "b"  # ...and "b" takes its slot before the worker drains
+    quiet = np.full((BLOCK, 1), 0.25, dtype=np.float32)
+    tap.publish(_slots(0), quiet[None, :, :], quiet)
+    assert tap.peek()[0] == (None,)
+    assert worker.drain() == 2
+    levels = worker.publish()["cue_levels"]
+    assert set(levels) == {"b"}
+    assert abs(levels["b"][1] - 0.25) < 1e-6
+
+
+def test_levels_integrate_over_publish_period():
+    tap = MeterTap(2, max_frames=BLOCK, slots=8, names=["a", "b"])
+    worker = MeterWorker(tap, SR)
+    loud = _sine(1000.0, 0.5, BLOCK, 2)
+    quiet = np.zeros_like(loud)
+    for block in (loud, quiet):
+        rows = np.stack([block, block * 0.5])
+        tap.publish(_slots(0, 1), rows, block)
+    assert worker.drain() == 2
+    snap = worker.publish()
+
+    rms, peak = snap["cue_levels"]["a"]
+    assert abs(rms - (0.5 / np.sqrt(2)) / np.sqrt(2)) < 1e-3  # half the period is silent
+    assert abs(peak - 0.5) < 1e-3
+    rms_b, peak_b = snap["cue_levels_per_channel"]["b"]
+    assert len(rms_b) == 2 and abs(peak_b[0] - 0.25) < 1e-3
+    assert snap["master_peak_db"][0] > -7.0 and snap["master_rms_db"][0] < snap["master_peak_db"][0]
+
+    # Nothing new -> cues drop out of the next snapshot.
+    assert worker.publish()["cue_levels"] == {}
+
+
+def test_true_peak_catches_intersample_peak():
+    # fs/4 sine at 45 degrees: every sample is +-0.707, the waveform peaks at 1.0.
+    block = _sine(SR / 4, 1.0, BLOCK, 1, phase=np.pi / 4)
+    assert np.max(np.abs(block)) < 0.71
+    tp = true_peak(block[None, :, :])
+    assert abs(float(tp[0, 0]) - 1.0) < 0.01
+
+
+def test_momentary_lufs_reference_tone():
+    """BS.1770: a full-scale 1 kHz sine on one channel reads -3.01 LUFS."""
+    tap = MeterTap(1, max_frames=BLOCK, slots=128, names=["a"])
+    worker = MeterWorker(tap, SR, enable_true_peak=False)
+    tone = _sine(997.0, 1.0, SR // 2, 1)
+    for start in range(0, tone.shape[0] - BLOCK + 1, BLOCK):
+        block = tone[start : start + BLOCK]
+        tap.publish(_slots(0), block[None, :, :], block)
+        worker.drain()
+    snap = worker.publish()
+    assert abs(snap["cue_lufs_momentary"]["a"] - (-3.01)) < 0.1
+    assert abs(snap["master_lufs_momentary"] - (-3.01)) < 0.1
+
+
+def test_forget_drops_cue_state():
+    tap = MeterTap(1, max_frames=BLOCK, slots=4, names=["a"])
+    worker = MeterWorker(tap, SR)
+    block = _sine(440.0, 0.5, BLOCK, 1)
+    tap.publish(_slots(0), block[None, :, :], block)
+    worker.drain()
+    worker.forget("a")
+    assert "a" not in worker.publish()["cue_levels"]
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import numpy as np
+
+from engine.processes.mix_ahead import MasterRing, MixAheadThread
+
+
+def test_ring_wraparound_order():
+    ring = MasterRing(8, 1)
+    out = np.empty((3, 1), dtype=np.float32)
+    seq = np.arange(30, dtype=np.float32)[:, None]
+    pos = 0
+    got = []
+    for _ in range(10):
+        pos += ring.write(seq[pos : pos + 3])
+        ring.read_into(out)
+        got.extend(out[:, 0].tolist())
+    assert got == seq[:30, 0].tolist()
+    assert ring.underruns == 0
+
+
+def test_underrun_zero_fills():
+    ring = MasterRing(16, 2)
+    ring.write(np.ones((4, 2), dtype=np.float32))
+    out = np.full((6, 2), 7.0, dtype=np.float32)
+    assert ring.read_into(out) == 4
+    assert np.all(out[:4] == 1.0) and np.all(out[4:] == 0.0)
+    assert ring.underruns == 1 and ring.underrun_frames == 2
+
+
+def test_fill_keeps_target_lead():
+    ring = MasterRing(64 * 4, 2)
+    counter = {"n": 0}
+
+    def render(block):
+        counter["n"] += 1
+        block.fill(float(counter["n"]))
+
+    mixer = MixAheadThread(ring, render, block_frames=64, ahead_blocks=3, sample_rate=48000)
+    assert mixer.fill() == 3
+    assert ring.available() == 192
+    assert mixer.fill() == 0
+
+    out = np.empty((64, 2), dtype=np.float32)
+    ring.read_into(out)
+    assert np.all(out == 1.0)
+    assert mixer.fill() == 1 and ring.available() == 192
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import struct
+import time
+
+import numpy as np
+import pytest
+
+from engine.processes.offline_sink import (
+    CallbackTimingStats,
+    MasterWriter,
+    OfflineOutputStream,
+    parse_sink_spec,
+)
+
+
+def test_parse_sink_spec():
+    assert parse_sink_spec(None) is None
+    assert parse_sink_spec("device") is None
+    assert parse_sink_spec("null") == ("null", None)
+    assert parse_sink_spec("wav:/tmp/x.wav") == ("wav", "/tmp/x.wav")
+    with pytest.raises(ValueError):
+        parse_sink_spec("wav:")
+    with pytest.raises(ValueError):
+        parse_sink_spec("flac:/tmp/x.flac")
+
+
+def test_wav_round_trip(tmp_path):
+    path = tmp_path / "mix.wav"
+    w = MasterWriter("wav", str(path), 48000, 2)
+    blocks = [np.full((64, 2), i / 10.0, dtype=np.float32) for i in range(3)]
+    for b in blocks:
+        w.write(b)
+    w.close()
+
+    raw = path.read_bytes()
+    assert raw[:4] == b"RIFF" and raw[8:12] == b"WAVE"
+    fmt_tag, channels, rate = struct.unpack("<HHI", raw[20:28])
+    assert (fmt_tag, channels, rate) == (3, 2, 48000)
+    data_bytes = struct.unpack("<I", raw[40:44])[0]
+    assert data_bytes == 192 * 2 * 4
+    data = np.frombuffer(raw[44:], dtype="<f4").reshape(-1, 2)
+    assert np.array_equal(data, np.concatenate(blocks))
+
+
+def test_npy_output(tmp_path):
+    path = tmp_path / "mix.npy"
+    w = MasterWriter("npy", str(path), 48000, 2)
+    w.write(np.ones((32, 2), dtype=np.float32))
+    w.write(np.zeros((32, 2), dtype=np.float32))
+    w.close()
+    data = np.load(path)
+    assert data.shape == (64, 2)
+    assert data[:32].sum() == 64.0 and data[32:].sum() == 0.0
+
+
+def test_timing_summary():
+    stats = CallbackTimingStats(budget_ms=10.0)
+    for ms in (1.0, 2.0, 3.0, 20.0):
+        stats.add(ms)
+    s = stats.summary()
+    assert s["callbacks"] == 4
+    assert s["over_budget"] == 1
+    assert s["max_ms"] == 20.0
+
+
+def test_stream_renders_and_counts_stalls():
+    calls = {"n": 0, "ready_checks": 0}
+
+    def callback(outdata, frames, t, status):
+        calls["n"] += 1
+        outdata.fill(float(calls["n"]))
+
+    def ready(frames):
+        # Not ready on every other first check -> one stall per two blocks.
+        calls["ready_checks"] += 1
+        return calls["ready_checks"] % 2 == 0
+
+    writer = MasterWriter("null", None, 48000, 2)
+    stream = OfflineOutputStream(
+        samplerate=48000,
+        channels=2,
+        blocksize=128,
+        callback=callback,
+        writer=writer,
+        speed=0.0,
+        ready=ready,
+        active=lambda: True,
+    )
+    stream.start()
+    deadline = time.perf_counter() + 2.0
+    while calls["n"] < 20 and time.perf_counter() < deadline:
+        time.sleep(0.005)
+    stream.stop()
+
+    assert calls["n"] >= 20
+    assert writer.frames == stream.frames_rendered == calls["n"] * 128
+    assert stream.stats.count == calls["n"]
+    assert stream.stats.stalls >= calls["n"] - 1
+
+
+def test_gate_holds_at_limit():
+    limit = {"frames": 128 * 5}
+    writer = MasterWriter("null", None, 48000, 2)
+    stream = OfflineOutputStream(
+        samplerate=48000,
+        channels=2,
+        blocksize=128,
+        callback=lambda outdata, frames, t, status: outdata.fill(0.0),
+        writer=writer,
+        speed=0.0,
+        active=lambda: True,
+        gate=lambda frames: stream.frames_rendered + frames <= limit["frames"],
+    )
+    stream.start()
+    time.sleep(0.05)
+    assert stream.frames_rendered == 128 * 5
+    limit["frames"] = 128 * 8 + 64  # holds at the last block boundary before the limit
+    time.sleep(0.05)
+    stream.stop()
+    assert stream.frames_rendered == 128 * 8
+    assert stream.stats.stalls == 0
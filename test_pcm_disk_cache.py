@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import os
+import time
+
+import numpy as np
+
+from engine.pcm_disk_cache import PcmDiskCache, to_float32
+from engine.processes.decoded_cache import DecodedPcmCache, PcmCapture, cache_key
+
+
+def _source(tmp_path, name="cue.wav", payload=b"RIFF"):
+    p = tmp_path / name
+    p.write_bytes(payload)
+    return str(p)
+
+
+def _pcm(frames=4800, channels=2, seed=0):
+    rng = np.random.default_rng(seed)
+    return (rng.random((frames, channels), dtype=np.float32) - 0.5).astype(np.float32)
+
+
+def test_round_trip_memmap_and_invalidation(tmp_path):
+    src = _source(tmp_path)
+    cache = PcmDiskCache(tmp_path / "cache", max_bytes=1 << 24)
+    pcm = _pcm()
+    assert cache.store(src, 48000, 2, "pad", pcm, source_channels=2) is not None
+
+    mapped = cache.open(src, 48000, 2, "pad")
+    assert isinstance(mapped, np.memmap)
+    assert np.array_equal(np.asarray(mapped), pcm)
+    assert cache.open(src, 44100, 2, "pad") is None
+
+    with open(src, "ab") as fh:
+        fh.write(b"edited")
+    assert cache.open(src, 48000, 2, "pad") is None
+
+
+def test_layout_sharing(tmp_path):
+    """Entries at the source's own channel count serve either producer's layout.
+
+    Remapped entries serve only the layout they were remapped to.
+    """
+    src = _source(tmp_path)
+    cache = PcmDiskCache(tmp_path / "cache", max_bytes=1 << 24)
+    cache.store(src, 48000, 2, "stereo", _pcm(), source_channels=2)
+    assert cache.open(src, 48000, 2, "pad") is not None  # native: editor output serves the engine
+
+    mono = _source(tmp_path, "mono.wav")
+    cache.store(mono, 48000, 2, "stereo", _pcm(), source_channels=1)
+    assert cache.open(mono, 48000, 2, "stereo") is not None
+    assert cache.open(mono, 48000, 2, "pad") is None
+
+
+def test_int16_entries(tmp_path):
+    src = _source(tmp_path)
+    f32 = PcmDiskCache(tmp_path / "f32", max_bytes=1 << 24)
+    i16 = PcmDiskCache(tmp_path / "i16", max_bytes=1 << 24, int16=True)
+    pcm = _pcm()
+    e32 = f32.store(src, 48000, 2, "pad", pcm, source_channels=2)
+    e16 = i16.store(src, 48000, 2, "pad", pcm, source_channels=2)
+    assert os.path.getsize(e16) < os.path.getsize(e32) * 0.6
+    mapped = i16.open(src, 48000, 2, "pad")
+    assert mapped.dtype == np.int16
+    assert np.max(np.abs(to_float32(mapped) - pcm)) <= 1.0 / 32768.0
+
+
+def test_entry_size_limit(tmp_path):
+    src = _source(tmp_path)
+    pcm = _pcm()
+    cache = PcmDiskCache(tmp_path / "cache", max_bytes=1 << 24, max_entry_bytes=pcm.nbytes - 1)
+    assert cache.store(src, 48000, 2, "pad", pcm, source_channels=2) is None
+    assert cache.store(src, 48000, 2, "pad", pcm[:-1], source_channels=2) is not None
+
+
+def test_capture_streams_to_disk_past_ram_limit(tmp_path):
+    src = _source(tmp_path)
+    disk = PcmDiskCache(tmp_path / "cache", max_bytes=1 << 24)
+    ram = DecodedPcmCache(budget_bytes=1 << 20, max_entry_bytes=_pcm(1000).nbytes)
+    chunks = [_pcm(800, seed=i) for i in range(3)]
+
+    def open_disk():
+        return disk.writer(src, 48000, 2, "pad", source_channels=2)
+
+    cap = PcmCapture(ram, cache_key(src, 48000, 2), 2, open_disk=open_disk)
+    for chunk in chunks:
+        cap.add(chunk)
+    assert cap.active  # over the RAM limit, still streaming to disk
+    assert cap.finish() is None and len(ram) == 0
+    assert np.array_equal(np.asarray(disk.open(src, 48000, 2, "pad")), np.concatenate(chunks))
+
+    stopped = PcmCapture(None, cache_key(src, 44100, 2), 2, open_disk=lambda: disk.writer(src, 44100, 2, "pad"))
+    stopped.add(chunks[0])
+    stopped.abandon()
+    assert disk.open(src, 44100, 2, "pad") is None
+    assert not list(disk.root.glob("*.tmp"))
+
+
+def test_eviction_by_age_then_size(tmp_path):
+    pcm = _pcm(frames=1000)
+    entry_bytes = pcm.nbytes
+    cache = PcmDiskCache(tmp_path / "cache", max_bytes=entry_bytes * 10, max_age_s=3600)
+    paths = []
+    for i in range(4):
+        src = _source(tmp_path, f"s{i}.wav", payload=bytes([i]))
+        paths.append(cache.store(src, 48000, 2, "pad", pcm, source_channels=2))
+    now = time.time()
+    os.utime(paths[0], (now - 7200, now - 7200))  # expired
+    for i, p in enumerate(paths[1:], start=1):
+        os.utime(p, (now - 100 + i, now - 100 + i))
+
+    cache.max_bytes = int(entry_bytes * 2.5)  # room for two entries
+    result = cache.evict(now=now)
+    assert result["removed"] == 2
+    assert not paths[0].exists() and not paths[1].exists()
+    assert paths[2].exists() and paths[3].exists()
+
+
+def test_stale_temp_files_are_removed(tmp_path):
+    cache = PcmDiskCache(tmp_path / "cache", max_bytes=1 << 24)
+    cache.root.mkdir()
+    stale = cache.root / "abc123.tmp"
+    fresh = cache.root / "def456.tmp"
+    stale.write_bytes(b"x" * 100)
+    fresh.write_bytes(b"x" * 100)
+    now = time.time()
+    os.utime(stale, (now - 3600, now - 3600))
+    result = cache.evict(now=now)
+    assert result["removed"] == 1 and result["freed_bytes"] == 100
+    assert not stale.exists() and fresh.exists()  # may still be being written
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import struct
+import wave
+
+import numpy as np
+
+from engine.pcm_file import open_pcm_file
+
+
+def _ramp(frames=1000, channels=2) -> np.ndarray:
+    t = np.linspace(-0.9, 0.9, frames * channels, dtype=np.float64)
+    return t.reshape(frames, channels)
+
+
+def _int_bytes(x: np.ndarray, width: int, big_endian: bool = False) -> bytes:
+    scale = float(1 << (8 * width - 1))
+    ints = np.clip(np.round(x * scale), -scale, scale - 1).astype(np.int64).ravel()
+    if width == 1:
+        return (ints + 128).astype(np.uint8).tobytes()
+    order = "big" if big_endian else "little"
+    return b"".join(int(v).to_bytes(width, order, signed=True) for v in ints)
+
+
+def _write_wav(path, x: np.ndarray, width: int) -> None:
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(x.shape[1])
+        w.setsampwidth(width)
+        w.setframerate(48000)
+        w.writeframes(_int_bytes(x, width))
+
+
+def _write_float_wav(path, x: np.ndarray) -> None:
+    data = x.astype("<f4").tobytes()
+    fmt = struct.pack("<HHIIHH", 3, x.shape[1], 48000, 48000 * 4 * x.shape[1], 4 * x.shape[1], 32)
+    body = b"WAVE" + b"fmt " + struct.pack("<I", len(fmt)) + fmt + b"data" + struct.pack("<I", len(data)) + data
+    path.write_bytes(b"RIFF" + struct.pack("<I", len(body)) + body)
+
+
+def _extended(rate: float) -> bytes:
+    exp = int(np.floor(np.log2(rate)))
+    mant = int(rate * 2 ** (63 - exp))
+    return struct.pack(">HQ", exp + 16383, mant)
+
+
+def _write_aiff(path, x: np.ndarray, width: int, *, sowt: bool = False) -> None:
+    data = _int_bytes(x, width, big_endian=not sowt)
+    comm = struct.pack(">hIh", x.shape[1], x.shape[0], width * 8) + _extended(48000.0)
+    if sowt:
+        comm += b"sowt" + b"\x00"
+    ssnd = struct.pack(">II", 0, 0) + data
+    chunks = b"COMM" + struct.pack(">I", len(comm)) + comm + (b"\x00" if len(comm) & 1 else b"")
+    chunks += b"SSND" + struct.pack(">I", len(ssnd)) + ssnd
+    kind = b"AIFC" if sowt else b"AIFF"
+    path.write_bytes(b"FORM" + struct.pack(">I", 4 + len(chunks)) + kind + chunks)
+
+
+def test_wav_integer_and_float_widths(tmp_path):
+    x = _ramp()
+    for width, tol in ((1, 1 / 127), (2, 1 / 32767), (3, 1 / 8388607), (4, 1e-7)):
+        p = tmp_path / f"w{width}.wav"
+        _write_wav(p, x, width)
+        f = open_pcm_file(str(p))
+        assert f is not None and f.sample_rate == 48000 and f.shape == (1000, 2)
+        assert np.max(np.abs(f[0:1000] - x)) <= tol, width
+    p = tmp_path / "float.wav"
+    _write_float_wav(p, x)
+    f = open_pcm_file(str(p))
+    assert f is not None and np.array_equal(f[:], x.astype(np.float32))
+
+
+def test_aiff_and_sowt(tmp_path):
+    x = _ramp(frames=333)
+    for width in (2, 3):
+        for sowt in (False, True):
+            p = tmp_path / f"a{width}{int(sowt)}.aif"
+            _write_aiff(p, x, width, sowt=sowt)
+            f = open_pcm_file(str(p))
+            assert f is not None and f.sample_rate == 48000 and f.frames == 333
+            assert np.max(np.abs(f[:] - x)) <= 1 / 32767
+
+
+def test_exact_slices_and_channel_remap(tmp_path):
+    x = _ramp(frames=500, channels=3)
+    p = tmp_path / "three.wav"
+    _write_float_wav(p, x)
+    f = open_pcm_file(str(p))
+    assert np.array_equal(f[123:130], x[123:130].astype(np.float32))
+    assert f[499:600].shape == (1, 3)
+    stereo = f.with_channels(2)
+    assert stereo.shape == (500, 2) and np.array_equal(stereo[10:20], x[10:20, :2].astype(np.float32))
+    quad = f.with_channels(4)
+    assert np.all(quad[0:5][:, 3] == 0.0)
+
+
+def test_rejects_compressed_and_clamps_truncated(tmp_path):
+    p = tmp_path / "adpcm.wav"
+    fmt = struct.pack("<HHIIHH", 2, 2, 48000, 0, 0, 4)
+    body = b"WAVE" + b"fmt " + struct.pack("<I", 16) + fmt + b"data" + struct.pack("<I", 4) + b"\x00" * 4
+    p.write_bytes(b"RIFF" + struct.pack("<I", len(body)) + body)
+    assert open_pcm_file(str(p)) is None
+    assert open_pcm_file(str(tmp_path / "missing.wav")) is None
+
+    t = tmp_path / "trunc.wav"
+    _write_wav(t, _ramp(frames=100), 2)
+    t.write_bytes(t.read_bytes()[:-41])  # header still claims 100 frames
+    f = open_pcm_file(str(t))
+    assert f is not None and f.frames == 89
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import numpy as np
+
+from engine.processes.output_process import _Ring
+from engine.processes.pcm_ring import PcmRing
+
+
+def _ramp(start: int, frames: int, channels: int = 2) -> np.ndarray:
+    x = np.arange(start, start + frames, dtype=np.float32)
+    return np.repeat(x[:, None], channels, axis=1)
+
+
+def test_wraparound_order_and_padding():
+    ring = PcmRing(10, 2)
+    out = np.empty((4, 2), dtype=np.float32)
+    got = []
+    for k in range(6):
+        ring.push(_ramp(k * 4, 4))
+        filled, restart, stopped = ring.pull_into(out)
+        assert filled == 4 and restart is None and not stopped
+        got.extend(out[:, 0].tolist())
+    assert got == list(range(24))
+
+    ring.push(_ramp(100, 3))
+    filled, _, _ = ring.pull_into(out)
+    assert filled == 3 and out[3, 0] == 0.0 and ring.frames == 0
+
+
+def test_restart_marker_and_stop_at_boundary():
+    ring = PcmRing(64, 1)
+    ring.push(_ramp(0, 5, 1))
+    ring.push(_ramp(1000, 5, 1), is_loop_restart=True)
+    out = np.empty((8, 1), dtype=np.float32)
+    filled, restart, _ = ring.pull_into(out)
+    assert filled == 8 and restart == 5 and out[5, 0] == 1000.0
+    filled, restart, _ = ring.pull_into(out)
+    assert filled == 2 and restart is None  # marker already consumed mid-chunk
+
+    ring.push(_ramp(0, 3, 1))
+    ring.push(_ramp(2000, 3, 1), is_loop_restart=True)
+    filled, restart, stopped = ring.pull_into(out, stop_at_restart=True)
+    assert filled == 3 and stopped and ring.buffered == 0
+
+
+def test_spill_when_full():
+    ring = PcmRing(8, 1)
+    ring.push(_ramp(0, 6, 1))
+    ring.push(_ramp(6, 6, 1))
+    assert ring.buffered == 8 and ring.spilled == 4 and ring.frames == 12
+    out = np.empty((6, 1), dtype=np.float32)
+    ring.pull_into(out)
+    assert ring.flush() == 4 and ring.spilled == 0
+    ring.pull_into(out)
+    assert out[:, 0].tolist() == [6, 7, 8, 9, 10, 11]
+
+
+def test_eof_cue_not_done_while_spilled():
+    """A cue at EOF must keep playing until the tail waiting in the spill is out."""
+    ring = _Ring(8)
+    ring.push(_ramp(0, 6, 1), eof=False)
+    ring.push(_ramp(6, 6, 1), eof=True)
+    for expect in (6, 2, 0):
+        _, done, filled, _ = ring.pull(6, 1)
+        assert filled == expect and not done  # the last 4 frames are still spilled
+    ring.pcm.flush()
+    _, done, filled, _ = ring.pull(6, 1)
+    assert filled == 4 and not done
+    _, done, filled, _ = ring.pull(6, 1)
+    assert filled == 0 and done
+
+
+def test_clear_and_truncate():
+    ring = PcmRing(32, 1)
+    out = np.empty((4, 1), dtype=np.float32)
+    ring.push(_ramp(0, 10, 1))
+    ring.clear()
+    assert ring.frames == 0
+    ring.push(_ramp(50, 2, 1))
+    filled, _, _ = ring.pull_into(out)
+    assert filled == 2 and out[0, 0] == 50.0
+
+    ring.push(_ramp(0, 10, 1))
+    assert ring.truncate(3) == 3 and ring.frames == 3
+    ring.push(_ramp(99, 4, 1))  # ignored until clear()
+    filled, _, _ = ring.pull_into(out)
+    assert filled == 3 and ring.frames == 0
+
+
+def test_truncate_at_next_restart():
+    ring = PcmRing(32, 1)
+    ring.push(_ramp(0, 4, 1))
+    ring.push(_ramp(100, 4, 1), is_loop_restart=True)
+    assert ring.truncate_at_next_restart()
+    assert ring.frames == 4
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import multiprocessing as mp
+
+import numpy as np
+
+from engine.processes.pcm_shm import PcmSlabPool, PcmSlabWriter
+
+
+def _make_pool(slab_count: int = 4, slab_frames: int = 1000, channels: int = 2) -> PcmSlabPool:
+    return PcmSlabPool.create(mp.get_context("spawn"), slab_count=slab_count, slab_frames=slab_frames, channels=channels)
+
+
+def test_writer_spans_round_trip_and_release():
+    pool = _make_pool()
+    try:
+        writer = PcmSlabWriter(pool)
+        a = np.random.default_rng(1).standard_normal((700, 2)).astype(np.float32)
+        b = np.random.default_rng(2).standard_normal((700, 2)).astype(np.float32)
+
+        spans_a, written_a = writer.write(a)
+        spans_b, written_b = writer.write(b)
+        assert written_a == 700 and written_b == 700
+        # Second chunk continues the first slab, then spills into a new one.
+        assert spans_a == [(spans_a[0][0], 0, 700)]
+        assert spans_b[0] == (spans_a[0][0], 700, 300)
+        assert spans_b[1][1:] == (0, 400)
+
+        writer.seal()
+        out = np.concatenate([pool.take(*span) for span in spans_a + spans_b], axis=0)
+        assert np.array_equal(out, np.concatenate([a, b], axis=0))
+        assert pool.free_slabs() == 4
+    finally:
+        pool.close()
+        pool.unlink()
+
+
+def test_exhausted_pool_reports_short_write():
+    """The caller needs the short write to fall back to inline PCM."""
+    pool = _make_pool(slab_count=2, slab_frames=100)
+    try:
+        writer = PcmSlabWriter(pool)
+        pcm = np.ones((250, 2), dtype=np.float32)
+        spans, written = writer.write(pcm)
+        assert written == 200
+        assert [s[2] for s in spans] == [100, 100]
+        assert pool.free_slabs() == 0
+
+        writer.seal()
+        for span in spans:
+            pool.take(*span)
+        assert pool.free_slabs() == 2
+    finally:
+        pool.close()
+        pool.unlink()
+
+
+def test_channel_mismatch_is_not_written():
+    pool = _make_pool(channels=2)
+    try:
+        spans, written = PcmSlabWriter(pool).write(np.zeros((10, 1), dtype=np.float32))
+        assert spans == [] and written == 0
+    finally:
+        pool.close()
+        pool.unlink()
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import os
+
+import numpy as np
+
+from engine.processes.preroll import PrerollStore, preroll_key
+
+
+def _head(frames: int = 1000) -> np.ndarray:
+    return np.full((frames, 2), 0.25, dtype=np.float32)
+
+
+def test_key_tracks_file_and_in_frame(tmp_path):
+    """A trimmed or edited cue must never be served a stale head."""
+    path = tmp_path / "bed.mp3"
+    path.write_bytes(b"x" * 100)
+    k = preroll_key(str(path), 0, 48000, 2)
+    assert k == preroll_key(str(path), 0, 48000, 2)
+    assert k != preroll_key(str(path), 4800, 48000, 2)
+    path.write_bytes(b"x" * 101)
+    os.utime(path, ns=(1, 1))
+    assert preroll_key(str(path), 0, 48000, 2) != k
+    assert preroll_key(str(tmp_path / "missing.mp3"), 0, 48000, 2) is None
+
+
+def test_arm_replaces_the_armed_set():
+    store = PrerollStore(budget_bytes=1 << 20, preroll_frames=1000)
+    assert not store.put("a", _head())  # not armed
+    assert sorted(store.arm(["a", "b"])) == ["a", "b"]
+    assert store.put("a", _head()) and store.put("b", _head())
+    assert store.arm(["b", "c"]) == ["c"]  # bank switch: a is dropped, b is kept
+    assert "a" not in store and "b" in store
+    assert store.stats()["bytes"] == _head().nbytes
+    head = store.get("b")
+    assert head is not None and not head.pcm.flags.writeable and not head.exact
+    assert store.put("b", _head(), exact=True) and store.get("b").exact
+
+
+def test_budget_and_hit_rate():
+    entry = _head().nbytes
+    store = PrerollStore(budget_bytes=entry * 2, preroll_frames=1000)
+    store.arm(["a", "b", "c"])
+    for key in ("a", "b"):
+        store.put(key, _head())
+    assert store.get("a") is not None  # a is now most recent
+    store.put("c", _head())
+    assert "b" not in store and "a" in store and "c" in store
+    assert store.get("b") is None
+    stats = store.stats()
+    assert stats["bytes"] == entry * 2 <= stats["budget_bytes"]
+    assert (stats["hits"], stats["misses"], stats["hit_rate"], stats["evictions"]) == (1, 1, 0.5, 1)
+    assert not store.put("a", _head(10000))  # larger than the whole budget
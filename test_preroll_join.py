@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import queue
+
+import av
+import numpy as np
+import pytest
+
+from engine.processes import decode_process_pooled as dpp
+from engine.processes.decode_process_pooled import BufferRequest, DecodeStart, DecodedChunk, DecodeError
+from engine.processes.preroll import PrerollStore, preroll_key
+from engine.seek_index import SeekIndexStore, build_seek_index
+
+
+RATE = 48000
+IN_FRAME = 30011  # not on an AAC frame boundary
+HEAD_FRAMES = 4800
+TOTAL = 20000
+
+
+def _encode_aac(path: str, seconds: float = 2.0) -> None:
+    rng = np.random.default_rng(7)
+    samples = rng.uniform(-0.5, 0.5, int(RATE * seconds)).astype(np.float32)
+    container = av.open(path, "w")
+    stream = container.add_stream("aac", rate=RATE, layout="mono")
+    # Without this the encoder codes the noise as PNS, which decodes to different
+    # pseudo-random samples after a seek than in a front-to-back decode.
+    stream.options = {"aac_pns": "0"}
+    for pos in range(0, samples.shape[0], 1024):
+        frame = av.AudioFrame.from_ndarray(samples[None, pos : pos + 1024], format="fltp", layout="mono")
+        frame.sample_rate = RATE
+        frame.pts = pos
+        for packet in stream.encode(frame):
+            container.mux(packet)
+    for packet in stream.encode():
+        container.mux(packet)
+    container.close()
+
+
+def _start(path: str) -> DecodeStart:
+    return DecodeStart("c1", "t1", path, IN_FRAME, None, 0.0, False, RATE, 2, 512)
+
+
+def _play(path: str, preroll: PrerollStore | None = None) -> np.ndarray:
+    cmd_q: "queue.Queue[object]" = queue.Queue()
+    sink: "queue.Queue[object]" = queue.Queue()
+    cmd_q.put(BufferRequest("c1", TOTAL))
+    got: list[np.ndarray] = []
+    frames = 0
+    steps = dpp._decode_cue_steps(0, _start(path), cmd_q, sink, sink, None, preroll=preroll)
+    try:
+        for produced in steps:
+            while True:
+                try:
+                    msg = sink.get_nowait()
+                except queue.Empty:
+                    break
+                assert not isinstance(msg, DecodeError), msg
+                if isinstance(msg, DecodedChunk) and msg.pcm is not None:
+                    got.append(np.array(msg.pcm))
+                    frames += int(msg.pcm.shape[0])
+            if produced is None or frames >= TOTAL:
+                break
+    finally:
+        steps.close()
+    return np.concatenate(got, axis=0)[:TOTAL]
+
+
+def _armed(path: str) -> PrerollStore:
+    store = PrerollStore(budget_bytes=1 << 24, preroll_frames=HEAD_FRAMES)
+    key = preroll_key(path, IN_FRAME, RATE, 2)
+    store.arm([key])
+    for _ in dpp._preroll_steps(0, _start(path), store):
+        pass
+    assert key in store
+    return store
+
+
+@pytest.mark.parametrize("indexed", [False, True])
+def test_armed_start_matches_unarmed_decode(tmp_path, monkeypatch, indexed):
+    """Regression: the armed head must join the decoder behind it without a seam.
+
+    The cue is a compressed (AAC) file with a mid-file in_frame, played unarmed and
+    then armed, with and without a seek index for the file.
+    """
+    path = str(tmp_path / "bed.m4a")
+    _encode_aac(path)
+    store = SeekIndexStore(tmp_path / "SeekIndex")
+    if indexed:
+        index = build_seek_index(path)
+        assert index is not None and store.save(index) is not None
+    monkeypatch.setattr(dpp, "shared_seek_index_store", lambda: store if indexed else None)
+
+    unarmed = _play(path)
+    preroll = _armed(path)
+    assert preroll.get(preroll_key(path, IN_FRAME, RATE, 2)).exact == indexed
+    armed = _play(path, preroll)
+
+    assert unarmed.shape == armed.shape == (TOTAL, 2)
+    assert preroll.stats()["hits"] == 2  # the check above and the armed start
+    assert np.array_equal(armed, unarmed)
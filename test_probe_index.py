@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import os
+import time
+
+from engine.probe_index import ProbeIndex
+
+
+_PROBE = {
+    "duration_seconds": 2.5,
+    "sample_rate": 44100,
+    "channels": 2,
+    "title": "Intro",
+    "artist": "Band",
+    "metadata": {"title": "Intro", "artist": "Band"},
+    "decoder_probe": {"audio_stream_index": 0, "stream_rate": 44100, "duration_seconds": 2.5},
+}
+
+
+def _wait_for(index: ProbeIndex, path: str) -> dict:
+    deadline = time.monotonic() + 5.0
+    while time.monotonic() < deadline:
+        entry = index.get(path)
+        if entry is not None:
+            return entry
+        time.sleep(0.01)
+    raise AssertionError(f"{path} was not indexed")
+
+
+def test_put_get_and_invalidation(tmp_path):
+    audio = tmp_path / "a.wav"
+    audio.write_bytes(b"x" * 100)
+    index = ProbeIndex(tmp_path / "probes.sqlite3")
+    assert index.get(str(audio)) is None
+    assert index.put(str(audio), _PROBE)
+    entry = index.get(str(audio))
+    st = os.stat(audio)
+    assert entry["sig"] == {"path": str(audio.resolve()), "size": 100, "mtime_ns": st.st_mtime_ns}
+    assert {k: entry[k] for k in _PROBE} == _PROBE
+    assert index.stats()["entries"] == 1 and index.hits == 1 and index.misses == 1
+
+    audio.write_bytes(b"y" * 120)
+    assert index.get(str(audio)) is None
+    assert index.get(str(tmp_path / "missing.wav")) is None
+
+
+def test_background_request(tmp_path):
+    """A missing file is probed once, on the indexer thread.
+
+    A probe the caller already has is stored without probing.
+    """
+    calls = []
+
+    def prober(path: str) -> dict:
+        calls.append(path)
+        return _PROBE
+
+    a, b = tmp_path / "a.wav", tmp_path / "b.wav"
+    a.write_bytes(b"a")
+    b.write_bytes(b"b")
+    index = ProbeIndex(tmp_path / "probes.sqlite3", prober=prober)
+    index.request(str(a))
+    index.request(str(a))
+    assert _wait_for(index, str(a))["duration_seconds"] == 2.5
+    index.request(str(a))
+    index.request(str(b), dict(_PROBE, duration_seconds=9.0))
+    assert _wait_for(index, str(b))["duration_seconds"] == 9.0
+    assert calls == [str(a)]
+
+    other = ProbeIndex(tmp_path / "probes.sqlite3")
+    assert other.get(str(a))["metadata"] == _PROBE["metadata"]
+    assert other.stats()["entries"] == 2
+    index.close()
+    other.close()
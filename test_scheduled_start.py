@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+
+from engine.processes.decode_process_pooled import BufferRequest, DecodedChunk
+from engine.processes.output_process import OutputConfig, OutputStartCue, output_process_main
+
+
+def _decoder(decode_q: queue.Queue, pcm_q: queue.Queue, chunks: dict[str, DecodedChunk]) -> None:
+    """Answer each cue's first BufferRequest with its whole (EOF) chunk, like the decoder."""
+    while chunks:
+        req = decode_q.get()
+        if isinstance(req, BufferRequest) and req.cue_id in chunks:
+            pcm_q.put(chunks.pop(req.cue_id))
+
+
+def _render(tmp_path, starts, chunks) -> np.ndarray:
+    out = tmp_path / "mix.npy"
+    saved = dict(os.environ)
+    os.environ.update({
+        "STEPD_OUTPUT_SINK": f"npy:{out}",
+        # Real time: an unthrottled sink can pass a start sample before the decoder
+        # thread answers, and the cue then (correctly) starts late.
+        "STEPD_OUTPUT_SINK_SPEED": "1",
+        "STEPD_SERVICE_LOG_DIR": str(tmp_path),
+        "STEPD_OUTPUT_START_LEAD_MS": "50",
+        "STEPD_CALLBACK_STATS_MS": "0",
+        "STEPD_RT_DISABLE_METERS": "1",
+        "STEPD_EOF_FADE_MS": "0",
+    })
+    cmd_q, pcm_q, event_q, decode_q = queue.Queue(), queue.Queue(), queue.Queue(), queue.Queue()
+    try:
+        for msg in starts:
+            cmd_q.put(msg)
+        threading.Thread(target=_decoder, args=(decode_q, pcm_q, chunks), daemon=True).start()
+        cfg = OutputConfig(sample_rate=48000, channels=2, block_frames=512)
+        t = threading.Thread(target=output_process_main, args=(cfg, cmd_q, pcm_q, event_q, decode_q), daemon=True)
+        t.start()
+        finished: set[str] = set()
+        deadline = time.monotonic() + 20.0
+        while len(finished) < len(starts) and time.monotonic() < deadline:
+            try:
+                evt = event_q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if isinstance(evt, tuple) and evt[0] == "finished":
+                finished.add(evt[1])
+        assert len(finished) == len(starts)
+        cmd_q.put(False)
+        t.join(timeout=10.0)
+        assert not t.is_alive()
+    finally:
+        os.environ.clear()
+        os.environ.update(saved)
+    return np.load(out)[:, 0]
+
+
+def _chunk(cue_id: str, frames: int, value: float) -> DecodedChunk:
+    return DecodedChunk(cue_id, cue_id, np.full((frames, 2), value, dtype=np.float32), True)
+
+
+def test_quantized_starts_share_a_sample(tmp_path):
+    """Cues on the same quantum must begin mixing on the same output sample, mid-block.
+
+    The output loop runs in a thread on the headless npy sink (no audio device).
+    """
+    starts = [
+        OutputStartCue("a", "a", 0.0, start_quantum_frames=1000),
+        OutputStartCue("b", "b", 0.0, start_quantum_frames=1000),
+    ]
+    mix = _render(tmp_path, starts, {"a": _chunk("a", 3000, 0.25), "b": _chunk("b", 3000, 0.5)})
+    onset = int(np.flatnonzero(mix)[0])
+    # Both on one quantum boundary, at least one block + 50 ms (2400 frames) out, mid-block.
+    assert onset % 1000 == 0 and onset >= 512 + 2400 and onset % 512 != 0
+    assert np.allclose(mix[onset : onset + 3000], 0.75)
+    assert np.all(mix[onset + 3000 :] == 0.0)
+
+
+def test_absolute_start_sample(tmp_path):
+    starts = [OutputStartCue("a", "a", 0.0, start_at_sample=4801)]
+    mix = _render(tmp_path, starts, {"a": _chunk("a", 100, 0.5)})
+    assert np.all(mix[:4801] == 0.0)
+    assert np.allclose(mix[4801:4901], 0.5)
+    assert np.all(mix[4901:] == 0.0)
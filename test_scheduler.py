@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from engine.scheduler import TimerHeap
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_pops_only_due_in_order():
+    clock = _Clock()
+    timers = TimerHeap(clock)
+    timers.schedule_in(0.3, "stop", "b")
+    timers.schedule_in(0.1, "stop", "a")
+    timers.schedule_in(5.0, "force_remove", "c")
+    assert timers.pop_due() == []
+    clock.now += 0.5
+    assert [(t.kind, t.key) for t in timers.pop_due()] == [("stop", "a"), ("stop", "b")]
+    assert len(timers) == 1 and timers.next_deadline() == 105.0
+
+
+def test_reschedule_replaces():
+    clock = _Clock()
+    timers = TimerHeap(clock)
+    timers.schedule_in(0.1, "stop", "a")
+    timers.schedule_in(2.0, "stop", "a")  # a second fade-out request pushes the stop back
+    clock.now += 1.0
+    assert timers.pop_due() == []
+    clock.now += 1.0
+    assert [t.key for t in timers.pop_due()] == ["a"]
+    assert timers.pop_due() == [] and len(timers) == 0
+
+
+def test_cancel_kind_and_key():
+    clock = _Clock()
+    timers = TimerHeap(clock)
+    timers.schedule_in(1.0, "stop", "a")
+    timers.schedule_in(1.0, "force_remove", "a")
+    timers.schedule_in(1.0, "stop", "b")
+    timers.schedule_in(1.0, "command", 7, payload="cmd")
+    assert timers.cancel("force_remove", "a") and not timers.cancel("force_remove", "a")
+    timers.cancel_key("b")
+    clock.now += 2.0
+    due = timers.pop_due()
+    assert [(t.kind, t.key, t.payload) for t in due] == [("stop", "a", None), ("command", 7, "cmd")]
+    assert timers.next_deadline() is None
+
+
+def test_stale_entries_are_compacted():
+    timers = TimerHeap(_Clock())
+    for i in range(10000):
+        timers.schedule(200.0 + i, "stop", "a")
+    assert len(timers) == 1 and len(timers._heap) < 200
+    assert timers.next_deadline() == 200.0 + 9999
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import os
+from fractions import Fraction
+
+import numpy as np
+
+from engine.seek_index import SeekIndex, SeekIndexStore
+from engine.processes.decoded_cache import file_signature
+
+
+def _index(path: str, *, preroll: int = 0) -> SeekIndex:
+    # 1152-sample frames (MP3) with PTS in a 1/14112000 time base (294 ticks per sample).
+    offsets = np.arange(0, 1152 * 10, 1152, dtype=np.int64)
+    return SeekIndex(
+        sig=file_signature(path),
+        stream_index=0,
+        sample_rate=48000,
+        time_base=Fraction(1, 14112000),
+        pts=offsets * 294,
+        offsets=offsets,
+        total_samples=1152 * 10 - 500,
+        delay_samples=0,
+        padding_samples=500,
+        preroll=preroll,
+    )
+
+
+def _source(tmp_path):
+    p = tmp_path / "bed.mp3"
+    p.write_bytes(b"ID3")
+    return str(p)
+
+
+def test_locate_exact_discard(tmp_path):
+    idx = _index(_source(tmp_path))
+    assert idx.locate(0) == (0, 0)
+    assert idx.locate(1152 * 3 + 17) == (1152 * 3 * 294, 17)
+    assert idx.locate(10**9)[1] == idx.total_samples - 1152 * 9
+
+
+def test_preroll_seeks_earlier(tmp_path):
+    idx = _index(_source(tmp_path), preroll=2)
+    assert idx.locate(1152 * 3 + 17) == (1152 * 1 * 294, 1152 * 2 + 17)
+    assert idx.locate(100) == (0, 100)
+
+
+def test_offset_at_only_indexed_pts(tmp_path):
+    """An unexpected seek landing must fall back rather than guess an offset."""
+    idx = _index(_source(tmp_path))
+    assert idx.offset_at(1152 * 4 * 294) == 1152 * 4
+    assert idx.offset_at(1152 * 4 * 294 + 1) is None
+    assert idx.offset_at(None) is None
+
+
+def test_store_round_trip_and_invalidation(tmp_path):
+    src = _source(tmp_path)
+    store = SeekIndexStore(tmp_path / "SeekIndex")
+    assert store.load(src) is None
+    assert store.save(_index(src, preroll=2)) is not None
+    loaded = store.load(src)
+    assert loaded is not None and store.exists(src)
+    assert loaded.preroll == 2 and loaded.padding_samples == 500
+    assert loaded.time_base == Fraction(1, 14112000)
+    assert np.array_equal(loaded.pts, _index(src).pts)
+    assert store.load(src, stream_index=1) is None
+
+    with open(src, "ab") as fh:
+        fh.write(b"edited")
+    os.utime(src, ns=(1, 1))
+    assert store.load(src) is None and not store.exists(src)
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import multiprocessing as mp
+import queue
+import threading
+import time
+
+from engine.processes.wakeup import Wakeup
+
+
+def _put_later(fn, delay: float = 0.05) -> None:
+    t = threading.Timer(delay, fn)
+    t.daemon = True
+    t.start()
+
+
+def test_wakes_on_queue_and_pipe():
+    ctx = mp.get_context("spawn")
+    q = ctx.Queue()
+    r, w = ctx.Pipe(duplex=False)
+    wakeup = Wakeup([q, r])
+    try:
+        _put_later(lambda: q.put("cmd"))
+        t0 = time.monotonic()
+        assert wakeup.wait(5.0)
+        assert time.monotonic() - t0 < 2.0
+        assert q.get_nowait() == "cmd"
+
+        _put_later(lambda: w.send("pcm"))
+        assert wakeup.wait(5.0) and r.recv() == "pcm"
+    finally:
+        wakeup.close()
+        q.close()
+
+
+def test_notify_coalesces():
+    wakeup = Wakeup([])
+    try:
+        _put_later(wakeup.notify)
+        assert wakeup.wait(5.0)
+        for _ in range(10):
+            wakeup.notify()
+        assert wakeup.wait(1.0)
+        assert not wakeup.wait(0.02)  # the ten notifies were one wakeup
+        assert wakeup.wakeups == 2 and wakeup.timeouts == 1
+    finally:
+        wakeup.close()
+
+
+def test_timeout_and_polling_fallback():
+    """In-process queue.Queue inputs cannot be waited on and fall back to polling."""
+    q: "queue.Queue[str]" = queue.Queue()
+    wakeup = Wakeup([q])
+    try:
+        t0 = time.monotonic()
+        assert not wakeup.wait(0.05)
+        assert time.monotonic() - t0 >= 0.04
+        _put_later(lambda: q.put("x"), delay=0.02)
+        assert wakeup.wait(5.0) and q.get_nowait() == "x"
+    finally:
+        wakeup.close()
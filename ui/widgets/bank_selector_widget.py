@@ -28,6 +28,9 @@ class BankSelectorWidget(QWidget):
 	- All banks stay connected to the EngineAdapter so hidden banks still receive
 	  cue updates; when switching banks we force a light UI refresh so the newly
 	  visible bank immediately reflects current active state.
+	- The visible bank's cues (or every bank's, see set_arm_all_banks) are armed in
+	  the engine so their first moments stay decoded; re-armed on bank switches and
+	  button edits (debounced).
 	"""
 
 	bank_changed = Signal(int)
@@ -54,6 +57,13 @@ class BankSelectorWidget(QWidget):
 		self._bank_buttons: list[QPushButton] = []
 		self._bank_widgets: list[ButtonBankWidget] = []
 		self._current_bank_index: int = 0
+		self._arm_all_banks: bool = False
+
+		# Debounced re-arm of the visible bank (bank switch, file/in/out edits).
+		self._arm_timer = QTimer(self)
+		self._arm_timer.setSingleShot(True)
+		self._arm_timer.setInterval(250)
+		self._arm_timer.timeout.connect(self.arm_visible_cues)
 
 		root = QVBoxLayout(self)
 		root.setContentsMargins(6, 6, 6, 6)
@@ -87,6 +97,11 @@ class BankSelectorWidget(QWidget):
 			)
 			self._bank_widgets.append(bank_widget)
 			self._stack.addWidget(bank_widget)
+			for b in getattr(bank_widget, "buttons", []) or []:
+				try:
+					b.state_changed.connect(lambda _state, i=idx: self._schedule_arm(i))
+				except Exception:
+					pass
 
 		# Default to first bank
 		if self._bank_buttons:
@@ -333,6 +348,42 @@ class BankSelectorWidget(QWidget):
 			except Exception:
 				pass
 
+		# Keep the newly visible bank's cues decoded ahead of a press.
+		self._arm_timer.start()
+
+	# ---------------------------------------------------------------------
+	# Cue arming (decoded preroll in the engine)
+	# ---------------------------------------------------------------------
+
+	def set_arm_all_banks(self, enabled: bool) -> None:
+		"""Arm every bank's cues instead of only the visible bank's."""
+		self._arm_all_banks = bool(enabled)
+		self._arm_timer.start()
+
+	def _schedule_arm(self, bank_index: int) -> None:
+		if self._arm_all_banks or int(bank_index) == self._current_bank_index:
+			self._arm_timer.start()
+
+	def arm_visible_cues(self) -> None:
+		"""Send the armed cue set (visible bank, or all banks) to the engine."""
+		adapter = self.engine_adapter
+		arm = getattr(adapter, "arm_cues", None)
+		if not callable(arm):
+			return
+		banks = self._bank_widgets if self._arm_all_banks else [self.current_bank()]
+		cues: list[tuple[str, int, Optional[int]]] = []
+		for bank in banks:
+			for btn in getattr(bank, "buttons", []) or []:
+				file_path = getattr(btn, "file_path", None)
+				if not file_path:
+					continue
+				try:
+					out_frame = getattr(btn, "out_frame", None)
+					cues.append((str(file_path), int(getattr(btn, "in_frame", 0) or 0), None if out_frame is None else int(out_frame)))
+				except Exception:
+					continue
+		arm(cues)
+
 	def flush_persistence(self) -> None:
 		"""Force any pending debounced button settings writes to disk."""
 		try:
@@ -71,6 +71,8 @@ from PySide6.QtGui import QColor, QFont, QFontMetrics, QPainter, QRadialGradient
 from PySide6.QtCore import QMimeData
 
 from engine.cue import Cue, CueInfo
+from engine.probe_index import probe_file, shared_index as shared_probe_index
+from engine.seek_index import shared_store as shared_seek_index_store
 from ui.widgets.AudioLevelMeter import AudioLevelMeter
 
 if TYPE_CHECKING:
@@ -672,6 +674,14 @@ class SoundFileButton(QPushButton):
         self.file_path = file_path
         self._file_probe_cache = cached_probe
 
+        # Seed the shared probe index (no-op if the file is indexed already).
+        try:
+            probe_index = shared_probe_index()
+            if probe_index is not None:
+                probe_index.request(file_path, cached_probe)
+        except Exception:
+            pass
+
         try:
             self.duration_seconds = cached_probe.get("duration_seconds")
         except Exception:
@@ -704,12 +714,25 @@ class SoundFileButton(QPushButton):
             self._decoder_probe_cache = dp if isinstance(dp, dict) else None
         except Exception:
             self._decoder_probe_cache = None
+        self._request_seek_index(file_path, self._decoder_probe_cache)
 
         try:
             self._refresh_label()
         except Exception:
             pass
 
+    @staticmethod
+    def _request_seek_index(path: str, decoder_probe: Optional[dict]) -> None:
+        """Queue a background seek index build (no-op if an up-to-date one exists)."""
+        try:
+            store = shared_seek_index_store()
+            if store is None:
+                return
+            idx = decoder_probe.get("audio_stream_index") if isinstance(decoder_probe, dict) else None
+            store.request(path, idx if isinstance(idx, int) else None)
+        except Exception:
+            pass
+
     def _label_text_for_display(self) -> str:
         """Return the base label text (no auto-wrapping/newlines)."""
         try:
@@ -1687,18 +1710,34 @@ class SoundFileButton(QPushButton):
         since all we're doing is setting text on the button.
         """
         try:
-            duration, sr, ch, title, artist, metadata, decoder_probe = self._probe_file(path)
-            sig = self._file_signature(path)
-            cache = {
-                "sig": sig,
-                "duration_seconds": duration,
-                "sample_rate": sr,
-                "channels": ch,
-                "title": title,
-                "artist": artist,
-                "metadata": metadata,
-                "decoder_probe": decoder_probe,
-            }
+            # Reuse a probe of the same file by any button (or an earlier session).
+            probe_index = shared_probe_index()
+            cache = probe_index.get(path) if probe_index is not None else None
+            if cache is None:
+                duration, sr, ch, title, artist, metadata, decoder_probe = self._probe_file(path)
+                sig = self._file_signature(path)
+                cache = {
+                    "sig": sig,
+                    "duration_seconds": duration,
+                    "sample_rate": sr,
+                    "channels": ch,
+                    "title": title,
+                    "artist": artist,
+                    "metadata": metadata,
+                    "decoder_probe": decoder_probe,
+                }
+                if probe_index is not None:
+                    probe_index.put(path, cache)
+            else:
+                duration = cache["duration_seconds"]
+                sr = cache["sample_rate"]
+                ch = cache["channels"]
+                title = cache["title"]
+                artist = cache["artist"]
+                metadata = cache["metadata"]
+                decoder_probe = cache["decoder_probe"]
+            # Sample-accurate in/loop points for the engine (engine/seek_index.py).
+            self._request_seek_index(path, decoder_probe)
 
             def _apply() -> None:
                 # Apply results on the GUI thread.
@@ -1733,148 +1772,13 @@ class SoundFileButton(QPushButton):
     @staticmethod
     def _probe_file(path: str) -> tuple[Optional[float], Optional[int], Optional[int], Optional[str], Optional[str], dict, dict]:
         """
-        Best-effort probe: try PyAV, fall back to wave for WAV files.
+        Best-effort probe (engine/probe_index.py: PyAV, falling back to wave for WAV files).
         
         Returns:
             (duration_seconds, sample_rate, channels, song_title, song_artist, metadata, decoder_probe)
         """
-        # Try PyAV (fast metadata read)
-        try:
-            import av
-            container = av.open(path)
-
-            stream = None
-            audio_stream_index = None
-            try:
-                for i, s in enumerate(list(container.streams)):
-                    if getattr(s, "type", None) == "audio":
-                        stream = s
-                        audio_stream_index = int(i)
-                        break
-            except Exception:
-                stream = next((s for s in container.streams if s.type == "audio"), None)
-                audio_stream_index = None
-            
-            total_seconds: Optional[float] = None
-            sr: Optional[int] = None
-            ch: Optional[int] = None
-            title: Optional[str] = None
-            artist: Optional[str] = None
-            metadata: dict = {}
-            decoder_probe: dict = {}
-            
-            if stream is not None:
-                # Extract duration
-                if getattr(stream, "duration", None) and getattr(stream, "time_base", None):
-                    total_seconds = float(stream.duration * stream.time_base)
-                
-                # Extract sample rate
-                if getattr(stream, "rate", None):
-                    sr = int(stream.rate)
-                
-                # Extract channels
-                if getattr(stream, "channels", None):
-                    ch = int(stream.channels)
-
-                # Decoder probe fields (serializable)
-                if audio_stream_index is not None:
-                    decoder_probe["audio_stream_index"] = int(audio_stream_index)
-                try:
-                    tb = getattr(stream, "time_base", None)
-                    if tb is not None:
-                        num = getattr(tb, "numerator", None)
-                        den = getattr(tb, "denominator", None)
-                        if num is not None and den is not None:
-                            decoder_probe["time_base_num"] = int(num)
-                            decoder_probe["time_base_den"] = int(den)
-                except Exception:
-                    pass
-                try:
-                    if getattr(stream, "duration", None) is not None:
-                        decoder_probe["stream_duration"] = int(stream.duration)
-                except Exception:
-                    pass
-                try:
-                    if sr is not None:
-                        decoder_probe["stream_rate"] = int(sr)
-                except Exception:
-                    pass
-                try:
-                    if ch is not None:
-                        decoder_probe["stream_channels"] = int(ch)
-                except Exception:
-                    pass
-
-                # Include duration seconds for downstream consumers.
-                if total_seconds is not None:
-                    decoder_probe["duration_seconds"] = float(total_seconds)
-            
-            # Extract metadata from container level
-            if container.metadata:
-                try:
-                    for k, v in dict(container.metadata).items():
-                        try:
-                            kk = k.decode("utf-8", errors="replace") if isinstance(k, bytes) else str(k)
-                            vv = v.decode("utf-8", errors="replace") if isinstance(v, bytes) else str(v)
-                            metadata[str(kk)] = str(vv)
-                        except Exception:
-                            pass
-                except Exception:
-                    pass
-
-            # Merge stream-level metadata
-            try:
-                if stream is not None and getattr(stream, "metadata", None):
-                    for k, v in dict(stream.metadata).items():
-                        try:
-                            kk = k.decode("utf-8", errors="replace") if isinstance(k, bytes) else str(k)
-                            vv = v.decode("utf-8", errors="replace") if isinstance(v, bytes) else str(v)
-                            metadata[str(kk)] = str(vv)
-                        except Exception:
-                            pass
-            except Exception:
-                pass
-
-            # Title/artist convenience (best-effort)
-            try:
-                title = metadata.get("title") or metadata.get("TITLE") or metadata.get("Title")
-            except Exception:
-                title = None
-            try:
-                artist = metadata.get("artist") or metadata.get("ARTIST") or metadata.get("Artist")
-            except Exception:
-                artist = None
-            
-            try:
-                container.close()
-            except Exception:
-                pass
-            
-            return (total_seconds, sr, ch, title, artist, metadata, decoder_probe)
-        
-        except Exception:
-            pass
-        
-        # Fallback for WAV via wave module
-        try:
-            import wave
-            with wave.open(path, "rb") as w:
-                frames = w.getnframes()
-                rate = w.getframerate()
-                channels = w.getnchannels()
-                total_seconds = frames / float(rate) if rate else None
-                sr = int(rate) if rate else None
-                ch = int(channels) if channels else None
-                decoder_probe = {
-                    "duration_seconds": float(total_seconds) if total_seconds is not None else None,
-                    "stream_rate": int(rate) if rate else None,
-                    "stream_channels": int(channels) if channels else None,
-                }
-                return (total_seconds, sr, ch, None, None, {}, decoder_probe)
-        except Exception:
-            pass
-
-        return (None, None, None, None, None, {}, {})
+        p = probe_file(path)
+        return (p["duration_seconds"], p["sample_rate"], p["channels"], p["title"], p["artist"], p["metadata"], p["decoder_probe"])
 
     # ==========================================================================
     # CLIP EDITING DIALOGS